@@ -14,6 +14,8 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import logging
 
+from ..utils.password_hashing import PasswordHashingBusyError, get_password_hashing_pool
+
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -27,6 +29,25 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT Bearer token scheme
 security = HTTPBearer()
 
+# Demo/test accounts with precomputed bcrypt hashes, so falling back to them
+# never costs an extra hash per login attempt
+DEMO_USERS: Dict[str, Dict[str, str]] = {
+    "demo_user": {
+        "user_id": "user_001",
+        # demo_password
+        "password_hash": "$2b$12$luzVcydPF7WyYoYTv5Kjfui8.GPe8CfR5iA0j20FjA8qYEaNScva.",
+    },
+    "test_user": {
+        "user_id": "user_002",
+        # test_password
+        "password_hash": "$2b$12$5tPgPrDfgchFEU1.P92fQ.CaNHxQuofaK/FvBUbKExOgrWGB7WH1G",
+    },
+}
+
+# Verified when no account matches, so every login attempt costs exactly one
+# bcrypt verify and response time does not reveal which usernames exist
+DUMMY_PASSWORD_HASH = "$2b$12$fq3yunpIqpoWiMXg/bzS0u7QvW/.q8lIIXooJzfWoIKp8oaQMPSbi"
+
 
 class JWTAuthenticator:
     """JWT authentication handler"""
@@ -43,6 +64,41 @@ class JWTAuthenticator:
         """Generate password hash"""
         return pwd_context.hash(password)
 
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verify a password on the password hashing pool
+
+        Raises:
+            HTTPException: 429 if the hashing backlog is full
+        """
+        try:
+            return await get_password_hashing_pool().run(
+                pwd_context.verify, plain_password, hashed_password
+            )
+        except PasswordHashingBusyError as e:
+            raise self._hashing_busy(e)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """
+        Generate password hash on the password hashing pool
+
+        Raises:
+            HTTPException: 429 if the hashing backlog is full
+        """
+        try:
+            return await get_password_hashing_pool().run(pwd_context.hash, password)
+        except PasswordHashingBusyError as e:
+            raise self._hashing_busy(e)
+
+    @staticmethod
+    def _hashing_busy(error: PasswordHashingBusyError) -> HTTPException:
+        logger.warning(f"Rejecting password hashing request: {error}")
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many concurrent login attempts, please retry later",
+            headers={"Retry-After": str(error.retry_after)},
+        )
+
     def create_access_token(
         self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None
     ) -> str:
@@ -212,12 +268,14 @@ async def authenticate_user(username: str, password: str) -> Optional[str]:
 
     Returns:
         User ID if authentication successful, None otherwise
+
+    Raises:
+        HTTPException: 429 if the password hashing pool is overloaded
     """
     try:
         # Import here to avoid circular imports
         from ..repositories.user_repository import UserRepository
         from ..database.connection import get_database_manager
-        import hashlib
 
         # Get database manager and create session
         db_manager = get_database_manager()
@@ -226,63 +284,48 @@ async def authenticate_user(username: str, password: str) -> Optional[str]:
 
             # Look up user by username (display_name)
             user_db = await user_repo.get_user_by_username(username)
-            if not user_db:
-                logger.warning(f"User not found: {username}")
-                # Fall back to demo users
-                demo_users = {
-                    "demo_user": {
-                        "user_id": "user_001",
-                        "password_hash": authenticator.get_password_hash("demo_password"),
-                    },
-                    "test_user": {
-                        "user_id": "user_002",
-                        "password_hash": authenticator.get_password_hash("test_password"),
-                    },
-                }
-
-                demo_user = demo_users.get(username)
-                if demo_user and authenticator.verify_password(password, demo_user["password_hash"]):
-                    logger.info(f"Demo user authenticated: {username}")
-                    return demo_user["user_id"]
-
-                logger.warning(f"No valid authentication method found for user: {username}")
+
+        # Verify outside the session so the connection is not held while hashing
+        if not user_db:
+            logger.warning(f"User not found: {username}")
+            # Fall back to demo users
+            return await _authenticate_demo_user(username, password)
+
+        # Check if user has a stored password hash
+        if user_db.password_hash:
+            # Verify password using bcrypt
+            if await authenticator.verify_password_async(password, user_db.password_hash):
+                logger.info(f"User authenticated successfully: {username}")
+                return user_db.user_id
+            else:
+                logger.warning(f"Password verification failed for user: {username}")
                 return None
 
-            # Check if user has a stored password hash
-            if user_db.password_hash:
-                # Verify password using bcrypt
-                if authenticator.verify_password(password, user_db.password_hash):
-                    logger.info(f"User authenticated successfully: {username}")
-                    return user_db.user_id
-                else:
-                    logger.warning(f"Password verification failed for user: {username}")
-                    return None
-
-            # If no password hash, fall back to demo users for backward compatibility
-            demo_users = {
-                "demo_user": {
-                    "user_id": "user_001",
-                    "password_hash": authenticator.get_password_hash("demo_password"),
-                },
-                "test_user": {
-                    "user_id": "user_002",
-                    "password_hash": authenticator.get_password_hash("test_password"),
-                },
-            }
-
-            demo_user = demo_users.get(username)
-            if demo_user and authenticator.verify_password(password, demo_user["password_hash"]):
-                logger.info(f"Demo user authenticated: {username}")
-                return demo_user["user_id"]
-
-            logger.warning(f"No valid authentication method found for user: {username}")
-            return None
+        # If no password hash, fall back to demo users for backward compatibility
+        return await _authenticate_demo_user(username, password)
 
+    except HTTPException:
+        # Hashing pool overloaded (429)
+        raise
     except Exception as e:
         logger.error(f"Authentication error: {e}")
         return None
 
 
+async def _authenticate_demo_user(username: str, password: str) -> Optional[str]:
+    """Check credentials against the built-in demo accounts"""
+    demo_user = DEMO_USERS.get(username)
+    if demo_user is None:
+        # Same cost as a real verify for unknown users
+        await authenticator.verify_password_async(password, DUMMY_PASSWORD_HASH)
+    elif await authenticator.verify_password_async(password, demo_user["password_hash"]):
+        logger.info(f"Demo user authenticated: {username}")
+        return demo_user["user_id"]
+
+    logger.warning(f"No valid authentication method found for user: {username}")
+    return None
+
+
 def create_user_token(user_id: str) -> Dict[str, Any]:
     """
     Create access token for user
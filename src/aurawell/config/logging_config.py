@@ -8,9 +8,12 @@ structured logging, security-aware log filtering, and audit trails.
 import logging
 import logging.config
 import os
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 import json
 
 from .settings import settings
@@ -138,6 +141,295 @@ class AuraWellFormatter(logging.Formatter):
         return json.dumps(log_entry, ensure_ascii=False)
 
 
+class RequestLogFormatter(logging.Formatter):
+    """
+    Formatter for ``aurawell.requests`` records
+
+    The request middleware passes its structured entry as ``record.context``;
+    it is serialized to one JSON line here, and sensitive values are redacted.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._security_filter = SecurityLogFilter()
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = getattr(record, "context", None)
+        if entry is None:
+            return record.getMessage()
+
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        lowered = line.lower()
+        if any(p in lowered for p in SecurityLogFilter.SENSITIVE_PATTERNS):
+            line = self._security_filter._sanitize_message(line)
+        return line
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Queue handler that does no formatting on the calling thread
+
+    Records are enqueued untouched and formatted by the listener's handlers.
+    When the queue is full the record is handed to ``overflow`` and written
+    synchronously on the calling thread; without an ``overflow`` it is
+    dropped and counted rather than blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        overflow: Optional[Callable[[logging.LogRecord], None]] = None,
+    ):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self.overflowed = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow is None:
+                self.dropped += 1
+            else:
+                self.overflowed += 1
+                self.overflow(record)
+
+
+_request_log_listener: Optional[QueueListener] = None
+_request_log_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def start_request_logging(
+    log_file: Optional[str] = None, queue_size: int = 10000
+) -> QueueListener:
+    """
+    Route ``aurawell.requests`` through a queue drained by a background thread
+
+    Args:
+        log_file: File to write request logs to; stdout when omitted
+        queue_size: Maximum records buffered before new ones are dropped
+
+    Returns:
+        The running queue listener
+    """
+    global _request_log_listener, _request_log_queue_handler
+    if _request_log_listener is not None:
+        return _request_log_listener
+
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+        handler: logging.Handler = logging.FileHandler(log_file, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(RequestLogFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _request_log_queue_handler = NonBlockingQueueHandler(log_queue)
+
+    request_logger = logging.getLogger("aurawell.requests")
+    request_logger.addHandler(_request_log_queue_handler)
+    request_logger.setLevel(logging.INFO)
+    request_logger.propagate = False
+
+    _request_log_listener = QueueListener(
+        log_queue, handler, respect_handler_level=True
+    )
+    _request_log_listener.start()
+    return _request_log_listener
+
+
+def stop_request_logging() -> None:
+    """Flush queued request logs and restore normal propagation"""
+    global _request_log_listener, _request_log_queue_handler
+    if _request_log_listener is None:
+        return
+
+    _request_log_listener.stop()
+    for handler in _request_log_listener.handlers:
+        handler.close()
+
+    request_logger = logging.getLogger("aurawell.requests")
+    request_logger.removeHandler(_request_log_queue_handler)
+    request_logger.propagate = True
+
+    if _request_log_queue_handler.dropped:
+        logging.getLogger(__name__).warning(
+            f"Dropped {_request_log_queue_handler.dropped} request log records"
+        )
+    _request_log_listener = None
+    _request_log_queue_handler = None
+
+
+class BatchingLogWriter:
+    """
+    Drains a log queue on a background thread and writes records in batches
+
+    Whatever has accumulated in the queue (up to ``batch_size`` records) is
+    formatted and written to the handler's stream with one write and one
+    flush, instead of a write and flush per record.
+    """
+
+    _sentinel = None
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        handler: logging.StreamHandler,
+        batch_size: int = 256,
+    ):
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.batches = 0
+        self.records = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="batching-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write everything still queued, then stop the thread"""
+        if self._thread is None:
+            return
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            batch = []
+            stopping = record is self._sentinel
+            if not stopping:
+                batch.append(record)
+            while not stopping and len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._sentinel:
+                    stopping = True
+                else:
+                    batch.append(record)
+
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def write(self, record: logging.LogRecord) -> None:
+        """Write one record immediately on the calling thread"""
+        self._write([record])
+
+    def _write(self, batch: List[logging.LogRecord]) -> None:
+        lines = []
+        for record in batch:
+            if record.levelno < self.handler.level or not self.handler.filter(record):
+                continue
+            try:
+                lines.append(self.handler.format(record) + self.handler.terminator)
+            except Exception:
+                self.handler.handleError(record)
+
+        if not lines:
+            return
+        with self.handler.lock:
+            try:
+                self.handler.stream.write("".join(lines))
+                self.handler.flush()
+            except Exception:
+                self.handler.handleError(batch[-1])
+            self.batches += 1
+            self.records += len(lines)
+
+
+_audit_log_writer: Optional[BatchingLogWriter] = None
+_audit_log_queue_handler: Optional[NonBlockingQueueHandler] = None
+_audit_log_previous_handlers: List[logging.Handler] = []
+
+
+def start_audit_logging(
+    log_file: str = os.path.join("logs", "audit.log"),
+    queue_size: int = 10000,
+    batch_size: int = 256,
+) -> BatchingLogWriter:
+    """
+    Route ``aurawell.audit`` through a queue written in batches by a background thread
+
+    Audit records are never dropped: when the queue is full the record is
+    written synchronously by the logging thread instead, which may put it
+    ahead of records still queued.
+
+    Args:
+        log_file: File to write audit records to
+        queue_size: Maximum records buffered before writes become synchronous
+        batch_size: Maximum records written per batch
+
+    Returns:
+        The running batch writer
+    """
+    global _audit_log_writer, _audit_log_queue_handler, _audit_log_previous_handlers
+    if _audit_log_writer is not None:
+        return _audit_log_writer
+
+    log_dir = os.path.dirname(log_file)
+    if log_dir and not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+    handler = logging.FileHandler(log_file, encoding="utf-8")
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(AuraWellFormatter(include_context=True))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _audit_log_writer = BatchingLogWriter(log_queue, handler, batch_size=batch_size)
+    _audit_log_queue_handler = NonBlockingQueueHandler(
+        log_queue, overflow=_audit_log_writer.write
+    )
+
+    audit_logger = logging.getLogger("aurawell.audit")
+    _audit_log_previous_handlers = list(audit_logger.handlers)
+    for previous in _audit_log_previous_handlers:
+        audit_logger.removeHandler(previous)
+    audit_logger.addHandler(_audit_log_queue_handler)
+    audit_logger.setLevel(logging.INFO)
+    audit_logger.propagate = False
+
+    _audit_log_writer.start()
+    return _audit_log_writer
+
+
+def stop_audit_logging() -> None:
+    """Flush queued audit records and restore the previous audit handlers"""
+    global _audit_log_writer, _audit_log_queue_handler, _audit_log_previous_handlers
+    if _audit_log_writer is None:
+        return
+
+    _audit_log_writer.stop()
+    _audit_log_writer.handler.close()
+
+    audit_logger = logging.getLogger("aurawell.audit")
+    audit_logger.removeHandler(_audit_log_queue_handler)
+    for previous in _audit_log_previous_handlers:
+        audit_logger.addHandler(previous)
+
+    if _audit_log_queue_handler.overflowed:
+        logging.getLogger(__name__).warning(
+            f"Audit log queue was full {_audit_log_queue_handler.overflowed} times; "
+            f"those records were written synchronously"
+        )
+    _audit_log_writer = None
+    _audit_log_queue_handler = None
+    _audit_log_previous_handlers = []
+
+
 def setup_logging(
     log_level: Optional[str] = None,
     log_file: Optional[str] = None,
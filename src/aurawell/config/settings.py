@@ -39,6 +39,37 @@ class AuraWellSettings:
     DEEPSEEK_MAX_TOKENS: int = int(os.getenv("DEEPSEEK_MAX_TOKENS", "2048"))
     DEEPSEEK_TEMPERATURE: float = float(os.getenv("DEEPSEEK_TEMPERATURE", "0.7"))
 
+    # LLM HTTP connection pool, shared by all DeepSeek clients per API host
+    DEEPSEEK_HTTP_TIMEOUT: float = float(os.getenv("DEEPSEEK_HTTP_TIMEOUT", "300"))
+    DEEPSEEK_HTTP_CONNECT_TIMEOUT: float = float(
+        os.getenv("DEEPSEEK_HTTP_CONNECT_TIMEOUT", "10")
+    )
+    DEEPSEEK_HTTP_MAX_CONNECTIONS: int = int(
+        os.getenv("DEEPSEEK_HTTP_MAX_CONNECTIONS", "100")
+    )
+    DEEPSEEK_HTTP_MAX_KEEPALIVE: int = int(os.getenv("DEEPSEEK_HTTP_MAX_KEEPALIVE", "20"))
+    DEEPSEEK_HTTP_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("DEEPSEEK_HTTP_KEEPALIVE_EXPIRY", "30")
+    )
+    # HTTP/2 is only used when the optional h2 package is installed
+    DEEPSEEK_HTTP2: bool = os.getenv("DEEPSEEK_HTTP2", "true").lower() == "true"
+
+    # LLM response cache (exact match, plus optional embedding similarity)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", "86400"))
+    LLM_CACHE_SEMANTIC_ENABLED: bool = (
+        os.getenv("LLM_CACHE_SEMANTIC_ENABLED", "false").lower() == "true"
+    )
+    LLM_CACHE_SEMANTIC_THRESHOLD: float = float(
+        os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD", "0.95")
+    )
+    LLM_EMBEDDING_MODEL: str = os.getenv("LLM_EMBEDDING_MODEL", "text-embedding-v4")
+
+    # Chat agent pool: at most AGENT_POOL_MAX_SIZE agents, idle ones dropped
+    # after AGENT_POOL_IDLE_TTL seconds
+    AGENT_POOL_MAX_SIZE: int = int(os.getenv("AGENT_POOL_MAX_SIZE", "1000"))
+    AGENT_POOL_IDLE_TTL: float = float(os.getenv("AGENT_POOL_IDLE_TTL", "1800"))
+
     # Health Platform API Keys
     XIAOMI_HEALTH_API_KEY: Optional[str] = os.getenv("XIAOMI_HEALTH_API_KEY")
     XIAOMI_HEALTH_CLIENT_ID: Optional[str] = os.getenv("XIAOMI_HEALTH_CLIENT_ID")
@@ -74,21 +105,63 @@ class AuraWellSettings:
     # Rate Limiting
     API_RATE_LIMIT_PER_MINUTE: int = int(os.getenv("API_RATE_LIMIT_PER_MINUTE", "60"))
     API_RATE_LIMIT_PER_HOUR: int = int(os.getenv("API_RATE_LIMIT_PER_HOUR", "1000"))
+    # Request rate limiting (off by default) keyed on the verified JWT subject
+    # or client IP, its backend ("memory" or "redis") and per-path overrides,
+    # e.g. "/api/v1/chat=10/60,/ws=5/60" (max_requests/window_seconds)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_RULES: str = os.getenv("RATE_LIMIT_RULES", "")
+    # Fraction of fast, successful requests written to the request log
+    REQUEST_LOG_SAMPLE_RATE: float = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1.0"))
 
     # Security
     ENCRYPTION_KEY: Optional[str] = os.getenv("ENCRYPTION_KEY")
     JWT_SECRET: Optional[str] = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Password hashing runs on a dedicated thread pool; logins beyond
+    # PASSWORD_HASH_MAX_PENDING queued hashes are rejected with 429
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+    # Verified JWT payloads are cached in-process for at most AUTH_TOKEN_CACHE_TTL
+    # seconds (never past the token's exp); 0 disables the cache
+    AUTH_TOKEN_CACHE_TTL: float = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    # Token blacklist is mirrored locally and kept current via Redis pub/sub;
+    # a full resync runs every TOKEN_BLACKLIST_REFRESH_INTERVAL seconds, and if
+    # the mirror has not been confirmed for TOKEN_BLACKLIST_MAX_STALENESS
+    # seconds checks fall back to querying Redis directly
+    TOKEN_BLACKLIST_LOCAL_MIRROR: bool = os.getenv("TOKEN_BLACKLIST_LOCAL_MIRROR", "true").lower() == "true"
+    TOKEN_BLACKLIST_REFRESH_INTERVAL: float = float(os.getenv("TOKEN_BLACKLIST_REFRESH_INTERVAL", "60"))
+    TOKEN_BLACKLIST_MAX_STALENESS: float = float(os.getenv("TOKEN_BLACKLIST_MAX_STALENESS", "5"))
+    # A user's family roles are cached per request and in-process for
+    # FAMILY_PERMISSION_CACHE_TTL seconds (bounds cross-worker staleness after
+    # role changes); 0 disables the cache
+    FAMILY_PERMISSION_CACHE_TTL: float = float(os.getenv("FAMILY_PERMISSION_CACHE_TTL", "30"))
+    FAMILY_PERMISSION_CACHE_SIZE: int = int(os.getenv("FAMILY_PERMISSION_CACHE_SIZE", "10000"))
 
     # Redis Configuration
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     REDIS_PASSWORD: Optional[str] = os.getenv("REDIS_PASSWORD")
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
 
+    # Cache serialization (codec: orjson, msgpack, json; compression: zstd, zlib, none)
+    CACHE_CODEC: str = os.getenv("CACHE_CODEC", "orjson")
+    CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "zstd")
+    CACHE_COMPRESS_THRESHOLD: int = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024"))
+    # Optional in-process L1 cache in front of Redis. Off by default: another
+    # worker's invalidation reaches this worker's L1 only after CACHE_LOCAL_TTL
+    CACHE_LOCAL_ENABLED: bool = os.getenv("CACHE_LOCAL_ENABLED", "false").lower() == "true"
+    CACHE_LOCAL_TTL: int = int(os.getenv("CACHE_LOCAL_TTL", "30"))
+
     # Database (if needed)
     DATABASE_URL: Optional[str] = os.getenv("DATABASE_URL")
 
+    # Heart rate storage: "rows" or "chunked" (packed per-day BLOBs with
+    # rollups). Switch to "chunked" only after existing rows were moved with
+    # "python migrations.py migrate-heart-rate"; chunked reads ignore rows
+    HEART_RATE_STORAGE: str = os.getenv("HEART_RATE_STORAGE", "rows")
+
     # Default Health Goals
     DEFAULT_DAILY_STEPS: int = int(os.getenv("DEFAULT_DAILY_STEPS", "10000"))
     DEFAULT_SLEEP_HOURS: float = float(os.getenv("DEFAULT_SLEEP_HOURS", "8.0"))
@@ -103,6 +176,23 @@ class AuraWellSettings:
     NOTIFICATION_TIME_MORNING: str = os.getenv("NOTIFICATION_TIME_MORNING", "08:00")
     NOTIFICATION_TIME_EVENING: str = os.getenv("NOTIFICATION_TIME_EVENING", "20:00")
 
+    # WebSocket heartbeat: a single timer wheel ticking every
+    # WEBSOCKET_HEARTBEAT_TICK seconds pings each socket every
+    # WEBSOCKET_HEARTBEAT_INTERVAL seconds and closes it when no pong arrives
+    # within WEBSOCKET_HEARTBEAT_TIMEOUT seconds
+    WEBSOCKET_HEARTBEAT_INTERVAL: float = float(os.getenv("WEBSOCKET_HEARTBEAT_INTERVAL", "30"))
+    WEBSOCKET_HEARTBEAT_TIMEOUT: float = float(os.getenv("WEBSOCKET_HEARTBEAT_TIMEOUT", "10"))
+    WEBSOCKET_HEARTBEAT_TICK: float = float(os.getenv("WEBSOCKET_HEARTBEAT_TICK", "1"))
+    # Concurrent sockets per user (devices); the oldest is closed beyond this
+    WEBSOCKET_MAX_CONNECTIONS_PER_USER: int = int(os.getenv("WEBSOCKET_MAX_CONNECTIONS_PER_USER", "5"))
+    # Messages for a user or family are published on a bus ("memory" for a
+    # single worker, "redis" to reach sockets held by other workers) on
+    # WEBSOCKET_BUS_CHANNEL. Each socket buffers at most
+    # WEBSOCKET_SEND_QUEUE_SIZE outgoing messages; a slower client is closed
+    WEBSOCKET_BUS_BACKEND: str = os.getenv("WEBSOCKET_BUS_BACKEND", "memory")
+    WEBSOCKET_BUS_CHANNEL: str = os.getenv("WEBSOCKET_BUS_CHANNEL", "aurawell:ws:events")
+    WEBSOCKET_SEND_QUEUE_SIZE: int = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "256"))
+
     # External Services
     WEATHER_API_KEY: Optional[str] = os.getenv("WEATHER_API_KEY")
     TIMEZONE: str = os.getenv("TIMEZONE", "UTC")
@@ -128,6 +218,24 @@ class AuraWellSettings:
     RAG_FC_FUNCTION_NAME: str = os.getenv("RAG_FC_FUNCTION_NAME", "RAGmoudle")
     RAG_REQUEST_TIMEOUT: int = int(os.getenv("RAG_REQUEST_TIMEOUT", "30"))
     RAG_MAX_RETRIES: int = int(os.getenv("RAG_MAX_RETRIES", "3"))
+    # Per-request retrieval deadline in seconds; partial results are returned on expiry
+    RAG_RETRIEVAL_DEADLINE: float = float(os.getenv("RAG_RETRIEVAL_DEADLINE", "8"))
+    # Retrieval result cache keyed by normalized query and k
+    RAG_RESULT_CACHE_TTL: int = int(os.getenv("RAG_RESULT_CACHE_TTL", "300"))
+    RAG_RESULT_CACHE_SIZE: int = int(os.getenv("RAG_RESULT_CACHE_SIZE", "512"))
+
+    # Local MarianMT query translation. "batched" micro-batches concurrent
+    # requests on a worker thread; "direct" translates on the calling thread
+    TRANSLATION_ENGINE_MODE: str = os.getenv("TRANSLATION_ENGINE_MODE", "batched")
+    TRANSLATION_MAX_BATCH_SIZE: int = int(os.getenv("TRANSLATION_MAX_BATCH_SIZE", "16"))
+    TRANSLATION_MAX_WAIT_MS: float = float(os.getenv("TRANSLATION_MAX_WAIT_MS", "5"))
+    # Dynamic int8 quantization of the Linear layers (CPU only)
+    TRANSLATION_QUANTIZE: bool = os.getenv("TRANSLATION_QUANTIZE", "true").lower() == "true"
+    # Inputs up to this many tokens use greedy decoding instead of beam search
+    TRANSLATION_GREEDY_MAX_TOKENS: int = int(os.getenv("TRANSLATION_GREEDY_MAX_TOKENS", "32"))
+    TRANSLATION_CACHE_SIZE: int = int(os.getenv("TRANSLATION_CACHE_SIZE", "2048"))
+    # 0 keeps the torch default
+    TRANSLATION_NUM_THREADS: int = int(os.getenv("TRANSLATION_NUM_THREADS", "0"))
 
     @classmethod
     def validate_required_settings(cls) -> List[str]:
@@ -199,6 +307,9 @@ class AuraWellSettings:
             "function_name": cls.RAG_FC_FUNCTION_NAME,
             "timeout": cls.RAG_REQUEST_TIMEOUT,
             "max_retries": cls.RAG_MAX_RETRIES,
+            "retrieval_deadline": cls.RAG_RETRIEVAL_DEADLINE,
+            "result_cache_ttl": cls.RAG_RESULT_CACHE_TTL,
+            "result_cache_size": cls.RAG_RESULT_CACHE_SIZE,
         }
 
     @classmethod
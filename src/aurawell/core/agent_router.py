@@ -7,9 +7,13 @@ LangChain Agent统一访问接口
 """
 
 import logging
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Optional, Dict, Any, Tuple
 from abc import ABC, abstractmethod
 
+from ..config.settings import AuraWellSettings
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +27,14 @@ class BaseAgent(ABC):
         """处理用户消息"""
         pass
 
+    async def stream_message(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """流式处理用户消息；默认实现把完整回复作为一个片段返回"""
+        response = await self.process_message(message, context)
+        yield {"event": "token", "data": {"content": response.get("message", "")}}
+        yield {"event": "done", "data": response}
+
     @abstractmethod
     async def get_conversation_history(self, limit: int = 10) -> list:
         """获取对话历史"""
@@ -41,14 +53,36 @@ class AgentRouter:
     核心职责：
     1. 提供统一的LangChain Agent访问接口
     2. 确保API接口完全向后兼容
-    3. 管理Agent实例缓存
+    3. 管理Agent实例池（LRU + 空闲超时淘汰）
     4. 作为前端API和LangChain Agent之间的适配层
 
+    Agent池容量有上限：超过 max_agents 时淘汰最久未使用的Agent，空闲超过
+    idle_ttl 秒的Agent在下次访问池时淘汰。重量级组件由所有Agent共享，
+    被淘汰的Agent只丢失内存中的最近对话，完整历史仍在数据库中。
+
     注意：系统已100%迁移到LangChain，此路由器确保API稳定性
     """
 
-    def __init__(self):
-        self._agent_cache = {}  # 缓存Agent实例
+    def __init__(
+        self, max_agents: Optional[int] = None, idle_ttl: Optional[float] = None
+    ):
+        """
+        Args:
+            max_agents: Agent池容量（默认 AGENT_POOL_MAX_SIZE）
+            idle_ttl: 空闲淘汰时间，秒（默认 AGENT_POOL_IDLE_TTL）
+        """
+        self.max_agents = max_agents or AuraWellSettings.AGENT_POOL_MAX_SIZE
+        self.idle_ttl = idle_ttl or AuraWellSettings.AGENT_POOL_IDLE_TTL
+        # agent_key -> (最后使用时间, Agent)，按最后使用时间从旧到新排列
+        self._agent_cache: "OrderedDict[str, Tuple[float, BaseAgent]]" = OrderedDict()
+        self.pool_stats = {
+            "hits": 0,
+            "misses": 0,
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+        }
+        # 最近的流式首token耗时（秒）
+        self._first_token_latencies: deque = deque(maxlen=1000)
 
     async def get_agent(self, user_id: str, feature_context: str = "chat") -> BaseAgent:
         """
@@ -62,9 +96,16 @@ class AgentRouter:
             BaseAgent: LangChain Agent实例
         """
         agent_key = f"{user_id}_{feature_context}"
-
-        # 从缓存获取或创建新实例
-        if agent_key not in self._agent_cache:
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        # 从池中获取或创建新实例
+        entry = self._agent_cache.pop(agent_key, None)
+        if entry is not None:
+            self.pool_stats["hits"] += 1
+            agent = entry[1]
+        else:
+            self.pool_stats["misses"] += 1
             try:
                 # 动态导入LangChain Agent（避免循环导入）
                 from ..langchain_agent.agent import LangChainAgent
@@ -76,9 +117,35 @@ class AgentRouter:
                 # 创建一个最基本的Agent实例作为最后的回退
                 agent = self._create_fallback_agent(user_id)
 
-            self._agent_cache[agent_key] = agent
-
-        return self._agent_cache[agent_key]
+        # 重新插入到末尾，标记为最近使用
+        self._agent_cache[agent_key] = (now, agent)
+        while len(self._agent_cache) > self.max_agents:
+            self._agent_cache.popitem(last=False)
+            self.pool_stats["evicted_lru"] += 1
+
+        return agent
+
+    def _evict_idle(self, now: float) -> None:
+        """淘汰空闲超时的Agent（按最后使用时间排序，只需检查池头部）"""
+        deadline = now - self.idle_ttl
+        while self._agent_cache:
+            last_used, _ = next(iter(self._agent_cache.values()))
+            if last_used > deadline:
+                break
+            self._agent_cache.popitem(last=False)
+            self.pool_stats["evicted_idle"] += 1
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """获取Agent池命中、未命中与淘汰统计"""
+        self._evict_idle(time.monotonic())
+        lookups = self.pool_stats["hits"] + self.pool_stats["misses"]
+        return {
+            **self.pool_stats,
+            "size": len(self._agent_cache),
+            "max_size": self.max_agents,
+            "idle_ttl": self.idle_ttl,
+            "hit_rate": self.pool_stats["hits"] / lookups if lookups else 0.0,
+        }
 
     def _create_fallback_agent(self, user_id: str) -> BaseAgent:
         """创建一个最基本的fallback agent"""
@@ -142,6 +209,70 @@ class AgentRouter:
                 "data": None,
             }
 
+    async def stream_message(
+        self, user_id: str, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式处理用户消息（统一接口）
+
+        Args:
+            user_id: 用户ID
+            message: 用户消息
+            context: 上下文信息
+
+        Yields:
+            事件字典 {"event": "progress" | "token" | "done" | "error", "data": {...}}；
+            done 事件的 data 与 process_message 的返回格式一致，并附带
+            first_token_ms（首个token耗时）
+        """
+        start = time.perf_counter()
+        first_token_ms = None
+        try:
+            agent = await self.get_agent(user_id, "chat")
+            async for event in agent.stream_message(message, context):
+                if event["event"] == "token" and first_token_ms is None:
+                    first_token = time.perf_counter() - start
+                    first_token_ms = round(first_token * 1000, 1)
+                    self._first_token_latencies.append(first_token)
+                elif event["event"] == "done":
+                    event = {
+                        "event": "done",
+                        "data": {
+                            **self._normalize_response(event["data"]),
+                            "first_token_ms": first_token_ms,
+                        },
+                    }
+                yield event
+
+        except Exception as e:
+            logger.error(f"流式处理消息失败: {e}")
+            yield {
+                "event": "error",
+                "data": {
+                    "success": False,
+                    "message": "处理消息时发生错误",
+                    "error": str(e),
+                    "data": None,
+                },
+            }
+
+    def get_streaming_stats(self) -> Dict[str, Any]:
+        """获取最近流式请求的首token耗时统计（毫秒）"""
+        latencies = sorted(self._first_token_latencies)
+        if not latencies:
+            return {"count": 0, "avg_ms": None, "p50_ms": None, "p95_ms": None}
+
+        def percentile(q: float) -> float:
+            index = min(len(latencies) - 1, int(q / 100 * len(latencies)))
+            return round(latencies[index] * 1000, 1)
+
+        return {
+            "count": len(latencies),
+            "avg_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+            "p50_ms": percentile(50),
+            "p95_ms": percentile(95),
+        }
+
     def _normalize_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """
         标准化响应格式，确保与现有API完全一致
@@ -185,7 +316,7 @@ class AgentRouter:
     def clear_user_cache(self, user_id: str) -> None:
         """清除特定用户的Agent缓存"""
         keys_to_remove = [
-            key for key in self._agent_cache.keys() if key.startswith(user_id)
+            key for key in self._agent_cache.keys() if key.startswith(f"{user_id}_")
         ]
         for key in keys_to_remove:
             del self._agent_cache[key]
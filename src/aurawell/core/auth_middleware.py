@@ -2,9 +2,14 @@
 认证中间件
 
 实现JWT Token验证和黑名单检查的FastAPI中间件
+
+验证通过的Token载荷按Token哈希缓存在进程内（LRU，TTL 不超过Token的 exp），
+黑名单检查走本地镜像（见 token_blacklist），因此同一Token的后续请求既不访问
+Redis 也不重复 jwt.decode。黑名单检查始终先于缓存查找，撤销不受缓存影响。
 """
 
 import logging
+import time
 from typing import Optional, Tuple
 from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -12,6 +17,7 @@ from jose import jwt, JWTError
 
 from .token_blacklist import get_token_blacklist_manager
 from ..config.settings import get_settings
+from ..utils.cache import LocalCache
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,12 @@ class JWTAuthMiddleware:
     def __init__(self):
         self.settings = get_settings()
         self.security = HTTPBearer(auto_error=False)
+        self.token_cache_ttl = self.settings.AUTH_TOKEN_CACHE_TTL
+        cache_size = self.settings.AUTH_TOKEN_CACHE_SIZE
+        # 每条计为 1 字节，字节上限即条数上限
+        self._token_cache = LocalCache(max_entries=cache_size, max_bytes=cache_size)
+        self.token_cache_hits = 0
+        self.token_cache_misses = 0
 
     async def verify_token(self, token: str) -> Tuple[bool, Optional[dict], Optional[str]]:
         """
@@ -36,9 +48,17 @@ class JWTAuthMiddleware:
         try:
             # 1. 检查Token是否在黑名单中
             blacklist_manager = await get_token_blacklist_manager()
-            if await blacklist_manager.is_token_blacklisted(token):
+            token_hash = blacklist_manager.get_token_hash(token)
+            if await blacklist_manager.is_token_hash_blacklisted(token_hash):
+                self._token_cache.discard(token_hash)
                 return False, None, "Token已被撤销"
 
+            cached = self._token_cache.get(token_hash)
+            if cached is not None:
+                self.token_cache_hits += 1
+                return True, dict(cached), None
+            self.token_cache_misses += 1
+
             # 2. 验证Token签名和有效性
             payload = jwt.decode(
                 token,
@@ -53,11 +73,12 @@ class JWTAuthMiddleware:
             if "exp" not in payload:
                 return False, None, "Token缺少过期时间"
 
+            self._cache_payload(token_hash, payload)
             return True, payload, None
 
         except jwt.ExpiredSignatureError:
             return False, None, "Token已过期"
-        except jwt.InvalidTokenError:
+        except jwt.JWTClaimsError:
             return False, None, "Token无效"
         except JWTError as e:
             logger.warning(f"JWT验证失败: {e}")
@@ -66,6 +87,28 @@ class JWTAuthMiddleware:
             logger.error(f"Token验证异常: {e}")
             return False, None, "Token验证异常"
 
+    def _cache_payload(self, token_hash: str, payload: dict):
+        """缓存已验证的载荷，缓存有效期不超过Token本身的过期时间"""
+        if self.token_cache_ttl <= 0:
+            return
+        try:
+            remaining = float(payload["exp"]) - time.time()
+        except (TypeError, ValueError):
+            return
+        self._token_cache.set(
+            token_hash, dict(payload), size=1, ttl=min(self.token_cache_ttl, remaining)
+        )
+
+    def get_token_cache_stats(self) -> dict:
+        """已验证Token缓存统计"""
+        total = self.token_cache_hits + self.token_cache_misses
+        return {
+            "entries": len(self._token_cache),
+            "hits": self.token_cache_hits,
+            "misses": self.token_cache_misses,
+            "hit_ratio": round(self.token_cache_hits / total, 4) if total else 0.0,
+        }
+
     async def extract_token_from_request(self, request: Request) -> Optional[str]:
         """
         从请求中提取Token
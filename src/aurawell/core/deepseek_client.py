@@ -7,17 +7,98 @@ specifically optimized for health lifestyle orchestration tasks.
 
 import os
 import json
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Union, AsyncGenerator
+import threading
+import weakref
+from typing import Dict, List, Optional, Any, Union, AsyncGenerator, Tuple
 from dataclasses import dataclass
-from openai import OpenAI
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
 from pydantic import BaseModel
 from ..config.settings import AuraWellSettings
 
+# HTTP/2 for httpx needs the optional h2 package
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+# Pooled HTTP clients, one per API host; async pools are also per event loop
+# (event loop -> {host: httpx.AsyncClient})
+_async_http_pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_sync_http_pools: Dict[str, httpx.Client] = {}
+_sync_pools_lock = threading.Lock()
+
+
+def _http_pool_options() -> Dict[str, Any]:
+    """httpx client options for the shared LLM connection pools"""
+    return {
+        "limits": httpx.Limits(
+            max_connections=AuraWellSettings.DEEPSEEK_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=AuraWellSettings.DEEPSEEK_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=AuraWellSettings.DEEPSEEK_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(
+            AuraWellSettings.DEEPSEEK_HTTP_TIMEOUT,
+            connect=AuraWellSettings.DEEPSEEK_HTTP_CONNECT_TIMEOUT,
+        ),
+        "http2": AuraWellSettings.DEEPSEEK_HTTP2 and HTTP2_AVAILABLE,
+        "follow_redirects": True,
+    }
+
+
+def get_async_http_client(base_url: str) -> httpx.AsyncClient:
+    """
+    Get the pooled async HTTP client for an API host
+
+    Every DeepSeekClient talking to the same host on the running event loop
+    shares one keep-alive pool, so connection limits apply per host.
+
+    Args:
+        base_url: API base URL
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    pools = _async_http_pools.setdefault(asyncio.get_running_loop(), {})
+    host = httpx.URL(base_url).host
+    client = pools.get(host)
+    if client is None or client.is_closed:
+        client = pools[host] = httpx.AsyncClient(**_http_pool_options())
+    return client
+
+
+def get_sync_http_client(base_url: str) -> httpx.Client:
+    """Blocking counterpart of ``get_async_http_client`` for CLI use"""
+    host = httpx.URL(base_url).host
+    with _sync_pools_lock:
+        client = _sync_http_pools.get(host)
+        if client is None or client.is_closed:
+            client = _sync_http_pools[host] = httpx.Client(**_http_pool_options())
+        return client
+
+
+async def close_http_clients() -> None:
+    """Close the pooled clients of the running event loop and the sync pools"""
+    pools = _async_http_pools.pop(asyncio.get_running_loop(), {})
+    for client in pools.values():
+        await client.aclose()
+
+    with _sync_pools_lock:
+        sync_clients = list(_sync_http_pools.values())
+        _sync_http_pools.clear()
+    for client in sync_clients:
+        client.close()
+
+
 @dataclass
 class APIUsage:
     """Data class to track API usage statistics"""
@@ -44,15 +125,26 @@ class DeepSeekClient:
 
     Uses OpenAI library with DeepSeek's base URL for API calls.
     Prioritizes deepseek-reasoner model for reasoning and planning tasks.
+
+    Async code should use ``get_deepseek_response_async`` and
+    ``get_streaming_response``, which run on ``AsyncOpenAI`` over a shared
+    keep-alive connection pool. ``get_deepseek_response`` blocks the calling
+    thread and is kept for scripts and the CLI.
     """
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
         """
         Initialize DeepSeek client (via Alibaba Cloud DashScope)
 
         Args:
             api_key: DashScope API key. If None, will read from DASHSCOPE_API_KEY env var
             base_url: API base URL. If None, will read from DASHSCOPE_BASE_URL env var
+            http_client: Async HTTP client to use instead of the shared pool
 
         Raises:
             ValueError: If API key is not provided or found in environment
@@ -73,14 +165,41 @@ class DeepSeekClient:
             self._determine_api_endpoint()
         )
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url,
-            timeout=300.0  # 设置45秒超时，给LLM足够的响应时间
-        )
+        # 给LLM足够的响应时间
+        self.timeout = AuraWellSettings.DEEPSEEK_HTTP_TIMEOUT
+        self._http_client = http_client
+        self._client: Optional[OpenAI] = None
+        # AsyncOpenAI clients are bound to the event loop they were created on
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
 
         logger.info(f"DeepSeek client initialized successfully with base_url: {self.base_url}")
 
+    @property
+    def client(self) -> OpenAI:
+        """Blocking OpenAI client on the shared sync connection pool"""
+        if self._client is None:
+            self._client = OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http_client=get_sync_http_client(self.base_url),
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """AsyncOpenAI client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http_client=self._http_client or get_async_http_client(self.base_url),
+            )
+        return client
+
     def _determine_api_endpoint(self) -> str:
         """
         根据API密钥来源判断使用哪个API端点
@@ -109,7 +228,114 @@ class DeepSeekClient:
                 logger.info("根据密钥格式判断：使用阿里云DashScope API端点")
                 return "https://dashscope.aliyuncs.com/compatible-mode/v1"
 
-    def get_deepseek_response(
+    def _build_request(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: Optional[str],
+        tools: Optional[List[Dict[str, Any]]],
+        temperature: float,
+        max_tokens: int,
+        stream: bool = False,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build chat completion parameters
+
+        Returns:
+            Tuple of (model name, API call parameters)
+        """
+        # Use default model from settings if not specified
+        if model_name is None:
+            model_name = AuraWellSettings.DEEPSEEK_DEFAULT_MODEL
+
+        # Prepare API call parameters
+        api_params = {
+            "model": model_name,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if stream:
+            api_params["stream"] = True
+
+        # Add tools if provided
+        if tools:
+            api_params["tools"] = tools
+            api_params["tool_choice"] = "auto"
+
+        call_type = "streaming API call" if stream else "API call"
+        logger.info(f"Making {call_type} to DeepSeek with model: {model_name}")
+        logger.debug(f"Messages: {json.dumps(messages, ensure_ascii=False)}")
+        return model_name, api_params
+
+    @staticmethod
+    def _parse_response(response: Any, model_name: str) -> DeepSeekResponse:
+        """Convert a chat completion into a DeepSeekResponse"""
+        # Extract response data
+        message = response.choices[0].message
+        content = message.content or ""
+        tool_calls = None
+
+        # Process tool calls if present
+        if hasattr(message, "tool_calls") and message.tool_calls:
+            tool_calls = []
+            for tool_call in message.tool_calls:
+                tool_calls.append(
+                    {
+                        "id": tool_call.id,
+                        "type": tool_call.type,
+                        "function": {
+                            "name": tool_call.function.name,
+                            "arguments": tool_call.function.arguments,
+                        },
+                    }
+                )
+            logger.info(
+                f"Function calls requested: {[tc['function']['name'] for tc in tool_calls]}"
+            )
+
+        # Track usage
+        usage = None
+        if response.usage:
+            usage = APIUsage(
+                prompt_tokens=response.usage.prompt_tokens,
+                completion_tokens=response.usage.completion_tokens,
+                total_tokens=response.usage.total_tokens,
+                model=model_name,
+            )
+            logger.info(
+                f"Token usage - Prompt: {usage.prompt_tokens}, "
+                f"Completion: {usage.completion_tokens}, "
+                f"Total: {usage.total_tokens}"
+            )
+
+        return DeepSeekResponse(
+            content=content,
+            tool_calls=tool_calls,
+            usage=usage,
+            model=model_name,
+            finish_reason=response.choices[0].finish_reason,
+        )
+
+    @staticmethod
+    def _api_error(error: Exception, api_name: str = "DeepSeek API") -> Exception:
+        """Map a client error to a user-facing exception"""
+        error_msg = str(error)
+        logger.error(f"{api_name} call failed: {error_msg}")
+
+        # 检查是否是超时错误
+        if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
+            return Exception(f"{api_name} 请求超时，请稍后重试: {error_msg}")
+        # 检查是否是网络错误
+        elif "connection" in error_msg.lower() or "network" in error_msg.lower():
+            return Exception(f"{api_name} 网络连接失败，请检查网络: {error_msg}")
+        # 检查是否是认证错误
+        elif "401" in error_msg or "unauthorized" in error_msg.lower():
+            return Exception(f"{api_name} 认证失败，请检查API密钥: {error_msg}")
+        # 其他错误
+        else:
+            return Exception(f"{api_name} 调用失败: {error_msg}")
+
+    async def get_deepseek_response_async(
         self,
         messages: List[Dict[str, str]],
         model_name: Optional[str] = None,
@@ -118,7 +344,7 @@ class DeepSeekClient:
         max_tokens: int = 1024,
     ) -> DeepSeekResponse:
         """
-        Get response from DeepSeek API
+        Get response from DeepSeek API without blocking the event loop
 
         Args:
             messages: List of message dicts with 'role' and 'content'
@@ -133,92 +359,76 @@ class DeepSeekClient:
         Raises:
             Exception: For API errors, network issues, or authentication failures
         """
-        # Use default model from settings if not specified
-        if model_name is None:
-            model_name = AuraWellSettings.DEEPSEEK_DEFAULT_MODEL
+        model_name, api_params = self._build_request(
+            messages, model_name, tools, temperature, max_tokens
+        )
+        try:
+            response = await self.async_client.chat.completions.create(**api_params)
+        except Exception as e:
+            raise self._api_error(e)
+        return self._parse_response(response, model_name)
+
+    def get_deepseek_response(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> DeepSeekResponse:
+        """
+        Blocking variant of ``get_deepseek_response_async`` for scripts and CLI
+
+        Do not call this from async code; it holds the event loop for the whole
+        LLM call.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            model_name: DeepSeek model name (default: from settings)
+            tools: Optional list of function tool definitions for function calling
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens in response
+
+        Returns:
+            DeepSeekResponse object containing the API response
 
+        Raises:
+            Exception: For API errors, network issues, or authentication failures
+        """
+        model_name, api_params = self._build_request(
+            messages, model_name, tools, temperature, max_tokens
+        )
         try:
-            # Prepare API call parameters
-            api_params = {
-                "model": model_name,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-            }
-
-            # Add tools if provided
-            if tools:
-                api_params["tools"] = tools
-                api_params["tool_choice"] = "auto"
-
-            logger.info(f"Making API call to DeepSeek with model: {model_name}")
-            logger.debug(f"Messages: {json.dumps(messages, ensure_ascii=False)}")
-
-            # Make API call
             response = self.client.chat.completions.create(**api_params)
+        except Exception as e:
+            raise self._api_error(e)
+        return self._parse_response(response, model_name)
 
-            # Extract response data
-            message = response.choices[0].message
-            content = message.content or ""
-            tool_calls = None
-
-            # Process tool calls if present
-            if hasattr(message, "tool_calls") and message.tool_calls:
-                tool_calls = []
-                for tool_call in message.tool_calls:
-                    tool_calls.append(
-                        {
-                            "id": tool_call.id,
-                            "type": tool_call.type,
-                            "function": {
-                                "name": tool_call.function.name,
-                                "arguments": tool_call.function.arguments,
-                            },
-                        }
-                    )
-                logger.info(
-                    f"Function calls requested: {[tc['function']['name'] for tc in tool_calls]}"
-                )
+    async def get_embeddings_async(
+        self, texts: List[str], model_name: Optional[str] = None
+    ) -> List[List[float]]:
+        """
+        Embed texts with the OpenAI-compatible embeddings endpoint
 
-            # Track usage
-            usage = None
-            if response.usage:
-                usage = APIUsage(
-                    prompt_tokens=response.usage.prompt_tokens,
-                    completion_tokens=response.usage.completion_tokens,
-                    total_tokens=response.usage.total_tokens,
-                    model=model_name,
-                )
-                logger.info(
-                    f"Token usage - Prompt: {usage.prompt_tokens}, "
-                    f"Completion: {usage.completion_tokens}, "
-                    f"Total: {usage.total_tokens}"
-                )
+        Args:
+            texts: Texts to embed
+            model_name: Embedding model name (default: LLM_EMBEDDING_MODEL)
 
-            return DeepSeekResponse(
-                content=content,
-                tool_calls=tool_calls,
-                usage=usage,
-                model=model_name,
-                finish_reason=response.choices[0].finish_reason,
-            )
+        Returns:
+            One embedding vector per input text, in input order
 
+        Raises:
+            Exception: For API errors, network issues, or authentication failures
+        """
+        try:
+            response = await self.async_client.embeddings.create(
+                model=model_name or AuraWellSettings.LLM_EMBEDDING_MODEL,
+                input=texts,
+                encoding_format="float",
+            )
         except Exception as e:
-            error_msg = str(e)
-            logger.error(f"DeepSeek API call failed: {error_msg}")
-
-            # 检查是否是超时错误
-            if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
-                raise Exception(f"DeepSeek API 请求超时，请稍后重试: {error_msg}")
-            # 检查是否是网络错误
-            elif "connection" in error_msg.lower() or "network" in error_msg.lower():
-                raise Exception(f"DeepSeek API 网络连接失败，请检查网络: {error_msg}")
-            # 检查是否是认证错误
-            elif "401" in error_msg or "unauthorized" in error_msg.lower():
-                raise Exception(f"DeepSeek API 认证失败，请检查API密钥: {error_msg}")
-            # 其他错误
-            else:
-                raise Exception(f"DeepSeek API 调用失败: {error_msg}")
+            raise self._api_error(e, "DeepSeek Embedding API")
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
 
     async def get_streaming_response(
         self,
@@ -244,63 +454,28 @@ class DeepSeekClient:
         Raises:
             Exception: For API errors, network issues, or authentication failures
         """
-        # Use default model from settings if not specified
-        if model_name is None:
-            model_name = AuraWellSettings.DEEPSEEK_DEFAULT_MODEL
+        model_name, api_params = self._build_request(
+            messages, model_name, tools, temperature, max_tokens, stream=True
+        )
 
         try:
-            # Prepare API call parameters
-            api_params = {
-                "model": model_name,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-                "stream": True,  # Enable streaming
-            }
-
-            # Add tools if provided
-            if tools:
-                api_params["tools"] = tools
-                api_params["tool_choice"] = "auto"
-
-            logger.info(
-                f"Making streaming API call to DeepSeek with model: {model_name}"
-            )
-            logger.debug(f"Messages: {json.dumps(messages, ensure_ascii=False)}")
-
-            # Make streaming API call
-            stream = self.client.chat.completions.create(**api_params)
-
-            # Process streaming response
-            full_content = ""
-            for chunk in stream:
-                if chunk.choices and len(chunk.choices) > 0:
-                    delta = chunk.choices[0].delta
-                    if hasattr(delta, "content") and delta.content:
-                        token = delta.content
-                        full_content += token
-                        yield token
-
-            logger.info(
-                f"Streaming response completed. Total length: {len(full_content)}"
-            )
+            stream = await self.async_client.chat.completions.create(**api_params)
+            try:
+                full_length = 0
+                async for chunk in stream:
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if hasattr(delta, "content") and delta.content:
+                            full_length += len(delta.content)
+                            yield delta.content
+            finally:
+                # Release the pooled connection if the consumer stops early
+                await stream.close()
+
+            logger.info(f"Streaming response completed. Total length: {full_length}")
 
         except Exception as e:
-            error_msg = str(e)
-            logger.error(f"DeepSeek streaming API call failed: {error_msg}")
-
-            # 检查是否是超时错误
-            if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
-                raise Exception(f"DeepSeek 流式API 请求超时，请稍后重试: {error_msg}")
-            # 检查是否是网络错误
-            elif "connection" in error_msg.lower() or "network" in error_msg.lower():
-                raise Exception(f"DeepSeek 流式API 网络连接失败，请检查网络: {error_msg}")
-            # 检查是否是认证错误
-            elif "401" in error_msg or "unauthorized" in error_msg.lower():
-                raise Exception(f"DeepSeek 流式API 认证失败，请检查API密钥: {error_msg}")
-            # 其他错误
-            else:
-                raise Exception(f"DeepSeek 流式API 调用失败: {error_msg}")
+            raise self._api_error(e, "DeepSeek 流式API")
 
 
 def create_health_tools() -> List[Dict[str, Any]]:
@@ -157,8 +157,8 @@ async def get_user_activity_summary(user_id: str, days: int = 7) -> List[dict]:
             end_date = date.today()
             start_date = end_date - timedelta(days=days - 1)
             
-            # 从数据库获取活动数据
-            activity_summaries = await health_repo.get_activity_summaries(
+            # 从数据库获取活动数据（只读列投影，不构建 ORM 实体）
+            activity_summaries = await health_repo.get_activity_summaries_lite(
                 user_id=user_id, start_date=start_date, end_date=end_date
             )
             
@@ -175,22 +175,24 @@ async def get_user_activity_summary(user_id: str, days: int = 7) -> List[dict]:
                         end_date=end_date.isoformat(),
                     )
                     
-                    # 处理并保存数据到数据库
-                    for day_data in xiaomi_data.get("daily_summaries", []):
-                        activity_summary = UnifiedActivitySummary(
+                    # 处理并批量保存数据到数据库
+                    activity_batch = [
+                        UnifiedActivitySummary(
                             date=day_data["date"],
                             steps=day_data.get("steps"),
                             distance_meters=day_data.get("distance_meters"),
                             active_calories=day_data.get("active_calories"),
                             total_calories=day_data.get("total_calories"),
                             active_minutes=day_data.get("active_minutes"),
-                            source_platform=HealthPlatform.XIAOMI,
-                            data_quality=DataQuality.GOOD,
+                            source_platform=HealthPlatform.XIAOMI_HEALTH,
+                            data_quality=DataQuality.HIGH,
                         )
-                        await health_repo.save_activity_summary(user_id, activity_summary)
+                        for day_data in xiaomi_data.get("daily_summaries", [])
+                    ]
+                    await health_repo.save_activity_summaries(user_id, activity_batch)
                     
                     # 重新获取保存的数据
-                    activity_summaries = await health_repo.get_activity_summaries(
+                    activity_summaries = await health_repo.get_activity_summaries_lite(
                         user_id=user_id, start_date=start_date, end_date=end_date
                     )
                     
@@ -283,22 +285,22 @@ async def analyze_sleep_quality(user_id: str, date_range: str) -> List[dict]:
         async with db_manager.get_session() as session:
             health_repo = HealthDataRepository(session)
             
-            # 从数据库获取睡眠数据
-            sleep_sessions = await health_repo.get_sleep_sessions(
+            # 从数据库获取睡眠数据（只读列投影，不构建 ORM 实体）
+            sleep_sessions = await health_repo.get_sleep_sessions_lite(
                 user_id=user_id, start_date=start_date, end_date=end_date
             )
             
             # 转换为标准格式返回
             result = []
-            for session in sleep_sessions:
-                total_hours = (session.total_sleep_minutes or 0) / 60
+            for sleep in sleep_sessions:
+                total_hours = (sleep.total_sleep_minutes or 0) / 60
                 result.append({
-                    "date": str(session.date),
+                    "date": str(sleep.date),
                     "total_sleep_hours": round(total_hours, 1),
-                    "deep_sleep_hours": round((session.deep_sleep_minutes or 0) / 60, 1),
-                    "light_sleep_hours": round((session.light_sleep_minutes or 0) / 60, 1),
-                    "rem_sleep_hours": round((session.rem_sleep_minutes or 0) / 60, 1),
-                    "sleep_efficiency": session.sleep_efficiency or 0,
+                    "deep_sleep_hours": round((sleep.deep_sleep_minutes or 0) / 60, 1),
+                    "light_sleep_hours": round((sleep.light_sleep_minutes or 0) / 60, 1),
+                    "rem_sleep_hours": round((sleep.rem_sleep_minutes or 0) / 60, 1),
+                    "sleep_efficiency": sleep.sleep_efficiency or 0,
                 })
             
             # 如果没有数据，返回模拟数据
@@ -385,12 +387,12 @@ async def get_health_insights(user_id: str) -> List[dict]:
             start_date = end_date - timedelta(days=6)
 
             # 获取活动数据
-            activity_summaries = await health_repo.get_activity_summaries(
+            activity_summaries = await health_repo.get_activity_summaries_lite(
                 user_id=user_id, start_date=start_date, end_date=end_date
             )
 
             # 获取睡眠数据
-            sleep_sessions = await health_repo.get_sleep_sessions(
+            sleep_sessions = await health_repo.get_sleep_sessions_lite(
                 user_id=user_id, start_date=start_date, end_date=end_date
             )
 
@@ -1088,7 +1090,7 @@ async def generate_exercise_plan(
 
             # 获取用户最近的活动数据
             health_repo = HealthDataRepository(session)
-            recent_activity = await health_repo.get_activity_summaries(
+            recent_activity = await health_repo.get_activity_summaries_lite(
                 user_id=user_id,
                 start_date=date.today() - timedelta(days=14),
                 end_date=date.today(),
@@ -0,0 +1,373 @@
+"""
+LLM Response Cache for AuraWell
+
+Caches chat completions in front of ``DeepSeekClient`` so repeated FAQ-style
+questions ("每天应该走多少步", BMI questions) are answered without another
+multi-second LLM call.
+
+Two lookup tiers share one store:
+
+* Exact: a hash of the normalized messages, model, temperature, max_tokens
+  and tools, stored through ``CacheManager`` (Redis plus in-process L1).
+* Semantic (optional): the last user message is embedded and compared with
+  previously answered questions that share the same remaining context; a
+  cached answer is reused when cosine similarity reaches the threshold.
+
+Every entry lives in a scope. Only single-turn prompts explicitly marked
+``SHARED_SCOPE`` are shared between users; prompts carrying profile data or
+conversation history must use ``user_scope(user_id)`` and are tagged so
+``invalidate_user_cache`` drops them. Calls without a scope bypass the cache.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config.settings import AuraWellSettings
+from ..utils.cache import CacheManager, get_cache_manager, user_tag
+from .deepseek_client import DeepSeekResponse
+
+logger = logging.getLogger(__name__)
+
+# Scope of prompts that contain nothing user-specific
+SHARED_SCOPE = "shared"
+
+CACHE_PREFIX = "llm_response"
+
+# Only complete answers are worth replaying
+CACHEABLE_FINISH_REASONS = ("stop",)
+
+# Async callable turning texts into embedding vectors
+Embedder = Callable[[List[str]], Awaitable[Sequence[Sequence[float]]]]
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = "?？!！。.~～ "
+
+
+def user_scope(user_id: Any) -> str:
+    """Cache scope for prompts personalized to one user"""
+    return user_tag(user_id)
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize a message for cache keys
+
+    Applies NFKC (full-width to half-width), lowercases, collapses whitespace
+    and drops trailing punctuation, so "每天应该走多少步？" and
+    "每天应该走多少步?" share a key.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _WHITESPACE.sub(" ", text).strip().lower()
+    return text.rstrip(_TRAILING_PUNCTUATION)
+
+
+def _digest(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:32]
+
+
+class LLMResponseCache:
+    """Exact and semantic response cache for chat completions"""
+
+    def __init__(
+        self,
+        cache_manager: Optional[CacheManager] = None,
+        embedder: Optional[Embedder] = None,
+        ttl: Optional[int] = None,
+        semantic_threshold: Optional[float] = None,
+        max_semantic_entries: int = 256,
+        max_semantic_groups: int = 1024,
+        enabled: Optional[bool] = None,
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            cache_manager: Backing store (default: the global cache manager)
+            embedder: Async callable embedding a list of texts; the semantic
+                tier is disabled when None
+            ttl: Entry lifetime in seconds (default: LLM_CACHE_TTL)
+            semantic_threshold: Minimum cosine similarity for a semantic hit
+                (default: LLM_CACHE_SEMANTIC_THRESHOLD)
+            max_semantic_entries: Questions kept per scope and context
+            max_semantic_groups: Scope/context groups kept in memory (LRU)
+            enabled: Serve and store responses (default: LLM_CACHE_ENABLED)
+        """
+        self.enabled = (
+            AuraWellSettings.LLM_CACHE_ENABLED if enabled is None else enabled
+        )
+        self.cache_manager = cache_manager or get_cache_manager()
+        self.embedder = embedder
+        self.ttl = ttl or AuraWellSettings.LLM_CACHE_TTL
+        self.semantic_threshold = (
+            semantic_threshold
+            if semantic_threshold is not None
+            else AuraWellSettings.LLM_CACHE_SEMANTIC_THRESHOLD
+        )
+        self.max_semantic_entries = max_semantic_entries
+        self.max_semantic_groups = max_semantic_groups
+
+        # (scope, context hash) -> (unit vectors, exact keys), oldest first
+        self._semantic: (
+            "OrderedDict[Tuple[str, str], Tuple[List[np.ndarray], List[str]]]"
+        ) = OrderedDict()
+        self.stats: Dict[str, float] = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stored": 0,
+            "latency_saved": 0.0,
+        }
+
+    @staticmethod
+    def _request_parts(
+        messages: List[Dict[str, Any]],
+        model_name: Optional[str],
+        tools: Optional[List[Dict[str, Any]]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Split a request into its context and its last user question"""
+        normalized = [
+            {
+                "role": message.get("role"),
+                "content": normalize_prompt(message.get("content")),
+            }
+            for message in messages
+        ]
+        question = ""
+        if normalized and normalized[-1]["role"] == "user":
+            question = normalized.pop()["content"]
+
+        context = {
+            "messages": normalized,
+            "model": model_name or AuraWellSettings.DEEPSEEK_DEFAULT_MODEL,
+            "temperature": round(float(temperature), 2),
+            "max_tokens": max_tokens,
+            "tools": tools or None,
+        }
+        return context, question
+
+    @staticmethod
+    def is_shareable(messages: List[Dict[str, Any]]) -> bool:
+        """Whether a prompt may be cached across users
+
+        Only system prompts plus a single user question qualify; history or
+        tool output in the prompt may carry user data.
+        """
+        roles = [message.get("role") for message in messages]
+        only_system_and_user = set(roles) <= {"system", "user"}
+        return only_system_and_user and roles.count("user") == 1 and roles[-1] == "user"
+
+    def _key(self, scope: str, context_hash: str, question: str) -> str:
+        return f"aurawell:{CACHE_PREFIX}:{_digest([scope, context_hash, question])}"
+
+    async def _embed(self, question: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of a question, or None if unavailable"""
+        if self.embedder is None or not question:
+            return None
+        try:
+            vector = np.asarray((await self.embedder([question]))[0], dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"LLM cache embedding failed, skipping semantic tier: {e}")
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def _semantic_match(
+        self, group: Tuple[str, str], vector: np.ndarray
+    ) -> Tuple[Optional[str], float]:
+        """Most similar cached question in a group as (exact key, similarity)"""
+        vectors, keys = self._semantic.get(group, ((), ()))
+        if not keys:
+            return None, 0.0
+        similarities = np.stack(vectors) @ vector
+        best = int(np.argmax(similarities))
+        return keys[best], float(similarities[best])
+
+    def _remember(self, group: Tuple[str, str], vector: np.ndarray, key: str):
+        """Index an answered question for semantic lookup"""
+        vectors, keys = self._semantic.setdefault(group, ([], []))
+        self._semantic.move_to_end(group)
+        vectors.append(vector)
+        keys.append(key)
+        if len(keys) > self.max_semantic_entries:
+            del vectors[0], keys[0]
+        while len(self._semantic) > self.max_semantic_groups:
+            self._semantic.popitem(last=False)
+
+    def _forget(self, group: Tuple[str, str], key: str):
+        """Drop an index entry whose cached answer has expired"""
+        entry = self._semantic.get(group)
+        if entry is None or key not in entry[1]:
+            return
+        index = entry[1].index(key)
+        del entry[0][index], entry[1][index]
+
+    async def get_or_call(
+        self,
+        call: Callable[[], Awaitable[DeepSeekResponse]],
+        messages: List[Dict[str, Any]],
+        model_name: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        scope: Optional[str] = None,
+    ) -> DeepSeekResponse:
+        """
+        Return a cached response for the request or make the call and cache it
+
+        Args:
+            call: Makes the LLM request on a miss
+            messages: Chat messages
+            model_name: Model name
+            tools: Function tool definitions
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            scope: ``SHARED_SCOPE``, ``user_scope(user_id)`` or None to bypass
+
+        Returns:
+            DeepSeekResponse from the cache or the call
+        """
+        if scope == SHARED_SCOPE and not self.is_shareable(messages):
+            logger.debug("Multi-turn prompt marked shared, bypassing LLM cache")
+            scope = None
+        if scope is None or not self.enabled:
+            self.stats["bypassed"] += 1
+            return await call()
+
+        context, question = self._request_parts(
+            messages, model_name, tools, temperature, max_tokens
+        )
+        context_hash = _digest(context)
+        key = self._key(scope, context_hash, question)
+
+        cached = await self.cache_manager.get(key)
+        if cached is not None:
+            self.stats["exact_hits"] += 1
+            self.stats["latency_saved"] += cached["latency"]
+            return DeepSeekResponse(**cached["response"])
+
+        group = (scope, context_hash)
+        vector = await self._embed(question)
+        if vector is not None:
+            match_key, similarity = self._semantic_match(group, vector)
+            if match_key is not None and similarity >= self.semantic_threshold:
+                cached = await self.cache_manager.get(match_key)
+                if cached is not None:
+                    self.stats["semantic_hits"] += 1
+                    self.stats["latency_saved"] += cached["latency"]
+                    logger.debug(
+                        f"LLM cache semantic hit (similarity {similarity:.3f})"
+                    )
+                    return DeepSeekResponse(**cached["response"])
+                self._forget(group, match_key)
+
+        self.stats["misses"] += 1
+        start = time.perf_counter()
+        response = await call()
+        latency = time.perf_counter() - start
+
+        if response.content and response.finish_reason in CACHEABLE_FINISH_REASONS:
+            tags = [] if scope == SHARED_SCOPE else [scope, f"{CACHE_PREFIX}:{scope}"]
+            await self.cache_manager.set(
+                key,
+                {"response": response.model_dump(), "latency": latency},
+                self.ttl,
+                tags=tags,
+            )
+            if vector is not None:
+                self._remember(group, vector, key)
+            self.stats["stored"] += 1
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit counts, hit rate and total LLM latency saved by hits"""
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "latency_saved": round(self.stats["latency_saved"], 3),
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "semantic_enabled": self.embedder is not None,
+            "semantic_threshold": self.semantic_threshold,
+        }
+
+
+class CachedAIClient:
+    """
+    AI client wrapper answering ``get_deepseek_response_async`` from the cache
+
+    Callers opt in per request with ``cache_scope``; every other attribute
+    (sync and streaming calls, ``is_mock``...) is delegated to the wrapped
+    client unchanged.
+    """
+
+    def __init__(self, client: Any, cache: Optional[LLMResponseCache] = None):
+        """
+        Initialize the wrapper
+
+        Args:
+            client: Real or mock AI client
+            cache: Response cache; by default one is created, with the
+                semantic tier enabled by LLM_CACHE_SEMANTIC_ENABLED when the
+                client can produce embeddings
+        """
+        self.client = client
+        if cache is None:
+            embedder = None
+            if AuraWellSettings.LLM_CACHE_SEMANTIC_ENABLED:
+                embedder = getattr(client, "get_embeddings_async", None)
+            cache = LLMResponseCache(embedder=embedder)
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    async def get_deepseek_response_async(
+        self,
+        messages: List[Dict[str, Any]],
+        model_name: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        cache_scope: Optional[str] = None,
+    ) -> DeepSeekResponse:
+        """
+        Get an AI response, served from the cache when possible
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            model_name: Model name (default: from settings)
+            tools: Optional list of function tool definitions
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+            cache_scope: ``SHARED_SCOPE`` for prompts without user data,
+                ``user_scope(user_id)`` for personalized prompts, or None to
+                bypass the cache
+
+        Returns:
+            DeepSeekResponse object
+        """
+        return await self.cache.get_or_call(
+            lambda: self.client.get_deepseek_response_async(
+                messages, model_name, tools, temperature, max_tokens
+            ),
+            messages,
+            model_name,
+            tools,
+            temperature,
+            max_tokens,
+            scope=cache_scope,
+        )
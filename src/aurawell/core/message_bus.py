@@ -0,0 +1,294 @@
+"""
+WebSocket message bus for AuraWell application.
+
+Carries messages for WebSocket clients between workers. A message is
+addressed to a user (all of their sockets) or to a family (every connected
+member) and travels as already-serialized JSON text, so the sender encodes
+it once and each worker hands the same string to all of its local sockets.
+
+Backends:
+
+- ``InMemoryMessageBus`` delivers to subscribers in the same process, which
+  is enough for a single worker
+- ``RedisMessageBus`` additionally publishes on a Redis channel that every
+  worker subscribes to. Local subscribers are served immediately and remote
+  publishes are pipelined by a background task, so senders never wait on
+  Redis. If Redis is unreachable the bus degrades to local delivery.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from ..config.settings import get_settings
+
+try:
+    import redis.asyncio as aioredis
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Message scopes
+USER = "user"
+FAMILY = "family"
+# Membership change notices (empty text): the user's families, or a family's
+# member list, changed and workers must refresh their family index
+USER_MEMBERSHIP = "user_membership"
+FAMILY_MEMBERSHIP = "family_membership"
+
+# Called with (scope, target_id, text, exclude_user); must not block
+MessageHandler = Callable[[str, str, str, Optional[str]], None]
+
+
+class MessageBus(ABC):
+    """Publish/subscribe transport for messages addressed to users or families"""
+
+    def __init__(self):
+        self._handlers: List[MessageHandler] = []
+        self.published = 0
+
+    def subscribe(self, handler: MessageHandler):
+        """Deliver every message published on the bus to ``handler``"""
+        if handler not in self._handlers:
+            self._handlers.append(handler)
+
+    def unsubscribe(self, handler: MessageHandler):
+        """Stop delivering messages to ``handler``"""
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+
+    @abstractmethod
+    async def publish(
+        self, scope: str, target_id: str, text: str, exclude_user: Optional[str] = None
+    ):
+        """
+        Publish serialized message text
+
+        Args:
+            scope: ``USER`` or ``FAMILY``
+            target_id: User ID or family ID, depending on the scope
+            text: JSON text sent to the sockets unchanged
+            exclude_user: User that should not receive a family message
+        """
+
+    async def publish_json(
+        self,
+        scope: str,
+        target_id: str,
+        message: Dict[str, Any],
+        exclude_user: Optional[str] = None,
+    ):
+        """Serialize ``message`` once and publish it"""
+        text = json.dumps(message, ensure_ascii=False, default=str)
+        await self.publish(scope, target_id, text, exclude_user)
+
+    def start(self):
+        """Start background work; requires a running event loop"""
+
+    async def close(self):
+        """Release bus resources"""
+
+    def _dispatch(
+        self, scope: str, target_id: str, text: str, exclude_user: Optional[str]
+    ):
+        for handler in list(self._handlers):
+            try:
+                handler(scope, target_id, text, exclude_user)
+            except Exception as e:
+                logger.error(f"Message bus handler failed for {scope} {target_id}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bus statistics"""
+        return {
+            "backend": "memory",
+            "subscribers": len(self._handlers),
+            "published": self.published,
+        }
+
+
+class InMemoryMessageBus(MessageBus):
+    """Delivers messages to subscribers in the current process"""
+
+    async def publish(
+        self, scope: str, target_id: str, text: str, exclude_user: Optional[str] = None
+    ):
+        self.published += 1
+        self._dispatch(scope, target_id, text, exclude_user)
+
+
+class RedisMessageBus(MessageBus):
+    """Fans messages out to every worker through a Redis pub/sub channel
+
+    Each worker tags what it publishes with its own origin ID and ignores
+    those messages when they come back from Redis, since its local
+    subscribers were already served at publish time.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        channel: str = "aurawell:ws:events",
+        max_pending: int = 10000,
+        batch_size: int = 256,
+    ):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package is required for RedisMessageBus")
+        super().__init__()
+        self.redis_url = redis_url
+        self.channel = channel
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.origin = uuid.uuid4().hex
+        self._redis_client = None
+        self._outbox: Deque[str] = deque()
+        self._publisher_task: Optional[asyncio.Task] = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.dropped = 0
+
+    def _get_redis_client(self):
+        if self._redis_client is None:
+            self._redis_client = aioredis.from_url(
+                self.redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=5,
+            )
+        return self._redis_client
+
+    async def publish(
+        self, scope: str, target_id: str, text: str, exclude_user: Optional[str] = None
+    ):
+        self.published += 1
+        self._dispatch(scope, target_id, text, exclude_user)
+        self.start()
+
+        if len(self._outbox) >= self.max_pending:
+            self.dropped += 1
+            logger.warning(f"Message bus backlog full, dropping message for {scope} {target_id}")
+            return
+        # The text goes last so it needs no escaping
+        self._outbox.append(f"{self.origin}\n{scope}\n{target_id}\n{exclude_user or ''}\n{text}")
+        if self._publisher_task is None or self._publisher_task.done():
+            self._publisher_task = asyncio.create_task(self._run_publisher())
+
+    async def _run_publisher(self):
+        """Publish queued messages in pipelined batches until the queue is empty"""
+        while self._outbox:
+            batch = [
+                self._outbox.popleft()
+                for _ in range(min(self.batch_size, len(self._outbox)))
+            ]
+            try:
+                pipe = self._get_redis_client().pipeline(transaction=False)
+                for data in batch:
+                    pipe.publish(self.channel, data)
+                await pipe.execute()
+            except Exception as e:
+                # Other workers miss these; local sockets already have them
+                self.dropped += len(batch)
+                logger.warning(f"Message bus publish failed, dropped {len(batch)} messages: {e}")
+
+    def start(self):
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._run_listener())
+
+    async def _run_listener(self):
+        """Receive messages from other workers; reconnect with exponential backoff"""
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._get_redis_client().pubsub()
+                await pubsub.subscribe(self.channel)
+                backoff = 1.0
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0
+                    )
+                    if message and message.get("type") == "message":
+                        self._receive(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Message bus subscription lost, retrying in {backoff:.0f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.unsubscribe()
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def _receive(self, data: str):
+        try:
+            origin, scope, target_id, exclude_user, text = data.split("\n", 4)
+        except ValueError:
+            logger.warning("Ignoring malformed message bus event")
+            return
+        if origin == self.origin:
+            return
+        self.received += 1
+        self._dispatch(scope, target_id, text, exclude_user or None)
+
+    async def close(self):
+        if self._publisher_task is not None:
+            try:
+                await asyncio.wait_for(self._publisher_task, timeout=1.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+                pass
+            self._publisher_task = None
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener_task = None
+        if self._redis_client is not None:
+            await self._redis_client.aclose()
+            self._redis_client = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats.update(
+            backend="redis",
+            received=self.received,
+            dropped=self.dropped,
+            pending=len(self._outbox),
+        )
+        return stats
+
+
+def create_message_bus() -> MessageBus:
+    """Build a message bus from application settings"""
+    settings = get_settings()
+    if settings.WEBSOCKET_BUS_BACKEND == "redis":
+        if REDIS_AVAILABLE:
+            return RedisMessageBus(settings.REDIS_URL, channel=settings.WEBSOCKET_BUS_CHANNEL)
+        logger.error(
+            "WEBSOCKET_BUS_BACKEND=redis but the redis package is not installed; "
+            "using the in-memory bus, messages will not reach other workers"
+        )
+    return InMemoryMessageBus()
+
+
+# Process-wide bus shared by the WebSocket manager and the services publishing to it
+_message_bus: Optional[MessageBus] = None
+
+
+def get_message_bus() -> MessageBus:
+    """Get the process-wide message bus"""
+    global _message_bus
+    if _message_bus is None:
+        _message_bus = create_message_bus()
+    return _message_bus
@@ -0,0 +1,194 @@
+"""
+Family permission resolution for AuraWell application.
+
+Resolves a user's family roles for the permission decorators and the family
+services. All of a user's memberships are loaded with a single query and
+cached at two levels:
+
+- per request: a context-local map, so the decorator, the handler and any
+  data sanitization checks in the same request share one lookup
+- across requests: an in-process LRU with a short TTL
+
+Code that changes memberships (joining, role changes, removal) must call
+``invalidate_user`` or ``invalidate_family``. Other workers pick the change
+up when their TTL expires, so the TTL bounds cross-worker staleness.
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from ..models.family_models import FamilyRole
+from ..utils.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+# Loads {family_id: role} for one user
+MembershipLoader = Callable[[str], Awaitable[Dict[str, FamilyRole]]]
+
+_request_memberships: ContextVar[Optional[Dict[str, Dict[str, FamilyRole]]]] = (
+    ContextVar("family_request_memberships", default=None)
+)
+
+
+@contextmanager
+def permission_request_scope() -> Iterator[None]:
+    """
+    Share membership lookups for the rest of the current request.
+
+    Nested scopes reuse the outermost one.
+    """
+    if _request_memberships.get() is not None:
+        yield
+        return
+
+    token = _request_memberships.set({})
+    try:
+        yield
+    finally:
+        _request_memberships.reset(token)
+
+
+class FamilyPermissionResolver:
+    """
+    Cached lookup of a user's roles across all of their families.
+
+    Returned membership maps are shared between callers and must be treated
+    as read-only. Concurrent misses for the same user share one load.
+    """
+
+    def __init__(
+        self, loader: MembershipLoader, ttl: float = 30.0, max_entries: int = 10000
+    ):
+        """
+        Args:
+            loader: Coroutine loading ``{family_id: role}`` for a user
+            ttl: Seconds a user's memberships are reused across requests;
+                0 disables both cache levels
+            max_entries: Maximum number of users kept in the cache
+        """
+        self._loader = loader
+        self.ttl = ttl
+        # Each entry counts as 1 byte, so the byte limit is the entry limit
+        self._cache = LocalCache(max_entries=max_entries, max_bytes=max_entries)
+        self._inflight: Dict[str, "asyncio.Future[Dict[str, FamilyRole]]"] = {}
+        # Bumped on every invalidation; loads that overlap one are not cached
+        self._invalidations = 0
+        self.loads = 0
+        self.coalesced_loads = 0
+        self.request_hits = 0
+        self.cache_hits = 0
+
+    async def get_memberships(self, user_id: str) -> Dict[str, FamilyRole]:
+        """
+        Get all active family memberships of a user.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            Dict[str, FamilyRole]: Role per family ID
+        """
+        if self.ttl <= 0:
+            self.loads += 1
+            return await self._loader(user_id)
+
+        scope = _request_memberships.get()
+        if scope is not None and user_id in scope:
+            self.request_hits += 1
+            return scope[user_id]
+
+        memberships = self._cache.get(user_id)
+        if memberships is not None:
+            self.cache_hits += 1
+        else:
+            memberships = await self._load(user_id)
+
+        if scope is not None:
+            scope[user_id] = memberships
+        return memberships
+
+    async def get_role(self, family_id: str, user_id: str) -> Optional[FamilyRole]:
+        """
+        Get a user's role in a family.
+
+        Returns:
+            Optional[FamilyRole]: The role, or None if the user is not a member
+        """
+        memberships = await self.get_memberships(user_id)
+        return memberships.get(family_id)
+
+    async def _load(self, user_id: str) -> Dict[str, FamilyRole]:
+        task = self._inflight.get(user_id)
+        if task is None:
+            self.loads += 1
+            task = asyncio.ensure_future(self._loader(user_id))
+            self._inflight[user_id] = task
+            task.add_done_callback(partial(self._store, user_id, self._invalidations))
+        else:
+            self.coalesced_loads += 1
+        # A cancelled caller must not cancel the load other callers wait on
+        return await asyncio.shield(task)
+
+    def _store(self, user_id: str, invalidations: int, task: asyncio.Future) -> None:
+        if self._inflight.get(user_id) is task:
+            del self._inflight[user_id]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if invalidations == self._invalidations:
+            self._cache.set(user_id, task.result(), size=1, ttl=self.ttl)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drop a user's cached memberships after they join, leave or change role.
+
+        Args:
+            user_id: ID of the user whose memberships changed
+        """
+        self._invalidations += 1
+        self._cache.discard(user_id)
+        self._inflight.pop(user_id, None)
+
+        scope = _request_memberships.get()
+        if scope is not None:
+            scope.pop(user_id, None)
+
+    def invalidate_family(self, family_id: str) -> None:
+        """
+        Drop cached memberships of every member of a family.
+
+        Entries are indexed by user rather than family, so this clears the
+        whole cache; family-wide changes such as deletion are rare.
+
+        Args:
+            family_id: ID of the family whose memberships changed
+        """
+        self._invalidations += 1
+        self._cache.discard_matching("*")
+        self._inflight.clear()
+
+        scope = _request_memberships.get()
+        if scope is not None:
+            for user_id in [u for u, m in scope.items() if family_id in m]:
+                del scope[user_id]
+        logger.debug(f"Family permission cache cleared for family {family_id}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics; ``loads`` is the number of membership queries"""
+        lookups = self.loads + self.coalesced_loads + self.request_hits + self.cache_hits
+        return {
+            "entries": len(self._cache),
+            "ttl": self.ttl,
+            "loads": self.loads,
+            "coalesced_loads": self.coalesced_loads,
+            "request_hits": self.request_hits,
+            "cache_hits": self.cache_hits,
+            "hit_ratio": (
+                round((self.request_hits + self.cache_hits) / lookups, 4)
+                if lookups
+                else 0.0
+            ),
+        }
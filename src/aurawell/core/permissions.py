@@ -3,6 +3,12 @@ Permission decorators and validators for AuraWell application.
 
 This module provides decorators for role-based access control,
 specifically for family management features with audit logging.
+
+Role lookups go through ``FamilyPermissionResolver`` and each decorated call
+runs in a permission request scope, so the decorator and the handler share
+one membership lookup. Audit records are handed to the ``aurawell.audit``
+logger as structured context and serialized off the event loop once
+``start_audit_logging`` is active.
 """
 
 from functools import wraps
@@ -11,8 +17,8 @@ from datetime import datetime, timezone
 from fastapi import HTTPException, status
 from ..models.api_models import FamilyRole
 from ..core.exceptions import AurawellException
+from ..core.permission_resolver import permission_request_scope
 import logging
-import json
 
 logger = logging.getLogger(__name__)
 audit_logger = logging.getLogger("aurawell.audit")
@@ -50,12 +56,15 @@ async def log_permission_action(
         "error_message": error_message,
     }
 
-    # Log to audit logger
-    audit_logger.info(json.dumps(audit_entry, ensure_ascii=False))
+    # Serialized by the audit handler, off the event loop when batching is on
+    audit_logger.info(
+        f"Permission {result}: {action} on {resource} in family {family_id}",
+        extra={"context": audit_entry},
+    )
 
     # Also log to main logger for debugging
     if result == "success":
-        logger.info(
+        logger.debug(
             f"Permission granted: {user_id} performed {action} on {resource} in family {family_id}"
         )
     elif result == "denied":
@@ -92,6 +101,10 @@ def require_family_permission(
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
+            with permission_request_scope():
+                return await _check_and_call(*args, **kwargs)
+
+        async def _check_and_call(*args, **kwargs):
             # Get required dependencies
             try:
                 # Extract family_id from kwargs
@@ -278,6 +291,10 @@ def require_family_membership(family_id_param: str = "family_id"):
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
+            with permission_request_scope():
+                return await _check_and_call(*args, **kwargs)
+
+        async def _check_and_call(*args, **kwargs):
             try:
                 family_id = kwargs.get(family_id_param)
                 if not family_id:
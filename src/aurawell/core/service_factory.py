@@ -19,6 +19,7 @@ import asyncio
 
 # 导入现有的真实客户端
 from .deepseek_client import DeepSeekClient, DeepSeekResponse
+from .llm_cache import CachedAIClient
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,17 @@ class AIClientProtocol(Protocol):
         """获取AI响应"""
         ...
     
+    async def get_deepseek_response_async(
+        self,
+        messages: list,
+        model_name: Optional[str] = None,
+        tools: Optional[list] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> DeepSeekResponse:
+        """获取AI响应（不阻塞事件循环）"""
+        ...
+    
     async def get_streaming_response(
         self,
         messages: list,
@@ -90,6 +102,19 @@ class MockDeepSeekClient:
             finish_reason="stop"
         )
     
+    async def get_deepseek_response_async(
+        self,
+        messages: list,
+        model_name: Optional[str] = None,
+        tools: Optional[list] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> DeepSeekResponse:
+        """返回Mock响应数据（异步接口）"""
+        return self.get_deepseek_response(
+            messages, model_name, tools, temperature, max_tokens
+        )
+    
     async def get_streaming_response(
         self,
         messages: list,
@@ -233,6 +258,9 @@ class ServiceClientFactory:
                     'last_updated': cls._get_current_time()
                 }
                 logger.info("未配置DeepSeek API Key，使用Mock客户端")
+
+            # 所有调用方共享同一个LLM响应缓存（按请求的cache_scope启用）
+            cls._clients['deepseek'] = CachedAIClient(cls._clients['deepseek'])
         
         return cls._clients['deepseek']
     
@@ -306,6 +334,9 @@ class ServiceClientFactory:
         # 确保至少初始化了DeepSeek客户端
         if 'deepseek' not in cls._service_status:
             cls.get_deepseek_client()
+        cls._service_status['deepseek']['llm_cache'] = (
+            cls.get_deepseek_client().cache.get_stats()
+        )
 
         # 确保初始化了MCP工具接口
         if 'mcp_tools' not in cls._service_status:
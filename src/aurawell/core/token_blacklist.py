@@ -2,12 +2,20 @@
 JWT Token黑名单管理器
 
 实现基于Redis的JWT Token黑名单机制，确保登出Token无法被重复使用
+
+每个进程在内存中维护黑名单的本地镜像（Token哈希 -> 过期时间）：启动时全量加载，
+之后通过 Redis pub/sub 接收撤销事件增量更新，并定期全量重同步。镜像确认为最新时，
+绝大多数"未撤销"的检查不产生任何网络请求；镜像超过 TOKEN_BLACKLIST_MAX_STALENESS
+秒未确认（如订阅连接中断）时退回直接查询 Redis，保证撤销在各 worker 间的生效延迟有上界。
 """
 
+import asyncio
+import hashlib
 import logging
 import json
+import time
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
 import redis.asyncio as redis
 from jose import jwt, JWTError
 
@@ -24,6 +32,18 @@ class TokenBlacklistManager:
         self._redis_client: Optional[redis.Redis] = None
         self.blacklist_prefix = "token_blacklist:"
         self.user_tokens_prefix = "user_tokens:"
+        self.events_channel = "token_blacklist:events"
+
+        # 本地黑名单镜像 {token_hash: 过期时间戳}
+        self.mirror_enabled = self.settings.TOKEN_BLACKLIST_LOCAL_MIRROR
+        self.refresh_interval = self.settings.TOKEN_BLACKLIST_REFRESH_INTERVAL
+        self.max_staleness = self.settings.TOKEN_BLACKLIST_MAX_STALENESS
+        self._local_blacklist: Dict[str, float] = {}
+        self._mirror_confirmed_at: Optional[float] = None
+        self._mirror_task: Optional[asyncio.Task] = None
+        self.local_checks = 0
+        self.redis_checks = 0
+
     async def _get_redis_client(self) -> Optional[redis.Redis]:
         """获取Redis客户端，实现快速失败机制"""
         if self._redis_client is None:
@@ -109,7 +129,7 @@ class TokenBlacklistManager:
             }
 
             # 使用Token的哈希作为键
-            token_hash = self._get_token_hash(token)
+            token_hash = self.get_token_hash(token)
             blacklist_key = f"{self.blacklist_prefix}{token_hash}"
 
             # 添加到Redis，设置TTL
@@ -124,6 +144,9 @@ class TokenBlacklistManager:
             await redis_client.sadd(user_tokens_key, token_hash)
             await redis_client.expire(user_tokens_key, ttl_seconds)
 
+            self._add_local([token_hash], ttl_seconds)
+            await self._publish_revocation(redis_client, [token_hash], ttl_seconds)
+
             logger.info(f"Token已加入黑名单: user_id={user_id}, reason={reason}, ttl={ttl_seconds}s")
             return True
 
@@ -141,6 +164,24 @@ class TokenBlacklistManager:
         Returns:
             是否在黑名单中
         """
+        return await self.is_token_hash_blacklisted(self.get_token_hash(token))
+
+    async def is_token_hash_blacklisted(self, token_hash: str) -> bool:
+        """
+        按Token哈希检查是否在黑名单中，本地镜像为最新时不访问 Redis
+
+        Args:
+            token_hash: get_token_hash 计算的Token哈希
+
+        Returns:
+            是否在黑名单中
+        """
+        if self.mirror_enabled:
+            self._ensure_mirror_task()
+            if self.is_mirror_fresh():
+                self.local_checks += 1
+                return self._in_local_blacklist(token_hash)
+
         try:
             redis_client = await self._get_redis_client()
 
@@ -149,19 +190,14 @@ class TokenBlacklistManager:
                 logger.debug("Redis不可用，跳过Token黑名单检查（安全降级）")
                 return False
 
-            # 计算Token哈希
-            token_hash = self._get_token_hash(token)
+            self.redis_checks += 1
             blacklist_key = f"{self.blacklist_prefix}{token_hash}"
 
-            # 检查是否存在
-            exists = await redis_client.exists(blacklist_key)
-
-            if exists:
-                # 获取黑名单信息用于日志
-                blacklist_data = await redis_client.get(blacklist_key)
-                if blacklist_data:
-                    data = json.loads(blacklist_data)
-                    logger.info(f"Token在黑名单中: user_id={data.get('user_id')}, reason={data.get('reason')}")
+            # 一次 GET 同时判断是否存在并取得日志信息
+            blacklist_data = await redis_client.get(blacklist_key)
+            if blacklist_data:
+                data = json.loads(blacklist_data)
+                logger.info(f"Token在黑名单中: user_id={data.get('user_id')}, reason={data.get('reason')}")
                 return True
 
             return False
@@ -219,6 +255,9 @@ class TokenBlacklistManager:
                 )
                 revoked_count += 1
 
+            self._add_local(token_hashes, 24 * 60 * 60)
+            await self._publish_revocation(redis_client, token_hashes, 24 * 60 * 60)
+
             # 清除用户Token列表
             await redis_client.delete(user_tokens_key)
 
@@ -275,6 +314,7 @@ class TokenBlacklistManager:
                     continue
 
             stats["by_reason"] = reason_stats
+            stats["local_mirror"] = self.get_mirror_stats()
             return stats
 
         except Exception as e:
@@ -326,9 +366,126 @@ class TokenBlacklistManager:
             logger.error(f"清理过期Token失败: {e}")
             return 0
 
-    def _get_token_hash(self, token: str) -> str:
-        """获取Token的哈希值"""
-        import hashlib
+    # ------------------------------------------------------------------
+    # 本地黑名单镜像
+    # ------------------------------------------------------------------
+
+    def is_mirror_fresh(self) -> bool:
+        """镜像在 max_staleness 秒内与 Redis 确认过同步状态"""
+        return (
+            self._mirror_confirmed_at is not None
+            and time.monotonic() - self._mirror_confirmed_at <= self.max_staleness
+        )
+
+    def get_mirror_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.mirror_enabled,
+            "fresh": self.is_mirror_fresh(),
+            "entries": len(self._local_blacklist),
+            "local_checks": self.local_checks,
+            "redis_checks": self.redis_checks,
+        }
+
+    def _in_local_blacklist(self, token_hash: str) -> bool:
+        expires_at = self._local_blacklist.get(token_hash)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self._local_blacklist.pop(token_hash, None)
+            return False
+        return True
+
+    def _add_local(self, token_hashes: Iterable[str], ttl_seconds: float):
+        expires_at = time.time() + ttl_seconds
+        for token_hash in token_hashes:
+            self._local_blacklist[token_hash] = expires_at
+
+    async def _publish_revocation(
+        self, redis_client: redis.Redis, token_hashes: Iterable[str], ttl_seconds: int
+    ):
+        """通知其他 worker 更新本地镜像"""
+        try:
+            await redis_client.publish(
+                self.events_channel,
+                json.dumps({"hashes": list(token_hashes), "ttl": ttl_seconds}),
+            )
+        except Exception as e:
+            # 其他 worker 会在镜像重同步或过期后回退到 Redis 查询时看到该撤销
+            logger.warning(f"发布Token撤销事件失败: {e}")
+
+    def _apply_event(self, data: str):
+        try:
+            event = json.loads(data)
+            self._add_local(event["hashes"], float(event["ttl"]))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"忽略无法解析的Token撤销事件: {e}")
+
+    async def _reload_local_blacklist(self, redis_client: redis.Redis):
+        """全量加载 Redis 中的黑名单到本地镜像"""
+        keys = [key async for key in redis_client.scan_iter(match=f"{self.blacklist_prefix}*", count=1000)]
+        now = time.time()
+        snapshot: Dict[str, float] = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            pipe = redis_client.pipeline(transaction=False)
+            for key in chunk:
+                pipe.ttl(key)
+            for key, ttl in zip(chunk, await pipe.execute()):
+                if ttl and ttl > 0:
+                    snapshot[key[len(self.blacklist_prefix):]] = now + ttl
+        self._local_blacklist = snapshot
+        logger.debug(f"Token黑名单镜像已同步: {len(snapshot)} 条")
+
+    def _ensure_mirror_task(self):
+        if self._mirror_task is None or self._mirror_task.done():
+            self._mirror_task = asyncio.create_task(self._run_mirror())
+
+    async def _run_mirror(self):
+        """订阅撤销事件并定期全量重同步；连接中断时指数退避重连"""
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                redis_client = await self._get_redis_client()
+                if redis_client is None:
+                    raise ConnectionError("Redis不可用")
+
+                # 先订阅再全量加载，加载期间发布的撤销事件不会丢失
+                pubsub = redis_client.pubsub()
+                await pubsub.subscribe(self.events_channel)
+                await self._reload_local_blacklist(redis_client)
+                self._mirror_confirmed_at = time.monotonic()
+                next_reload = time.monotonic() + self.refresh_interval
+                backoff = 1.0
+
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=0.5
+                    )
+                    # 读取成功说明订阅连接仍然有效
+                    self._mirror_confirmed_at = time.monotonic()
+                    if message and message.get("type") == "message":
+                        self._apply_event(message["data"])
+                    if time.monotonic() >= next_reload:
+                        await self._reload_local_blacklist(redis_client)
+                        next_reload = time.monotonic() + self.refresh_interval
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token黑名单镜像同步中断，{backoff:.0f}秒后重试: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.unsubscribe()
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def get_token_hash(self, token: str) -> str:
+        """获取Token的哈希值（黑名单与已验证Token缓存共用的键）"""
         return hashlib.sha256(token.encode()).hexdigest()[:32]
 
     async def _parse_token_info(self, token: str) -> Optional[Dict[str, Any]]:
@@ -343,6 +500,14 @@ class TokenBlacklistManager:
 
     async def close(self):
         """关闭Redis连接"""
+        if self._mirror_task is not None:
+            self._mirror_task.cancel()
+            try:
+                await self._mirror_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._mirror_task = None
+            self._mirror_confirmed_at = None
         if self._redis_client:
             await self._redis_client.close()
             self._redis_client = None
@@ -12,6 +12,7 @@ from .models import (
     ActivitySummaryDB,
     SleepSessionDB,
     HeartRateSampleDB,
+    HeartRateChunkDB,
     NutritionEntryDB,
     AchievementProgressDB,
     PlatformConnectionDB,
@@ -44,6 +45,7 @@ __all__ = [
     "ActivitySummaryDB",
     "SleepSessionDB",
     "HeartRateSampleDB",
+    "HeartRateChunkDB",
     "NutritionEntryDB",
     "AchievementProgressDB",
     "PlatformConnectionDB",
@@ -144,8 +144,14 @@ class DatabaseManager:
         if not self.engine:
             raise RuntimeError("Database engine not initialized")
 
+        # Imported here; migrations depends on this module
+        from .migrations import apply_unique_constraint_migrations
+
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            # Adds missing unique indexes to clean tables only; tables with
+            # duplicate rows are reported, never cleaned up here
+            await conn.run_sync(apply_unique_constraint_migrations)
 
         logger.info("Database tables created successfully")
 
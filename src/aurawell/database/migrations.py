@@ -5,16 +5,142 @@ Provides tools for database schema initialization and migration.
 """
 
 import logging
-from typing import Optional
+from typing import Dict, Optional, List
 from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy import text, inspect
+from sqlalchemy import text, inspect, select, delete
 from sqlalchemy.exc import SQLAlchemyError
 
 from .base import Base
 from .connection import DatabaseManager
+from .models import HeartRateSampleDB
 
 logger = logging.getLogger(__name__)
 
+# Unique constraints added after their tables first shipped. ``create_all``
+# never alters existing tables, so older databases get an equivalent unique
+# index instead; the bulk upserts' ON CONFLICT targets depend on them.
+UNIQUE_CONSTRAINT_MIGRATIONS = [
+    (
+        "heart_rate_samples",
+        "uq_hr_user_timestamp_platform",
+        ("user_id", "timestamp_utc", "source_platform"),
+    ),
+    (
+        "activity_summaries",
+        "uq_user_date_platform",
+        ("user_id", "date", "source_platform"),
+    ),
+    (
+        "sleep_sessions",
+        "uq_sleep_user_date_platform",
+        ("user_id", "date", "source_platform"),
+    ),
+]
+
+
+def _missing_unique_constraints(sync_conn):
+    """Yield ``(table, name, columns)`` for upsert constraints not yet in place"""
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+
+    for table, name, columns in UNIQUE_CONSTRAINT_MIGRATIONS:
+        if table not in existing_tables:
+            continue
+
+        unique_column_sets = {
+            tuple(constraint["column_names"])
+            for constraint in inspector.get_unique_constraints(table)
+        }
+        unique_column_sets.update(
+            tuple(index["column_names"])
+            for index in inspector.get_indexes(table)
+            if index.get("unique")
+        )
+        if tuple(columns) not in unique_column_sets:
+            yield table, name, columns
+
+
+def _count_duplicates(sync_conn, table: str, columns) -> int:
+    """Count rows that would be removed to make ``columns`` unique in ``table``"""
+    column_list = ", ".join(columns)
+    return sync_conn.execute(
+        text(
+            f"SELECT COUNT(*) FROM {table} WHERE id NOT IN "
+            f"(SELECT MAX(id) FROM {table} GROUP BY {column_list})"
+        )
+    ).scalar()
+
+
+def find_unique_constraint_duplicates(sync_conn) -> Dict[str, int]:
+    """
+    Report duplicate rows blocking the upsert unique constraints
+
+    Read-only. Only tables still missing their constraint are checked.
+
+    Args:
+        sync_conn: Synchronous connection (use via ``conn.run_sync``)
+
+    Returns:
+        Duplicate row count per table, for tables that have duplicates
+    """
+    duplicates = {}
+    for table, _, columns in _missing_unique_constraints(sync_conn):
+        count = _count_duplicates(sync_conn, table, columns)
+        if count:
+            duplicates[table] = count
+    return duplicates
+
+
+def apply_unique_constraint_migrations(
+    sync_conn, remove_duplicates: bool = False
+) -> List[str]:
+    """
+    Add missing upsert unique constraints to existing tables
+
+    A table holding duplicate rows is left untouched with a warning unless
+    ``remove_duplicates`` is set, in which case every duplicate group is
+    reduced to its most recently inserted row first. Run that explicitly
+    (``python migrations.py dedupe-unique --apply``), never at startup.
+    Safe to run repeatedly.
+
+    Args:
+        sync_conn: Synchronous connection (use via ``conn.run_sync``)
+        remove_duplicates: Delete duplicate rows so the constraint can be added
+
+    Returns:
+        Names of the unique indexes that were created
+    """
+    created = []
+
+    for table, name, columns in list(_missing_unique_constraints(sync_conn)):
+        column_list = ", ".join(columns)
+        duplicates = _count_duplicates(sync_conn, table, columns)
+        if duplicates and not remove_duplicates:
+            logger.warning(
+                f"{table} has {duplicates} duplicate rows on ({column_list}); "
+                f"unique index {name} not added and bulk upserts into it will fail. "
+                f"Review with 'python migrations.py dedupe-unique' and apply with "
+                f"'python migrations.py dedupe-unique --apply'"
+            )
+            continue
+
+        if duplicates:
+            result = sync_conn.execute(
+                text(
+                    f"DELETE FROM {table} WHERE id NOT IN "
+                    f"(SELECT MAX(id) FROM {table} GROUP BY {column_list})"
+                )
+            )
+            logger.warning(f"Removed {result.rowcount} duplicate rows from {table}")
+
+        sync_conn.execute(
+            text(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table} ({column_list})")
+        )
+        created.append(name)
+        logger.info(f"Added unique index {name} on {table} ({column_list})")
+
+    return created
+
 
 class DatabaseMigrator:
     """
@@ -65,6 +191,107 @@ class DatabaseMigrator:
             logger.error(f"Table creation failed: {e}")
             return False
 
+    async def migrate_heart_rate_to_chunks(
+        self, batch_size: int = 50000, delete_rows: bool = True
+    ) -> int:
+        """
+        Move per-reading heart rate rows into chunked storage
+
+        Rows are read per user in ``id`` order, merged into the user's day
+        chunks and (optionally) deleted, one committed batch at a time, so an
+        interrupted migration can simply be re-run.
+
+        Args:
+            batch_size: Rows read per batch
+            delete_rows: Delete migrated rows from ``heart_rate_samples``
+
+        Returns:
+            Number of samples migrated
+        """
+        # Imported here; the repository layer depends on this package
+        from ..repositories.heart_rate_repository import HeartRateChunkRepository
+
+        columns = [
+            column.name
+            for column in HeartRateSampleDB.__table__.columns
+            if column.name not in ("id", "created_at", "updated_at")
+        ]
+        migrated = 0
+
+        try:
+            async with self.db_manager.get_session() as session:
+                result = await session.execute(
+                    select(HeartRateSampleDB.user_id).distinct()
+                )
+                user_ids = list(result.scalars().all())
+
+            for user_id in user_ids:
+                last_id = 0
+                while True:
+                    async with self.db_manager.get_session() as session:
+                        stmt = (
+                            select(HeartRateSampleDB.__table__)
+                            .where(
+                                HeartRateSampleDB.user_id == user_id,
+                                HeartRateSampleDB.id > last_id,
+                            )
+                            .order_by(HeartRateSampleDB.id)
+                            .limit(batch_size)
+                        )
+                        rows = (await session.execute(stmt)).mappings().all()
+                        if not rows:
+                            break
+
+                        samples = [
+                            {name: row[name] for name in columns} for row in rows
+                        ]
+                        await HeartRateChunkRepository(session).append_samples(
+                            user_id, samples
+                        )
+                        if delete_rows:
+                            await session.execute(
+                                delete(HeartRateSampleDB).where(
+                                    HeartRateSampleDB.user_id == user_id,
+                                    HeartRateSampleDB.id.between(
+                                        rows[0]["id"], rows[-1]["id"]
+                                    ),
+                                )
+                            )
+                        last_id = rows[-1]["id"]
+                        migrated += len(rows)
+
+            logger.info(f"Migrated {migrated} heart rate samples to chunked storage")
+            return migrated
+        except Exception as e:
+            logger.error(f"Heart rate chunk migration failed: {e}")
+            raise
+
+    async def dedupe_unique_constraints(self, apply: bool = False) -> Dict[str, int]:
+        """
+        Report, and optionally remove, rows blocking the upsert unique constraints
+
+        Args:
+            apply: Delete the duplicates (keeping the newest row of each group)
+                and add the missing unique indexes
+
+        Returns:
+            Duplicate row count per table found before any deletion
+        """
+        try:
+            if not self.db_manager.engine:
+                await self.db_manager.initialize()
+
+            async with self.db_manager.engine.begin() as conn:
+                duplicates = await conn.run_sync(find_unique_constraint_duplicates)
+                if apply:
+                    await conn.run_sync(
+                        apply_unique_constraint_migrations, remove_duplicates=True
+                    )
+            return duplicates
+        except Exception as e:
+            logger.error(f"Unique constraint deduplication failed: {e}")
+            raise
+
     async def drop_tables(self) -> bool:
         """
         Drop all tables (use with caution!)
@@ -304,7 +531,10 @@ if __name__ == "__main__":
         import sys
 
         if len(sys.argv) < 2:
-            print("Usage: python migrations.py [init|reset|validate]")
+            print(
+                "Usage: python migrations.py "
+                "[init|reset|validate|migrate-heart-rate|dedupe-unique [--apply]]"
+            )
             return
 
         command = sys.argv[1]
@@ -323,6 +553,30 @@ if __name__ == "__main__":
                 print(f"Schema validation: {'PASSED' if success else 'FAILED'}")
             finally:
                 await db_manager.close()
+        elif command == "migrate-heart-rate":
+            db_manager = DatabaseManager()
+            migrator = DatabaseMigrator(db_manager)
+            try:
+                migrated = await migrator.migrate_heart_rate_to_chunks()
+                print(f"Heart rate samples migrated to chunks: {migrated}")
+                print("Set HEART_RATE_STORAGE=chunked to read from chunked storage")
+            finally:
+                await db_manager.close()
+        elif command == "dedupe-unique":
+            apply = "--apply" in sys.argv[2:]
+            db_manager = DatabaseManager()
+            migrator = DatabaseMigrator(db_manager)
+            try:
+                duplicates = await migrator.dedupe_unique_constraints(apply=apply)
+                for table, count in duplicates.items():
+                    action = "removed" if apply else "would be removed"
+                    print(f"{table}: {count} duplicate rows {action}")
+                if not duplicates:
+                    print("No duplicate rows found")
+                elif not apply:
+                    print("Re-run with --apply to delete them and add the unique indexes")
+            finally:
+                await db_manager.close()
         else:
             print(f"Unknown command: {command}")
 
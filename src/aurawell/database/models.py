@@ -16,6 +16,7 @@ from sqlalchemy import (
     Date,
     Text,
     JSON,
+    LargeBinary,
     ForeignKey,
     Index,
     UniqueConstraint,
@@ -63,6 +64,7 @@ class UserProfileDB(Base):
     activity_summaries = relationship("ActivitySummaryDB", back_populates="user")
     sleep_sessions = relationship("SleepSessionDB", back_populates="user")
     heart_rate_samples = relationship("HeartRateSampleDB", back_populates="user")
+    heart_rate_chunks = relationship("HeartRateChunkDB", back_populates="user")
     nutrition_entries = relationship("NutritionEntryDB", back_populates="user")
     achievement_progress = relationship("AchievementProgressDB", back_populates="user")
     platform_connections = relationship("PlatformConnectionDB", back_populates="user")
@@ -191,7 +193,72 @@ class HeartRateSampleDB(Base):
     user = relationship("UserProfileDB", back_populates="heart_rate_samples")
 
     # Constraints
-    __table_args__ = (Index("idx_hr_user_timestamp", "user_id", "timestamp_utc"),)
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "timestamp_utc",
+            "source_platform",
+            name="uq_hr_user_timestamp_platform",
+        ),
+        Index("idx_hr_user_timestamp", "user_id", "timestamp_utc"),
+    )
+
+
+class HeartRateChunkDB(Base):
+    """Heart rate samples of one user, day and source packed into BLOBs
+
+    See ``database.timeseries`` for the encoding of ``samples`` and the
+    ``rollup_*`` columns.
+    """
+
+    __tablename__ = "heart_rate_chunks"
+
+    # Primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    # Foreign key
+    user_id: Mapped[str] = mapped_column(
+        String(255), ForeignKey("user_profiles.user_id")
+    )
+
+    # Chunk key (UTC day)
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    source_platform: Mapped[str] = mapped_column(String(50), nullable=False)
+    measurement_type: Mapped[str] = mapped_column(String(50), default="unknown")
+
+    # Packed samples and rollups
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_timestamp_utc: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    last_timestamp_utc: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    samples: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    rollup_1m: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    rollup_5m: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    rollup_1h: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    # Metadata
+    data_quality: Mapped[str] = mapped_column(String(20), default="unknown")
+    recorded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    # Relationships
+    user = relationship("UserProfileDB", back_populates="heart_rate_chunks")
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "date",
+            "source_platform",
+            "measurement_type",
+            name="uq_hr_chunk_user_date_platform_type",
+        ),
+        Index("idx_hr_chunk_user_date", "user_id", "date"),
+    )
 
 
 class NutritionEntryDB(Base):
@@ -0,0 +1,246 @@
+"""
+Heart Rate Time-Series Encoding
+
+Packs a day of heart rate samples into compact BLOBs for ``HeartRateChunkDB``.
+Samples are stored as delta-encoded millisecond timestamps (uint32) plus uint8
+BPM values, and each chunk carries precomputed min/max/mean/count rollups at
+1-minute, 5-minute and 1-hour resolution so long-range charts never decode
+raw samples.
+"""
+
+import struct
+import zlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# Rollup resolutions, coarsest first, as (name, bucket seconds)
+ROLLUP_RESOLUTIONS: Tuple[Tuple[str, int], ...] = (
+    ("1h", 3600),
+    ("5m", 300),
+    ("1m", 60),
+)
+RAW_RESOLUTION = "raw"
+
+_SAMPLES_HEADER = struct.Struct("<BIq")  # version, count, first timestamp (ms)
+_ROLLUP_HEADER = struct.Struct("<BI")  # version, bucket count
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Rollup(NamedTuple):
+    """Per-bucket aggregates at one resolution"""
+
+    bucket: np.ndarray  # stored as uint16 bucket index from the start of the day
+    min_bpm: np.ndarray  # uint8
+    max_bpm: np.ndarray  # uint8
+    mean_bpm: np.ndarray  # float32
+    count: np.ndarray  # uint32
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Milliseconds since the epoch; naive datetimes are treated as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(milliseconds=1)
+
+
+def from_epoch_ms(value: int) -> datetime:
+    """Inverse of ``to_epoch_ms``, returning an aware UTC datetime"""
+    return EPOCH + timedelta(milliseconds=int(value))
+
+
+def day_start_ms(day: date) -> int:
+    """Epoch milliseconds of midnight UTC on ``day``"""
+    return to_epoch_ms(datetime.combine(day, time.min, tzinfo=timezone.utc))
+
+
+def encode_samples(timestamps_ms: np.ndarray, bpm: np.ndarray) -> bytes:
+    """
+    Pack samples sorted by timestamp into a compressed BLOB
+
+    Args:
+        timestamps_ms: Sorted int64 epoch milliseconds
+        bpm: Heart rate values, one per timestamp
+
+    Returns:
+        Encoded payload
+    """
+    count = len(timestamps_ms)
+    first = int(timestamps_ms[0]) if count else 0
+    deltas = np.diff(timestamps_ms, prepend=first).astype("<u4")
+    body = (
+        _SAMPLES_HEADER.pack(FORMAT_VERSION, count, first)
+        + deltas.tobytes()
+        + np.asarray(bpm, dtype=np.uint8).tobytes()
+    )
+    return zlib.compress(body, 6)
+
+
+def decode_samples(payload: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unpack a BLOB written by ``encode_samples``
+
+    Returns:
+        Tuple of (int64 epoch milliseconds, uint8 BPM) arrays
+    """
+    body = zlib.decompress(payload)
+    version, count, first = _SAMPLES_HEADER.unpack_from(body)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported heart rate chunk version {version}")
+
+    offset = _SAMPLES_HEADER.size
+    deltas = np.frombuffer(body, dtype="<u4", count=count, offset=offset)
+    bpm = np.frombuffer(body, dtype=np.uint8, count=count, offset=offset + 4 * count)
+    timestamps = first + np.cumsum(deltas, dtype=np.int64)
+    return timestamps, bpm.copy()
+
+
+def merge_samples(
+    timestamps_ms: np.ndarray,
+    bpm: np.ndarray,
+    new_timestamps_ms: np.ndarray,
+    new_bpm: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge new samples into existing ones, sorted and de-duplicated
+
+    A new sample replaces an existing one with the same timestamp, matching
+    the upsert semantics of row storage.
+    """
+    all_timestamps = np.concatenate((new_timestamps_ms, timestamps_ms))
+    all_bpm = np.concatenate((new_bpm, bpm))
+    # np.unique keeps the first occurrence, and new samples come first
+    unique_timestamps, index = np.unique(all_timestamps, return_index=True)
+    return unique_timestamps, all_bpm[index]
+
+
+def aggregate_buckets(buckets: np.ndarray, bpm: np.ndarray) -> Rollup:
+    """
+    Aggregate BPM values grouped by a sorted bucket key
+
+    Args:
+        buckets: Non-decreasing bucket key per sample
+        bpm: Heart rate values, one per sample
+
+    Returns:
+        Rollup whose ``bucket`` holds the distinct keys (same dtype as input)
+    """
+    if not len(buckets):
+        return Rollup(
+            buckets,
+            np.empty(0, np.uint8),
+            np.empty(0, np.uint8),
+            np.empty(0, np.float32),
+            np.empty(0, np.uint32),
+        )
+
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    counts = np.diff(np.append(starts, len(buckets)))
+    sums = np.add.reduceat(bpm.astype(np.uint32), starts)
+    return Rollup(
+        buckets[starts],
+        np.minimum.reduceat(bpm, starts),
+        np.maximum.reduceat(bpm, starts),
+        (sums / counts).astype(np.float32),
+        counts.astype(np.uint32),
+    )
+
+
+def combine_rollups(rollup: Rollup) -> Rollup:
+    """
+    Merge rollup entries sharing a bucket key, e.g. from several sources
+
+    The input need not be sorted; the result is sorted by bucket.
+    """
+    order = np.argsort(rollup.bucket, kind="stable")
+    buckets = rollup.bucket[order]
+    if not len(buckets):
+        return rollup
+
+    counts = rollup.count[order].astype(np.uint64)
+    weighted = rollup.mean_bpm[order].astype(np.float64) * counts
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    total = np.add.reduceat(counts, starts)
+    return Rollup(
+        buckets[starts],
+        np.minimum.reduceat(rollup.min_bpm[order], starts),
+        np.maximum.reduceat(rollup.max_bpm[order], starts),
+        (np.add.reduceat(weighted, starts) / total).astype(np.float32),
+        total.astype(np.uint32),
+    )
+
+
+def compute_rollup(
+    timestamps_ms: np.ndarray, bpm: np.ndarray, day: date, bucket_seconds: int
+) -> Rollup:
+    """Aggregate sorted samples of one day into fixed-width buckets"""
+    buckets = (timestamps_ms - day_start_ms(day)) // (bucket_seconds * 1000)
+    rollup = aggregate_buckets(buckets, bpm)
+    return rollup._replace(bucket=rollup.bucket.astype(np.uint16))
+
+
+def encode_rollup(rollup: Rollup) -> bytes:
+    """Pack a rollup into a compressed BLOB"""
+    body = _ROLLUP_HEADER.pack(FORMAT_VERSION, len(rollup.bucket)) + b"".join(
+        (
+            rollup.bucket.astype("<u2").tobytes(),
+            rollup.min_bpm.astype(np.uint8).tobytes(),
+            rollup.max_bpm.astype(np.uint8).tobytes(),
+            rollup.mean_bpm.astype("<f4").tobytes(),
+            rollup.count.astype("<u4").tobytes(),
+        )
+    )
+    return zlib.compress(body, 6)
+
+
+def decode_rollup(payload: bytes) -> Rollup:
+    """Unpack a BLOB written by ``encode_rollup``"""
+    body = zlib.decompress(payload)
+    version, count = _ROLLUP_HEADER.unpack_from(body)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported heart rate rollup version {version}")
+
+    arrays = []
+    offset = _ROLLUP_HEADER.size
+    for dtype in ("<u2", np.uint8, np.uint8, "<f4", "<u4"):
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+        arrays.append(array)
+        offset += array.nbytes
+    return Rollup(*arrays)
+
+
+def encode_chunk(
+    timestamps_ms: np.ndarray, bpm: np.ndarray, day: date
+) -> Dict[str, bytes]:
+    """Encode samples plus every rollup, keyed by ``HeartRateChunkDB`` column"""
+    columns = {"samples": encode_samples(timestamps_ms, bpm)}
+    for name, seconds in ROLLUP_RESOLUTIONS:
+        rollup = compute_rollup(timestamps_ms, bpm, day, seconds)
+        columns[f"rollup_{name}"] = encode_rollup(rollup)
+    return columns
+
+
+def select_resolution(
+    start: datetime, end: datetime, points: Optional[int]
+) -> Tuple[str, int]:
+    """
+    Pick the coarsest resolution giving at least ``points`` buckets
+
+    Args:
+        start: Range start
+        end: Range end
+        points: Requested number of points; ``None`` asks for raw samples
+
+    Returns:
+        Tuple of (resolution name, bucket seconds); raw samples use 0 seconds
+    """
+    if points:
+        span_seconds = (end - start).total_seconds()
+        for name, seconds in ROLLUP_RESOLUTIONS:
+            if span_seconds / seconds >= points:
+                return name, seconds
+    return RAW_RESOLUTION, 0
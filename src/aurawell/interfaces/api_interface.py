@@ -5,15 +5,15 @@ Provides RESTful API endpoints for the AuraWell health assistant application.
 Includes chat interface, health data management, user profiles, and achievements.
 """
 
+import json
 import logging
 from datetime import datetime, date, timedelta, timezone
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, HTTPException, Depends, status, Request, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.openapi.utils import get_openapi
 from pydantic import ValidationError, Field
-import time
 
 # Import models and authentication
 from ..models.api_models import (
@@ -139,12 +139,27 @@ from ..utils.cache import (
 )
 from ..utils.async_tasks import get_task_manager, async_task
 from ..middleware import configure_cors
+from ..middleware.rate_limiter import RateLimitingMiddleware
+from ..core.message_bus import get_message_bus
+from ..config.settings import get_settings
+from ..config.logging_config import (
+    start_audit_logging,
+    start_request_logging,
+    stop_audit_logging,
+    stop_request_logging,
+)
 
 # Import core components - 现在使用LangChain Agent，保留兼容性接口
 from ..core.agent_router import agent_router
+from ..core.deepseek_client import close_http_clients
 from ..agent import HealthToolsRegistry  # 保持API兼容性
 from ..database import get_database_manager
-from ..repositories import UserRepository, HealthDataRepository, AchievementRepository
+from ..repositories import (
+    UserRepository,
+    HealthDataRepository,
+    AchievementRepository,
+    InvalidCursorError,
+)
 # ChatService已移除，使用agent_router替代
 from ..services.family_service import FamilyService
 from ..services.family_interaction_service import FamilyInteractionService
@@ -172,6 +187,13 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("AuraWell API starting up...")
 
+    # Move request log serialization and I/O off the event loop
+    start_request_logging(
+        log_file=None if get_settings().DEBUG else "logs/requests.log"
+    )
+    # Permission audit records are written in batches by a background thread
+    start_audit_logging()
+
     # Initialize database
     try:
         db_manager = await get_db_manager()
@@ -203,6 +225,27 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error during database cleanup: {e}")
 
+    # Release the shared Redis cache pool
+    try:
+        await get_cache_manager().cleanup()
+    except Exception as e:
+        logger.error(f"Error during cache cleanup: {e}")
+
+    # Close pooled LLM HTTP connections
+    try:
+        await close_http_clients()
+    except Exception as e:
+        logger.error(f"Error during LLM client cleanup: {e}")
+
+    # Flush pending WebSocket bus publishes and drop the subscription
+    try:
+        await get_message_bus().close()
+    except Exception as e:
+        logger.error(f"Error during message bus cleanup: {e}")
+
+    stop_request_logging()
+    stop_audit_logging()
+
     logger.info("AuraWell API shutdown completed")
 
 
@@ -250,6 +293,9 @@ app.add_middleware(
     allowed_hosts=["localhost", "127.0.0.1", "*.aurawell.com", "testserver"],
 )
 
+# Rate limiting, response timing headers, performance metrics and request logs
+app.add_middleware(RateLimitingMiddleware)
+
 # Register exception handlers
 app.add_exception_handler(AuraWellException, aurawell_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
@@ -1127,33 +1173,6 @@ async def get_rag_status(
         )
 
 
-# Middleware for request timing and performance monitoring
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add response time header and monitor performance"""
-    start_time = time.time()
-
-    # Get performance monitor
-    perf_monitor = get_performance_monitor()
-
-    response = await call_next(request)
-    process_time = time.time() - start_time
-
-    # Add headers
-    response.headers["X-Process-Time"] = str(process_time)
-    response.headers["X-Request-ID"] = getattr(request.state, "request_id", "unknown")
-
-    # Record performance metrics
-    endpoint = f"{request.method} {request.url.path}"
-    perf_monitor.record_request_time(endpoint, process_time)
-
-    # Log slow requests (> 500ms as per requirement)
-    if process_time > 0.5:
-        logger.warning(f"Slow request: {endpoint} took {process_time:.3f}s")
-
-    return response
-
-
 # Exception handlers are now registered above using app.add_exception_handler()
 
 
@@ -1965,7 +1984,7 @@ async def login(login_request: LoginRequest):
 
         return TokenResponse(data=token_data, message="Login successful")
 
-    except AuthenticationException:
+    except (AuthenticationException, HTTPException):
         raise
     except Exception as e:
         logger.error(f"Login error: {e}")
@@ -2024,7 +2043,7 @@ async def register(
 
         # Hash password using bcrypt for security
         from ..auth.jwt_auth import authenticator
-        password_hash = authenticator.get_password_hash(register_request.password)
+        password_hash = await authenticator.get_password_hash_async(register_request.password)
 
         # Process health data
         health_data = register_request.health_data or {}
@@ -2065,7 +2084,7 @@ async def register(
             data={"user_id": created_user.user_id},
         )
 
-    except (ValidationException, AuraWellException):
+    except (ValidationException, AuraWellException, HTTPException):
         raise
     except Exception as e:
         logger.error(f"Registration error: {e}")
@@ -2205,6 +2224,62 @@ async def chat(
         )
 
 
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events frame"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+@app.post("/api/v1/chat/stream", tags=["Chat"])
+async def chat_stream(
+    chat_request: ChatRequest, current_user_id: str = Depends(get_current_user_id)
+):
+    """
+    Process chat message and stream the AI response as Server-Sent Events
+
+    Events:
+        progress: MCP tool analysis / execution stages
+        token: ``{"content": ...}`` text fragment as the model generates it
+        done: Full reply in the same shape as ``/api/v1/chat`` plus
+            ``conversation_id`` and ``first_token_ms``
+        error: Processing failed; also ends the stream instead of ``done``
+            when the model stream breaks off after some tokens were sent
+
+    Args:
+        chat_request: Chat message and context
+        current_user_id: Authenticated user ID
+
+    Returns:
+        ``text/event-stream`` response
+    """
+    conversation_id = (
+        chat_request.conversation_id
+        or f"conv_{current_user_id}_{int(datetime.now().timestamp())}"
+    )
+
+    async def events():
+        async for event in agent_router.stream_message(
+            user_id=current_user_id,
+            message=chat_request.message,
+            context={
+                "conversation_id": conversation_id,
+                "request_type": "chat_stream",
+                **(chat_request.context or {}),
+            },
+        ):
+            data = event["data"]
+            if event["event"] == "done":
+                data = {**data, "conversation_id": conversation_id}
+            yield _sse_event(event["event"], data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ============================================================================
 # ENHANCED HEALTH CHAT ENDPOINTS
 # ============================================================================
@@ -5092,6 +5167,24 @@ async def get_achievements(
 # HEALTH DATA ENDPOINTS
 # ============================================================================
 
+# Page size of cursor-paginated health data queries when no limit is given
+DEFAULT_HEALTH_PAGE_SIZE = 100
+
+
+def _paginated(request: HealthDataRequest) -> bool:
+    """Whether a health data request asks for a cursor page from the database
+
+    Only ``paginate`` or a ``cursor`` select the database; ``limit`` alone
+    does not change the data source. An empty first page still falls back to
+    the health tools.
+    """
+    return request.paginate or request.cursor is not None
+
+
+def _minutes_to_hours(minutes: Optional[int]) -> Optional[float]:
+    """Convert stored sleep minutes to the hours used by the API"""
+    return round(minutes / 60, 2) if minutes is not None else None
+
 
 @app.get(
     "/api/v1/health/activity", response_model=ActivityDataResponse, tags=["Health Data"]
@@ -5116,6 +5209,48 @@ async def get_activity_data(
         HTTPException: If data retrieval fails
     """
     try:
+        if _paginated(request):
+            db_manager = await get_db_manager()
+            async with db_manager.get_session() as session:
+                rows, next_cursor = await HealthDataRepository(
+                    session
+                ).get_activity_summaries_page(
+                    current_user_id,
+                    limit=request.limit or DEFAULT_HEALTH_PAGE_SIZE,
+                    cursor=request.cursor,
+                    start_date=request.start_date,
+                    end_date=request.end_date,
+                )
+
+            activity_summaries = [
+                ActivitySummary(
+                    date=row.date,
+                    steps=row.steps,
+                    distance_km=(
+                        round(row.distance_meters / 1000, 2)
+                        if row.distance_meters is not None
+                        else None
+                    ),
+                    calories_burned=(
+                        int(row.active_calories)
+                        if row.active_calories is not None
+                        else None
+                    ),
+                    active_minutes=row.active_minutes,
+                )
+                for row in rows
+            ]
+            # Nothing synced to the database yet: serve the first page from
+            # the health tools (Xiaomi Health) like an unpaginated request
+            if activity_summaries or request.cursor:
+                return ActivityDataResponse(
+                    message="Activity data retrieved successfully",
+                    user_id=current_user_id,
+                    data=activity_summaries,
+                    total_records=len(activity_summaries),
+                    next_cursor=next_cursor,
+                )
+
         # Calculate days from date range or use default
         if request.start_date and request.end_date:
             days = (request.end_date - request.start_date).days + 1
@@ -5151,6 +5286,8 @@ async def get_activity_data(
             total_records=len(activity_summaries),
         )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get activity data: {e}")
         raise HTTPException(
@@ -5180,6 +5317,43 @@ async def get_sleep_data(
         HTTPException: If data retrieval fails
     """
     try:
+        if _paginated(request):
+            db_manager = await get_db_manager()
+            async with db_manager.get_session() as session:
+                rows, next_cursor = await HealthDataRepository(
+                    session
+                ).get_sleep_sessions_page(
+                    current_user_id,
+                    limit=request.limit or DEFAULT_HEALTH_PAGE_SIZE,
+                    cursor=request.cursor,
+                    start_date=request.start_date,
+                    end_date=request.end_date,
+                )
+
+            sleep_summaries = [
+                SleepSummary(
+                    date=row.date,
+                    total_sleep_hours=_minutes_to_hours(row.total_sleep_minutes),
+                    deep_sleep_hours=_minutes_to_hours(row.deep_sleep_minutes),
+                    light_sleep_hours=_minutes_to_hours(row.light_sleep_minutes),
+                    rem_sleep_hours=_minutes_to_hours(row.rem_sleep_minutes),
+                    sleep_efficiency=row.sleep_efficiency,
+                    bedtime=row.bedtime_utc,
+                    wake_time=row.wake_time_utc,
+                )
+                for row in rows
+            ]
+            # Nothing synced to the database yet: serve the first page from
+            # the health tools (Xiaomi Health) like an unpaginated request
+            if sleep_summaries or request.cursor:
+                return SleepDataResponse(
+                    message="Sleep data retrieved successfully",
+                    user_id=current_user_id,
+                    data=sleep_summaries,
+                    total_records=len(sleep_summaries),
+                    next_cursor=next_cursor,
+                )
+
         # Calculate days from date range or use default
         if request.start_date and request.end_date:
             days = (request.end_date - request.start_date).days + 1
@@ -5210,6 +5384,8 @@ async def get_sleep_data(
             total_records=len(sleep_summaries),
         )
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get sleep data: {e}")
         raise HTTPException(
@@ -5844,6 +6020,8 @@ async def get_performance_metrics():
             "slow_endpoints": slow_endpoints,
             "cache_stats": perf_monitor.cache_stats,
             "cache_enabled": cache_manager.enabled,
+            "agent_pool": agent_router.get_pool_stats(),
+            "chat_streaming": agent_router.get_streaming_stats(),
             "timestamp": datetime.now().isoformat(),
         }
 
@@ -8,13 +8,26 @@ Features include connection management, message streaming, and user session hand
 import json
 import logging
 import asyncio
+import math
+import time
+import uuid
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Any, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect, HTTPException, Depends
 from fastapi.routing import APIRouter
 from pydantic import BaseModel, Field
 
 from ..auth import authenticator, get_current_user_id
+from ..config.settings import get_settings
+from ..core.message_bus import (
+    FAMILY,
+    FAMILY_MEMBERSHIP,
+    USER,
+    USER_MEMBERSHIP,
+    MessageBus,
+    get_message_bus,
+)
 from ..models.api_models import (
     ChatRequest,
     EnhancedHealthChatRequest,
@@ -23,7 +36,7 @@ from ..models.api_models import (
 )
 # ChatService已移除，使用agent_router替代
 from ..langchain_agent.services.health_advice_service import HealthAdviceService
-from ..services.family_service import FamilyService
+from ..services.family_service import FamilyService, get_family_permission_resolver
 from ..core.agent_router import agent_router
 # RAG Service (v1.1 特种突击队)
 from ..services.rag_service import get_rag_service
@@ -31,164 +44,465 @@ from ..services.rag_service import get_rag_service
 logger = logging.getLogger(__name__)
 
 
+class WebSocketConnection:
+    """A single client socket; one user may hold several (multi-device)"""
+
+    __slots__ = (
+        "connection_id",
+        "user_id",
+        "websocket",
+        "metadata",
+        "connected_at",
+        "last_activity",
+        "last_pong",
+        "heartbeat_count",
+        "pong_received",
+        "closed",
+        "outbox",
+        "writer",
+    )
+
+    def __init__(
+        self, user_id: str, websocket: WebSocket, metadata: Dict[str, Any]
+    ):
+        now = time.monotonic()
+        self.connection_id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.websocket = websocket
+        self.metadata = metadata
+        # Monotonic timestamps; converted to wall-clock only for display
+        self.connected_at = now
+        self.last_activity = now
+        self.last_pong = now
+        self.heartbeat_count = 0
+        # Cleared when a ping is sent, set when the pong arrives
+        self.pong_received = asyncio.Event()
+        self.pong_received.set()
+        self.closed = False
+        # Serialized messages waiting for this socket, written in order by
+        # a writer task that only runs while the outbox is non-empty
+        self.outbox: Deque[str] = deque()
+        self.writer: Optional[asyncio.Task] = None
+
+
+class HeartbeatWheel:
+    """
+    Hashed timing wheel driving pings and pong timeouts for all connections
+
+    A single task wakes once per tick and only looks at the deadlines that
+    fall in the current slot, so an idle connection costs nothing between
+    its own deadlines. Deadlines more than one revolution away stay in their
+    slot until the revolution they belong to. The task exits when nothing
+    is scheduled and restarts on the next ``schedule``.
+    """
+
+    def __init__(
+        self,
+        on_due: Callable[[List[Tuple[float, str, WebSocketConnection]]], None],
+        tick: float = 1.0,
+        slots: int = 64,
+    ):
+        self.tick = tick
+        self._on_due = on_due
+        self._slots: List[List[Tuple[float, str, WebSocketConnection]]] = [
+            [] for _ in range(slots)
+        ]
+        self._cursor = self._tick_of(time.monotonic())
+        self._task: Optional[asyncio.Task] = None
+        self.pending = 0
+        self.wakeups = 0
+
+    def _tick_of(self, when: float) -> int:
+        return int(when // self.tick)
+
+    def schedule(self, deadline: float, kind: str, connection: WebSocketConnection):
+        """Run ``kind`` for ``connection`` on the first tick at or after ``deadline``"""
+        if self._task is None:
+            # Slots are empty while stopped, so the cursor can jump to now
+            self._cursor = self._tick_of(time.monotonic())
+        tick = max(math.ceil(deadline / self.tick), self._cursor)
+        self._slots[tick % len(self._slots)].append((deadline, kind, connection))
+        self.pending += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            while self.pending:
+                current = self._tick_of(time.monotonic())
+                while self._cursor <= current:
+                    self._advance(self._cursor)
+                    self._cursor += 1
+                self.wakeups += 1
+                await asyncio.sleep(max(0.0, self._cursor * self.tick - time.monotonic()))
+        finally:
+            self._task = None
+
+    def _advance(self, tick: int):
+        slot = self._slots[tick % len(self._slots)]
+        if not slot:
+            return
+        due, later = [], []
+        for entry in slot:
+            if math.ceil(entry[0] / self.tick) <= tick:
+                due.append(entry)
+            else:
+                later.append(entry)
+        self._slots[tick % len(self._slots)] = later
+        self.pending -= len(due)
+        if due:
+            try:
+                self._on_due(due)
+            except Exception as e:
+                logger.error(f"Heartbeat wheel callback failed: {e}")
+
+    def stop(self):
+        """Cancel the wheel task and drop every deadline"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._slots = [[] for _ in self._slots]
+        self.pending = 0
+
+
 class WebSocketManager:
-    """WebSocket connection manager for handling multiple user connections with heartbeat and reconnection support"""
-
-    def __init__(self):
-        # Store active connections by user_id
-        self.active_connections: Dict[str, WebSocket] = {}
-        # Store connection metadata
-        self.connection_metadata: Dict[str, Dict[str, Any]] = {}
-        # Store user session data
+    """
+    WebSocket connection manager with multi-device support and heartbeats
+
+    Every socket is tracked as a ``WebSocketConnection`` and a user may hold
+    up to ``max_connections_per_user`` of them; messages to a user reach all
+    of their sockets. Pings and pong timeouts for all sockets are driven by
+    one ``HeartbeatWheel`` instead of a task per socket, and pongs are
+    signalled through an ``asyncio.Event`` rather than polled.
+
+    Messages for users and families go through a ``MessageBus`` so they also
+    reach sockets held by other workers. Each message is serialized once and
+    the same text is queued on every matching local socket. A socket whose
+    queue reaches ``send_queue_size`` is a slow consumer and is closed.
+    """
+
+    PING = "ping"
+    PONG_TIMEOUT = "pong_timeout"
+
+    def __init__(
+        self,
+        heartbeat_interval: Optional[float] = None,
+        heartbeat_timeout: Optional[float] = None,
+        heartbeat_tick: Optional[float] = None,
+        max_connections_per_user: Optional[int] = None,
+        send_queue_size: Optional[int] = None,
+        message_bus: Optional[MessageBus] = None,
+    ):
+        settings = get_settings()
+        # Store active connections by connection_id, and their ids by user_id
+        self.connections: Dict[str, WebSocketConnection] = {}
+        self.user_connections: Dict[str, Dict[str, WebSocketConnection]] = {}
+        # Store user session data shared by all of a user's sockets
         self.user_sessions: Dict[str, Dict[str, Any]] = {}
-        # Store heartbeat tasks
-        self.heartbeat_tasks: Dict[str, asyncio.Task] = {}
+        # Families of connected users, for family broadcasts
+        self.family_members: Dict[str, Set[str]] = {}
+        self.user_families: Dict[str, Set[str]] = {}
         # Heartbeat configuration
-        self.heartbeat_interval = 30  # seconds
-        self.heartbeat_timeout = 10  # seconds
+        self.heartbeat_interval = (
+            heartbeat_interval or settings.WEBSOCKET_HEARTBEAT_INTERVAL
+        )
+        self.heartbeat_timeout = min(
+            heartbeat_timeout or settings.WEBSOCKET_HEARTBEAT_TIMEOUT,
+            self.heartbeat_interval,
+        )
+        self.max_connections_per_user = (
+            max_connections_per_user or settings.WEBSOCKET_MAX_CONNECTIONS_PER_USER
+        )
+        self.heartbeat_wheel = HeartbeatWheel(
+            self._on_heartbeat_due,
+            tick=heartbeat_tick or settings.WEBSOCKET_HEARTBEAT_TICK,
+        )
+        self.send_queue_size = send_queue_size or settings.WEBSOCKET_SEND_QUEUE_SIZE
+        self.message_bus = message_bus or get_message_bus()
+        self.message_bus.subscribe(self._deliver)
+        # Socket closes in flight, kept referenced until done
+        self._background_tasks: Set[asyncio.Task] = set()
+        self.heartbeat_timeouts = 0
+        self.slow_consumers = 0
 
     async def connect(
         self, websocket: WebSocket, user_id: str, metadata: Dict[str, Any] = None
-    ):
-        """Accept a WebSocket connection and register user"""
+    ) -> WebSocketConnection:
+        """Accept a WebSocket connection and register it for the user"""
         await websocket.accept()
+        self.message_bus.start()
+
+        connection = WebSocketConnection(user_id, websocket, metadata or {})
 
-        # Close existing connection if user is already connected
-        if user_id in self.active_connections:
+        # Close the oldest sockets beyond the per-user limit
+        while len(self.user_connections.get(user_id, {})) >= self.max_connections_per_user:
+            oldest = next(iter(self.user_connections[user_id].values()))
+            self._remove(oldest)
             try:
-                await self.active_connections[user_id].close()
-                # Cancel existing heartbeat task
-                if user_id in self.heartbeat_tasks:
-                    self.heartbeat_tasks[user_id].cancel()
+                await oldest.websocket.close(code=1008, reason="Too many connections")
             except Exception as e:
                 logger.warning(
                     f"Error closing existing connection for user {user_id}: {e}"
                 )
 
         # Register new connection
-        self.active_connections[user_id] = websocket
-        self.connection_metadata[user_id] = metadata or {}
-        self.user_sessions[user_id] = {
-            "connected_at": datetime.now().isoformat(),
-            "last_activity": datetime.now().isoformat(),
-            "active_member_id": user_id,  # Default to self
-            "conversation_id": None,
-            "heartbeat_count": 0,
-            "last_pong": datetime.now().isoformat(),
-        }
+        sockets = self.user_connections.setdefault(user_id, {})
+        sockets[connection.connection_id] = connection
+        self.connections[connection.connection_id] = connection
+        if user_id not in self.user_sessions:
+            self.user_sessions[user_id] = {
+                "connected_at": connection.connected_at,
+                "last_activity": connection.connected_at,
+                "active_member_id": user_id,  # Default to self
+                "conversation_id": None,
+            }
 
-        # Start heartbeat task
-        self.heartbeat_tasks[user_id] = asyncio.create_task(
-            self._heartbeat_task(user_id)
+        self.heartbeat_wheel.schedule(
+            connection.connected_at + self.heartbeat_interval, self.PING, connection
         )
 
-        logger.info(f"WebSocket connection established for user: {user_id}")
-        await self.send_personal_message(
-            user_id,
-            {
-                "type": "connection_established",
-                "status": "connected",
-                "message": "欢迎使用AuraWell健康助手！",
-                "timestamp": datetime.now().isoformat(),
-                "heartbeat_interval": self.heartbeat_interval,
-            },
+        logger.info(
+            f"WebSocket connection established for user: {user_id} ({len(sockets)} active)"
         )
-
-    def disconnect(self, user_id: str):
-        """Disconnect and remove user from active connections"""
-        if user_id in self.active_connections:
-            del self.active_connections[user_id]
-        if user_id in self.connection_metadata:
-            del self.connection_metadata[user_id]
-        if user_id in self.user_sessions:
-            del self.user_sessions[user_id]
-        if user_id in self.heartbeat_tasks:
-            self.heartbeat_tasks[user_id].cancel()
-            del self.heartbeat_tasks[user_id]
-
-        logger.info(f"WebSocket connection closed for user: {user_id}")
-
-    async def _heartbeat_task(self, user_id: str):
-        """Background task to send periodic heartbeat pings"""
-        try:
-            while user_id in self.active_connections:
-                await asyncio.sleep(self.heartbeat_interval)
-
-                if user_id not in self.active_connections:
-                    break
-
-                # Send ping message
-                ping_message = {
-                    "type": "ping",
+        self._enqueue(
+            connection,
+            json.dumps(
+                {
+                    "type": "connection_established",
+                    "status": "connected",
+                    "message": "欢迎使用AuraWell健康助手！",
                     "timestamp": datetime.now().isoformat(),
-                    "heartbeat_id": self.user_sessions[user_id]["heartbeat_count"],
-                }
-
-                try:
-                    await self.send_personal_message(user_id, ping_message)
-                    self.user_sessions[user_id]["heartbeat_count"] += 1
+                    "heartbeat_interval": self.heartbeat_interval,
+                    "connection_id": connection.connection_id,
+                },
+                ensure_ascii=False,
+            ),
+        )
+        return connection
+
+    def disconnect(self, user_id: str, connection_id: Optional[str] = None):
+        """Remove one of a user's connections, or all of them when no id is given"""
+        sockets = self.user_connections.get(user_id, {})
+        if connection_id is None:
+            targets = list(sockets.values())
+        else:
+            targets = [sockets[connection_id]] if connection_id in sockets else []
+
+        for connection in targets:
+            self._remove(connection)
+
+        if targets:
+            logger.info(f"WebSocket connection closed for user: {user_id}")
+
+    def _remove(self, connection: WebSocketConnection):
+        # Pending wheel entries for a closed connection are skipped when due
+        connection.closed = True
+        connection.pong_received.set()
+        connection.outbox.clear()
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        self.connections.pop(connection.connection_id, None)
+
+        sockets = self.user_connections.get(connection.user_id)
+        if sockets is not None:
+            sockets.pop(connection.connection_id, None)
+            if not sockets:
+                del self.user_connections[connection.user_id]
+                self.user_sessions.pop(connection.user_id, None)
+                self._leave_families(connection.user_id)
+
+    def set_user_families(self, user_id: str, family_ids: Iterable[str]):
+        """Record the families of a connected user so family broadcasts reach them"""
+        if user_id not in self.user_connections:
+            return
+        self._leave_families(user_id)
+        families = set(family_ids)
+        for family_id in families:
+            self.family_members.setdefault(family_id, set()).add(user_id)
+        self.user_families[user_id] = families
+
+    async def _refresh_families(
+        self, user_ids: Iterable[str], family_id: Optional[str] = None
+    ):
+        """Re-resolve the families of connected users after a membership change
+
+        The notice may come from another worker, so the shared resolver cache
+        of this process is invalidated before reloading.
+        """
+        resolver = get_family_permission_resolver()
+        if family_id is not None:
+            resolver.invalidate_family(family_id)
+        for user_id in user_ids:
+            if family_id is None:
+                resolver.invalidate_user(user_id)
+            if user_id not in self.user_connections:
+                continue
+            try:
+                memberships = await resolver.get_memberships(user_id)
+            except Exception as e:
+                logger.warning(f"Failed to refresh families for WebSocket user {user_id}: {e}")
+                continue
+            self.set_user_families(user_id, memberships)
+
+    def _leave_families(self, user_id: str):
+        for family_id in self.user_families.pop(user_id, ()):
+            members = self.family_members.get(family_id)
+            if members is not None:
+                members.discard(user_id)
+                if not members:
+                    del self.family_members[family_id]
+
+    def _on_heartbeat_due(self, due: List[Tuple[float, str, WebSocketConnection]]):
+        """Send pings and close sockets whose pong is overdue"""
+        now = time.monotonic()
+        timestamp = datetime.now().isoformat()
+        for deadline, kind, connection in due:
+            if connection.closed:
+                continue
+            if kind == self.PING:
+                connection.heartbeat_count += 1
+                connection.pong_received.clear()
+                ping = json.dumps(
+                    {
+                        "type": "ping",
+                        "timestamp": timestamp,
+                        "heartbeat_id": connection.heartbeat_count,
+                    }
+                )
+                self._enqueue(connection, ping)
+                self.heartbeat_wheel.schedule(
+                    now + self.heartbeat_timeout, self.PONG_TIMEOUT, connection
+                )
+                # Chain pings off the deadline so tick rounding does not drift
+                next_ping = deadline + self.heartbeat_interval
+                if next_ping <= now:
+                    next_ping = now + self.heartbeat_interval
+                self.heartbeat_wheel.schedule(next_ping, self.PING, connection)
+            elif not connection.pong_received.is_set():
+                logger.warning(
+                    f"Heartbeat timeout for user {connection.user_id}, disconnecting"
+                )
+                self.heartbeat_timeouts += 1
+                self._handle_heartbeat_timeout(connection)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def wait_for_pong(
+        self, connection: WebSocketConnection, timeout: Optional[float] = None
+    ) -> bool:
+        """Wait until the outstanding ping on a connection is answered"""
+        try:
+            await asyncio.wait_for(
+                connection.pong_received.wait(),
+                timeout=self.heartbeat_timeout if timeout is None else timeout,
+            )
+        except asyncio.TimeoutError:
+            return False
+        return not connection.closed
 
-                    # Wait for pong response with timeout
-                    await asyncio.wait_for(
-                        self._wait_for_pong(user_id), timeout=self.heartbeat_timeout
-                    )
+    def _handle_heartbeat_timeout(self, connection: WebSocketConnection):
+        """Handle heartbeat timeout by closing connection"""
+        self._remove(connection)
+        self._spawn(self._close(connection, 1001, "Heartbeat timeout"))
 
-                except asyncio.TimeoutError:
-                    logger.warning(
-                        f"Heartbeat timeout for user {user_id}, disconnecting"
-                    )
-                    await self._handle_heartbeat_timeout(user_id)
-                    break
-                except Exception as e:
-                    logger.error(f"Heartbeat error for user {user_id}: {e}")
-                    break
-
-        except asyncio.CancelledError:
-            logger.debug(f"Heartbeat task cancelled for user {user_id}")
+    async def _close(self, connection: WebSocketConnection, code: int, reason: str):
+        try:
+            await connection.websocket.close(code=code, reason=reason)
         except Exception as e:
-            logger.error(f"Heartbeat task error for user {user_id}: {e}")
-
-    async def _wait_for_pong(self, user_id: str):
-        """Wait for pong response from client"""
-        initial_pong_time = self.user_sessions[user_id].get("last_pong")
+            logger.error(f"Error closing connection for user {connection.user_id}: {e}")
 
-        while True:
-            await asyncio.sleep(0.1)  # Check every 100ms
-            current_pong_time = self.user_sessions[user_id].get("last_pong")
-            if current_pong_time != initial_pong_time:
-                break
-
-    async def _handle_heartbeat_timeout(self, user_id: str):
-        """Handle heartbeat timeout by closing connection"""
+    async def handle_pong(self, user_id: str, connection_id: Optional[str] = None):
+        """Handle pong response from client"""
+        sockets = self.user_connections.get(user_id, {})
+        if connection_id is None:
+            targets = list(sockets.values())
+        else:
+            targets = [sockets[connection_id]] if connection_id in sockets else []
+
+        now = time.monotonic()
+        for connection in targets:
+            connection.last_pong = now
+            connection.last_activity = now
+            connection.pong_received.set()
+
+    def record_activity(self, connection: WebSocketConnection):
+        """Mark a connection (and its user's session) as active"""
+        now = time.monotonic()
+        connection.last_activity = now
+        session = self.user_sessions.get(connection.user_id)
+        if session is not None:
+            session["last_activity"] = now
+
+    def _enqueue(self, connection: WebSocketConnection, text: str) -> bool:
+        """Queue serialized text on a socket; close the socket if its queue is full"""
+        if connection.closed:
+            return False
+        if len(connection.outbox) >= self.send_queue_size:
+            self.slow_consumers += 1
+            logger.warning(
+                f"Closing slow WebSocket consumer for user {connection.user_id}: "
+                f"{len(connection.outbox)} messages queued"
+            )
+            self._remove(connection)
+            # 1013: try again later; the client reconnects and resyncs
+            self._spawn(self._close(connection, 1013, "Slow consumer"))
+            return False
+
+        connection.outbox.append(text)
+        if connection.writer is None:
+            connection.writer = asyncio.create_task(self._write(connection))
+        return True
+
+    async def _write(self, connection: WebSocketConnection):
+        """Write a socket's queued messages in order until the queue is empty"""
+        outbox = connection.outbox
         try:
-            if user_id in self.active_connections:
-                await self.active_connections[user_id].close(
-                    code=1001, reason="Heartbeat timeout"
-                )
-            self.disconnect(user_id)
+            while outbox:
+                await connection.websocket.send_text(outbox[0])
+                outbox.popleft()
+                connection.last_activity = time.monotonic()
         except Exception as e:
-            logger.error(f"Error handling heartbeat timeout for user {user_id}: {e}")
+            logger.error(f"Error sending message to user {connection.user_id}: {e}")
+            # Remove disconnected socket
+            self._remove(connection)
+        finally:
+            connection.writer = None
+
+    def _deliver(
+        self, scope: str, target_id: str, text: str, exclude_user: Optional[str]
+    ):
+        """Message bus handler: queue a message on the matching local sockets"""
+        if scope == USER:
+            user_ids: Iterable[str] = (target_id,)
+        elif scope == FAMILY:
+            user_ids = tuple(self.family_members.get(target_id, ()))
+        elif scope == USER_MEMBERSHIP:
+            self._spawn(self._refresh_families((target_id,)))
+            return
+        elif scope == FAMILY_MEMBERSHIP:
+            members = tuple(self.family_members.get(target_id, ()))
+            self._spawn(self._refresh_families(members, family_id=target_id))
+            return
+        else:
+            return
 
-    async def handle_pong(self, user_id: str):
-        """Handle pong response from client"""
-        if user_id in self.user_sessions:
-            self.user_sessions[user_id]["last_pong"] = datetime.now().isoformat()
-            self.user_sessions[user_id]["last_activity"] = datetime.now().isoformat()
+        now = time.monotonic()
+        for user_id in user_ids:
+            sockets = self.user_connections.get(user_id)
+            if not sockets or user_id == exclude_user:
+                continue
+            for connection in list(sockets.values()):
+                self._enqueue(connection, text)
+            session = self.user_sessions.get(user_id)
+            if session is not None:
+                session["last_activity"] = now
 
     async def send_personal_message(self, user_id: str, message: Dict[str, Any]):
-        """Send message to specific user"""
-        if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_text(
-                    json.dumps(message, ensure_ascii=False)
-                )
-                self.user_sessions[user_id][
-                    "last_activity"
-                ] = datetime.now().isoformat()
-            except Exception as e:
-                logger.error(f"Error sending message to user {user_id}: {e}")
-                # Remove disconnected user
-                self.disconnect(user_id)
+        """Send message to every socket of a specific user, on any worker"""
+        await self.message_bus.publish_json(USER, user_id, message)
 
     async def send_streaming_message(
         self, user_id: str, delta: str, status: str = "streaming"
@@ -218,24 +532,64 @@ class WebSocketManager:
     async def broadcast_to_family(
         self, family_id: str, message: Dict[str, Any], exclude_user: str = None
     ):
-        """Broadcast message to all family members"""
-        # Note: Would need family service integration to get family members
-        # For now, this is a placeholder for future family features
-        logger.info(f"Broadcasting to family {family_id}: {message}")
+        """Broadcast message to all connected family members, on any worker"""
+        await self.message_bus.publish_json(FAMILY, family_id, message, exclude_user)
 
     def get_connected_users(self) -> List[str]:
         """Get list of connected user IDs"""
-        return list(self.active_connections.keys())
+        return list(self.user_connections.keys())
+
+    def get_connection_count(self) -> int:
+        """Get number of open sockets across all users"""
+        return len(self.connections)
 
     def get_user_session(self, user_id: str) -> Dict[str, Any]:
         """Get user session data"""
         return self.user_sessions.get(user_id, {})
 
+    def describe_session(self, user_id: str) -> Dict[str, Any]:
+        """User session with wall-clock timestamps, for clients and stats"""
+        session = self.user_sessions.get(user_id)
+        if session is None:
+            return {}
+        return {
+            "connected_at": _wall_clock(session["connected_at"]),
+            "last_activity": _wall_clock(session["last_activity"]),
+            "active_member_id": session.get("active_member_id"),
+            "conversation_id": session.get("conversation_id"),
+            "connections": len(self.user_connections.get(user_id, {})),
+        }
+
     def update_user_session(self, user_id: str, updates: Dict[str, Any]):
         """Update user session data"""
         if user_id in self.user_sessions:
             self.user_sessions[user_id].update(updates)
-            self.user_sessions[user_id]["last_activity"] = datetime.now().isoformat()
+            self.user_sessions[user_id]["last_activity"] = time.monotonic()
+
+    def get_heartbeat_stats(self) -> Dict[str, Any]:
+        """Heartbeat scheduler statistics"""
+        return {
+            "connections": len(self.connections),
+            "scheduled_deadlines": self.heartbeat_wheel.pending,
+            "wheel_wakeups": self.heartbeat_wheel.wakeups,
+            "heartbeat_timeouts": self.heartbeat_timeouts,
+        }
+
+    def get_delivery_stats(self) -> Dict[str, Any]:
+        """Send queue and message bus statistics"""
+        return {
+            "queued_messages": sum(len(c.outbox) for c in self.connections.values()),
+            "send_queue_size": self.send_queue_size,
+            "slow_consumers": self.slow_consumers,
+            "bus": self.message_bus.get_stats(),
+        }
+
+
+def _wall_clock(monotonic_ts: float) -> str:
+    """Convert a monotonic timestamp to an ISO wall-clock time"""
+    return datetime.fromtimestamp(
+        time.time() - (time.monotonic() - monotonic_ts)
+    ).isoformat()
 
 
 # Global WebSocket manager instance
@@ -279,9 +633,9 @@ async def websocket_chat_endpoint(
     Query parameters:
     - token: JWT authentication token (REQUIRED in production)
     """
+    connection = None
     try:
         # 🔒 强化认证：生产环境必须要求token
-        from ..config.settings import get_settings
         settings = get_settings()
 
         if not token:
@@ -310,7 +664,7 @@ async def websocket_chat_endpoint(
                 return
 
         # Connect user
-        await websocket_manager.connect(
+        connection = await websocket_manager.connect(
             websocket, user_id, {"endpoint": "/ws/chat", "authenticated": bool(token)}
         )
 
@@ -319,6 +673,13 @@ async def websocket_chat_endpoint(
         health_advice_service = HealthAdviceService()
         family_service = FamilyService()
 
+        # Family broadcasts (e.g. health alerts) reach users through their memberships
+        try:
+            memberships = await family_service.permission_resolver.get_memberships(user_id)
+            websocket_manager.set_user_families(user_id, memberships)
+        except Exception as e:
+            logger.warning(f"Failed to load families for WebSocket user {user_id}: {e}")
+
         # Main message loop
         while True:
             try:
@@ -328,9 +689,7 @@ async def websocket_chat_endpoint(
                 message = WebSocketMessage(**message_data)
 
                 # Update user activity
-                websocket_manager.user_sessions[user_id][
-                    "last_activity"
-                ] = datetime.now().isoformat()
+                websocket_manager.record_activity(connection)
 
                 # Send acknowledgment
                 await websocket_manager.send_status_update(
@@ -355,7 +714,9 @@ async def websocket_chat_endpoint(
 
                 elif message.type == "pong":
                     # Handle pong response for heartbeat
-                    await websocket_manager.handle_pong(user_id)
+                    await websocket_manager.handle_pong(
+                        user_id, connection.connection_id
+                    )
                     logger.debug(f"Received pong from user {user_id}")
 
                 else:
@@ -388,7 +749,8 @@ async def websocket_chat_endpoint(
 
     finally:
         # Clean up
-        websocket_manager.disconnect(user_id)
+        if connection is not None:
+            websocket_manager.disconnect(user_id, connection.connection_id)
 
 
 async def handle_health_chat(
@@ -469,32 +831,40 @@ async def handle_general_chat(
         # Use agent_router to process the message
         await websocket_manager.send_status_update(user_id, "streaming", "正在处理...")
 
-        # Process message with agent_router
-        response_data = await agent_router.process_message(
+        # Forward model tokens as they are generated
+        async for event in agent_router.stream_message(
             user_id=user_id,
             message=query,
             context={
                 "conversation_id": conversation_id,
                 "request_type": "general_chat",
             },
-        )
-
-        response = response_data.get("message", "抱歉，我现在无法处理您的请求。")
-
-        # Send response in chunks to simulate streaming
-        chunk_size = 10
-        for i in range(0, len(response), chunk_size):
-            chunk = response[i : i + chunk_size]
-            await websocket_manager.send_streaming_message(user_id, chunk, "streaming")
-            await asyncio.sleep(0.1)  # Simulate delay
-
-        # Send completion
-        await websocket_manager.send_status_update(
-            user_id,
-            "done",
-            "回复完成",
-            {"full_response": response, "conversation_id": conversation_id},
-        )
+        ):
+            data = event["data"]
+            if event["event"] == "token":
+                await websocket_manager.send_streaming_message(
+                    user_id, data["content"], "streaming"
+                )
+            elif event["event"] == "progress":
+                await websocket_manager.send_status_update(
+                    user_id, "streaming", data.get("message", ""), data
+                )
+            elif event["event"] == "done":
+                await websocket_manager.send_status_update(
+                    user_id,
+                    "done",
+                    "回复完成",
+                    {
+                        "full_response": data.get("message")
+                        or "抱歉，我现在无法处理您的请求。",
+                        "conversation_id": conversation_id,
+                        "first_token_ms": data.get("first_token_ms"),
+                    },
+                )
+            else:
+                await websocket_manager.send_status_update(
+                    user_id, "error", f"聊天处理失败: {data.get('error')}"
+                )
 
     except Exception as e:
         logger.error(f"Error in general chat for user {user_id}: {e}")
@@ -602,7 +972,7 @@ async def handle_member_switch(
 async def handle_status_request(user_id: str, message: WebSocketMessage):
     """Handle status requests"""
     try:
-        session = websocket_manager.get_user_session(user_id)
+        session = websocket_manager.describe_session(user_id)
         await websocket_manager.send_status_update(
             user_id,
             "done",
@@ -627,7 +997,8 @@ async def websocket_health():
     return {
         "status": "healthy",
         "service": "websocket",
-        "active_connections": len(websocket_manager.get_connected_users()),
+        "active_connections": websocket_manager.get_connection_count(),
+        "connected_users": len(websocket_manager.get_connected_users()),
         "timestamp": datetime.now().isoformat(),
     }
 
@@ -636,15 +1007,13 @@ async def websocket_health():
 async def websocket_stats():
     """WebSocket service statistics"""
     return {
-        "active_connections": len(websocket_manager.get_connected_users()),
+        "active_connections": websocket_manager.get_connection_count(),
         "connected_users": websocket_manager.get_connected_users(),
         "sessions": {
-            user_id: {
-                "connected_at": session.get("connected_at"),
-                "last_activity": session.get("last_activity"),
-                "active_member_id": session.get("active_member_id"),
-            }
-            for user_id, session in websocket_manager.user_sessions.items()
+            user_id: websocket_manager.describe_session(user_id)
+            for user_id in websocket_manager.user_sessions
         },
+        "heartbeat": websocket_manager.get_heartbeat_stats(),
+        "delivery": websocket_manager.get_delivery_stats(),
         "timestamp": datetime.now().isoformat(),
     }
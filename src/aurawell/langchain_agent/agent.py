@@ -6,11 +6,12 @@ LangChain Agent 实现
 import asyncio
 import logging
 import concurrent.futures
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, NamedTuple
 
 from ..core.agent_router import BaseAgent
 from ..conversation.memory_manager import MemoryManager
 from ..core.deepseek_client import DeepSeekClient
+from ..core.llm_cache import SHARED_SCOPE, user_scope
 
 # 新增：导入MCP工具管理器
 try:
@@ -26,6 +27,71 @@ from .services.health_advice_service import HealthAdviceService
 logger = logging.getLogger(__name__)
 
 
+class AgentComponents(NamedTuple):
+    """所有Agent共享的无状态重量级组件（进程级单例）"""
+
+    deepseek_client: Any
+    llm: Any
+    memory_manager: MemoryManager
+    health_advice_service: HealthAdviceService
+    mcp_manager: Any
+
+
+_agent_components: Optional[AgentComponents] = None
+
+
+def get_agent_components() -> AgentComponents:
+    """
+    获取进程级共享的Agent组件，首次调用时创建
+
+    LLM客户端、LangChain LLM包装器、对话历史管理器、健康建议服务和MCP工具管理器
+    都不持有用户状态，所有用户的Agent共用一份，Agent本身只保存轻量的对话状态。
+
+    Returns:
+        AgentComponents: 共享组件
+    """
+    global _agent_components
+    if _agent_components is None:
+        deepseek_client = None
+        llm = None
+        try:
+            # 初始化DeepSeek客户端通过ServiceClientFactory
+            from ..core.service_factory import ServiceClientFactory
+            deepseek_client = ServiceClientFactory.get_deepseek_client()
+
+            # 尝试创建LangChain LLM包装器
+            try:
+                llm = HealthAdviceAgent._create_langchain_llm(deepseek_client)
+                logger.info("LangChain LLM包装器初始化成功")
+            except Exception as llm_e:
+                logger.warning(f"LangChain LLM包装器初始化失败: {llm_e}，使用直接客户端")
+
+            logger.info("DeepSeek客户端初始化成功")
+        except Exception as e:
+            logger.warning(f"DeepSeek客户端初始化失败: {e}，将使用本地模式")
+            deepseek_client = None
+
+        # MCP工具智能管理器
+        mcp_manager = None
+        if MCPToolsManager:
+            try:
+                mcp_manager = MCPToolsManager()
+                logger.info("MCP工具管理器已初始化")
+            except Exception as e:
+                logger.warning(f"MCP工具管理器初始化失败: {e}")
+        else:
+            logger.warning("MCPToolsManager不可用，跳过初始化")
+
+        _agent_components = AgentComponents(
+            deepseek_client=deepseek_client,
+            llm=llm,
+            memory_manager=MemoryManager(),
+            health_advice_service=HealthAdviceService(),
+            mcp_manager=mcp_manager,
+        )
+    return _agent_components
+
+
 class HealthAdviceAgent(BaseAgent):
     """
     AuraWell健康建议生成AI Agent (MCP智能化版本)
@@ -39,6 +105,9 @@ class HealthAdviceAgent(BaseAgent):
     兼容性保证：保持所有现有API接口不变
     """
 
+    # 内存中保留的对话轮数上限
+    MAX_CONVERSATION_HISTORY = 20
+
     def __init__(self, user_id: str):
         """
         初始化MCP智能化LangChain Agent
@@ -47,56 +116,22 @@ class HealthAdviceAgent(BaseAgent):
             user_id: 用户ID
         """
         self.user_id = user_id
-        self.memory_manager = MemoryManager()
-        self.health_advice_service = HealthAdviceService()
-
-        # DeepSeek客户端和LLM
-        self.deepseek_client = None
-        self.llm = None
 
-        # 新增：MCP工具智能管理器
-        if MCPToolsManager:
-            try:
-                self.mcp_manager = MCPToolsManager()
-                logger.info(f"MCP工具管理器已初始化，用户: {user_id}")
-            except Exception as e:
-                logger.warning(f"MCP工具管理器初始化失败: {e}")
-                self.mcp_manager = None
-        else:
-            logger.warning("MCPToolsManager不可用，跳过初始化")
-            self.mcp_manager = None
+        # 无状态组件为进程级共享实例，Agent只保存用户自己的轻量状态
+        components = get_agent_components()
+        self.deepseek_client = components.deepseek_client
+        self.llm = components.llm
+        self.memory_manager = components.memory_manager
+        self.health_advice_service = components.health_advice_service
+        self.mcp_manager = components.mcp_manager
 
         # LangChain组件（保持向后兼容）
         self.tools = []
         self.agent_executor = None
 
-        # 对话历史
+        # 对话历史（只保留最近 MAX_CONVERSATION_HISTORY 轮，完整历史在数据库）
         self._conversation_history = []
 
-        # 初始化组件
-        self._initialize_components()
-
-    def _initialize_components(self):
-        """初始化所有组件"""
-        try:
-            # 初始化DeepSeek客户端通过ServiceClientFactory
-            from ..core.service_factory import ServiceClientFactory
-            self.deepseek_client = ServiceClientFactory.get_deepseek_client()
-
-            # 尝试创建LangChain LLM包装器
-            try:
-                self.llm = self._create_langchain_llm()
-                logger.info("LangChain LLM包装器初始化成功")
-            except Exception as llm_e:
-                logger.warning(f"LangChain LLM包装器初始化失败: {llm_e}，使用直接客户端")
-                self.llm = None
-
-            logger.info("DeepSeek客户端初始化成功")
-        except Exception as e:
-            logger.warning(f"DeepSeek客户端初始化失败: {e}，将使用本地模式")
-            self.deepseek_client = None
-            self.llm = None
-
     async def _initialize_langchain_components(self):
         """
         初始化LangChain组件（异步）
@@ -116,7 +151,8 @@ class HealthAdviceAgent(BaseAgent):
             logger.error(f"LangChain Agent 初始化失败: {e}")
             raise
 
-    def _create_langchain_llm(self):
+    @staticmethod
+    def _create_langchain_llm(deepseek_client):
         """创建LangChain LLM包装器"""
         try:
             # 尝试导入LangChain OpenAI包装器
@@ -130,7 +166,7 @@ class HealthAdviceAgent(BaseAgent):
                     logger.warning("LangChain OpenAI包装器不可用，跳过LLM包装器创建")
                     return None
 
-            if not self.deepseek_client:
+            if not deepseek_client:
                 return None
 
             # 创建LangChain兼容的LLM
@@ -142,8 +178,8 @@ class HealthAdviceAgent(BaseAgent):
             try:
                 llm = ChatOpenAI(
                     model=model_name,
-                    openai_api_key=self.deepseek_client.api_key,  # DashScope API Key
-                    openai_api_base=self.deepseek_client.base_url,  # DashScope Compatible URL
+                    openai_api_key=deepseek_client.api_key,  # DashScope API Key
+                    openai_api_base=deepseek_client.base_url,  # DashScope Compatible URL
                     temperature=0.7,
                     max_tokens=1024
                 )
@@ -158,7 +194,7 @@ class HealthAdviceAgent(BaseAgent):
 
     def _create_llm(self):
         """创建LLM（兼容性方法）"""
-        return self.llm or self._create_langchain_llm()
+        return self.llm or self._create_langchain_llm(self.deepseek_client)
 
     def _create_tools(self):
         """创建LangChain工具列表"""
@@ -319,6 +355,125 @@ class HealthAdviceAgent(BaseAgent):
             # 最后的fallback
             return await self._get_error_response(message, str(e))
 
+    async def stream_message(
+        self, message: str, context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式处理用户消息
+
+        与 process_message 走相同的流程（MCP工作流 → 增强响应 / 传统响应），
+        但模型输出通过 get_streaming_response 逐token产出，而不是等待完整回复。
+
+        Args:
+            message: 用户消息
+            context: 上下文信息
+
+        Yields:
+            事件字典 {"event": ..., "data": {...}}：
+            - progress: MCP意图分析、工具执行等阶段进度
+            - token: 模型生成的文本片段
+            - done: 完整回复及元数据（与 process_message 的返回格式一致）
+
+        Raises:
+            Exception: 模型已输出部分内容后流式调用失败（回复不完整，不产出 done）
+        """
+        context = context or {}
+        yield {
+            "event": "progress",
+            "data": {"stage": "analyzing", "message": "正在分析您的问题..."},
+        }
+
+        workflow_result = await self._execute_mcp_workflow(message, context)
+        if workflow_result.success and workflow_result.tool_calls:
+            yield {
+                "event": "progress",
+                "data": {
+                    "stage": "tools_completed",
+                    "message": "健康工具执行完成，正在生成回复...",
+                    "tools_used": workflow_result.tool_calls,
+                    "execution_time": workflow_result.execution_time,
+                },
+            }
+            parts: List[str] = []
+            async for token in self._stream_ai_response(
+                self._build_mcp_enhanced_prompt(message, workflow_result, context),
+                fallback=self._format_tool_results_as_message(workflow_result),
+                max_tokens=1500,
+            ):
+                parts.append(token)
+                yield {"event": "token", "data": {"content": token}}
+
+            ai_response = "".join(parts)
+            self._conversation_history.append({
+                'user': message,
+                'assistant': ai_response,
+                'mcp_tools_used': workflow_result.tool_calls,
+                'timestamp': asyncio.get_event_loop().time()
+            })
+            del self._conversation_history[:-self.MAX_CONVERSATION_HISTORY]
+            yield {
+                "event": "done",
+                "data": {
+                    'success': True,
+                    'message': ai_response,
+                    'data': {
+                        'response_type': 'mcp_enhanced',
+                        'tools_used': workflow_result.tool_calls,
+                        'execution_time': workflow_result.execution_time,
+                    },
+                    'agent_type': 'mcp_enhanced'
+                },
+            }
+            return
+
+        if self._is_health_advice_request(message) or not self.deepseek_client:
+            # 五模块健康建议需要完整结果才能解析，整体作为一个片段返回
+            yield {
+                "event": "progress",
+                "data": {"stage": "generating", "message": "正在生成回复..."},
+            }
+            result = await self._process_traditional_message(message, context)
+            yield {"event": "token", "data": {"content": result.get("message", "")}}
+            yield {"event": "done", "data": result}
+            return
+
+        parts = []
+        async for token in self._stream_ai_response(
+            self._build_chat_messages(message),
+            fallback="抱歉，我现在无法处理您的请求。请稍后重试。",
+        ):
+            parts.append(token)
+            yield {"event": "token", "data": {"content": token}}
+        yield {
+            "event": "done",
+            "data": {
+                'success': True,
+                'message': "".join(parts),
+                'data': {'response_type': 'traditional_ai'},
+                'agent_type': 'traditional'
+            },
+        }
+
+    async def _stream_ai_response(
+        self, messages: List[Dict[str, str]], fallback: str, **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        流式调用DeepSeek；尚未产出任何内容就失败时返回fallback文本，
+        已产出部分内容后失败则重新抛出异常，避免把截断的回复当作完整回复
+        """
+        produced = False
+        try:
+            async for token in self.deepseek_client.get_streaming_response(
+                messages=messages, temperature=0.7, **kwargs
+            ):
+                produced = True
+                yield token
+        except Exception as e:
+            logger.error(f"流式AI响应生成失败: {e}")
+            if produced:
+                raise
+            yield fallback
+
     async def _execute_mcp_workflow(self, message: str, context: Dict[str, Any]) -> WorkflowResult:
         """执行MCP智能工作流"""
         try:
@@ -368,6 +523,7 @@ class HealthAdviceAgent(BaseAgent):
                 'mcp_tools_used': workflow_result.tool_calls,
                 'timestamp': asyncio.get_event_loop().time()
             })
+            del self._conversation_history[:-self.MAX_CONVERSATION_HISTORY]
             
             return {
                 'success': True,
@@ -444,10 +600,12 @@ class HealthAdviceAgent(BaseAgent):
         """使用DeepSeek生成基于工具结果的响应"""
         try:
             if self.deepseek_client:
-                response = self.deepseek_client.get_deepseek_response(
+                # 提示词包含工具返回的用户数据，缓存仅限本用户
+                response = await self.deepseek_client.get_deepseek_response_async(
                     messages=messages,
                     temperature=0.7,
-                    max_tokens=1500
+                    max_tokens=1500,
+                    cache_scope=user_scope(self.user_id),
                 )
                 return response.content
             else:
@@ -793,11 +951,32 @@ class HealthAdviceAgent(BaseAgent):
         """使用DeepSeek API生成AI响应"""
         try:
             _ = context  # 避免未使用参数警告
-            # 构建对话历史
-            messages = []
+            messages = self._build_chat_messages(message)
 
-            # 添加系统提示
-            system_prompt = """你是AuraWell健康助手，一个专业的健康管理AI助手。你的职责是：
+            # 调用DeepSeek API
+            # 无对话历史的单轮问题与用户无关，可跨用户共享缓存
+            response = await self.deepseek_client.get_deepseek_response_async(
+                messages=messages,
+                temperature=0.7,
+                cache_scope=(
+                    user_scope(self.user_id)
+                    if self._conversation_history
+                    else SHARED_SCOPE
+                ),
+            )
+
+            return response.content
+
+        except Exception as e:
+            logger.error(f"AI响应生成失败: {e}")
+            return "抱歉，我现在无法处理您的请求。请稍后重试。"
+
+    def _build_chat_messages(self, message: str) -> List[Dict[str, str]]:
+        """构建普通对话请求：系统提示 + 最近对话历史 + 当前消息"""
+        messages = []
+
+        # 添加系统提示
+        system_prompt = """你是AuraWell健康助手，一个专业的健康管理AI助手。你的职责是：
 1. 回答用户的健康相关问题
 2. 提供个性化的健康建议
 3. 帮助用户管理健康数据
@@ -806,27 +985,14 @@ class HealthAdviceAgent(BaseAgent):
 
 请用友好、专业的语气回答用户问题。如果涉及医疗诊断，请建议用户咨询专业医生。"""
 
-            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "system", "content": system_prompt})
 
-            # 添加最近的对话历史
-            recent_history = (
-                self._conversation_history[-10:] if self._conversation_history else []
-            )
-            messages.extend(recent_history)
+        # 添加最近的对话历史
+        messages.extend(self._conversation_history[-10:])
 
-            # 添加当前消息
-            messages.append({"role": "user", "content": message})
-
-            # 调用DeepSeek API
-            response = self.deepseek_client.get_deepseek_response(
-                messages=messages, temperature=0.7
-            )
-
-            return response.content
-
-        except Exception as e:
-            logger.error(f"AI响应生成失败: {e}")
-            return "抱歉，我现在无法处理您的请求。请稍后重试。"
+        # 添加当前消息
+        messages.append({"role": "user", "content": message})
+        return messages
 
     async def _get_local_response(self, message: str, context: Dict[str, Any]) -> str:
         """生成本地响应（当AI不可用时）"""
@@ -19,6 +19,7 @@ from ...database import get_database_manager
 from ...repositories.user_repository import UserRepository
 from ...repositories.health_data_repository import HealthDataRepository
 from ...core.service_factory import ServiceClientFactory
+from ...core.llm_cache import user_scope
 from ...utils.health_calculations import (
     calculate_bmi,
     calculate_bmr,
@@ -503,10 +504,11 @@ class HealthAdviceService:
                 # Try to complete missing sections
                 if self.deepseek_client:
                     try:
-                        completion = self.deepseek_client.get_deepseek_response(
+                        completion = await self.deepseek_client.get_deepseek_response_async(
                             messages=[{"role": "user", "content": completion_prompt}],
                             model_name=MODEL_CONFIG["reasoning_tasks"],  # 使用推理模型补全建议
                             temperature=0.3,
+                            cache_scope=user_scope(user_id),
                         )
                         advice_content += "\n\n" + completion.content
                     except Exception as e:
@@ -671,11 +673,12 @@ class HealthAdviceService:
             prompt = topic_prompts.get(topic, f"关于{topic}的健康建议")
 
             if self.deepseek_client:
-                response = self.deepseek_client.get_deepseek_response(
+                response = await self.deepseek_client.get_deepseek_response_async(
                     messages=[{"role": "user", "content": prompt}],
                     model_name=MODEL_CONFIG["chat_tasks"],  # 快速建议使用对话模型
                     temperature=0.3,
                     max_tokens=512,
+                    cache_scope=user_scope(user_id),  # 提示词包含用户BMI/体重
                 )
                 return response.content
             else:
@@ -764,7 +767,7 @@ class HealthAdviceService:
 
         for attempt in range(max_retries + 1):
             try:
-                response = self.deepseek_client.get_deepseek_response(
+                response = await self.deepseek_client.get_deepseek_response_async(
                     messages=messages,
                     model_name=model_name,
                     temperature=temperature,
@@ -589,6 +589,15 @@ class HealthDataRequest(BaseModel):
     limit: Optional[int] = Field(
         None, ge=1, le=1000, description="Maximum number of records to return (1-1000)"
     )
+    paginate: bool = Field(
+        False,
+        description="Page through synced records with next_cursor; implied by cursor",
+    )
+    cursor: Optional[str] = Field(
+        None,
+        max_length=512,
+        description="Opaque cursor from next_cursor of the previous page",
+    )
 
     @field_validator("data_types")
     @classmethod
@@ -632,6 +641,7 @@ class ActivityDataResponse(BaseResponse):
     user_id: str
     data: List[ActivitySummary]
     total_records: int
+    next_cursor: Optional[str] = None
 
 
 class SleepDataResponse(BaseResponse):
@@ -640,6 +650,7 @@ class SleepDataResponse(BaseResponse):
     user_id: str
     data: List[SleepSummary]
     total_records: int
+    next_cursor: Optional[str] = None
 
 
 # Pagination and Filtering Models
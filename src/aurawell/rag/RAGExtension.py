@@ -8,31 +8,38 @@ try:
     from .rag_utils import get_file_type, process_list
     from .oss_utils import OSSManager
     from .file_index_manager import FileIndexManager
+    from .vector_store import get_vector_store
+    from .ingestion_pipeline import IngestionJob, IngestionPipeline, PipelineConfig, EMBEDDING_BATCH_LIMIT
+    from .embedding_cache import CachedEmbedder, get_embedding_cache
 except ImportError:
     from rag_utils import get_file_type, process_list
     from oss_utils import OSSManager
     from file_index_manager import FileIndexManager
+    from vector_store import get_vector_store
+    from ingestion_pipeline import IngestionJob, IngestionPipeline, PipelineConfig, EMBEDDING_BATCH_LIMIT
+    from embedding_cache import CachedEmbedder, get_embedding_cache
 from alibabacloud_docmind_api20220711.client import Client as docmind_api20220711Client
 from alibabacloud_tea_openapi import models as open_api_models
 from alibabacloud_docmind_api20220711 import models as docmind_api20220711_models
 from alibabacloud_tea_util import models as util_models
 from alibabacloud_credentials.client import Client as CredClient
 from alibabacloud_credentials.models import Config as CredentialsConfig
-from dashvector import Doc
 
 from openai import OpenAI
 from dotenv import load_dotenv
-import uuid
 import os
 import time
-import dashvector
-import numpy as np
 import platform
 import re
 import math
 import tempfile
+import threading
 from datetime import datetime, timedelta, timezone
 
+EMBEDDING_MODEL = "text-embedding-v4"
+# 目前项目启用的DashVector仅支持固定长度的向量，根据简单调查，选择1024维这个比较通用的选择
+EMBEDDING_DIMENSIONS = 1024
+
 def normalize_file_path(file_path: str) -> str:
     """
     跨平台文件路径标准化处理
@@ -220,7 +227,34 @@ class Document:
         self.bailian_endpoint = "https://dashscope.aliyuncs.com/compatible-mode/v1"
         self.region_id = "cn-hangzhou"
 
+        # OpenAI兼容客户端在实例内复用，入库流水线的多个线程共享同一个连接池
+        self._embedding_client = None
+        self._llm_client = None
+        self._client_lock = threading.Lock()
+
         print("✅ Document类初始化完成")
+
+    def _get_embedding_client(self) -> OpenAI:
+        """获取复用的百炼向量化客户端"""
+        if self._embedding_client is None:
+            with self._client_lock:
+                if self._embedding_client is None:
+                    self._embedding_client = OpenAI(
+                        api_key=self.dash_scope_key,
+                        base_url=self.bailian_endpoint
+                    )
+        return self._embedding_client
+
+    def _get_llm_client(self) -> OpenAI:
+        """获取复用的通义千问客户端"""
+        if self._llm_client is None:
+            with self._client_lock:
+                if self._llm_client is None:
+                    self._llm_client = OpenAI(
+                        api_key=self.qwen_api_key,
+                        base_url=self.bailian_endpoint
+                    )
+        return self._llm_client
     def __doc_analysation(self, file_path:str):
         """
         使用阿里云的docmind服务对文档进行解析，返回解析结果
@@ -308,7 +342,10 @@ class Document:
         - 去除空白行
         - 合并连续的文本块
         """
-        raw_text = self.__doc_analysation(file_path)
+        return self._layouts_to_markdown(self.__doc_analysation(file_path))
+
+    def _layouts_to_markdown(self, raw_text) -> str:
+        """将 DocMind 解析结果中的 markdownContent 拼接并整理为段落文本"""
         full_markdown = ""
         layouts = raw_text.get("layouts",  []) if raw_text.get("layouts",  None) is not None else []
         for layout in layouts:
@@ -519,24 +556,56 @@ class Document:
                 actual_file_path = file_path
                 original_filename = os.path.basename(file_path)
 
-            # 2. 使用现有方法解析文档
+            # 2. 解析文档（只提交一次DocMind任务）
             raw_content = self.__doc_analysation(actual_file_path)
 
             # 3. 提取文档的完整文本内容
-            full_text = self.file_Parsing(actual_file_path)
+            full_text = self._layouts_to_markdown(raw_content)
 
             if not full_text or len(full_text.strip()) < 10:
                 print("文档内容为空或过短，无法进行内容过滤")
                 return []
 
-            # 3. 使用大语言模型提取高密度信息
-            client = OpenAI(
-                api_key=self.qwen_api_key,
-                base_url=self.bailian_endpoint
-            )
+            # 4. 使用大语言模型提取高密度信息
+            filtered_segments = self._extract_high_density_segments(full_text)
+
+            # 5. 将过滤后的段落向量化并存储到数据库
+            if filtered_segments:
+                self._vectorize_and_store_segments(filtered_segments)
+
+            # 6. 如果是OSS文件，上传解析内容
+            if is_oss_key and full_text:
+                try:
+                    self.upload_parsed_content_to_oss(full_text, original_filename)
+                except Exception as e:
+                    print(f"⚠️  上传解析内容失败: {e}")
+
+            return filtered_segments
+
+        except Exception as e:
+            print(f"❌ 内容过滤过程中发生错误: {e}")
+            return []
+        finally:
+            # 清理临时文件
+            if temp_file_path and os.path.exists(temp_file_path):
+                try:
+                    os.unlink(temp_file_path)
+                    print(f"🗑️  清理临时文件: {temp_file_path}")
+                except Exception as e:
+                    print(f"⚠️  清理临时文件失败: {e}")
+
+    def _extract_high_density_segments(self, full_text: str) -> list:
+        """
+        调用大语言模型从文档全文中提取高信息密度段落
+
+        Args:
+            full_text (str): 文档的完整文本
 
-            # 构建提示词
-            system_prompt = """你是一位医学文献信息提取专家。请仔细阅读以下文本，从中提取所有**高密度信息段落**，包括但不限于：
+        Returns:
+            list: 提取出的段落列表，模型返回空结果时为空列表
+        """
+        # 构建提示词
+        system_prompt = """你是一位医学文献信息提取专家。请仔细阅读以下文本，从中提取所有**高密度信息段落**，包括但不限于：
 
 - 膳食建议
 - 推荐摄入量
@@ -558,64 +627,62 @@ class Document:
 
 现在请处理以下文本："""
 
-            user_prompt = full_text
-
-            # 调用大语言模型
-            completion = client.chat.completions.create(
-                model="qwen-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                top_p=0.9,
-                max_tokens=2048
-            )
-
-            # 4. 处理大语言模型的返回结果
-            llm_response = completion.choices[0].message.content.strip()
-
-            if not llm_response:
-                print("大语言模型返回空结果")
-                return []
-
-            # 5. 按 ";;" 分割文本
-            segments = llm_response.split(";;")
-
-            # 6. 清理和过滤分割后的文本段
-            filtered_segments = []
-            for segment in segments:
-                cleaned_segment = segment.strip()
-                # 过滤掉长度小于3的段落
-                if len(cleaned_segment) >= 3:
-                    filtered_segments.append(cleaned_segment)
+        # 调用大语言模型
+        completion = self._get_llm_client().chat.completions.create(
+            model="qwen-turbo",
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": full_text}
+            ],
+            temperature=0.3,
+            top_p=0.9,
+            max_tokens=2048
+        )
 
-            print(f"成功提取 {len(filtered_segments)} 个高密度信息段落")
+        llm_response = (completion.choices[0].message.content or "").strip()
+        if not llm_response:
+            print("大语言模型返回空结果")
+            return []
 
-            # 7. 将过滤后的段落向量化并存储到数据库
-            if filtered_segments:
-                self._vectorize_and_store_segments(filtered_segments)
+        # 按 ";;" 分割文本，过滤掉长度小于3的段落
+        filtered_segments = [
+            segment.strip() for segment in llm_response.split(";;")
+            if len(segment.strip()) >= 3
+        ]
+        print(f"成功提取 {len(filtered_segments)} 个高密度信息段落")
+        return filtered_segments
+
+    def _request_embeddings(self, texts: list) -> list:
+        """调用百炼 embedding 接口，单次最多10条文本"""
+        completion = self._get_embedding_client().embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=texts,
+            dimensions=EMBEDDING_DIMENSIONS,  # 指定向量维度（仅 text-embedding-v3及 text-embedding-v4支持该参数）
+            encoding_format="float"
+        )
+        return [item.embedding for item in completion.data]
+
+    def _new_embedder(self) -> CachedEmbedder:
+        """创建带缓存的向量化器，每次入库运行单独统计缓存命中"""
+        return CachedEmbedder(
+            self._request_embeddings,
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            cache=get_embedding_cache(),
+            batch_size=EMBEDDING_BATCH_LIMIT
+        )
 
-            # 8. 如果是OSS文件，上传解析内容
-            if is_oss_key and full_text:
-                try:
-                    self.upload_parsed_content_to_oss(full_text, original_filename)
-                except Exception as e:
-                    print(f"⚠️  上传解析内容失败: {e}")
+    def _embed_texts(self, texts: list) -> list:
+        """
+        批量向量化文本，缓存命中的文本不再调用接口
 
-            return filtered_segments
+        Args:
+            texts (list): 文本列表
 
-        except Exception as e:
-            print(f"❌ 内容过滤过程中发生错误: {e}")
-            return []
-        finally:
-            # 清理临时文件
-            if temp_file_path and os.path.exists(temp_file_path):
-                try:
-                    os.unlink(temp_file_path)
-                    print(f"🗑️  清理临时文件: {temp_file_path}")
-                except Exception as e:
-                    print(f"⚠️  清理临时文件失败: {e}")
+        Returns:
+            list: 与输入一一对应的向量列表
+        """
+        return self._new_embedder()(texts)
 
     def _vectorize_and_store_segments(self, segments: list):
         """
@@ -625,59 +692,32 @@ class Document:
             segments (list): 文本段落列表
         """
         try:
-            client = OpenAI(
-                api_key=self.dash_scope_key,
-                base_url=self.bailian_endpoint
-            )
+            vectors = self._embed_texts(segments)
 
-            # 连接向量数据库
-            vector_client = dashvector.Client(
-                api_key=self.dash_vector_key,
-                endpoint=self.vectorDB_endpoint
+            # 一次性批量写入向量存储（本地索引或DashVector，由 RAG_VECTOR_BACKEND 决定）
+            store = get_vector_store()
+            store.add(
+                vectors,
+                [{"raw_text": segment_text, "sub_title": "filtered_content"} for segment_text in segments]
             )
-            collection = vector_client.get(name='simple_collection')
-
-            # 批量处理向量化（每次最多10个）
-            for i in range(0, len(segments), 10):
-                batch = segments[i:i+10]
-
-                # 向量化当前批次
-                completion = client.embeddings.create(
-                    model="text-embedding-v4",
-                    input=batch,
-                    dimensions=1024,
-                    encoding_format="float"
-                )
-
-                # 存储到向量数据库
-                for j, embedding_data in enumerate(completion.data):
-                    segment_text = batch[j]
-                    vector = np.array(embedding_data.embedding, dtype=float)
-
-                    ret = collection.insert(
-                        Doc(
-                            id=str(uuid.uuid4()),
-                            vector=vector,
-                            fields={
-                                "raw_text": segment_text,
-                                "sub_title": "filtered_content"
-                            }
-                        )
-                    )
-
-                    if not ret:
-                        print(f"向量存储失败: {segment_text[:50]}...")
+            store.flush()
 
             print(f"成功将 {len(segments)} 个段落向量化并存储到数据库")
 
         except Exception as e:
             print(f"向量化和存储过程中发生错误: {e}")
 
-    def __content_vectorised(self, raw_content):
-        # raw_content 对应的是文档解析方法返回的 response.body.data
-        discard_type = () # 返回值中，忽略其中type对应的值中为这些值的内容，因为它们通常不对应任何具体内容
+    def _layout_segments(self, raw_content) -> list:
+        """
+        从 DocMind 解析结果中按版面元素切分段落，跳过标题和文献引用
+
+        Args:
+            raw_content: 文档解析服务返回值中的data字段
+
+        Returns:
+            list: 段落文本列表
+        """
         discard_subtype = ("doc_title", "title", "para_title")  # 返回值中，忽略其中sub_title对应的值中为这些值的内容，因为它们通常不对应任何具体内容
-        # raw_content 指的是PDF文档解析服务返回值中的data字段，其余的输入都会导致错误
         query_list = []
         layouts = raw_content.get("layouts", []) if raw_content.get("layouts", None) is not None else []
         for layout in layouts:
@@ -688,43 +728,119 @@ class Document:
                 table_content = table_content.split("\n")
                 table_content = process_list(table_content)
                 for s in table_content:
-                    if type(s) == type("hello"):
+                    if isinstance(s, str):
                         # 检查是否为引用内容，如果是则跳过
                         if not self.__is_reference_content(s):
                             query_list.append(s) # 将表格中的每一个格子中的内容加入至列表中
-                    else:
-                        continue
 
             markdown = layout.get("markdownContent", None) if layout.get("markdownContent", None) is not None else ""
             # 检查markdown内容是否为引用，如果不是引用才添加到列表中
             if markdown and not self.__is_reference_content(markdown):
                 query_list.append(markdown)
         print(f"The length of query_list is: {len(query_list)}")
-        client = OpenAI(
-            api_key=self.dash_scope_key,  # 直接配置api key以访问阿里云提供的服务
-            base_url=self.bailian_endpoint  # 百炼服务的base_url
+        return query_list
+
+    def __content_vectorised(self, raw_content):
+        # raw_content 对应的是文档解析方法返回的 response.body.data
+        query_list = self._layout_segments(raw_content)
+        vectors = self._embed_texts(query_list)
+        return list(zip(query_list, vectors))
+
+    def _ingest_download(self, job: IngestionJob):
+        """入库流水线的下载阶段"""
+        if not job.is_oss_key:
+            job.local_path = job.source
+            return
+        job.local_path = self.download_file_from_oss(job.source)
+        if not job.local_path:
+            raise RuntimeError(f"无法从OSS下载文件: {job.source}")
+
+    def _ingest_parse(self, job: IngestionJob):
+        """入库流水线的解析阶段，解析完成后删除下载的临时文件"""
+        try:
+            job.raw_content = self.__doc_analysation(job.local_path)
+            job.full_text = self._layouts_to_markdown(job.raw_content)
+        finally:
+            if job.is_oss_key and job.local_path and os.path.exists(job.local_path):
+                try:
+                    os.unlink(job.local_path)
+                except Exception as e:
+                    print(f"⚠️  清理临时文件失败: {e}")
+
+    def _ingest_filter(self, job: IngestionJob, use_content_filter: bool, file_manager=None):
+        """
+        入库流水线的过滤阶段
+
+        优先用大模型提取高密度段落，未提取到时回退到按版面切分的原始段落。
+        传入 file_manager 时把段落保存为检查点，中断后重跑无需再次解析和调用大模型
+        """
+        segments = []
+        if use_content_filter and job.full_text and len(job.full_text.strip()) >= 10:
+            segments = self._extract_high_density_segments(job.full_text)
+            job.sub_title = "filtered_content"
+            if not segments:
+                print(f"⚠️ 内容过滤未提取到有效信息，回退到原始方法: {job.filename}")
+
+        if not segments:
+            segments = self._layout_segments(job.raw_content)
+            job.sub_title = "original_content"
+
+        job.segments = segments
+        job.raw_content = None  # 解析结果不再需要，尽早释放
+
+        if job.is_oss_key and job.full_text:
+            try:
+                self.upload_parsed_content_to_oss(job.full_text, job.filename)
+            except Exception as e:
+                print(f"⚠️  上传解析内容失败: {e}")
+        job.full_text = ""
+
+        if file_manager is not None and segments:
+            segments_key = file_manager.save_segments(job.filename, segments, job.sub_title)
+            if segments_key:
+                file_manager.update_ingestion_progress(
+                    job.filename, "filtered",
+                    segments_key=segments_key, segment_count=len(segments)
+                )
+
+    def build_ingestion_pipeline(self, use_content_filter: bool = True, file_manager=None,
+                                 config: PipelineConfig = None,
+                                 embedder: CachedEmbedder = None) -> IngestionPipeline:
+        """
+        构建入库流水线
+
+        Args:
+            use_content_filter (bool): 是否使用大模型内容过滤
+            file_manager (FileIndexManager): 用于记录进度的索引管理器，为None时不记录
+            config (PipelineConfig): 并发与队列参数
+            embedder (CachedEmbedder): 向量化器，为None时新建
+
+        Returns:
+            IngestionPipeline: 入库流水线
+        """
+        def checkpoint(job: IngestionJob, stage: str):
+            if file_manager is None or not job.is_oss_key:
+                return
+            if stage == "stored":
+                file_manager.update_ingestion_progress(
+                    job.filename, stage, segment_count=len(job.segments), ingest_error=None
+                )
+            else:
+                # 已完成过滤的文件保留 filtered 状态，下次运行仍可从保存的段落继续
+                file_manager.update_ingestion_progress(
+                    job.filename, "filtered" if job.segments else "failed", ingest_error=job.error
+                )
+
+        return IngestionPipeline(
+            download=self._ingest_download,
+            parse=self._ingest_parse,
+            filter_segments=lambda job: self._ingest_filter(job, use_content_filter, file_manager),
+            embed=embedder or self._new_embedder(),
+            store=get_vector_store(),
+            checkpoint=checkpoint,
+            config=config,
         )
 
-        # 阿里云的词嵌入接口一次性最多接受10个字符串输入，所以要分开来上传
-        vector_list = []
-        for i in range(0,len(query_list)-10,10):
-            completion = client.embeddings.create(
-                model="text-embedding-v4",
-                input=query_list[i:i+10], # 一次性批上传10个文本块至阿里云百炼API
-                dimensions=1024,  # 指定向量维度（仅 text-embedding-v3及 text-embedding-v4支持该参数）
-                # 目前项目启用的DashVector仅支持固定长度的向量，根据简单调查，选择1024维这个比较通用的选择
-                encoding_format="float"
-            )
-            vector_list.append(completion.data)
-        flatten_vector_list = [
-            np.array(item.embedding,dtype=float)
-            for sublist in vector_list
-            for item in sublist
-        ]
-        rawcontent_vector_pair = list(zip(query_list, flatten_vector_list))
-        return rawcontent_vector_pair
-        # print(completion.model_dump_json())
-        # return vector_list, query_list # 同时返回原文内容和其对应的向量
     def file2VectorDB(self, file_path: str, use_content_filter: bool = True, is_oss_key: bool = False, update_index: bool = True) -> bool:
         """
         将文档解析并上传至向量数据库
@@ -739,99 +855,45 @@ class Document:
             bool: 操作是否成功
         """
         try:
-            filename = os.path.basename(file_path) if not is_oss_key else os.path.basename(file_path)
-
-            if use_content_filter:
-                # 使用新的内容过滤方法
-                filtered_segments = self.content_filter(file_path, is_oss_key=is_oss_key)
-                if filtered_segments:
-                    print(f"✅ 使用内容过滤方法成功处理文档，提取了 {len(filtered_segments)} 个高密度信息段落")
-
-                    # 更新向量化状态
-                    if update_index and is_oss_key:
-                        try:
-                            file_manager = FileIndexManager()
-                            file_manager.update_vectorization_status(filename, True)
-                        except Exception as e:
-                            print(f"⚠️  更新向量化状态失败: {e}")
-
-                    return True
-                else:
-                    print("⚠️ 内容过滤未提取到有效信息，回退到原始方法")
-                    # 如果内容过滤失败，回退到原始方法
-                    use_content_filter = False
-
-            if not use_content_filter:
-                # 使用原始方法
-                actual_file_path = file_path
-                temp_file_path = None
-
-                try:
-                    # 如果是OSS键名，先下载到本地
-                    if is_oss_key:
-                        temp_file_path = self.download_file_from_oss(file_path)
-                        if not temp_file_path:
-                            print(f"❌ 无法从OSS下载文件: {file_path}")
-                            return False
-                        actual_file_path = temp_file_path
-
-                    response = self.__doc_analysation(actual_file_path)
-                    vector_pairs = self.__content_vectorised(response)
-                    client = dashvector.Client(
-                        api_key=self.dash_vector_key,
-                        endpoint=self.vectorDB_endpoint
-                    )
-                    collection = client.get(name='simple_collection')
-                    for i in range(len(vector_pairs)):
-                        ret = collection.insert(
-                            Doc(
-                                id=str(uuid.uuid4()),
-                                vector=vector_pairs[i][1],
-                                fields={
-                                    "raw_text": vector_pairs[i][0],
-                                    "sub_title": "original_content"
-                                }
-                            )
-                        )
-                        assert ret  # 判断插入操作是否成功
-                    print(f"✅ 使用原始方法成功处理文档，存储了 {len(vector_pairs)} 个文本段落")
-
-                    # 更新向量化状态
-                    if update_index and is_oss_key:
-                        try:
-                            file_manager = FileIndexManager()
-                            file_manager.update_vectorization_status(filename, True)
-                        except Exception as e:
-                            print(f"⚠️  更新向量化状态失败: {e}")
-
-                finally:
-                    # 清理临时文件
-                    if temp_file_path and os.path.exists(temp_file_path):
-                        try:
-                            os.unlink(temp_file_path)
-                        except Exception as e:
-                            print(f"⚠️  清理临时文件失败: {e}")
+            file_manager = FileIndexManager() if update_index and is_oss_key else None
+            embedder = self._new_embedder()
+            pipeline = self.build_ingestion_pipeline(use_content_filter, file_manager, embedder=embedder)
+            stats = pipeline.run([
+                IngestionJob(filename=os.path.basename(file_path), source=file_path, is_oss_key=is_oss_key)
+            ])
+
+            if stats.processed:
+                print(f"✅ 文档处理成功，存储了 {stats.segments} 个文本段落，"
+                      f"跳过已入库段落 {stats.segments_skipped} 个，"
+                      f"向量化缓存命中率 {embedder.stats.hit_ratio:.1%}")
+                return True
 
-            return True
+            print(f"❌ 文档处理失败: {stats.errors}")
+            return False
 
         except Exception as e:
             print(f"❌ 文档处理失败: {e}")
             return False
 
-    def batch_process_recent_files(self, days: int = 30, use_content_filter: bool = True) -> dict:
+    def batch_process_recent_files(self, days: int = 30, use_content_filter: bool = True,
+                                   config: PipelineConfig = None) -> dict:
         """
         批量处理OSS中最近上传的文件
 
+        文件经由入库流水线并发处理，每个文件过滤和写入完成后都会记录到文件索引，
+        中断后重新运行会跳过已写入的文件，并直接复用已保存段落的文件
+
         Args:
             days (int): 处理最近几天的文件，默认30天
             use_content_filter (bool): 是否使用内容过滤功能
+            config (PipelineConfig): 并发与队列参数
 
         Returns:
             dict: 处理结果统计
         """
         try:
-            # 获取最近上传的文件
-            recent_files = self.get_recent_files_from_oss(days)
+            file_manager = FileIndexManager()
+            recent_files = file_manager.get_files_uploaded_in_days(days)
 
             if not recent_files:
                 print(f"⚠️  未找到最近 {days} 天内上传的文件")
@@ -848,40 +910,35 @@ class Document:
                 print("✅ 所有最近上传的文件都已向量化")
                 return {"total": len(recent_files), "processed": 0, "failed": 0, "skipped": len(recent_files)}
 
-            # 批量处理文件
-            results = {"total": len(unvectorized_files), "processed": 0, "failed": 0, "skipped": 0}
-
-            for i, file_record in enumerate(unvectorized_files, 1):
-                filename = file_record["filename"]
-                oss_key = file_record["oss_key"]
-
-                print(f"\n[{i}/{len(unvectorized_files)}] 处理文件: {filename}")
-
-                try:
-                    success = self.file2VectorDB(
-                        oss_key,
-                        use_content_filter=use_content_filter,
-                        is_oss_key=True,
-                        update_index=True
-                    )
-
-                    if success:
-                        results["processed"] += 1
-                        print(f"✅ 文件处理成功: {filename}")
-                    else:
-                        results["failed"] += 1
-                        print(f"❌ 文件处理失败: {filename}")
-
-                except Exception as e:
-                    results["failed"] += 1
-                    print(f"❌ 文件处理异常: {filename}, 错误: {e}")
+            def jobs():
+                for file_record in unvectorized_files:
+                    job = IngestionJob(filename=file_record["filename"], source=file_record["oss_key"])
+                    # 上次运行已完成过滤的文件，直接从保存的段落继续
+                    if file_record.get("ingest_stage") == "filtered" and file_record.get("segments_key"):
+                        saved = file_manager.load_segments(file_record["segments_key"])
+                        if saved and saved.get("segments"):
+                            job.segments = saved["segments"]
+                            job.sub_title = saved.get("sub_title", "filtered_content")
+                            job.resumed = True
+                    yield job
+
+            embedder = self._new_embedder()
+            pipeline = self.build_ingestion_pipeline(use_content_filter, file_manager, config, embedder)
+            results = pipeline.run(jobs()).to_dict()
+            results["skipped"] = len(recent_files) - len(unvectorized_files)
+            results["embedding_cache"] = embedder.stats.to_dict()
 
             print(f"\n🎉 批量处理完成!")
             print(f"📊 处理结果:")
             print(f"  - 总文件数: {results['total']}")
             print(f"  - 处理成功: {results['processed']}")
             print(f"  - 处理失败: {results['failed']}")
-            print(f"  - 跳过文件: {results['skipped']}")
+            print(f"  - 断点续传: {results['resumed']}")
+            print(f"  - 已入库跳过的段落: {results['segments_skipped']}")
+            print(f"  - 向量化调用: {results['embedding_cache']['api_calls']}"
+                  f"（缓存命中率 {results['embedding_cache']['hit_ratio']:.1%}，"
+                  f"节省 {results['embedding_cache']['api_calls_saved']} 次）")
+            print(f"  - 耗时: {results['elapsed_seconds']}s")
 
             return results
 
@@ -903,8 +960,10 @@ class UserRetrieve:
         # 加载API密钥
         keys, success = load_api_keys()
 
-        # UserRetrieve只需要部分密钥
-        required_keys = ["DASH_VECTOR_API"]
+        # UserRetrieve只需要部分密钥，使用本地向量索引时不需要DashVector密钥
+        required_keys = []
+        if os.getenv("RAG_VECTOR_BACKEND", "dashvector").lower() == "dashvector":
+            required_keys.append("DASH_VECTOR_API")
         # 检查是否有可用的API密钥（DASHSCOPE_API_KEY 或 ALIBABA_QWEN_API_KEY）
         has_llm_key = keys.get("DASHSCOPE_API_KEY") or keys.get("ALIBABA_QWEN_API_KEY")
 
@@ -923,7 +982,32 @@ class UserRetrieve:
         self.vectorDB_endpoint = "vrs-cn-6sa4axaiv0001c.dashvector.cn-shanghai.aliyuncs.com"
         self.bailian_endpoint = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 
+        self._embedding_client = OpenAI(
+            api_key=self.dash_scope_key,
+            base_url=self.bailian_endpoint
+        )
+        self._embedder = CachedEmbedder(
+            self._request_embeddings,
+            model=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS,
+            cache=get_embedding_cache(),
+            batch_size=EMBEDDING_BATCH_LIMIT
+        )
+
+        # 进程内共享的向量存储（本地索引或DashVector）
+        self.vector_store = get_vector_store()
+
         print("✅ UserRetrieve类初始化完成")
+
+    def _request_embeddings(self, texts: list) -> list:
+        """调用百炼 embedding 接口，单次最多10条文本"""
+        completion = self._embedding_client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=texts,
+            dimensions=EMBEDDING_DIMENSIONS,
+            encoding_format="float"
+        )
+        return [item.embedding for item in completion.data]
     def __user_query_vectorised(self, raw_user_query: str):
         """
         增强的用户查询向量化方法，支持中英文检测和翻译
@@ -982,30 +1066,19 @@ class UserRetrieve:
             original_language = detected_language
             translated_text = translated_query
 
-        # 3. 对原文和翻译副本进行向量化
-        client = OpenAI(
-            api_key=self.dash_scope_key,
-            base_url=self.bailian_endpoint
-        )
-
-        # 批量向量化原文和翻译
-        completion = client.embeddings.create(
-            model="text-embedding-v4",
-            input=[original_text, translated_text],
-            dimensions=1024,
-            encoding_format="float"
-        )
+        # 3. 对原文和翻译副本进行向量化，重复的查询直接使用缓存
+        original_vector, translated_vector = self._embedder([original_text, translated_text])
 
         # 4. 构建返回结果
         result = {
             'original': {
                 'text': original_text,
-                'vector': np.array(completion.data[0].embedding, dtype=float),
+                'vector': original_vector,
                 'language': original_language
             },
             'translated': {
                 'text': translated_text,
-                'vector': np.array(completion.data[1].embedding, dtype=float),
+                'vector': translated_vector,
                 'language': translated_language
             }
         }
@@ -1023,64 +1096,54 @@ class UserRetrieve:
             list: 检索到的相关文本列表，每个元素都是字符串
         """
         # 1. 获取用户查询的向量化结果（包含原文和翻译）
-        vectorised_queries = self.__user_query_vectorised(user_query)
+        vectorised_queries = self.vectorise_query(user_query)
 
-        # 2. 连接向量数据库
-        client = dashvector.Client(
-            api_key=self.dash_vector_key,
-            endpoint=self.vectorDB_endpoint
-        )
-        collection = client.get(name='simple_collection')
-
-        # 3. 计算每次检索的数量（向上取整）
+        # 2. 计算每次检索的数量（向上取整）
         k_per_query = math.ceil(k / 2)
         print(f"🔍 每个查询检索 {k_per_query} 个结果，总共检索 {k} 个结果")
 
-        # 4. 使用原文进行检索
+        # 3. 同时使用原文和翻译副本进行检索
         print(f"🔍 使用原文检索: {vectorised_queries['original']['text']}")
-        ret_original = collection.query(
-            vector=vectorised_queries['original']['vector'],
-            topk=k_per_query,
-            output_fields=['raw_text', 'sub_title'],
-            include_vector=True
-        )
-
-        # 5. 使用翻译副本进行检索
         print(f"🔍 使用翻译检索: {vectorised_queries['translated']['text']}")
-        ret_translated = collection.query(
-            vector=vectorised_queries['translated']['vector'],
-            topk=k_per_query,
-            output_fields=['raw_text', 'sub_title'],
-            include_vector=True
+        hits_original, hits_translated = self.vector_store.query_many(
+            [
+                vectorised_queries['original']['vector'],
+                vectorised_queries['translated']['vector']
+            ],
+            k_per_query
         )
 
-        # 6. 合并检索结果
+        # 4. 合并检索结果
+        print(f"✅ 原文检索获得 {len(hits_original)} 个结果，翻译检索获得 {len(hits_translated)} 个结果")
+        retrieve_result = self.merge_hits([hits_original, hits_translated])
+        print(f"🎉 总共检索到 {len(retrieve_result)} 个唯一结果")
+        return retrieve_result
+
+    def vectorise_query(self, user_query: str) -> dict:
+        """
+        对用户查询做语言检测、翻译并批量向量化，返回结构同 __user_query_vectorised
+        """
+        return self.__user_query_vectorised(user_query)
+
+    @staticmethod
+    def merge_hits(hit_lists: list) -> list:
+        """
+        按顺序合并多路检索结果并按原文去重
+
+        Args:
+            hit_lists (list): 每路检索的 VectorHit 列表，靠前的一路优先
+
+        Returns:
+            list: 去重后的文本列表
+        """
         retrieve_result = []
         seen_texts = set()  # 用于去重
-
-        # 添加原文检索结果
-        if ret_original and ret_original.output:
-            print(f"✅ 原文检索成功，获得 {len(ret_original.output)} 个结果")
-            for content in ret_original.output:
-                text = content.fields["raw_text"]
-                if text not in seen_texts:
-                    retrieve_result.append(text)
-                    seen_texts.add(text)
-        else:
-            print("⚠️ 原文检索失败或无结果")
-
-        # 添加翻译检索结果
-        if ret_translated and ret_translated.output:
-            print(f"✅ 翻译检索成功，获得 {len(ret_translated.output)} 个结果")
-            for content in ret_translated.output:
-                text = content.fields["raw_text"]
-                if text not in seen_texts:
+        for hits in hit_lists:
+            for hit in hits or []:
+                text = hit.fields.get("raw_text")
+                if text and text not in seen_texts:
                     retrieve_result.append(text)
                     seen_texts.add(text)
-        else:
-            print("⚠️ 翻译检索失败或无结果")
-
-        print(f"🎉 总共检索到 {len(retrieve_result)} 个唯一结果")
         return retrieve_result
 
 if __name__ == "__main__":
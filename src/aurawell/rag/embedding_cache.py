@@ -0,0 +1,231 @@
+"""
+RAG向量化结果缓存
+以 (模型, 维度, sha256(文本)) 为键把 embedding 结果以 float16 存入本地 SQLite，
+重复入库的段落和重复的用户查询无需再次调用远程 embedding 接口。
+缓存文件默认位于数据目录（AURAWELL_DATA_DIR）下，可通过 RAG_EMBEDDING_CACHE_PATH 指定。
+
+CachedEmbedder 包装实际的 embedding 调用：先批量查询缓存，只为未命中的文本
+（同一批内去重后）调用远程接口，并统计命中率与节省的接口调用次数。
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .vector_store import DEFAULT_DATA_DIR
+except ImportError:
+    from vector_store import DEFAULT_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_DATA_DIR, "embedding_cache.sqlite3")
+# SQLite 单条语句的参数上限较低，批量查询按该大小分组
+LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """基于 SQLite 的持久化 embedding 缓存，向量以 float16 存储"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, dimensions, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def round_trip(vector: Sequence[float]) -> np.ndarray:
+        """按存储精度舍入后的 float32 向量，与之后命中缓存时读到的完全一致"""
+        return np.asarray(vector, dtype=np.float16).astype(np.float32)
+
+    def get_many(self, model: str, dimensions: int, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """批量读取，返回命中的 {text_hash: float32 向量}"""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), LOOKUP_CHUNK):
+                chunk = unique[start:start + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dimensions = ? AND text_hash IN ({placeholders})",
+                    (model, dimensions, *chunk),
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+        return found
+
+    def put_many(self, model: str, dimensions: int, items: Dict[str, Sequence[float]]):
+        """批量写入 {text_hash: 向量}"""
+        if not items:
+            return
+        rows = [
+            (model, dimensions, digest, np.asarray(vector, dtype=np.float16).tobytes())
+            for digest, vector in items.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dimensions, text_hash, vector) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """一次运行的缓存统计"""
+
+    requested: int = 0
+    hits: int = 0
+    api_calls: int = 0
+    api_calls_saved: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.requested if self.requested else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "requested": self.requested,
+            "hits": self.hits,
+            "hit_ratio": round(self.hit_ratio, 4),
+            "api_calls": self.api_calls,
+            "api_calls_saved": self.api_calls_saved,
+        }
+
+
+class CachedEmbedder:
+    """
+    带缓存的批量向量化
+
+    启用缓存时，远程接口返回的向量同样按 float16 舍入，同一文本无论是否命中缓存
+    得到的向量都相同。
+
+    Args:
+        request: 实际的远程调用，输入不超过 batch_size 条文本，返回等长的向量列表
+        model: 模型名，参与缓存键
+        dimensions: 向量维度，参与缓存键
+        cache: 缓存存储，为 None 时直接调用远程接口
+        batch_size: 远程接口单次最多接受的文本数量
+    """
+
+    def __init__(
+        self,
+        request: Callable[[List[str]], Sequence[Sequence[float]]],
+        model: str,
+        dimensions: int,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 10,
+    ):
+        self.request = request
+        self.model = model
+        self.dimensions = dimensions
+        self.cache = cache
+        self.batch_size = batch_size
+        self.stats = EmbeddingCacheStats()
+        self._stats_lock = threading.Lock()
+
+    def __call__(self, texts: Sequence[str]) -> List[np.ndarray]:
+        texts = list(texts)
+        if not texts:
+            return []
+
+        hashes = [text_hash(text) for text in texts]
+        cached = self.cache.get_many(self.model, self.dimensions, hashes) if self.cache else {}
+
+        # 未命中的文本在同一批内去重，只请求一次
+        missing: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in cached and digest not in missing:
+                missing[digest] = text
+
+        fetched: Dict[str, np.ndarray] = {}
+        pending = list(missing.items())
+        calls = 0
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            vectors = self.request([text for _, text in chunk])
+            calls += 1
+            for (digest, _), vector in zip(chunk, vectors):
+                fetched[digest] = (
+                    self.cache.round_trip(vector)
+                    if self.cache
+                    else np.asarray(vector, dtype=np.float32)
+                )
+
+        if self.cache and fetched:
+            try:
+                self.cache.put_many(self.model, self.dimensions, fetched)
+            except Exception as e:
+                logger.warning(f"写入 embedding 缓存失败: {e}")
+
+        with self._stats_lock:
+            self.stats.requested += len(texts)
+            self.stats.hits += sum(1 for digest in hashes if digest in cached)
+            self.stats.api_calls += calls
+            self.stats.api_calls_saved += -(-len(texts) // self.batch_size) - calls
+
+        return [cached[digest] if digest in cached else fetched[digest] for digest in hashes]
+
+
+_embedding_cache_instance: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    获取进程内共享的 embedding 缓存（单例模式）
+
+    环境变量:
+        RAG_EMBEDDING_CACHE_ENABLED: 是否启用，默认 true
+        RAG_EMBEDDING_CACHE_PATH: SQLite 文件路径，默认 <AURAWELL_DATA_DIR>/embedding_cache.sqlite3
+    """
+    global _embedding_cache_instance
+    if os.getenv("RAG_EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    if _embedding_cache_instance is None:
+        with _embedding_cache_lock:
+            if _embedding_cache_instance is None:
+                try:
+                    _embedding_cache_instance = EmbeddingCache(
+                        os.getenv("RAG_EMBEDDING_CACHE_PATH") or DEFAULT_CACHE_PATH
+                    )
+                except Exception as e:
+                    logger.warning(f"embedding 缓存不可用，直接调用远程接口: {e}")
+                    return None
+    return _embedding_cache_instance
@@ -7,6 +7,7 @@
 
 import json
 import os
+import threading
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional
 try:
@@ -22,6 +23,9 @@ class FileIndexManager:
         self.oss_manager = OSSManager()
         self.index_file_key = "file_status/file_index.json"
         self.nutrition_prefix = "nutrition/"
+        self.segments_prefix = "parsed_segments/"
+        # 入库流水线的多个线程会并发更新同一个索引文件
+        self._lock = threading.Lock()
         
         # 初始化索引文件
         self._initialize_index_file()
@@ -149,6 +153,74 @@ class FileIndexManager:
             print(f"❌ 更新向量化状态失败: {e}")
             return False
     
+    def update_ingestion_progress(self, filename: str, stage: str, **extra) -> bool:
+        """
+        记录文件在入库流水线中的进度，中断后重跑可以从该阶段继续
+
+        Args:
+            filename (str): 文件名
+            stage (str): 已完成的阶段，filtered / stored / failed
+            **extra: 一并写入记录的字段，如 segments_key、segment_count、ingest_error
+
+        Returns:
+            bool: 更新是否成功
+        """
+        with self._lock:
+            try:
+                index_data = self._load_index()
+
+                if filename not in index_data:
+                    print(f"⚠️  文件记录不存在: {filename}")
+                    return False
+
+                record = index_data[filename]
+                record["ingest_stage"] = stage
+                record.update(extra)
+                if stage == "stored":
+                    record["vectorized"] = True
+                record["last_updated"] = get_beijing_time()
+
+                return self._save_index(index_data)
+
+            except Exception as e:
+                print(f"❌ 更新入库进度失败: {e}")
+                return False
+
+    def save_segments(self, filename: str, segments: List[str], sub_title: str) -> Optional[str]:
+        """
+        将过滤后的段落保存到OSS，作为入库流水线的检查点
+
+        Args:
+            filename (str): 原始文件名
+            segments (List[str]): 过滤后的段落
+            sub_title (str): 段落来源标记
+
+        Returns:
+            Optional[str]: 段落文件的OSS键名，失败返回None
+        """
+        segments_key = f"{self.segments_prefix}{os.path.splitext(filename)[0]}.json"
+        content = json.dumps({"sub_title": sub_title, "segments": segments}, ensure_ascii=False)
+        if self.oss_manager.upload_string_as_file(content, segments_key):
+            return segments_key
+        return None
+
+    def load_segments(self, segments_key: str) -> Optional[Dict]:
+        """
+        读取检查点中保存的段落
+
+        Args:
+            segments_key (str): 段落文件的OSS键名
+
+        Returns:
+            Optional[Dict]: {"sub_title": str, "segments": List[str]}，不存在返回None
+        """
+        try:
+            content = self.oss_manager.download_file_content(segments_key)
+            return json.loads(content) if content else None
+        except Exception as e:
+            print(f"❌ 读取段落检查点失败: {e}")
+            return None
+
     def file_exists_in_index(self, filename: str) -> bool:
         """
         检查文件是否已在索引中
@@ -0,0 +1,380 @@
+"""
+RAG文档入库流水线
+把 下载 -> 解析 -> 过滤 -> 向量化 -> 写入 拆成独立阶段，阶段之间用有界队列连接：
+
+- 下载、解析、过滤是逐文件的阻塞调用（OSS、DocMind、大模型），各自有独立的并发线程数
+- 向量化阶段把多个文件的段落拼成满批次再调用 embedding 接口，并限制同时在途的批次数
+- 写入阶段把已完成的文件合并为一次批量写入，写入后通过 checkpoint 回调记录进度
+
+队列有界，任一下游阶段变慢时上游会阻塞等待，内存占用与语料规模无关。
+各阶段的具体实现由调用方注入（见 RAGExtension.Document），便于用本地桩服务做基准测试。
+"""
+
+import hashlib
+import logging
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from .vector_store import VectorStore
+except ImportError:
+    from vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# 阿里云 embedding 接口单次最多接受的文本数量
+EMBEDDING_BATCH_LIMIT = 10
+
+_SENTINEL = object()
+
+
+@dataclass
+class IngestionJob:
+    """流水线中流转的单个文件"""
+
+    filename: str
+    source: str
+    is_oss_key: bool = True
+    local_path: Optional[str] = None
+    raw_content: Any = None
+    full_text: str = ""
+    # 为 None 表示尚未过滤；从检查点恢复的文件直接带着段落进入向量化阶段
+    segments: Optional[List[str]] = None
+    sub_title: str = "filtered_content"
+    vectors: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+    resumed: bool = False
+    _pending: int = 0
+
+    def segment_ids(self) -> List[str]:
+        """由文件名和段落内容生成确定性ID，中断后重跑同一文件不会产生重复向量"""
+        ids = []
+        for text in self.segments or []:
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            ids.append(str(uuid.uuid5(uuid.NAMESPACE_URL, f"{self.filename}:{digest}")))
+        return ids
+
+
+@dataclass
+class PipelineConfig:
+    """各阶段并发与队列参数"""
+
+    queue_size: int = 8
+    download_workers: int = 4
+    parse_workers: int = 4
+    filter_workers: int = 4
+    embed_workers: int = 4
+    embed_batch_size: int = EMBEDDING_BATCH_LIMIT
+    # 向量化阶段等待凑满批次的最长时间（秒），超时后发送不满的批次
+    embed_flush_interval: float = 0.2
+    # 单次批量写入最多合并的段落数
+    upsert_batch_size: int = 500
+
+
+@dataclass
+class PipelineStats:
+    """一次入库运行的统计"""
+
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    resumed: int = 0
+    segments: int = 0
+    segments_skipped: int = 0
+    embedding_calls: int = 0
+    upsert_calls: int = 0
+    elapsed_seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "processed": self.processed,
+            "failed": self.failed,
+            "skipped": 0,
+            "resumed": self.resumed,
+            "segments": self.segments,
+            "segments_skipped": self.segments_skipped,
+            "embedding_calls": self.embedding_calls,
+            "upsert_calls": self.upsert_calls,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "files_per_second": round(self.processed / self.elapsed_seconds, 3) if self.elapsed_seconds else 0.0,
+            "errors": dict(self.errors),
+        }
+
+
+StageFn = Callable[[IngestionJob], None]
+
+
+class IngestionPipeline:
+    """
+    分阶段的流式入库流水线
+
+    Args:
+        download: 下载阶段，设置 job.local_path
+        parse: 解析阶段，设置 job.raw_content / job.full_text
+        filter_segments: 过滤阶段，设置 job.segments / job.sub_title
+        embed: 批量向量化，输入文本列表返回等长的向量列表
+        store: 向量存储
+        checkpoint: 可选回调 checkpoint(job, stage)，文件写入完成后以 stage="stored" 调用
+        config: 并发与队列参数
+    """
+
+    def __init__(
+        self,
+        download: StageFn,
+        parse: StageFn,
+        filter_segments: StageFn,
+        embed: Callable[[List[str]], Sequence[Sequence[float]]],
+        store: VectorStore,
+        checkpoint: Optional[Callable[[IngestionJob, str], None]] = None,
+        config: Optional[PipelineConfig] = None,
+    ):
+        self.config = config or PipelineConfig()
+        self.stages: List[Tuple[str, StageFn, int]] = [
+            ("download", download, self.config.download_workers),
+            ("parse", parse, self.config.parse_workers),
+            ("filter", filter_segments, self.config.filter_workers),
+        ]
+        self.embed = embed
+        self.store = store
+        self.checkpoint = checkpoint
+        self._stats_lock = threading.Lock()
+
+    def run(self, jobs: Iterable[IngestionJob]) -> PipelineStats:
+        """处理所有文件，阻塞直到全部写入或失败"""
+        stats = PipelineStats()
+        started = time.perf_counter()
+
+        stage_queues = [queue.Queue(maxsize=self.config.queue_size) for _ in self.stages]
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+        upsert_queue: queue.Queue = queue.Queue(maxsize=self.config.queue_size)
+        outputs = stage_queues[1:] + [embed_queue]
+
+        threads = []
+        for (name, fn, workers), inbox, outbox in zip(self.stages, stage_queues, outputs):
+            workers = max(1, workers)
+            remaining = [workers]
+            for i in range(workers):
+                threads.append(threading.Thread(
+                    target=self._stage_worker,
+                    args=(name, fn, inbox, outbox, remaining),
+                    name=f"ingest-{name}-{i}",
+                    daemon=True,
+                ))
+        threads.append(threading.Thread(
+            target=self._embed_dispatcher, args=(embed_queue, upsert_queue, stats),
+            name="ingest-embed", daemon=True,
+        ))
+        threads.append(threading.Thread(
+            target=self._upsert_worker, args=(upsert_queue, stats),
+            name="ingest-upsert", daemon=True,
+        ))
+        for thread in threads:
+            thread.start()
+
+        for job in jobs:
+            stats.total += 1
+            if job.resumed:
+                stats.resumed += 1
+            stage_queues[0].put(job)
+        for _ in range(max(1, self.stages[0][2])):
+            stage_queues[0].put(_SENTINEL)
+
+        for thread in threads:
+            thread.join()
+        # 整个运行结束后统一持久化，而不是每批写入都落盘
+        self.store.flush()
+
+        stats.elapsed_seconds = time.perf_counter() - started
+        logger.info(
+            f"入库完成: {stats.processed}/{stats.total} 个文件, {stats.segments} 个段落, "
+            f"{stats.embedding_calls} 次向量化调用, 耗时 {stats.elapsed_seconds:.2f}s"
+        )
+        return stats
+
+    def _stage_worker(self, name: str, fn: StageFn, inbox: queue.Queue,
+                      outbox: queue.Queue, remaining: List[int]):
+        """逐文件阶段：失败或已带段落的文件直接向下游传递"""
+        next_workers = self._next_workers(name)
+        while True:
+            job = inbox.get()
+            if job is _SENTINEL:
+                with self._stats_lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    for _ in range(next_workers):
+                        outbox.put(_SENTINEL)
+                return
+
+            if job.error is None and job.segments is None:
+                try:
+                    fn(job)
+                except Exception as e:
+                    job.error = f"{name}: {e}"
+                    logger.warning(f"文件 {job.filename} 在 {name} 阶段失败: {e}")
+            outbox.put(job)
+
+    def _next_workers(self, name: str) -> int:
+        names = [stage[0] for stage in self.stages]
+        index = names.index(name) + 1
+        # 向量化阶段只有一个分发线程
+        return max(1, self.stages[index][2]) if index < len(self.stages) else 1
+
+    def _embed_dispatcher(self, inbox: queue.Queue, outbox: queue.Queue, stats: PipelineStats):
+        """跨文件拼批调用 embedding，在途批次数不超过 embed_workers 的两倍"""
+        batch_size = max(1, min(self.config.embed_batch_size, EMBEDDING_BATCH_LIMIT))
+        in_flight = threading.BoundedSemaphore(max(1, self.config.embed_workers) * 2)
+        buffer: List[Tuple[IngestionJob, int, str]] = []
+        done = False
+
+        with ThreadPoolExecutor(max_workers=max(1, self.config.embed_workers),
+                                thread_name_prefix="ingest-embed-call") as executor:
+
+            def submit(items):
+                in_flight.acquire()
+                future = executor.submit(self._embed_batch, items, outbox, stats)
+                future.add_done_callback(lambda _: in_flight.release())
+
+            while not done:
+                try:
+                    job = inbox.get(timeout=self.config.embed_flush_interval)
+                except queue.Empty:
+                    if buffer:
+                        submit(buffer)
+                        buffer = []
+                    continue
+
+                if job is _SENTINEL:
+                    done = True
+                elif job.error is not None or not job.segments:
+                    if job.error is None and not job.segments:
+                        job.error = "filter: 未提取到任何段落"
+                    outbox.put(job)
+                else:
+                    self._drop_stored_segments(job, stats)
+                    if not job.segments:
+                        outbox.put(job)
+                        continue
+                    job.vectors = [None] * len(job.segments)
+                    job._pending = len(job.segments)
+                    buffer.extend((job, i, text) for i, text in enumerate(job.segments))
+
+                while len(buffer) >= batch_size or (done and buffer):
+                    submit(buffer[:batch_size])
+                    buffer = buffer[batch_size:]
+
+        outbox.put(_SENTINEL)
+
+    def _drop_stored_segments(self, job: IngestionJob, stats: PipelineStats):
+        """跳过向量存储中已有的段落，重新入库只改动了少量段落的文件时只向量化新增部分"""
+        try:
+            stored = self.store.existing_ids(job.segment_ids())
+        except Exception as e:
+            logger.warning(f"查询已入库段落失败，全部重新向量化: {e}")
+            return
+        if stored:
+            kept = [
+                text for text, doc_id in zip(job.segments, job.segment_ids())
+                if doc_id not in stored
+            ]
+            with self._stats_lock:
+                stats.segments_skipped += len(job.segments) - len(kept)
+            job.segments = kept
+
+    def _embed_batch(self, items: List[Tuple[IngestionJob, int, str]],
+                     outbox: queue.Queue, stats: PipelineStats):
+        error = None
+        vectors: Sequence[Sequence[float]] = []
+        try:
+            vectors = self.embed([text for _, _, text in items])
+            if len(vectors) != len(items):
+                raise ValueError(f"embedding 返回 {len(vectors)} 个向量，期望 {len(items)} 个")
+        except Exception as e:
+            error = f"embed: {e}"
+            logger.warning(f"向量化批次失败: {e}")
+
+        with self._stats_lock:
+            stats.embedding_calls += 1
+            finished = []
+            for position, (job, index, _) in enumerate(items):
+                if error is not None:
+                    job.error = job.error or error
+                else:
+                    job.vectors[index] = vectors[position]
+                job._pending -= 1
+                if job._pending == 0:
+                    finished.append(job)
+
+        for job in finished:
+            outbox.put(job)
+
+    def _upsert_worker(self, inbox: queue.Queue, stats: PipelineStats):
+        """合并已完成的文件做批量写入，写入成功后记录检查点"""
+        done = False
+        while not done:
+            item = inbox.get()
+            if item is _SENTINEL:
+                break
+            group = [item]
+            size = len(item.segments or [])
+            while size < self.config.upsert_batch_size:
+                try:
+                    item = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _SENTINEL:
+                    done = True
+                    break
+                group.append(item)
+                size += len(item.segments or [])
+            self._upsert_group(group, stats)
+
+    def _upsert_group(self, group: List[IngestionJob], stats: PipelineStats):
+        ready = [job for job in group if job.error is None]
+        for job in group:
+            if job.error is not None:
+                self._mark_failed(job, stats)
+
+        if not ready:
+            return
+
+        vectors, fields, ids = [], [], []
+        for job in ready:
+            vectors.extend(job.vectors)
+            fields.extend({"raw_text": text, "sub_title": job.sub_title} for text in job.segments)
+            ids.extend(job.segment_ids())
+
+        try:
+            if vectors:
+                self.store.add(vectors, fields, ids)
+                stats.upsert_calls += 1
+        except Exception as e:
+            for job in ready:
+                job.error = f"upsert: {e}"
+                self._mark_failed(job, stats)
+            return
+
+        for job in ready:
+            stats.processed += 1
+            stats.segments += len(job.segments)
+            if self.checkpoint is not None:
+                try:
+                    self.checkpoint(job, "stored")
+                except Exception as e:
+                    logger.warning(f"记录入库进度失败: {job.filename}, {e}")
+
+    def _mark_failed(self, job: IngestionJob, stats: PipelineStats):
+        stats.failed += 1
+        stats.errors[job.filename] = job.error
+        if self.checkpoint is not None:
+            try:
+                self.checkpoint(job, "failed")
+            except Exception as e:
+                logger.warning(f"记录入库失败状态失败: {job.filename}, {e}")
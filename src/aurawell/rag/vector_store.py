@@ -0,0 +1,657 @@
+"""
+向量存储抽象层
+为RAG检索提供统一的向量存储接口，目前支持两种后端：
+
+- local: 本地文件索引。向量归一化后按行追加写入磁盘上的 float32/float16 矩阵文件，
+  检索时通过内存映射读取并用 NumPy 暴力计算余弦相似度取 TopK；安装了 hnswlib 时
+  可选启用 HNSW 近似索引。索引支持增量追加，不依赖网络，适合数万段落规模的语料。
+  多个 worker 可共享同一目录：写入持有文件锁，检索前按元数据文件的大小/mtime
+  读入其他进程追加的记录（文件锁依赖 fcntl，Windows 上仅支持单进程）
+- dashvector: 阿里云 DashVector 云端向量库，客户端与集合在进程内复用，
+  查询时不再回传向量本身
+
+通过环境变量 RAG_VECTOR_BACKEND 选择后端，get_vector_store() 返回进程内共享的实例
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import hnswlib
+
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+try:
+    import dashvector
+    from dashvector import Doc
+
+    DASHVECTOR_AVAILABLE = True
+except ImportError:
+    DASHVECTOR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSION = 1024
+DEFAULT_COLLECTION = "simple_collection"
+# 运行时数据（本地索引、向量化缓存）放在数据目录下，不写入包目录
+DEFAULT_DATA_DIR = os.getenv("AURAWELL_DATA_DIR", "data")
+DEFAULT_LOCAL_INDEX_DIR = os.path.join(DEFAULT_DATA_DIR, "vector_index")
+
+# 暴力检索时每次转换为 float32 参与计算的行数，限制 float16 存储下的临时内存
+SCAN_CHUNK_ROWS = 16384
+# DashVector 单次写入的文档数量
+DASHVECTOR_INSERT_BATCH = 100
+# DashVector 多路查询并发发出时的线程数
+DASHVECTOR_QUERY_WORKERS = 4
+
+
+@dataclass
+class VectorHit:
+    """单条检索结果"""
+
+    id: str
+    score: float
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+class VectorStore(ABC):
+    """向量存储接口"""
+
+    backend: str = ""
+
+    @abstractmethod
+    def add(
+        self,
+        vectors: Sequence[Sequence[float]],
+        fields: Sequence[Dict[str, Any]],
+        ids: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """
+        写入一批向量
+
+        Args:
+            vectors: 向量列表，每个向量的维度必须与存储一致
+            fields: 与向量一一对应的字段字典（如 raw_text、sub_title）
+            ids: 可选的文档ID，缺省时自动生成；ID已存在时不会产生重复记录
+
+        Returns:
+            List[str]: 写入的文档ID
+        """
+
+    @abstractmethod
+    def query(self, vector: Sequence[float], topk: int) -> List[VectorHit]:
+        """按相似度返回前 topk 条结果，得分越靠前越相关"""
+
+    def query_many(
+        self, vectors: Sequence[Sequence[float]], topk: int
+    ) -> List[List[VectorHit]]:
+        """一次检索多个查询向量，返回与输入顺序一致的结果列表"""
+        return [self.query(vector, topk) for vector in vectors]
+
+    def existing_ids(self, ids: Sequence[str]) -> set:
+        """返回 ids 中已存储的部分，入库时据此跳过已向量化的段落"""
+        return set()
+
+    def flush(self):
+        """把已写入的数据持久化到磁盘，入库运行结束时调用"""
+
+    def close(self):
+        """持久化并释放资源"""
+        self.flush()
+
+    @abstractmethod
+    def count(self) -> int:
+        """已存储的向量数量"""
+
+
+def _normalize_rows(vectors: Any, dim: int) -> np.ndarray:
+    """转换为 float32 二维矩阵并做 L2 归一化，使内积等于余弦相似度"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2 or matrix.shape[1] != dim:
+        raise ValueError(f"向量维度不匹配: 期望 {dim}，实际 {matrix.shape}")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class LocalVectorStore(VectorStore):
+    """
+    基于内存映射矩阵文件的本地向量存储
+
+    目录结构:
+        manifest.json  维度、存储精度与记录数
+        vectors.bin    行优先的归一化向量矩阵，只追加
+        meta.jsonl     每行一条 {"id": ..., "fields": {...}}，与矩阵行一一对应
+        hnsw.bin       可选的 HNSW 索引，由矩阵派生，缺失或落后时补齐
+        index.lock     多进程写入使用的文件锁
+
+    写入顺序为 矩阵 -> 元数据，读取方只接受两者都已完整写入的行；进程在写入
+    中途退出时，下次打开会把矩阵和元数据截断到两者共同的完整行数。
+    add() 只追加到文件，fsync 与 HNSW 索引保存在 flush()/close() 时进行
+    """
+
+    backend = "local"
+
+    MANIFEST_FILE = "manifest.json"
+    VECTORS_FILE = "vectors.bin"
+    META_FILE = "meta.jsonl"
+    HNSW_FILE = "hnsw.bin"
+    LOCK_FILE = "index.lock"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_LOCAL_INDEX_DIR,
+        dim: int = DEFAULT_DIMENSION,
+        dtype: str = "float32",
+        ann: Optional[str] = None,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+    ):
+        """
+        Args:
+            path: 索引目录
+            dim: 向量维度，已有索引时以 manifest 为准
+            dtype: 磁盘存储精度，float32 或 float16（文件与页缓存减半，但暴力检索需逐块转换，查询更慢）
+            ann: 近似索引类型，None 为暴力检索，"hnsw" 需要安装 hnswlib
+            hnsw_m: HNSW 每个节点的邻居数
+            hnsw_ef_construction: HNSW 构建时的候选集大小
+            hnsw_ef_search: HNSW 查询时的候选集大小，越大召回越高、越慢
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"不支持的存储精度: {dtype}")
+
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._id_set = set()
+        self._fields: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.memmap] = None
+        self._hnsw = None
+        # 已读入的元数据字节数与对应的文件状态，用于发现其他进程的追加
+        self._meta_offset = 0
+        self._meta_stat = None
+        self._dirty = False
+        self._hnsw_dirty = False
+
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+        if ann == "hnsw":
+            if HNSWLIB_AVAILABLE:
+                self._open_hnsw()
+            else:
+                logger.warning("hnswlib 未安装，本地向量索引使用暴力检索")
+        elif ann:
+            raise ValueError(f"不支持的近似索引类型: {ann}")
+
+    @property
+    def ann(self) -> Optional[str]:
+        return "hnsw" if self._hnsw is not None else None
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * self.dtype.itemsize
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程互斥的写锁；没有 fcntl 时只在进程内互斥"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(self._file(self.LOCK_FILE), "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _load(self):
+        """读取 manifest 与元数据，修复中断写入留下的不完整记录"""
+        manifest_path = self._file(self.MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest["dim"] != self.dim or manifest["dtype"] != self.dtype.name:
+                logger.warning(
+                    f"本地向量索引已存在 (dim={manifest['dim']}, dtype={manifest['dtype']})，"
+                    f"忽略参数 dim={self.dim}, dtype={self.dtype.name}"
+                )
+            self.dim = manifest["dim"]
+            self.dtype = np.dtype(manifest["dtype"])
+
+        with self._file_lock():
+            self._repair()
+            self._refresh()
+            self._write_manifest()
+
+    def _repair(self):
+        """截断矩阵与元数据中未写完的尾部，调用方持有文件锁"""
+        meta_path = self._file(self.META_FILE)
+        meta_bytes = b""
+        if os.path.exists(meta_path):
+            with open(meta_path, "rb") as f:
+                meta_bytes = f.read()
+        # 最后一行未以换行结束说明没写完
+        lines = meta_bytes[:meta_bytes.rfind(b"\n") + 1].splitlines(keepends=True)
+
+        vectors_path = self._file(self.VECTORS_FILE)
+        vector_bytes = os.path.getsize(vectors_path) if os.path.exists(vectors_path) else 0
+        rows = min(vector_bytes // self._row_bytes, len(lines))
+
+        if vector_bytes != rows * self._row_bytes:
+            logger.warning(f"截断本地向量文件中的不完整记录，保留 {rows} 行")
+            with open(vectors_path, "r+b") as f:
+                f.truncate(rows * self._row_bytes)
+        keep = sum(len(line) for line in lines[:rows])
+        if keep != len(meta_bytes):
+            with open(meta_path, "r+b" if meta_bytes else "wb") as f:
+                f.truncate(keep)
+
+    def _refresh(self):
+        """读入元数据文件中新增的完整记录（包括其他进程追加的）"""
+        meta_path = self._file(self.META_FILE)
+        try:
+            stat = os.stat(meta_path)
+        except FileNotFoundError:
+            return
+        state = (stat.st_size, stat.st_mtime_ns)
+        if state == self._meta_stat:
+            return
+
+        with open(meta_path, "rb") as f:
+            f.seek(self._meta_offset)
+            data = f.read(stat.st_size - self._meta_offset)
+        lines = data[:data.rfind(b"\n") + 1].splitlines(keepends=True)
+
+        # 只接受矩阵中已有对应向量的行
+        vectors_path = self._file(self.VECTORS_FILE)
+        vector_rows = os.path.getsize(vectors_path) // self._row_bytes
+        lines = lines[:max(0, vector_rows - len(self._ids))]
+        if not lines:
+            return
+
+        start = len(self._ids)
+        for line in lines:
+            record = json.loads(line)
+            self._ids.append(record["id"])
+            self._id_set.add(record["id"])
+            self._fields.append(record.get("fields", {}))
+            self._meta_offset += len(line)
+        self._matrix = None
+        if self._meta_offset == stat.st_size:
+            self._meta_stat = state
+
+        if self._hnsw is not None:
+            self._hnsw_add(self._get_matrix()[start:], start)
+
+    def _write_manifest(self):
+        manifest_path = self._file(self.MANIFEST_FILE)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"dim": self.dim, "dtype": self.dtype.name, "count": len(self._ids)}, f
+            )
+        os.replace(tmp_path, manifest_path)
+
+    def _get_matrix(self) -> Optional[np.memmap]:
+        """按当前行数映射矩阵文件，写入后会重新映射"""
+        if self._matrix is None and self._ids:
+            self._matrix = np.memmap(
+                self._file(self.VECTORS_FILE),
+                dtype=self.dtype,
+                mode="r",
+                shape=(len(self._ids), self.dim),
+            )
+        return self._matrix
+
+    def _open_hnsw(self):
+        """加载 HNSW 索引并补齐落后的行，无法加载时重建"""
+        index = hnswlib.Index(space="ip", dim=self.dim)
+        index_path = self._file(self.HNSW_FILE)
+        count = len(self._ids)
+        indexed = 0
+        loaded = False
+
+        if os.path.exists(index_path):
+            try:
+                index.load_index(index_path, max_elements=max(count, 1))
+                indexed = index.get_current_count()
+                loaded = indexed <= count
+            except Exception as e:
+                logger.warning(f"加载 HNSW 索引失败，将重新构建: {e}")
+
+        if not loaded:
+            index = hnswlib.Index(space="ip", dim=self.dim)
+            index.init_index(
+                max_elements=max(count, 1024),
+                M=self.hnsw_m,
+                ef_construction=self.hnsw_ef_construction,
+            )
+            indexed = 0
+
+        index.set_ef(self.hnsw_ef_search)
+        self._hnsw = index
+        if indexed < count:
+            self._hnsw_add(self._get_matrix()[indexed:], indexed)
+            logger.info(f"HNSW 索引补齐 {count - indexed} 条向量，共 {count} 条")
+            self.flush()
+
+    def _hnsw_add(self, vectors: np.ndarray, start: int):
+        """把从第 start 行开始的向量加入 HNSW 索引"""
+        needed = start + len(vectors)
+        if needed > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(max(needed, self._hnsw.get_max_elements() * 2))
+        for offset in range(0, len(vectors), SCAN_CHUNK_ROWS):
+            block = np.asarray(vectors[offset:offset + SCAN_CHUNK_ROWS], dtype=np.float32)
+            self._hnsw.add_items(block, np.arange(start + offset, start + offset + len(block)))
+        self._hnsw_dirty = True
+
+    def add(
+        self,
+        vectors: Sequence[Sequence[float]],
+        fields: Sequence[Dict[str, Any]],
+        ids: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        matrix = _normalize_rows(vectors, self.dim)
+        if len(fields) != len(matrix):
+            raise ValueError("向量与字段数量不一致")
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in range(len(matrix))]
+        elif len(ids) != len(matrix):
+            raise ValueError("向量与ID数量不一致")
+        if not len(matrix):
+            return []
+
+        with self._lock, self._file_lock():
+            # 先读入其他进程的追加，使行号与去重基于文件的最新状态
+            self._refresh()
+
+            # 已存在的ID直接跳过，重复写入同一批段落是幂等的
+            keep, seen = [], set()
+            for row, doc_id in enumerate(ids):
+                if doc_id not in self._id_set and doc_id not in seen:
+                    keep.append(row)
+                    seen.add(doc_id)
+            if not keep:
+                return list(ids)
+            if len(keep) != len(ids):
+                matrix = matrix[keep]
+                new_ids = [ids[row] for row in keep]
+                new_fields = [fields[row] for row in keep]
+            else:
+                new_ids, new_fields = list(ids), list(fields)
+
+            start = len(self._ids)
+            meta = b"".join(
+                (json.dumps({"id": doc_id, "fields": doc_fields}, ensure_ascii=False) + "\n").encode("utf-8")
+                for doc_id, doc_fields in zip(new_ids, new_fields)
+            )
+            with open(self._file(self.VECTORS_FILE), "ab") as f:
+                f.write(matrix.astype(self.dtype).tobytes())
+            with open(self._file(self.META_FILE), "ab") as f:
+                f.write(meta)
+
+            self._ids.extend(new_ids)
+            self._id_set.update(new_ids)
+            self._fields.extend(dict(doc_fields) for doc_fields in new_fields)
+            self._meta_offset += len(meta)
+            stat = os.stat(self._file(self.META_FILE))
+            if stat.st_size == self._meta_offset:
+                self._meta_stat = (stat.st_size, stat.st_mtime_ns)
+            self._matrix = None
+            self._dirty = True
+
+            if self._hnsw is not None:
+                self._hnsw_add(matrix, start)
+
+        return list(ids)
+
+    def flush(self):
+        """fsync 矩阵与元数据，更新 manifest，并保存有变更的 HNSW 索引"""
+        with self._lock, self._file_lock():
+            if self._dirty:
+                for name in (self.VECTORS_FILE, self.META_FILE):
+                    with open(self._file(name), "rb+") as f:
+                        os.fsync(f.fileno())
+                self._write_manifest()
+                self._dirty = False
+            if self._hnsw_dirty:
+                # 写临时文件再替换，其他进程加载时不会读到写了一半的索引
+                index_path = self._file(self.HNSW_FILE)
+                tmp_path = f"{index_path}.{os.getpid()}.tmp"
+                self._hnsw.save_index(tmp_path)
+                os.replace(tmp_path, index_path)
+                self._hnsw_dirty = False
+
+    def _hits(self, rows: Sequence[int], scores: Sequence[float]) -> List[VectorHit]:
+        return [
+            VectorHit(id=self._ids[row], score=float(score), fields=dict(self._fields[row]))
+            for row, score in zip(rows, scores)
+        ]
+
+    def query(self, vector: Sequence[float], topk: int) -> List[VectorHit]:
+        return self.query_many([vector], topk)[0]
+
+    def query_many(
+        self, vectors: Sequence[Sequence[float]], topk: int
+    ) -> List[List[VectorHit]]:
+        queries = _normalize_rows(vectors, self.dim)
+
+        with self._lock:
+            self._refresh()
+            count = len(self._ids)
+            k = min(topk, count)
+            if k <= 0:
+                return [[] for _ in range(len(queries))]
+
+            if self._hnsw is not None:
+                labels, distances = self._hnsw.knn_query(queries, k=k)
+                # ip 空间下 distance = 1 - 内积
+                return [
+                    self._hits(row_labels, 1.0 - row_distances)
+                    for row_labels, row_distances in zip(labels, distances)
+                ]
+
+            matrix = self._get_matrix()
+            scores = np.empty((count, len(queries)), dtype=np.float32)
+            for start in range(0, count, SCAN_CHUNK_ROWS):
+                block = np.asarray(matrix[start:start + SCAN_CHUNK_ROWS], dtype=np.float32)
+                scores[start:start + len(block)] = block @ queries.T
+
+            results = []
+            for column in scores.T:
+                top = np.argpartition(-column, k - 1)[:k]
+                top = top[np.argsort(-column[top])]
+                results.append(self._hits(top, column[top]))
+            return results
+
+    def existing_ids(self, ids: Sequence[str]) -> set:
+        with self._lock:
+            self._refresh()
+            return {doc_id for doc_id in ids if doc_id in self._id_set}
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+
+class DashVectorStore(VectorStore):
+    """阿里云 DashVector 后端，客户端与集合句柄在实例内复用"""
+
+    backend = "dashvector"
+
+    def __init__(
+        self,
+        api_key: str,
+        endpoint: str,
+        collection_name: str = DEFAULT_COLLECTION,
+        dim: int = DEFAULT_DIMENSION,
+    ):
+        if not DASHVECTOR_AVAILABLE:
+            raise ImportError("dashvector 未安装，无法使用 DashVector 后端")
+        self.api_key = api_key
+        self.endpoint = endpoint
+        self.collection_name = collection_name
+        self.dim = dim
+        self._collection = None
+        self._lock = threading.Lock()
+        self._query_executor = ThreadPoolExecutor(
+            max_workers=DASHVECTOR_QUERY_WORKERS, thread_name_prefix="dashvector-query"
+        )
+
+    def _get_collection(self):
+        if self._collection is None:
+            with self._lock:
+                if self._collection is None:
+                    client = dashvector.Client(api_key=self.api_key, endpoint=self.endpoint)
+                    collection = client.get(name=self.collection_name)
+                    if not collection:
+                        raise RuntimeError(
+                            f"无法获取 DashVector 集合 {self.collection_name}: {collection.message}"
+                        )
+                    self._collection = collection
+        return self._collection
+
+    def add(
+        self,
+        vectors: Sequence[Sequence[float]],
+        fields: Sequence[Dict[str, Any]],
+        ids: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        if len(fields) != len(vectors):
+            raise ValueError("向量与字段数量不一致")
+        if ids is None:
+            ids = [str(uuid.uuid4()) for _ in range(len(vectors))]
+
+        collection = self._get_collection()
+        docs = [
+            Doc(id=doc_id, vector=np.asarray(vector, dtype=float), fields=doc_fields)
+            for doc_id, vector, doc_fields in zip(ids, vectors, fields)
+        ]
+        for start in range(0, len(docs), DASHVECTOR_INSERT_BATCH):
+            ret = collection.upsert(docs[start:start + DASHVECTOR_INSERT_BATCH])
+            if not ret:
+                raise RuntimeError(f"DashVector 写入失败: {ret.message}")
+        return list(ids)
+
+    def query(self, vector: Sequence[float], topk: int) -> List[VectorHit]:
+        ret = self._get_collection().query(
+            vector=np.asarray(vector, dtype=float),
+            topk=topk,
+            output_fields=["raw_text", "sub_title"],
+            include_vector=False,
+        )
+        if not ret or not ret.output:
+            return []
+        return [
+            VectorHit(id=doc.id, score=float(doc.score), fields=dict(doc.fields or {}))
+            for doc in ret.output
+        ]
+
+    def query_many(
+        self, vectors: Sequence[Sequence[float]], topk: int
+    ) -> List[List[VectorHit]]:
+        """多路查询并发发出，总耗时约等于最慢的一次往返"""
+        if len(vectors) <= 1:
+            return [self.query(vector, topk) for vector in vectors]
+        self._get_collection()
+        futures = [self._query_executor.submit(self.query, vector, topk) for vector in vectors]
+        return [future.result() for future in futures]
+
+    def existing_ids(self, ids: Sequence[str]) -> set:
+        collection = self._get_collection()
+        found = set()
+        ids = list(ids)
+        for start in range(0, len(ids), DASHVECTOR_INSERT_BATCH):
+            ret = collection.fetch(ids[start:start + DASHVECTOR_INSERT_BATCH])
+            if ret and ret.output:
+                found.update(ret.output.keys())
+        return found
+
+    def count(self) -> int:
+        ret = self._get_collection().stats()
+        return int(ret.output.total_doc_count) if ret else 0
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """
+    根据环境变量创建向量存储
+
+    环境变量:
+        RAG_VECTOR_BACKEND: dashvector（默认）或 local
+        RAG_VECTOR_DIM: 向量维度，默认 1024
+        RAG_LOCAL_INDEX_DIR: 本地索引目录
+        RAG_LOCAL_INDEX_DTYPE: float32 或 float16
+        RAG_LOCAL_INDEX_ANN: 留空为暴力检索，hnsw 启用 HNSW 索引
+        RAG_LOCAL_HNSW_EF_SEARCH: HNSW 查询候选集大小
+        DASH_VECTOR_API / DASH_VECTOR_ENDPOINT / DASH_VECTOR_COLLECTION: DashVector 连接配置
+    """
+    backend = (backend or os.getenv("RAG_VECTOR_BACKEND", "dashvector")).lower()
+    dim = int(os.getenv("RAG_VECTOR_DIM", str(DEFAULT_DIMENSION)))
+
+    if backend == "local":
+        return LocalVectorStore(
+            path=os.getenv("RAG_LOCAL_INDEX_DIR") or DEFAULT_LOCAL_INDEX_DIR,
+            dim=dim,
+            dtype=os.getenv("RAG_LOCAL_INDEX_DTYPE", "float32"),
+            ann=os.getenv("RAG_LOCAL_INDEX_ANN") or None,
+            hnsw_ef_search=int(os.getenv("RAG_LOCAL_HNSW_EF_SEARCH", "64")),
+        )
+    if backend == "dashvector":
+        return DashVectorStore(
+            api_key=os.getenv("DASH_VECTOR_API"),
+            endpoint=os.getenv(
+                "DASH_VECTOR_ENDPOINT",
+                "vrs-cn-6sa4axaiv0001c.dashvector.cn-shanghai.aliyuncs.com",
+            ),
+            collection_name=os.getenv("DASH_VECTOR_COLLECTION", DEFAULT_COLLECTION),
+            dim=dim,
+        )
+    raise ValueError(f"不支持的向量存储后端: {backend}")
+
+
+_vector_store_instance: Optional[VectorStore] = None
+_vector_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """获取进程内共享的向量存储实例（单例模式）"""
+    global _vector_store_instance
+    if _vector_store_instance is None:
+        with _vector_store_lock:
+            if _vector_store_instance is None:
+                _vector_store_instance = create_vector_store()
+                logger.info(f"RAG向量存储后端: {_vector_store_instance.backend}")
+    return _vector_store_instance
@@ -5,16 +5,19 @@ Provides data access layer implementing Repository pattern for database operatio
 Abstracts database operations and provides clean interfaces for services.
 """
 
-from .base import BaseRepository
+from .base import BaseRepository, InvalidCursorError
 from .user_repository import UserRepository
 from .health_data_repository import HealthDataRepository
+from .heart_rate_repository import HeartRateChunkRepository
 from .achievement_repository import AchievementRepository
 from .health_plan_repository import HealthPlanRepository
 
 __all__ = [
     "BaseRepository",
+    "InvalidCursorError",
     "UserRepository",
     "HealthDataRepository",
+    "HeartRateChunkRepository",
     "AchievementRepository",
     "HealthPlanRepository",
 ]
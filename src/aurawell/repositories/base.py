@@ -4,16 +4,97 @@ Base Repository Pattern Implementation
 Provides abstract base class for all repositories with common CRUD operations.
 """
 
+import base64
+import binascii
+import json
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Optional, List, Dict, Any, Type
+from datetime import date, datetime, timezone
+from typing import (
+    TypeVar,
+    Generic,
+    Optional,
+    List,
+    Dict,
+    Any,
+    Type,
+    Sequence,
+    Iterator,
+    AsyncIterator,
+    Tuple,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, update, delete, func, insert, tuple_, Select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import selectinload
 
 from ..database.base import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Rows sent per executemany batch
+DEFAULT_BULK_CHUNK_SIZE = 1000
+
+# Columns never overwritten by the update half of an upsert
+UPSERT_PRESERVED_COLUMNS = ("id", "created_at")
+
+# Rows fetched per round trip when streaming query results
+DEFAULT_STREAM_BATCH_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encode the sort-key values of the last row of a page as an opaque cursor
+
+    Args:
+        values: Sort-key values; dates and datetimes are stored as ISO strings
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = [
+        value.isoformat() if isinstance(value, (date, datetime)) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> List[Any]:
+    """
+    Decode a cursor produced by ``encode_cursor``
+
+    Args:
+        cursor: Cursor string
+        types: Python type of each sort-key value, used to restore dates and
+            datetimes
+
+    Returns:
+        Sort-key values
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor does not match the sort key")
+
+        decoded = []
+        for python_type, value in zip(types, values):
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {e}") from e
+
 
 class BaseRepository(Generic[ModelType], ABC):
     """
@@ -281,3 +362,251 @@ class BaseRepository(Generic[ModelType], ABC):
         # Create new record
         all_fields = {**unique_fields, **kwargs}
         return await self.create(**all_fields)
+
+    def _dialect_name(self) -> str:
+        """Name of the SQL dialect the session is bound to"""
+        return self.session.get_bind().dialect.name
+
+    def _row_chunks(
+        self, rows: Sequence[Dict[str, Any]], chunk_size: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Split rows into executemany batches
+
+        Rows are grouped by their key set first, since every parameter set of
+        one statement must bind the same columns.
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+
+        for group in groups.values():
+            for start in range(0, len(group), chunk_size):
+                yield group[start : start + chunk_size]
+
+    async def bulk_insert(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Insert many records with chunked executemany INSERT statements
+
+        The statement is compiled once per batch; PostgreSQL drivers send each
+        batch as multi-row VALUES statements and SQLite reuses one prepared
+        statement. Unlike ``create`` the new rows are not loaded back into the
+        session, so it suits large syncs where the caller does not need the
+        instances.
+
+        Args:
+            rows: Field value dictionaries, one per record
+            chunk_size: Maximum rows per executemany batch
+
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+
+        table = self.model_class.__table__
+        for chunk in self._row_chunks(rows, chunk_size):
+            await self.session.execute(insert(table), chunk)
+        return len(rows)
+
+    async def bulk_upsert(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        conflict_fields: Sequence[str],
+        update_fields: Optional[Sequence[str]] = None,
+        chunk_size: int = DEFAULT_BULK_CHUNK_SIZE,
+    ) -> int:
+        """
+        Insert or update many records with native ``INSERT ... ON CONFLICT``
+
+        Batches are sent like ``bulk_insert`` on SQLite and PostgreSQL, so a
+        sync of N rows costs N / chunk_size executions instead of a SELECT
+        plus an INSERT or UPDATE per row. ``conflict_fields`` must match a
+        unique constraint on the table. Other dialects fall back to ``upsert``
+        per row.
+
+        Args:
+            rows: Field value dictionaries, one per record
+            conflict_fields: Columns of the unique constraint to upsert on
+            update_fields: Columns overwritten on conflict; defaults to every
+                supplied column except the conflict, ``id`` and ``created_at``
+                columns
+            chunk_size: Maximum rows per executemany batch
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        if not rows:
+            return 0
+
+        dialect_name = self._dialect_name()
+        if dialect_name == "postgresql":
+            dialect_insert = postgresql.insert
+        elif dialect_name == "sqlite":
+            dialect_insert = sqlite.insert
+        else:
+            for row in rows:
+                unique_fields = {field: row[field] for field in conflict_fields}
+                await self.upsert(unique_fields, **row)
+            return len(rows)
+
+        table = self.model_class.__table__
+        for chunk in self._row_chunks(rows, chunk_size):
+            stmt = dialect_insert(table)
+            columns = update_fields or [
+                column
+                for column in chunk[0]
+                if column not in conflict_fields
+                and column not in UPSERT_PRESERVED_COLUMNS
+            ]
+            set_ = {column: stmt.excluded[column] for column in columns}
+            # ON CONFLICT bypasses the ORM, so Python-side onupdate hooks
+            # never run; stamp updated_at explicitly
+            if "updated_at" in table.columns and "updated_at" not in set_:
+                set_["updated_at"] = datetime.now(timezone.utc)
+
+            if set_:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(conflict_fields), set_=set_
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_fields))
+            await self.session.execute(stmt, chunk)
+
+        return len(rows)
+
+    def _key_columns(self, order_by: Sequence[str]) -> List[Any]:
+        """Sort-key columns, with the primary key appended as a tiebreaker"""
+        names = list(order_by)
+        if "id" not in names and hasattr(self.model_class, "id"):
+            names.append("id")
+        return [getattr(self.model_class, name) for name in names]
+
+    async def paginate(
+        self,
+        stmt: Select,
+        order_by: Sequence[str],
+        limit: int,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Fetch one keyset (seek) page of a select statement
+
+        Instead of skipping ``OFFSET`` rows, each page continues strictly after
+        the last row of the previous one, so deep pages cost the same as the
+        first when ``order_by`` is backed by an index.
+
+        Args:
+            stmt: Filtered select of this repository's model
+            order_by: Sort-key column names; ``id`` is appended when missing
+            limit: Maximum number of records in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first
+            descending: Sort direction
+
+        Returns:
+            Tuple of (records, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        columns = self._key_columns(order_by)
+        if cursor:
+            key = tuple_(*columns)
+            types = [column.type.python_type for column in columns]
+            values = tuple_(*decode_cursor(cursor, types))
+            stmt = stmt.where(key < values if descending else key > values)
+
+        ordering = [column.desc() if descending else column.asc() for column in columns]
+        stmt = stmt.order_by(*ordering).limit(limit + 1)
+
+        result = await self.session.execute(stmt)
+        items = list(result.scalars().all())
+        if len(items) <= limit:
+            return items, None
+
+        items = items[:limit]
+        last = items[-1]
+        return items, encode_cursor([getattr(last, c.key) for c in columns])
+
+    async def stream(
+        self, stmt: Select, batch_size: int = DEFAULT_STREAM_BATCH_SIZE
+    ) -> AsyncIterator[List[ModelType]]:
+        """
+        Iterate a select statement's results in batches
+
+        Rows are fetched through ``AsyncSession.stream`` with ``yield_per``,
+        so only one batch is held in memory at a time.
+
+        Args:
+            stmt: Select of this repository's model, already ordered
+            batch_size: Records per yielded batch
+
+        Yields:
+            Lists of up to ``batch_size`` model instances
+        """
+        result = await self.session.stream_scalars(
+            stmt.execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield list(partition)
+
+    async def get_page_by_filters(
+        self,
+        filters: Dict[str, Any],
+        limit: int,
+        cursor: Optional[str] = None,
+        order_by: Sequence[str] = ("id",),
+        descending: bool = True,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset-paginated variant of ``get_by_filters``
+
+        Args:
+            filters: Dictionary of field_name: value pairs
+            limit: Maximum number of records in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first
+            order_by: Sort-key column names
+            descending: Sort direction
+
+        Returns:
+            Tuple of (records, next_cursor)
+        """
+        return await self.paginate(
+            self._filtered_select(filters), order_by, limit, cursor, descending
+        )
+
+    async def stream_by_filters(
+        self,
+        filters: Dict[str, Any],
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+        order_by: Sequence[str] = ("id",),
+    ) -> AsyncIterator[List[ModelType]]:
+        """
+        Streaming variant of ``get_by_filters``
+
+        Args:
+            filters: Dictionary of field_name: value pairs
+            batch_size: Records per yielded batch
+            order_by: Column names to sort by, ascending
+
+        Yields:
+            Lists of up to ``batch_size`` model instances
+        """
+        stmt = self._filtered_select(filters).order_by(
+            *(getattr(self.model_class, name) for name in order_by)
+        )
+        async for batch in self.stream(stmt, batch_size):
+            yield batch
+
+    def _filtered_select(self, filters: Dict[str, Any]) -> Select:
+        """Select of the model with field equality filters applied"""
+        stmt = select(self.model_class)
+        for field_name, value in filters.items():
+            if hasattr(self.model_class, field_name):
+                stmt = stmt.where(getattr(self.model_class, field_name) == value)
+        return stmt
@@ -130,6 +130,45 @@ class FamilyRepository:
                 f"Failed to get user families: {str(e)}", operation="get_user_families"
             )
 
+    async def get_user_memberships(self, user_id: str) -> Dict[str, FamilyRole]:
+        """Get a user's role in every active family they belong to, in one query"""
+        try:
+            from ..database.family_models import FamilyDB, FamilyMemberDB
+            from sqlalchemy import select
+
+            stmt = select(FamilyMemberDB.family_id, FamilyMemberDB.role).join(
+                FamilyDB, FamilyDB.family_id == FamilyMemberDB.family_id
+            ).where(
+                FamilyMemberDB.user_id == user_id,
+                FamilyMemberDB.is_active == True,
+                FamilyDB.is_active == True
+            )
+            result = await self.session.execute(stmt)
+
+            memberships = {
+                family_id: self._to_family_role(role)
+                for family_id, role in result.all()
+            }
+
+            logger.debug(f"✅ 用户家庭角色查询成功: {len(memberships)} 个家庭 (用户: {user_id})")
+            return memberships
+
+        except SQLAlchemyError as e:
+            logger.error(f"Database error getting user memberships: {e}")
+            raise DatabaseError(
+                f"Failed to get user memberships: {str(e)}",
+                operation="get_user_memberships",
+            )
+
+    @staticmethod
+    def _to_family_role(role: str) -> FamilyRole:
+        """Map a stored role to FamilyRole; legacy "admin"/"member" rows map to manager/viewer"""
+        legacy_roles = {"admin": FamilyRole.MANAGER, "member": FamilyRole.VIEWER}
+        try:
+            return FamilyRole(role)
+        except ValueError:
+            return legacy_roles.get(role, FamilyRole.VIEWER)
+
     async def get_user_owned_families_count(self, user_id: str) -> int:
         """Get count of families owned by user"""
         try:
@@ -221,7 +260,7 @@ class FamilyRepository:
                     "username": f"user_{member_db.user_id[-4:]}",  # 临时用户名
                     "display_name": member_db.display_name or f"用户{member_db.user_id[-4:]}",
                     "email": f"user_{member_db.user_id[-4:]}@example.com",  # 临时邮箱
-                    "role": FamilyRole(member_db.role),
+                    "role": self._to_family_role(member_db.role),
                     "joined_at": member_db.joined_at,
                     "last_active": member_db.last_active,
                     "is_active": member_db.is_active
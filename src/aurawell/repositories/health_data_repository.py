@@ -5,12 +5,35 @@ Provides data access operations for health data (activity, sleep, heart rate, nu
 """
 
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from typing import (
+    Optional,
+    List,
+    Dict,
+    Any,
+    Sequence,
+    Tuple,
+    Union,
+    AsyncIterator,
+    NamedTuple,
+)
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, desc, asc
+from sqlalchemy import select, and_, func, desc, asc, Select
 from sqlalchemy.orm import selectinload
 
-from .base import BaseRepository
+from .base import DEFAULT_STREAM_BATCH_SIZE, BaseRepository
+from .heart_rate_repository import (
+    HeartRateChunkRepository,
+    HeartRatePoint,
+    HeartRateRollupPoint,
+)
+from ..config.settings import AuraWellSettings
+from ..database.timeseries import (
+    aggregate_buckets,
+    from_epoch_ms,
+    select_resolution,
+    to_epoch_ms,
+)
 from ..database.models import (
     ActivitySummaryDB,
     SleepSessionDB,
@@ -25,12 +48,53 @@ from ..models.health_data_model import (
 )
 from ..models.enums import HealthPlatform, DataQuality
 
+# Upsert keys; each matches a unique constraint in database.models
+DAILY_UPSERT_KEYS = ("user_id", "date", "source_platform")
+HEART_RATE_UPSERT_KEYS = ("user_id", "timestamp_utc", "source_platform")
+
+# Keyset pagination sort keys; each leads with an indexed (user_id, ...) column
+DAILY_PAGE_KEYS = ("date",)
+HEART_RATE_PAGE_KEYS = ("timestamp_utc",)
+DEFAULT_PAGE_SIZE = 100
+
+
+class ActivitySummaryLite(NamedTuple):
+    """Read-only activity summary columns, loaded without ORM instrumentation"""
+
+    date: date
+    steps: Optional[int]
+    distance_meters: Optional[float]
+    active_calories: Optional[float]
+    active_minutes: Optional[int]
+
+
+class SleepSessionLite(NamedTuple):
+    """Read-only sleep session columns, loaded without ORM instrumentation"""
+
+    date: date
+    total_sleep_minutes: Optional[int]
+    deep_sleep_minutes: Optional[int]
+    light_sleep_minutes: Optional[int]
+    rem_sleep_minutes: Optional[int]
+    sleep_efficiency: Optional[float]
+
 
 class HealthDataRepository:
     """Repository for health data operations"""
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, heart_rate_storage: Optional[str] = None):
+        """
+        Initialize repository
+
+        Args:
+            session: Database session
+            heart_rate_storage: ``chunked`` or ``rows``; defaults to the
+                HEART_RATE_STORAGE setting
+        """
         self.session = session
+        self.heart_rate_storage = (
+            heart_rate_storage or AuraWellSettings.HEART_RATE_STORAGE
+        )
         self.activity_repo = BaseRepository[ActivitySummaryDB](
             session, ActivitySummaryDB
         )
@@ -38,6 +102,7 @@ class HealthDataRepository:
         self.heart_rate_repo = BaseRepository[HeartRateSampleDB](
             session, HeartRateSampleDB
         )
+        self.heart_rate_chunk_repo = HeartRateChunkRepository(session)
         self.nutrition_repo = BaseRepository[NutritionEntryDB](
             session, NutritionEntryDB
         )
@@ -56,7 +121,37 @@ class HealthDataRepository:
         Returns:
             Saved ActivitySummaryDB instance
         """
-        activity_data = {
+        activity_data = self._activity_row(user_id, activity)
+
+        # Use upsert to handle duplicates
+        unique_fields = {
+            "user_id": user_id,
+            "date": activity_data["date"],
+            "source_platform": activity_data["source_platform"],
+        }
+
+        return await self.activity_repo.upsert(unique_fields, **activity_data)
+
+    async def save_activity_summaries(
+        self, user_id: str, activities: Sequence[UnifiedActivitySummary]
+    ) -> int:
+        """
+        Save many activity summaries with a bulk upsert
+
+        Args:
+            user_id: User identifier
+            activities: UnifiedActivitySummary Pydantic models
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        rows = [self._activity_row(user_id, activity) for activity in activities]
+        return await self.activity_repo.bulk_upsert(rows, DAILY_UPSERT_KEYS)
+
+    @staticmethod
+    def _activity_row(user_id: str, activity: UnifiedActivitySummary) -> Dict[str, Any]:
+        """Map an activity summary to ActivitySummaryDB column values"""
+        return {
             "user_id": user_id,
             "date": datetime.strptime(activity.date, "%Y-%m-%d").date(),
             "steps": activity.steps,
@@ -69,15 +164,6 @@ class HealthDataRepository:
             "recorded_at": activity.recorded_at,
         }
 
-        # Use upsert to handle duplicates
-        unique_fields = {
-            "user_id": user_id,
-            "date": activity_data["date"],
-            "source_platform": activity_data["source_platform"],
-        }
-
-        return await self.activity_repo.upsert(unique_fields, **activity_data)
-
     async def get_activity_summaries(
         self,
         user_id: str,
@@ -99,15 +185,7 @@ class HealthDataRepository:
         Returns:
             List of ActivitySummaryDB instances
         """
-        stmt = select(ActivitySummaryDB).where(ActivitySummaryDB.user_id == user_id)
-
-        if start_date:
-            stmt = stmt.where(ActivitySummaryDB.date >= start_date)
-        if end_date:
-            stmt = stmt.where(ActivitySummaryDB.date <= end_date)
-        if platform:
-            stmt = stmt.where(ActivitySummaryDB.source_platform == platform)
-
+        stmt = self._activity_select(user_id, start_date, end_date, platform)
         stmt = stmt.order_by(desc(ActivitySummaryDB.date))
 
         if limit:
@@ -116,6 +194,116 @@ class HealthDataRepository:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_activity_summaries_lite(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        platform: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[ActivitySummaryLite]:
+        """
+        Read-only variant of ``get_activity_summaries`` for display paths
+
+        Selects only the ``ActivitySummaryLite`` columns, so no ORM instances
+        are built or tracked in the session's identity map.
+
+        Args:
+            user_id: User identifier
+            start_date: Start date filter
+            end_date: End date filter
+            platform: Platform filter
+            limit: Maximum number of records
+
+        Returns:
+            List of ActivitySummaryLite, newest first
+        """
+        stmt = self._activity_select(
+            user_id,
+            start_date,
+            end_date,
+            platform,
+            columns=[
+                getattr(ActivitySummaryDB, name) for name in ActivitySummaryLite._fields
+            ],
+        ).order_by(desc(ActivitySummaryDB.date))
+
+        if limit:
+            stmt = stmt.limit(limit)
+
+        result = await self.session.execute(stmt)
+        return list(map(ActivitySummaryLite._make, result))
+
+    async def get_activity_summaries_page(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        platform: Optional[str] = None,
+    ) -> Tuple[List[ActivitySummaryDB], Optional[str]]:
+        """
+        Get one keyset page of activity summaries, newest first
+
+        Args:
+            user_id: User identifier
+            limit: Maximum number of records in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first
+            start_date: Start date filter
+            end_date: End date filter
+            platform: Platform filter
+
+        Returns:
+            Tuple of (ActivitySummaryDB instances, next_cursor)
+        """
+        stmt = self._activity_select(user_id, start_date, end_date, platform)
+        return await self.activity_repo.paginate(stmt, DAILY_PAGE_KEYS, limit, cursor)
+
+    async def stream_activity_summaries(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        platform: Optional[str] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[ActivitySummaryDB]]:
+        """
+        Iterate activity summaries in batches, oldest first
+
+        Args:
+            user_id: User identifier
+            start_date: Start date filter
+            end_date: End date filter
+            platform: Platform filter
+            batch_size: Records per yielded batch
+
+        Yields:
+            Lists of ActivitySummaryDB instances
+        """
+        stmt = self._activity_select(user_id, start_date, end_date, platform)
+        stmt = stmt.order_by(ActivitySummaryDB.date, ActivitySummaryDB.id)
+        async for batch in self.activity_repo.stream(stmt, batch_size):
+            yield batch
+
+    @staticmethod
+    def _activity_select(
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        platform: Optional[str],
+        columns: Sequence[Any] = (ActivitySummaryDB,),
+    ) -> Select:
+        """Select activity summaries (or some of their columns), unordered"""
+        stmt = select(*columns).where(ActivitySummaryDB.user_id == user_id)
+        if start_date:
+            stmt = stmt.where(ActivitySummaryDB.date >= start_date)
+        if end_date:
+            stmt = stmt.where(ActivitySummaryDB.date <= end_date)
+        if platform:
+            stmt = stmt.where(ActivitySummaryDB.source_platform == platform)
+        return stmt
+
     async def get_latest_activity(
         self, user_id: str, platform: Optional[str] = None
     ) -> Optional[ActivitySummaryDB]:
@@ -153,12 +341,40 @@ class HealthDataRepository:
         Returns:
             Saved SleepSessionDB instance
         """
-        # Extract date from start_time_utc
-        sleep_date = sleep.start_time_utc.date()
+        sleep_data = self._sleep_row(user_id, sleep)
+
+        # Use upsert to handle duplicates
+        unique_fields = {
+            "user_id": user_id,
+            "date": sleep_data["date"],
+            "source_platform": sleep_data["source_platform"],
+        }
+
+        return await self.sleep_repo.upsert(unique_fields, **sleep_data)
+
+    async def save_sleep_sessions(
+        self, user_id: str, sleeps: Sequence[UnifiedSleepSession]
+    ) -> int:
+        """
+        Save many sleep sessions with a bulk upsert
+
+        Args:
+            user_id: User identifier
+            sleeps: UnifiedSleepSession Pydantic models
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        rows = [self._sleep_row(user_id, sleep) for sleep in sleeps]
+        return await self.sleep_repo.bulk_upsert(rows, DAILY_UPSERT_KEYS)
 
-        sleep_data = {
+    @staticmethod
+    def _sleep_row(user_id: str, sleep: UnifiedSleepSession) -> Dict[str, Any]:
+        """Map a sleep session to SleepSessionDB column values"""
+        return {
             "user_id": user_id,
-            "date": sleep_date,
+            # Extract date from start_time_utc
+            "date": sleep.start_time_utc.date(),
             "bedtime_utc": sleep.start_time_utc,
             "wake_time_utc": sleep.end_time_utc,
             "total_sleep_minutes": (
@@ -183,15 +399,6 @@ class HealthDataRepository:
             "recorded_at": sleep.recorded_at,
         }
 
-        # Use upsert to handle duplicates
-        unique_fields = {
-            "user_id": user_id,
-            "date": sleep_data["date"],
-            "source_platform": sleep_data["source_platform"],
-        }
-
-        return await self.sleep_repo.upsert(unique_fields, **sleep_data)
-
     async def get_sleep_sessions(
         self,
         user_id: str,
@@ -213,15 +420,7 @@ class HealthDataRepository:
         Returns:
             List of SleepSessionDB instances
         """
-        stmt = select(SleepSessionDB).where(SleepSessionDB.user_id == user_id)
-
-        if start_date:
-            stmt = stmt.where(SleepSessionDB.date >= start_date)
-        if end_date:
-            stmt = stmt.where(SleepSessionDB.date <= end_date)
-        if platform:
-            stmt = stmt.where(SleepSessionDB.source_platform == platform)
-
+        stmt = self._sleep_select(user_id, start_date, end_date, platform)
         stmt = stmt.order_by(desc(SleepSessionDB.date))
 
         if limit:
@@ -230,21 +429,179 @@ class HealthDataRepository:
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_sleep_sessions_lite(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        platform: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SleepSessionLite]:
+        """
+        Read-only variant of ``get_sleep_sessions`` for display paths
+
+        Args:
+            user_id: User identifier
+            start_date: Start date filter
+            end_date: End date filter
+            platform: Platform filter
+            limit: Maximum number of records
+
+        Returns:
+            List of SleepSessionLite, newest first
+        """
+        stmt = self._sleep_select(
+            user_id,
+            start_date,
+            end_date,
+            platform,
+            columns=[
+                getattr(SleepSessionDB, name) for name in SleepSessionLite._fields
+            ],
+        ).order_by(desc(SleepSessionDB.date))
+
+        if limit:
+            stmt = stmt.limit(limit)
+
+        result = await self.session.execute(stmt)
+        return list(map(SleepSessionLite._make, result))
+
+    async def get_sleep_sessions_page(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        platform: Optional[str] = None,
+    ) -> Tuple[List[SleepSessionDB], Optional[str]]:
+        """
+        Get one keyset page of sleep sessions, newest first
+
+        Args:
+            user_id: User identifier
+            limit: Maximum number of records in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first
+            start_date: Start date filter
+            end_date: End date filter
+            platform: Platform filter
+
+        Returns:
+            Tuple of (SleepSessionDB instances, next_cursor)
+        """
+        stmt = self._sleep_select(user_id, start_date, end_date, platform)
+        return await self.sleep_repo.paginate(stmt, DAILY_PAGE_KEYS, limit, cursor)
+
+    async def stream_sleep_sessions(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        platform: Optional[str] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[SleepSessionDB]]:
+        """
+        Iterate sleep sessions in batches, oldest first
+
+        Args:
+            user_id: User identifier
+            start_date: Start date filter
+            end_date: End date filter
+            platform: Platform filter
+            batch_size: Records per yielded batch
+
+        Yields:
+            Lists of SleepSessionDB instances
+        """
+        stmt = self._sleep_select(user_id, start_date, end_date, platform)
+        stmt = stmt.order_by(SleepSessionDB.date, SleepSessionDB.id)
+        async for batch in self.sleep_repo.stream(stmt, batch_size):
+            yield batch
+
+    @staticmethod
+    def _sleep_select(
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        platform: Optional[str],
+        columns: Sequence[Any] = (SleepSessionDB,),
+    ) -> Select:
+        """Select sleep sessions (or some of their columns), unordered"""
+        stmt = select(*columns).where(SleepSessionDB.user_id == user_id)
+        if start_date:
+            stmt = stmt.where(SleepSessionDB.date >= start_date)
+        if end_date:
+            stmt = stmt.where(SleepSessionDB.date <= end_date)
+        if platform:
+            stmt = stmt.where(SleepSessionDB.source_platform == platform)
+        return stmt
+
     # Heart Rate Data Methods
+    @property
+    def chunked_heart_rate(self) -> bool:
+        """Whether heart rate samples use chunked storage"""
+        return self.heart_rate_storage == "chunked"
+
     async def save_heart_rate_sample(
         self, user_id: str, heart_rate: UnifiedHeartRateSample
-    ) -> HeartRateSampleDB:
+    ) -> Union[HeartRateSampleDB, HeartRatePoint]:
         """
         Save heart rate sample data
 
+        Prefer ``save_heart_rate_samples`` for chunked storage; every call
+        rewrites the sample's day chunk.
+
         Args:
             user_id: User identifier
             heart_rate: UnifiedHeartRateSample Pydantic model
 
         Returns:
-            Saved HeartRateSampleDB instance
+            Saved HeartRateSampleDB instance, or a HeartRatePoint for chunked
+            storage
+        """
+        hr_data = self._heart_rate_row(user_id, heart_rate)
+
+        if self.chunked_heart_rate:
+            await self.heart_rate_chunk_repo.append_samples(user_id, [hr_data])
+            return HeartRatePoint(
+                user_id=user_id,
+                timestamp_utc=hr_data["timestamp_utc"],
+                bpm=hr_data["bpm"],
+                measurement_type=hr_data["measurement_type"],
+                source_platform=hr_data["source_platform"],
+                data_quality=hr_data["data_quality"],
+                recorded_at=hr_data["recorded_at"],
+            )
+
+        # Re-synced samples replace the stored reading instead of duplicating it
+        unique_fields = {key: hr_data[key] for key in HEART_RATE_UPSERT_KEYS}
+
+        return await self.heart_rate_repo.upsert(unique_fields, **hr_data)
+
+    async def save_heart_rate_samples(
+        self, user_id: str, heart_rates: Sequence[UnifiedHeartRateSample]
+    ) -> int:
         """
-        hr_data = {
+        Save many heart rate samples with a bulk upsert
+
+        Args:
+            user_id: User identifier
+            heart_rates: UnifiedHeartRateSample Pydantic models
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        rows = [self._heart_rate_row(user_id, sample) for sample in heart_rates]
+        if self.chunked_heart_rate:
+            return await self.heart_rate_chunk_repo.append_samples(user_id, rows)
+        return await self.heart_rate_repo.bulk_upsert(rows, HEART_RATE_UPSERT_KEYS)
+
+    @staticmethod
+    def _heart_rate_row(
+        user_id: str, heart_rate: UnifiedHeartRateSample
+    ) -> Dict[str, Any]:
+        """Map a heart rate sample to HeartRateSampleDB column values"""
+        return {
             "user_id": user_id,
             "timestamp_utc": heart_rate.timestamp_utc,
             "bpm": heart_rate.bpm,
@@ -255,8 +612,6 @@ class HealthDataRepository:
             "recorded_at": heart_rate.recorded_at,
         }
 
-        return await self.heart_rate_repo.create(**hr_data)
-
     async def get_heart_rate_samples(
         self,
         user_id: str,
@@ -264,7 +619,7 @@ class HealthDataRepository:
         end_time: Optional[datetime] = None,
         measurement_type: Optional[str] = None,
         limit: Optional[int] = None,
-    ) -> List[HeartRateSampleDB]:
+    ) -> List[Union[HeartRateSampleDB, HeartRatePoint]]:
         """
         Get heart rate samples for user with optional filters
 
@@ -276,24 +631,171 @@ class HealthDataRepository:
             limit: Maximum number of records
 
         Returns:
-            List of HeartRateSampleDB instances
+            List of HeartRateSampleDB instances, or HeartRatePoint tuples with
+            the same attributes for chunked storage
         """
-        stmt = select(HeartRateSampleDB).where(HeartRateSampleDB.user_id == user_id)
+        if self.chunked_heart_rate:
+            return await self.heart_rate_chunk_repo.get_samples(
+                user_id, start_time, end_time, measurement_type, limit
+            )
+
+        stmt = self._heart_rate_select(user_id, start_time, end_time, measurement_type)
+        stmt = stmt.order_by(desc(HeartRateSampleDB.timestamp_utc))
+
+        if limit:
+            stmt = stmt.limit(limit)
+
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
 
+    async def get_heart_rate_samples_page(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        measurement_type: Optional[str] = None,
+    ) -> Tuple[List[Union[HeartRateSampleDB, HeartRatePoint]], Optional[str]]:
+        """
+        Get one keyset page of heart rate samples, newest first
+
+        Cursors are specific to the storage mode that produced them.
+
+        Args:
+            user_id: User identifier
+            limit: Maximum number of records in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first
+            start_time: Start timestamp filter
+            end_time: End timestamp filter
+            measurement_type: Measurement type filter
+
+        Returns:
+            Tuple of (samples, next_cursor)
+        """
+        if self.chunked_heart_rate:
+            return await self.heart_rate_chunk_repo.get_samples_page(
+                user_id, limit, cursor, start_time, end_time, measurement_type
+            )
+
+        stmt = self._heart_rate_select(user_id, start_time, end_time, measurement_type)
+        return await self.heart_rate_repo.paginate(
+            stmt, HEART_RATE_PAGE_KEYS, limit, cursor
+        )
+
+    async def stream_heart_rate_samples(
+        self,
+        user_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        measurement_type: Optional[str] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[Union[HeartRateSampleDB, HeartRatePoint]]]:
+        """
+        Iterate heart rate samples in batches, oldest first
+
+        Args:
+            user_id: User identifier
+            start_time: Start timestamp filter
+            end_time: End timestamp filter
+            measurement_type: Measurement type filter
+            batch_size: Records per yielded batch
+
+        Yields:
+            Lists of HeartRateSampleDB instances or HeartRatePoint tuples
+        """
+        if self.chunked_heart_rate:
+            batches = self.heart_rate_chunk_repo.stream_samples(
+                user_id, start_time, end_time, measurement_type, batch_size
+            )
+        else:
+            stmt = self._heart_rate_select(
+                user_id, start_time, end_time, measurement_type
+            ).order_by(HeartRateSampleDB.timestamp_utc, HeartRateSampleDB.id)
+            batches = self.heart_rate_repo.stream(stmt, batch_size)
+
+        async for batch in batches:
+            yield batch
+
+    @staticmethod
+    def _heart_rate_select(
+        user_id: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        measurement_type: Optional[str],
+    ) -> Select:
+        """Select heart rate sample rows matching the filters, unordered"""
+        stmt = select(HeartRateSampleDB).where(HeartRateSampleDB.user_id == user_id)
         if start_time:
             stmt = stmt.where(HeartRateSampleDB.timestamp_utc >= start_time)
         if end_time:
             stmt = stmt.where(HeartRateSampleDB.timestamp_utc <= end_time)
         if measurement_type:
             stmt = stmt.where(HeartRateSampleDB.measurement_type == measurement_type)
+        return stmt
 
-        stmt = stmt.order_by(desc(HeartRateSampleDB.timestamp_utc))
+    async def get_heart_rate_series(
+        self,
+        user_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        points: Optional[int] = None,
+        measurement_type: Optional[str] = None,
+    ) -> Tuple[str, List[HeartRateRollupPoint]]:
+        """
+        Get heart rate for charting, downsampled to the requested point count
 
-        if limit:
-            stmt = stmt.limit(limit)
+        Picks the coarsest of the 1h/5m/1m rollups that still yields at least
+        ``points`` buckets over the range, falling back to raw samples.
 
-        result = await self.session.execute(stmt)
-        return list(result.scalars().all())
+        Args:
+            user_id: User identifier
+            start_time: Range start
+            end_time: Range end
+            points: Requested number of points; ``None`` returns raw samples
+            measurement_type: Measurement type filter
+
+        Returns:
+            Tuple of (resolution name, points oldest first)
+        """
+        if self.chunked_heart_rate:
+            return await self.heart_rate_chunk_repo.get_series(
+                user_id, start_time, end_time, points, measurement_type
+            )
+
+        # Row storage has no rollups; aggregate the range on the fly
+        resolution, bucket_seconds = select_resolution(start_time, end_time, points)
+        stmt = (
+            select(HeartRateSampleDB.timestamp_utc, HeartRateSampleDB.bpm)
+            .where(
+                HeartRateSampleDB.user_id == user_id,
+                HeartRateSampleDB.timestamp_utc >= start_time,
+                HeartRateSampleDB.timestamp_utc <= end_time,
+            )
+            .order_by(asc(HeartRateSampleDB.timestamp_utc))
+        )
+        if measurement_type:
+            stmt = stmt.where(HeartRateSampleDB.measurement_type == measurement_type)
+        rows = (await self.session.execute(stmt)).all()
+
+        timestamps = np.fromiter(
+            (to_epoch_ms(row.timestamp_utc) for row in rows), np.int64, len(rows)
+        )
+        bpm = np.fromiter((row.bpm for row in rows), np.uint8, len(rows))
+        bucket_ms = bucket_seconds * 1000 or 1  # raw: one bucket per timestamp
+        rollup = aggregate_buckets(timestamps // bucket_ms * bucket_ms, bpm)
+        return resolution, [
+            HeartRateRollupPoint(
+                timestamp_utc=from_epoch_ms(bucket),
+                min_bpm=min_bpm,
+                max_bpm=max_bpm,
+                mean_bpm=round(mean_bpm, 2),
+                count=count,
+            )
+            for bucket, min_bpm, max_bpm, mean_bpm, count in zip(
+                *(field.tolist() for field in rollup)
+            )
+        ]
 
     # Nutrition Data Methods
     async def save_nutrition_entry(
@@ -309,7 +811,32 @@ class HealthDataRepository:
         Returns:
             Saved NutritionEntryDB instance
         """
-        nutrition_data = {
+        nutrition_data = self._nutrition_row(user_id, nutrition)
+        return await self.nutrition_repo.create(**nutrition_data)
+
+    async def save_nutrition_entries(
+        self, user_id: str, entries: Sequence[NutritionEntry]
+    ) -> int:
+        """
+        Save many nutrition entries with a bulk insert
+
+        Nutrition entries have no natural key (the same food can be logged
+        several times a day), so they are inserted rather than upserted.
+
+        Args:
+            user_id: User identifier
+            entries: NutritionEntry Pydantic models
+
+        Returns:
+            Number of rows inserted
+        """
+        rows = [self._nutrition_row(user_id, entry) for entry in entries]
+        return await self.nutrition_repo.bulk_insert(rows)
+
+    @staticmethod
+    def _nutrition_row(user_id: str, nutrition: NutritionEntry) -> Dict[str, Any]:
+        """Map a nutrition entry to NutritionEntryDB column values"""
+        return {
             "user_id": user_id,
             "date": datetime.strptime(nutrition.date, "%Y-%m-%d").date(),
             "meal_type": nutrition.meal_type,
@@ -328,8 +855,6 @@ class HealthDataRepository:
             "recorded_at": nutrition.recorded_at,
         }
 
-        return await self.nutrition_repo.create(**nutrition_data)
-
     async def get_nutrition_entries(
         self,
         user_id: str,
@@ -351,15 +876,7 @@ class HealthDataRepository:
         Returns:
             List of NutritionEntryDB instances
         """
-        stmt = select(NutritionEntryDB).where(NutritionEntryDB.user_id == user_id)
-
-        if start_date:
-            stmt = stmt.where(NutritionEntryDB.date >= start_date)
-        if end_date:
-            stmt = stmt.where(NutritionEntryDB.date <= end_date)
-        if meal_type:
-            stmt = stmt.where(NutritionEntryDB.meal_type == meal_type)
-
+        stmt = self._nutrition_select(user_id, start_date, end_date, meal_type)
         stmt = stmt.order_by(desc(NutritionEntryDB.date))
 
         if limit:
@@ -367,3 +884,72 @@ class HealthDataRepository:
 
         result = await self.session.execute(stmt)
         return list(result.scalars().all())
+
+    async def get_nutrition_entries_page(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        meal_type: Optional[str] = None,
+    ) -> Tuple[List[NutritionEntryDB], Optional[str]]:
+        """
+        Get one keyset page of nutrition entries, newest first
+
+        Args:
+            user_id: User identifier
+            limit: Maximum number of records in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first
+            start_date: Start date filter
+            end_date: End date filter
+            meal_type: Meal type filter
+
+        Returns:
+            Tuple of (NutritionEntryDB instances, next_cursor)
+        """
+        stmt = self._nutrition_select(user_id, start_date, end_date, meal_type)
+        return await self.nutrition_repo.paginate(stmt, DAILY_PAGE_KEYS, limit, cursor)
+
+    async def stream_nutrition_entries(
+        self,
+        user_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        meal_type: Optional[str] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[NutritionEntryDB]]:
+        """
+        Iterate nutrition entries in batches, oldest first
+
+        Args:
+            user_id: User identifier
+            start_date: Start date filter
+            end_date: End date filter
+            meal_type: Meal type filter
+            batch_size: Records per yielded batch
+
+        Yields:
+            Lists of NutritionEntryDB instances
+        """
+        stmt = self._nutrition_select(user_id, start_date, end_date, meal_type)
+        stmt = stmt.order_by(NutritionEntryDB.date, NutritionEntryDB.id)
+        async for batch in self.nutrition_repo.stream(stmt, batch_size):
+            yield batch
+
+    @staticmethod
+    def _nutrition_select(
+        user_id: str,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        meal_type: Optional[str],
+    ) -> Select:
+        """Select nutrition entries matching the filters, unordered"""
+        stmt = select(NutritionEntryDB).where(NutritionEntryDB.user_id == user_id)
+        if start_date:
+            stmt = stmt.where(NutritionEntryDB.date >= start_date)
+        if end_date:
+            stmt = stmt.where(NutritionEntryDB.date <= end_date)
+        if meal_type:
+            stmt = stmt.where(NutritionEntryDB.meal_type == meal_type)
+        return stmt
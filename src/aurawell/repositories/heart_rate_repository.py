@@ -0,0 +1,600 @@
+"""
+Heart Rate Chunk Repository
+
+Stores heart rate samples as per-user/per-day chunks (see
+``database.timeseries``) and serves raw samples or precomputed rollups for a
+time range.
+"""
+
+import asyncio
+import weakref
+from datetime import date, datetime, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+from sqlalchemy import false, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .base import (
+    DEFAULT_STREAM_BATCH_SIZE,
+    BaseRepository,
+    decode_cursor,
+    encode_cursor,
+)
+from ..database.models import HeartRateChunkDB
+from ..database.timeseries import (
+    RAW_RESOLUTION,
+    ROLLUP_RESOLUTIONS,
+    Rollup,
+    combine_rollups,
+    day_start_ms,
+    decode_rollup,
+    decode_samples,
+    encode_chunk,
+    from_epoch_ms,
+    merge_samples,
+    select_resolution,
+    to_epoch_ms,
+)
+
+CHUNK_UPSERT_KEYS = ("user_id", "date", "source_platform", "measurement_type")
+
+# Per-user locks serializing the read-merge-write of appends in this process
+_append_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+
+# Chunk columns needed to rebuild HeartRatePoint tuples
+SAMPLE_COLUMNS = (
+    HeartRateChunkDB.date,
+    HeartRateChunkDB.source_platform,
+    HeartRateChunkDB.measurement_type,
+    HeartRateChunkDB.data_quality,
+    HeartRateChunkDB.recorded_at,
+    HeartRateChunkDB.samples,
+)
+
+
+class HeartRatePoint(NamedTuple):
+    """Heart rate sample read from a chunk
+
+    Attribute-compatible with ``HeartRateSampleDB`` so callers of
+    ``HealthDataRepository.get_heart_rate_samples`` work with either storage.
+    Per-sample ``context`` is not kept in chunks and is always ``None``.
+    """
+
+    user_id: str
+    timestamp_utc: datetime
+    bpm: int
+    measurement_type: str
+    source_platform: str
+    data_quality: str
+    recorded_at: datetime
+    context: Optional[str] = None
+
+
+class HeartRateRollupPoint(NamedTuple):
+    """Aggregated heart rate for one bucket (a single sample at raw resolution)"""
+
+    timestamp_utc: datetime
+    min_bpm: int
+    max_bpm: int
+    mean_bpm: float
+    count: int
+
+
+def _utc_date(value: datetime) -> date:
+    """UTC calendar day of a datetime; naive values are treated as UTC"""
+    if value.tzinfo is None:
+        return value.date()
+    return value.astimezone(timezone.utc).date()
+
+
+class HeartRateChunkRepository(BaseRepository[HeartRateChunkDB]):
+    """Repository for chunked heart rate storage"""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, HeartRateChunkDB)
+
+    def _chunk_query(
+        self,
+        columns: Sequence[Any],
+        user_id: str,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        measurement_type: Optional[str],
+        newest_first: bool = False,
+    ):
+        """Select chunk columns (not ORM instances) overlapping a time range
+
+        Chunks come back in a fixed order so samples sharing a timestamp are
+        always returned in the same order, which cursor pagination relies on.
+        ``newest_first`` only reverses the day order; chunks within a day keep
+        their order.
+        """
+        stmt = select(*columns).where(HeartRateChunkDB.user_id == user_id)
+        if start_time:
+            stmt = stmt.where(HeartRateChunkDB.date >= _utc_date(start_time))
+        if end_time:
+            stmt = stmt.where(HeartRateChunkDB.date <= _utc_date(end_time))
+        if measurement_type:
+            stmt = stmt.where(HeartRateChunkDB.measurement_type == measurement_type)
+        return stmt.order_by(
+            HeartRateChunkDB.date.desc() if newest_first else HeartRateChunkDB.date,
+            HeartRateChunkDB.source_platform,
+            HeartRateChunkDB.measurement_type,
+        )
+
+    @staticmethod
+    def _points(
+        user_id: str,
+        chunks: Sequence[Any],
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        descending: bool,
+        limit: Optional[int] = None,
+    ) -> List[HeartRatePoint]:
+        """Decode chunk rows into time-ordered points within a range"""
+        if not chunks:
+            return []
+
+        start_ms = to_epoch_ms(start_time) if start_time else None
+        end_ms = to_epoch_ms(end_time) if end_time else None
+        timestamp_parts, bpm_parts, chunk_parts = [], [], []
+        for index, chunk in enumerate(chunks):
+            timestamps, bpm = decode_samples(chunk.samples)
+            mask = np.ones(len(timestamps), dtype=bool)
+            if start_ms is not None:
+                mask &= timestamps >= start_ms
+            if end_ms is not None:
+                mask &= timestamps <= end_ms
+            timestamp_parts.append(timestamps[mask])
+            bpm_parts.append(bpm[mask])
+            chunk_parts.append(np.full(int(mask.sum()), index, dtype=np.int32))
+
+        timestamps = np.concatenate(timestamp_parts)
+        bpm = np.concatenate(bpm_parts)
+        chunk_index = np.concatenate(chunk_parts)
+        order = np.argsort(timestamps, kind="stable")
+        if descending:
+            order = order[::-1]
+        if limit:
+            order = order[:limit]
+
+        # Plain Python lists; per-element numpy scalar access is far slower
+        points = []
+        for timestamp, value, index in zip(
+            timestamps[order].tolist(),
+            bpm[order].tolist(),
+            chunk_index[order].tolist(),
+        ):
+            chunk = chunks[index]
+            points.append(
+                HeartRatePoint(
+                    user_id=user_id,
+                    timestamp_utc=from_epoch_ms(timestamp),
+                    bpm=value,
+                    measurement_type=chunk.measurement_type,
+                    source_platform=chunk.source_platform,
+                    data_quality=chunk.data_quality,
+                    recorded_at=chunk.recorded_at,
+                )
+            )
+        return points
+
+    async def append_samples(
+        self, user_id: str, samples: Sequence[Dict[str, Any]]
+    ) -> int:
+        """
+        Merge samples into their day chunks and refresh the rollups
+
+        Samples replace stored samples with the same timestamp, source and
+        measurement type. Concurrent appends for the same user are
+        serialized (see ``_lock_days``), so neither overwrites the other's
+        samples.
+
+        Args:
+            user_id: User identifier
+            samples: ``HeartRateSampleDB`` column dictionaries
+
+        Returns:
+            Number of samples written
+        """
+        groups: Dict[Tuple[date, str, str], List[Dict[str, Any]]] = {}
+        for sample in samples:
+            key = (
+                _utc_date(sample["timestamp_utc"]),
+                sample["source_platform"],
+                sample.get("measurement_type") or "unknown",
+            )
+            groups.setdefault(key, []).append(sample)
+        if not groups:
+            return 0
+
+        await self._lock_days(user_id, {key[0] for key in groups})
+        lock = _append_locks.get(user_id)
+        if lock is None:
+            lock = _append_locks[user_id] = asyncio.Lock()
+        async with lock:
+            return await self._merge_groups(user_id, groups, len(samples))
+
+    async def _lock_days(self, user_id: str, days: Set[date]) -> None:
+        """
+        Lock a user's day chunks until the transaction ends
+
+        PostgreSQL takes a transaction advisory lock per day, which also
+        covers chunks that do not exist yet; SQLite takes the database write
+        lock before reading. Both are re-entrant within the transaction, and
+        the in-process lock in ``append_samples`` covers sessions sharing one
+        SQLite connection.
+        """
+        dialect_name = self._dialect_name()
+        if dialect_name == "postgresql":
+            # Sorted so concurrent appends lock days in the same order
+            for day in sorted(days):
+                await self.session.execute(
+                    select(
+                        func.pg_advisory_xact_lock(
+                            func.hashtext(f"heart_rate_chunks:{user_id}:{day}")
+                        )
+                    )
+                )
+        elif dialect_name == "sqlite":
+            await self.session.execute(
+                update(HeartRateChunkDB)
+                .where(false())
+                .values(user_id=HeartRateChunkDB.user_id)
+                .execution_options(synchronize_session=False)
+            )
+
+    async def _merge_groups(
+        self,
+        user_id: str,
+        groups: Dict[Tuple[date, str, str], List[Dict[str, Any]]],
+        sample_count: int,
+    ) -> int:
+        """Read the affected day chunks, merge the new samples and write them back"""
+        # Plain column rows, so stale identity-mapped chunks are never reused
+        stmt = select(
+            HeartRateChunkDB.date,
+            HeartRateChunkDB.source_platform,
+            HeartRateChunkDB.measurement_type,
+            HeartRateChunkDB.samples,
+        ).where(
+            HeartRateChunkDB.user_id == user_id,
+            HeartRateChunkDB.date.in_({key[0] for key in groups}),
+        )
+        result = await self.session.execute(stmt)
+        existing = {
+            (row.date, row.source_platform, row.measurement_type): row.samples
+            for row in result
+        }
+
+        chunk_rows = []
+        for key, group in groups.items():
+            day, source_platform, measurement_type = key
+            # Reversed so the last of several samples with one timestamp wins
+            new_timestamps = np.fromiter(
+                (to_epoch_ms(sample["timestamp_utc"]) for sample in reversed(group)),
+                dtype=np.int64,
+                count=len(group),
+            )
+            new_bpm = np.fromiter(
+                (sample["bpm"] for sample in reversed(group)),
+                dtype=np.uint8,
+                count=len(group),
+            )
+
+            if key in existing:
+                timestamps, bpm = decode_samples(existing[key])
+            else:
+                timestamps, bpm = np.empty(0, np.int64), np.empty(0, np.uint8)
+            timestamps, bpm = merge_samples(timestamps, bpm, new_timestamps, new_bpm)
+
+            latest = group[-1]
+            chunk_rows.append(
+                {
+                    "user_id": user_id,
+                    "date": day,
+                    "source_platform": source_platform,
+                    "measurement_type": measurement_type,
+                    "sample_count": len(timestamps),
+                    "first_timestamp_utc": from_epoch_ms(timestamps[0]),
+                    "last_timestamp_utc": from_epoch_ms(timestamps[-1]),
+                    **encode_chunk(timestamps, bpm, day),
+                    "data_quality": latest.get("data_quality") or "unknown",
+                    "recorded_at": latest["recorded_at"],
+                }
+            )
+
+        await self.bulk_upsert(chunk_rows, CHUNK_UPSERT_KEYS)
+        return sample_count
+
+    async def get_samples(
+        self,
+        user_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        measurement_type: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[HeartRatePoint]:
+        """
+        Get raw samples, newest first
+
+        Args:
+            user_id: User identifier
+            start_time: Start timestamp filter
+            end_time: End timestamp filter
+            measurement_type: Measurement type filter
+            limit: Maximum number of samples
+
+        Returns:
+            List of HeartRatePoint
+        """
+        if not limit:
+            stmt = self._chunk_query(
+                SAMPLE_COLUMNS, user_id, start_time, end_time, measurement_type
+            )
+            chunks = (await self.session.execute(stmt)).all()
+            return self._points(
+                user_id, chunks, start_time, end_time, descending=True
+            )
+
+        # Decode one day at a time, newest first, and stop once the limit is
+        # filled; a chunk only holds samples of its own day, so older days
+        # cannot contribute newer samples
+        stmt = self._chunk_query(
+            SAMPLE_COLUMNS,
+            user_id,
+            start_time,
+            end_time,
+            measurement_type,
+            newest_first=True,
+        )
+        result = await self.session.stream(stmt.execution_options(yield_per=16))
+        points: List[HeartRatePoint] = []
+        day_chunks: List[Any] = []
+        try:
+            async for chunk in result:
+                if day_chunks and chunk.date != day_chunks[0].date:
+                    points.extend(
+                        self._points(
+                            user_id,
+                            day_chunks,
+                            start_time,
+                            end_time,
+                            descending=True,
+                            limit=limit - len(points),
+                        )
+                    )
+                    day_chunks = []
+                    if len(points) >= limit:
+                        break
+                day_chunks.append(chunk)
+        finally:
+            await result.close()
+
+        if day_chunks and len(points) < limit:
+            points.extend(
+                self._points(
+                    user_id,
+                    day_chunks,
+                    start_time,
+                    end_time,
+                    descending=True,
+                    limit=limit - len(points),
+                )
+            )
+        return points
+
+    async def get_samples_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        measurement_type: Optional[str] = None,
+    ) -> Tuple[List[HeartRatePoint], Optional[str]]:
+        """
+        Get one cursor page of raw samples, newest first
+
+        The cursor holds the last returned timestamp and how many samples at
+        that exact timestamp were already returned, so samples from several
+        sources sharing a timestamp are never skipped or repeated.
+        Later pages seek straight to the cursor's day: decoding starts there
+        and walks back only until the page is filled.
+
+        Args:
+            user_id: User identifier
+            limit: Maximum number of samples in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first
+            start_time: Start timestamp filter
+            end_time: End timestamp filter
+            measurement_type: Measurement type filter
+
+        Returns:
+            Tuple of (samples, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        skip = 0
+        if cursor:
+            # The boundary already respects end_time, it came from its results
+            end_time, skip = decode_cursor(cursor, (datetime, int))
+
+        samples = await self.get_samples(
+            user_id, start_time, end_time, measurement_type, limit + skip + 1
+        )
+        samples = samples[skip:]
+        if len(samples) <= limit:
+            return samples, None
+
+        samples = samples[:limit]
+        last = samples[-1].timestamp_utc
+        seen = sum(1 for sample in samples if sample.timestamp_utc == last)
+        if last == end_time:
+            seen += skip
+        return samples, encode_cursor([last, seen])
+
+    async def stream_samples(
+        self,
+        user_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        measurement_type: Optional[str] = None,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[List[HeartRatePoint]]:
+        """
+        Iterate raw samples oldest first, decoding one day of chunks at a time
+
+        Args:
+            user_id: User identifier
+            start_time: Start timestamp filter
+            end_time: End timestamp filter
+            measurement_type: Measurement type filter
+            batch_size: Samples per yielded batch
+
+        Yields:
+            Lists of up to ``batch_size`` HeartRatePoint
+        """
+        stmt = self._chunk_query(
+            SAMPLE_COLUMNS, user_id, start_time, end_time, measurement_type
+        )
+        result = await self.session.stream(stmt.execution_options(yield_per=16))
+
+        day_chunks: List[Any] = []
+        async for chunk in result:
+            if day_chunks and chunk.date != day_chunks[0].date:
+                points = self._points(
+                    user_id, day_chunks, start_time, end_time, descending=False
+                )
+                for start in range(0, len(points), batch_size):
+                    yield points[start : start + batch_size]
+                day_chunks = []
+            day_chunks.append(chunk)
+
+        points = self._points(
+            user_id, day_chunks, start_time, end_time, descending=False
+        )
+        for start in range(0, len(points), batch_size):
+            yield points[start : start + batch_size]
+
+    async def get_rollups(
+        self,
+        user_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        resolution: str,
+        measurement_type: Optional[str] = None,
+    ) -> List[HeartRateRollupPoint]:
+        """
+        Get precomputed rollups for a time range, oldest first
+
+        Buckets from different sources or measurement types are combined.
+
+        Args:
+            user_id: User identifier
+            start_time: Range start
+            end_time: Range end
+            resolution: One of ``1m``, ``5m`` or ``1h``
+            measurement_type: Measurement type filter
+
+        Returns:
+            List of HeartRateRollupPoint, one per bucket with data
+        """
+        bucket_seconds = dict(ROLLUP_RESOLUTIONS).get(resolution)
+        if bucket_seconds is None:
+            raise ValueError(f"Unknown heart rate resolution: {resolution}")
+
+        column = getattr(HeartRateChunkDB, f"rollup_{resolution}")
+        stmt = self._chunk_query(
+            (HeartRateChunkDB.date, column),
+            user_id,
+            start_time,
+            end_time,
+            measurement_type,
+        )
+        chunks = (await self.session.execute(stmt)).all()
+        if not chunks:
+            return []
+
+        bucket_ms = bucket_seconds * 1000
+        parts = []
+        for chunk_date, payload in chunks:
+            rollup = decode_rollup(payload)
+            starts = (
+                day_start_ms(chunk_date) + rollup.bucket.astype(np.int64) * bucket_ms
+            )
+            parts.append(rollup._replace(bucket=starts))
+        rollup = combine_rollups(Rollup(*map(np.concatenate, zip(*parts))))
+
+        # Keep every bucket overlapping [start_time, end_time]
+        mask = (rollup.bucket > to_epoch_ms(start_time) - bucket_ms) & (
+            rollup.bucket <= to_epoch_ms(end_time)
+        )
+        return [
+            HeartRateRollupPoint(
+                timestamp_utc=from_epoch_ms(bucket),
+                min_bpm=min_bpm,
+                max_bpm=max_bpm,
+                mean_bpm=round(mean_bpm, 2),
+                count=count,
+            )
+            for bucket, min_bpm, max_bpm, mean_bpm, count in zip(
+                *(field[mask].tolist() for field in rollup)
+            )
+        ]
+
+    async def get_series(
+        self,
+        user_id: str,
+        start_time: datetime,
+        end_time: datetime,
+        points: Optional[int] = None,
+        measurement_type: Optional[str] = None,
+    ) -> Tuple[str, List[HeartRateRollupPoint]]:
+        """
+        Get a chart-ready series at the coarsest resolution giving ``points``
+
+        Args:
+            user_id: User identifier
+            start_time: Range start
+            end_time: Range end
+            points: Requested number of points; ``None`` returns raw samples
+            measurement_type: Measurement type filter
+
+        Returns:
+            Tuple of (resolution name, points oldest first)
+        """
+        resolution, _ = select_resolution(start_time, end_time, points)
+        if resolution != RAW_RESOLUTION:
+            rollups = await self.get_rollups(
+                user_id, start_time, end_time, resolution, measurement_type
+            )
+            return resolution, rollups
+
+        samples = await self.get_samples(
+            user_id, start_time, end_time, measurement_type
+        )
+        return resolution, [
+            HeartRateRollupPoint(
+                timestamp_utc=sample.timestamp_utc,
+                min_bpm=sample.bpm,
+                max_bpm=sample.bpm,
+                mean_bpm=float(sample.bpm),
+                count=1,
+            )
+            for sample in reversed(samples)
+        ]
@@ -19,6 +19,7 @@ from ..models.api_models import (
     DataPrivacySettings,
 )
 from ..services.family_service import FamilyService
+from ..core.permission_resolver import permission_request_scope
 from ..core.exceptions import AuthorizationError, ValidationError
 
 logger = logging.getLogger(__name__)
@@ -188,22 +189,19 @@ class DataSanitizationService:
             if not family_id:
                 return False
 
-            # Check if both users are family members
-            requester_is_member = await self.family_service.is_family_member(
-                family_id, requester_user_id
-            )
-            target_is_member = await self.family_service.is_family_member(
-                family_id, target_user_id
-            )
+            # Check if both users are family members; the requester's
+            # membership lookup also yields their role
+            with permission_request_scope():
+                requester_role = await self._get_requester_role(
+                    requester_user_id, family_id
+                )
+                target_is_member = await self.family_service.is_family_member(
+                    family_id, target_user_id
+                )
 
-            if not (requester_is_member and target_is_member):
+            if requester_role is None or not target_is_member:
                 return False
 
-            # Get requester's role and permissions
-            requester_role = await self._get_requester_role(
-                requester_user_id, family_id
-            )
-
             # Check data type permissions
             return self._check_data_type_permissions(requester_role, data_types)
 
@@ -259,19 +257,10 @@ class DataSanitizationService:
     ) -> Optional[FamilyRole]:
         """Get requester's role in the family"""
         try:
-            family_info = await self.family_service.get_family_info(
+            return await self.family_service.get_user_family_role(
                 family_id, requester_user_id
             )
 
-            # Find requester's role in family members
-            # This is a simplified implementation - in real scenario,
-            # you'd query the family members table
-            if family_info.owner_id == requester_user_id:
-                return FamilyRole.OWNER
-            else:
-                # Default to viewer for now - should be retrieved from database
-                return FamilyRole.VIEWER
-
         except Exception as e:
             logger.error(f"Failed to get requester role: {e}")
             return None
@@ -12,6 +12,7 @@ from ..repositories.family_repository import FamilyRepository
 from ..repositories.user_repository import UserRepository
 from ..models.api_models import HealthAlert
 from ..config.health_constants import ALERT_CONSTANTS
+from ..core.message_bus import FAMILY, MessageBus, get_message_bus
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +25,13 @@ class FamilyInteractionService:
         interaction_repo: FamilyInteractionRepository,
         family_repo: FamilyRepository,
         user_repo: UserRepository,
+        message_bus: Optional[MessageBus] = None,
     ):
         self.interaction_repo = interaction_repo
         self.family_repo = family_repo
         self.user_repo = user_repo
+        # 告警通过 WebSocket 消息总线实时推送给在线的家庭成员（可跨 worker）
+        self.message_bus = message_bus or get_message_bus()
 
     # ============================================================================
     # 成员点赞功能
@@ -261,6 +265,22 @@ class FamilyInteractionService:
                 }
             )
             
+            await self._push_health_alert(
+                family_id,
+                {
+                    "alert_id": alert_id,
+                    "member_id": member_id,
+                    "alert_type": alert_type,
+                    "severity": severity,
+                    "title": title,
+                    "message": message,
+                    "recommendation": recommendation,
+                    "trigger_value": trigger_value,
+                    "threshold_value": threshold_value,
+                    "metric_unit": metric_unit,
+                },
+            )
+
             logger.info(f"为成员 {member_id} 创建健康告警: {alert_type} ({severity})")
             return alert_id
             
@@ -435,6 +455,23 @@ class FamilyInteractionService:
             # 日志记录失败不应该影响主要功能
             logger.warning(f"记录家庭活动日志失败: {e}")
 
+    async def _push_health_alert(self, family_id: str, alert: Dict[str, Any]) -> None:
+        """实时推送健康告警给在线的家庭成员"""
+        try:
+            await self.message_bus.publish_json(
+                FAMILY,
+                family_id,
+                {
+                    "type": "health_alert",
+                    "family_id": family_id,
+                    "alert": alert,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                },
+            )
+        except Exception as e:
+            # 推送失败不影响告警创建，成员仍可在告警列表中查看
+            logger.warning(f"推送健康告警失败: {e}")
+
     def _calculate_alert_statistics(self, alerts: List[Dict[str, Any]]) -> Dict[str, Any]:
         """计算告警统计信息"""
         stats = {
@@ -16,7 +16,7 @@ import uuid
 import logging
 import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
@@ -40,6 +40,14 @@ from ..core.exceptions import (
     AurawellException,
     DatabaseError,
 )
+from ..config.settings import AuraWellSettings
+from ..core.message_bus import (
+    FAMILY_MEMBERSHIP,
+    USER_MEMBERSHIP,
+    MessageBus,
+    get_message_bus,
+)
+from ..core.permission_resolver import FamilyPermissionResolver
 from ..database import get_database_manager
 from ..repositories.family_repository import FamilyRepository
 from ..repositories.user_repository import UserRepository
@@ -47,12 +55,42 @@ from ..repositories.user_repository import UserRepository
 logger = logging.getLogger(__name__)
 
 
+async def _load_user_memberships(user_id: str) -> Dict[str, FamilyRole]:
+    """Load a user's roles across all families with one query"""
+    async with get_database_manager().get_session() as session:
+        return await FamilyRepository(session).get_user_memberships(user_id)
+
+
+# Membership notices being published; keeps the tasks referenced until done
+_membership_notices: Set[asyncio.Task] = set()
+
+# Process-wide permission resolver shared by every FamilyService
+_permission_resolver: Optional[FamilyPermissionResolver] = None
+
+
+def get_family_permission_resolver() -> FamilyPermissionResolver:
+    """Get the process-wide family permission resolver"""
+    global _permission_resolver
+    if _permission_resolver is None:
+        _permission_resolver = FamilyPermissionResolver(
+            _load_user_memberships,
+            ttl=AuraWellSettings.FAMILY_PERMISSION_CACHE_TTL,
+            max_entries=AuraWellSettings.FAMILY_PERMISSION_CACHE_SIZE,
+        )
+    return _permission_resolver
+
+
 class FamilyService:
     """Service class for family management operations with database integration"""
 
-    def __init__(self, db_session: Optional[Session] = None):
+    def __init__(
+        self,
+        db_session: Optional[Session] = None,
+        message_bus: Optional[MessageBus] = None,
+    ):
         """Initialize family service with database session"""
         self.db_session = db_session
+        self.message_bus = message_bus or get_message_bus()
         self.db_manager = get_database_manager()
 
         # Import constants locally to avoid circular imports
@@ -71,6 +109,9 @@ class FamilyService:
             self.max_families = 3
             self.max_retry_attempts = 3
 
+        # Shared by every instance so invalidations reach all cached roles
+        self.permission_resolver = get_family_permission_resolver()
+
     async def _get_session(self):
         """Get database session with fallback to manager"""
         if self.db_session:
@@ -181,7 +222,9 @@ class FamilyService:
             return FamilyInfo(**family_data)
 
         try:
-            return await self._execute_with_retry(_create_family_operation)
+            family = await self._execute_with_retry(_create_family_operation)
+            self.invalidate_member_permissions(user_id=user_id)
+            return family
         except (ValidationError, ConflictError, NotFoundError):
             raise
         except Exception as e:
@@ -207,11 +250,6 @@ class FamilyService:
         async def _get_family_info_operation(
             family_repo: FamilyRepository, _user_repo: UserRepository
         ):
-            # Check if user is a member of the family
-            is_member = await family_repo.is_family_member(family_id, user_id)
-            if not is_member:
-                raise AuthorizationError("You are not a member of this family")
-
             family_data = await family_repo.get_family_by_id(family_id)
             if not family_data:
                 raise NotFoundError("Family not found", resource_type="family")
@@ -219,6 +257,10 @@ class FamilyService:
             return FamilyInfo(**family_data)
 
         try:
+            # Check if user is a member of the family
+            if not await self.is_family_member(family_id, user_id):
+                raise AuthorizationError("You are not a member of this family")
+
             return await self._execute_with_retry(_get_family_info_operation)
         except (NotFoundError, AuthorizationError):
             raise
@@ -427,7 +469,9 @@ class FamilyService:
             return FamilyInfo(**family_data)
 
         try:
-            return await self._execute_with_retry(_accept_invitation_operation)
+            family = await self._execute_with_retry(_accept_invitation_operation)
+            self.invalidate_member_permissions(user_id=user_id)
+            return family
         except (NotFoundError, ValidationError, AuthorizationError, ConflictError):
             raise
         except Exception as e:
@@ -454,10 +498,6 @@ class FamilyService:
         async def _get_family_members_operation(
             family_repo: FamilyRepository, _user_repo: UserRepository
         ):
-            is_member = await family_repo.is_family_member(family_id, user_id)
-            if not is_member:
-                raise AuthorizationError("You are not a member of this family")
-
             members_data = await family_repo.get_family_members(family_id)
 
             # 创建FamilyMember对象，确保数据类型正确
@@ -477,6 +517,9 @@ class FamilyService:
             return members
 
         try:
+            if not await self.is_family_member(family_id, user_id):
+                raise AuthorizationError("You are not a member of this family")
+
             return await self._execute_with_retry(_get_family_members_operation)
         except AuthorizationError:
             raise
@@ -504,40 +547,76 @@ class FamilyService:
         Raises:
             NotFoundError: If user is not a member
         """
+        role = await self.get_user_family_role(family_id, user_id)
+        if role is None:
+            raise NotFoundError(
+                "User is not a member of this family", resource_type="family_member"
+            )
 
-        async def _get_permissions_operation(
-            family_repo: FamilyRepository, _user_repo: UserRepository
-        ):
-            member = await family_repo.get_family_member(family_id, user_id)
-            if not member:
-                raise NotFoundError(
-                    "User is not a member of this family", resource_type="family_member"
-                )
+        return FamilyPermissionInfo(
+            family_id=family_id,
+            user_id=user_id,
+            role=role,
+            permissions=self._get_role_permissions(role),
+            can_invite_members=role in [FamilyRole.OWNER, FamilyRole.MANAGER],
+            can_remove_members=role in [FamilyRole.OWNER, FamilyRole.MANAGER],
+            can_view_all_data=role
+            in [FamilyRole.OWNER, FamilyRole.MANAGER, FamilyRole.VIEWER],
+            can_modify_family_settings=role == FamilyRole.OWNER,
+            can_delete_family=role == FamilyRole.OWNER,
+        )
 
-            role = member["role"]
-            permissions = self._get_role_permissions(role)
-
-            return FamilyPermissionInfo(
-                family_id=family_id,
-                user_id=user_id,
-                role=role,
-                permissions=permissions,
-                can_invite_members=role in [FamilyRole.OWNER, FamilyRole.MANAGER],
-                can_remove_members=role in [FamilyRole.OWNER, FamilyRole.MANAGER],
-                can_view_all_data=role
-                in [FamilyRole.OWNER, FamilyRole.MANAGER, FamilyRole.VIEWER],
-                can_modify_family_settings=role == FamilyRole.OWNER,
-                can_delete_family=role == FamilyRole.OWNER,
-            )
+    async def get_user_family_role(
+        self, family_id: str, user_id: str
+    ) -> Optional[FamilyRole]:
+        """
+        Get a user's role in a family from the permission cache
+
+        Args:
+            family_id: ID of the family
+            user_id: ID of the user
 
+        Returns:
+            Optional[FamilyRole]: The role, or None if the user is not a member
+        """
         try:
-            return await self._execute_with_retry(_get_permissions_operation)
-        except NotFoundError:
-            raise
+            return await self.permission_resolver.get_role(family_id, user_id)
         except Exception as e:
             logger.error(f"Failed to get user family permissions: {e}")
             raise BusinessLogicError(f"Failed to get user family permissions: {str(e)}")
 
+    async def is_family_member(self, family_id: str, user_id: str) -> bool:
+        """Check if a user is an active member of a family"""
+        return await self.get_user_family_role(family_id, user_id) is not None
+
+    def invalidate_member_permissions(
+        self, user_id: Optional[str] = None, family_id: Optional[str] = None
+    ) -> None:
+        """
+        Drop cached roles after a membership change
+
+        Role changes and member removals must call this with the affected
+        user; family-wide changes (e.g. deleting a family) pass family_id.
+        Also tells the WebSocket workers to refresh the family index of the
+        affected connected users.
+        """
+        if user_id:
+            self.permission_resolver.invalidate_user(user_id)
+            self._notify_membership_change(USER_MEMBERSHIP, user_id)
+        if family_id:
+            self.permission_resolver.invalidate_family(family_id)
+            self._notify_membership_change(FAMILY_MEMBERSHIP, family_id)
+
+    def _notify_membership_change(self, scope: str, target_id: str):
+        """Publish a membership notice on the message bus without waiting for it"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.message_bus.publish(scope, target_id, ""))
+        _membership_notices.add(task)
+        task.add_done_callback(_membership_notices.discard)
+
     def _get_role_permissions(self, role: FamilyRole) -> List[str]:
         """Get permissions for role"""
         permissions_map = {
@@ -6,7 +6,8 @@ AuraWell 多模型梯度服务
 import logging
 import time
 import os
-from typing import Dict, List, Optional, Any
+from collections import deque
+from typing import Deque, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
@@ -39,20 +40,175 @@ class ModelResponse:
     error_message: Optional[str] = None
 
 
+class CircuitState(Enum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class TierHealth:
+    """
+    单个模型级别的滑动窗口健康度与熔断器
+
+    最近 window_size 次调用用于计算成功率、超时率与延迟分位数，EWMA 跟踪近期
+    平均延迟，因此一段时间的故障不会永久拉低统计。连续失败达到阈值后熔断，
+    冷却 recovery_timeout 秒后半开，只放行一个探测请求：成功则恢复，失败则重新熔断。
+    """
+
+    def __init__(
+        self,
+        window_size: int = 100,
+        ewma_alpha: float = 0.2,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        min_samples: int = 5,
+    ):
+        self.window: Deque[Tuple[bool, bool, float]] = deque(maxlen=window_size)  # (成功, 超时, 耗时)
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.min_samples = min_samples
+
+        self.ewma_latency: Optional[float] = None
+        self.total_calls = 0
+        self.successful_calls = 0
+        self.timeout_count = 0
+        self.consecutive_failures = 0
+
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    def is_available(self) -> bool:
+        """是否可以发起请求（不占用半开探测名额）"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() - self.opened_at >= self.recovery_timeout
+        return not self.probe_in_flight
+
+    def allow_request(self) -> bool:
+        """
+        申请发起一次请求
+
+        Returns:
+            bool: 熔断中或半开探测已在进行时返回 False
+        """
+        if not self.is_available():
+            return False
+        if self.state == CircuitState.OPEN:
+            self.state = CircuitState.HALF_OPEN
+        if self.state == CircuitState.HALF_OPEN:
+            self.probe_in_flight = True
+        return True
+
+    def record(self, latency: float, success: bool, timeout: bool = False):
+        """记录一次已完成调用的结果"""
+        self.total_calls += 1
+        self.window.append((success, timeout, latency))
+        self.probe_in_flight = False
+
+        if success:
+            self.successful_calls += 1
+            self.consecutive_failures = 0
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency += self.ewma_alpha * (latency - self.ewma_latency)
+            if self.state != CircuitState.CLOSED:
+                logger.info("模型探测请求成功，熔断器关闭")
+                self.state = CircuitState.CLOSED
+            return
+
+        self.consecutive_failures += 1
+        if timeout:
+            self.timeout_count += 1
+        if (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != CircuitState.OPEN:
+                logger.warning(f"连续失败 {self.consecutive_failures} 次，熔断器打开")
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """请求被取消（如对冲请求落败），不计入健康统计"""
+        self.probe_in_flight = False
+
+    def percentile(self, q: float) -> Optional[float]:
+        """窗口内成功调用耗时的 q 分位数（最近邻法），样本不足时返回 None"""
+        latencies = sorted(latency for success, _, latency in self.window if success)
+        if len(latencies) < self.min_samples:
+            return None
+        index = max(0, min(len(latencies) - 1, round(q / 100 * len(latencies)) - 1))
+        return latencies[index]
+
+    def rate(self, timeouts: bool = False) -> Optional[float]:
+        """窗口内的成功率（或超时率），样本不足时返回 None"""
+        if len(self.window) < self.min_samples:
+            return None
+        hits = sum(1 for success, timeout, _ in self.window if (timeout if timeouts else success))
+        return hits / len(self.window)
+
+    @property
+    def health_score(self) -> float:
+        """0-1 的健康分：窗口成功率，熔断时为 0"""
+        if self.state == CircuitState.OPEN:
+            return 0.0
+        success_rate = self.rate()
+        return 1.0 if success_rate is None else round(success_rate, 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """性能报告用的统计快照"""
+        return {
+            "total_calls": self.total_calls,
+            "successful_calls": self.successful_calls,
+            "timeout_count": self.timeout_count,
+            "average_response_time": self.ewma_latency or 0.0,
+            "window_calls": len(self.window),
+            "window_success_rate": self.rate(),
+            "window_timeout_rate": self.rate(timeouts=True),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "health_score": self.health_score,
+            "circuit_state": self.state.value,
+        }
+
+
 class ModelFallbackService:
     """
     多模型梯度服务
     实现模型间的智能切换和降级机制
     """
     
-    def __init__(self, deepseek_client=None):
+    def __init__(
+        self,
+        deepseek_client=None,
+        enable_hedging: Optional[bool] = None,
+        request_budget: Optional[float] = None,
+    ):
         """
         初始化多模型服务
         
         Args:
             deepseek_client: DeepSeek客户端实例
+            enable_hedging: 高精度模型超过其 p95 耗时后是否并发请求快速模型，
+                默认读取 MODEL_HEDGING_ENABLED
+            request_budget: 单次 get_model_response 的总耗时预算（秒），
+                默认读取 MODEL_REQUEST_BUDGET
         """
         self.deepseek_client = deepseek_client
+        self.enable_hedging = (
+            enable_hedging
+            if enable_hedging is not None
+            else os.getenv("MODEL_HEDGING_ENABLED", "false").lower() == "true"
+        )
+        self.request_budget = request_budget or float(
+            os.getenv("MODEL_REQUEST_BUDGET", "240")
+        )
         
         # 模型配置字典 - 从环境变量读取模型名称
         self.model_configs = {
@@ -70,45 +226,20 @@ class ModelFallbackService:
             )
         }
         
-        # 性能统计
-        self.performance_stats = {
-            ModelTier.HIGH_PRECISION: {
-                "total_calls": 0,
-                "successful_calls": 0,
-                "average_response_time": 0.0,
-                "timeout_count": 0
-            },
-            ModelTier.FAST_RESPONSE: {
-                "total_calls": 0,
-                "successful_calls": 0,
-                "average_response_time": 0.0,
-                "timeout_count": 0
-            }
-        }
+        # 滑动窗口健康度与熔断器
+        self.tier_health = {tier: TierHealth() for tier in self.model_configs}
+        self.hedge_stats = {"fired": 0, "won": 0}
+        self.retry_backoff = 0.5  # 首次重试前的退避秒数，之后逐次翻倍
         
         # 上下文管理
         self.conversation_context = {}
         
         logger.info("多模型梯度服务初始化完成")
     
-    def _update_performance_stats(self, tier: ModelTier, response_time: float, success: bool, timeout: bool = False):
-        """更新性能统计"""
-        stats = self.performance_stats[tier]
-        stats["total_calls"] += 1
-        
-        if success:
-            stats["successful_calls"] += 1
-            # 更新平均响应时间
-            if stats["successful_calls"] == 1:
-                stats["average_response_time"] = response_time
-            else:
-                stats["average_response_time"] = (
-                    (stats["average_response_time"] * (stats["successful_calls"] - 1) + response_time) 
-                    / stats["successful_calls"]
-                )
-        
-        if timeout:
-            stats["timeout_count"] += 1
+    @property
+    def performance_stats(self) -> Dict[ModelTier, Dict[str, Any]]:
+        """各模型级别的统计快照"""
+        return {tier: health.snapshot() for tier, health in self.tier_health.items()}
     
     def _should_fallback_to_fast_model(self, tier: ModelTier) -> bool:
         """
@@ -123,18 +254,22 @@ class ModelFallbackService:
         if tier == ModelTier.FAST_RESPONSE:
             return False  # 已经是最快的模型了
         
-        stats = self.performance_stats[ModelTier.HIGH_PRECISION]
+        health = self.tier_health[ModelTier.HIGH_PRECISION]
         
-        # 如果高精度模型超时次数过多，建议降级
-        if stats["total_calls"] > 0:
-            timeout_rate = stats["timeout_count"] / stats["total_calls"]
-            if timeout_rate > 0.3:  # 超时率超过30%
-                logger.warning(f"高精度模型超时率过高({timeout_rate:.2%})，建议降级")
-                return True
+        # 熔断中且未到探测时间
+        if not health.is_available():
+            logger.warning("高精度模型熔断中，直接降级")
+            return True
+        
+        # 如果最近的超时率过高，建议降级
+        timeout_rate = health.rate(timeouts=True)
+        if timeout_rate is not None and timeout_rate > 0.3:  # 超时率超过30%
+            logger.warning(f"高精度模型超时率过高({timeout_rate:.2%})，建议降级")
+            return True
         
-        # 如果平均响应时间过长，建议降级
-        if stats["average_response_time"] > 120.0:  # 平均响应时间超过2分钟
-            logger.warning(f"高精度模型平均响应时间过长({stats['average_response_time']:.1f}s)，建议降级")
+        # 如果近期平均响应时间过长，建议降级
+        if health.ewma_latency is not None and health.ewma_latency > 120.0:  # 超过2分钟
+            logger.warning(f"高精度模型平均响应时间过长({health.ewma_latency:.1f}s)，建议降级")
             return True
         
         return False
@@ -208,17 +343,24 @@ class ModelFallbackService:
         preferred_tier: ModelTier = ModelTier.HIGH_PRECISION,
         temperature: float = 0.7,
         max_tokens: int = 1024,
+        hedge: Optional[bool] = None,
+        budget: Optional[float] = None,
         **kwargs
     ) -> ModelResponse:
         """
         获取模型响应，支持自动降级
         
+        每个模型最多尝试 1 + max_retries 次（仅对非超时错误重试），所有尝试共享
+        同一个总耗时预算；超时会真正取消进行中的请求。
+        
         Args:
             messages: 消息列表
             conversation_id: 对话ID，用于上下文管理
             preferred_tier: 首选模型级别
             temperature: 温度参数
             max_tokens: 最大token数
+            hedge: 是否启用对冲请求，默认使用服务配置
+            budget: 总耗时预算（秒），默认使用服务配置
             **kwargs: 其他参数
             
         Returns:
@@ -235,6 +377,7 @@ class ModelFallbackService:
         
         # 构建包含上下文的消息
         enhanced_messages = self._build_messages_with_context(messages, conversation_id)
+        call_args = (enhanced_messages, temperature, max_tokens)
         
         # 确定要尝试的模型顺序
         models_to_try = []
@@ -249,63 +392,65 @@ class ModelFallbackService:
             else:
                 models_to_try = [ModelTier.FAST_RESPONSE]
         
+        hedge = self.enable_hedging if hedge is None else hedge
+        started = time.monotonic()
+        deadline = started + (budget or self.request_budget)
         last_error = None
         
         for tier in models_to_try:
             config = self.model_configs[tier]
-            logger.info(f"尝试使用模型: {config.name} (级别: {tier.value})")
             
-            start_time = time.time()
-            timeout_occurred = False
-            
-            try:
-                # 设置超时
-                response = await asyncio.wait_for(
-                    self._call_model(config, enhanced_messages, temperature, max_tokens, **kwargs),
-                    timeout=config.timeout_threshold
-                )
+            for attempt in range(config.max_retries + 1):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    last_error = last_error or "请求耗时预算已用尽"
+                    break
+                if not self.tier_health[tier].allow_request():
+                    last_error = f"模型 {config.name} 熔断中"
+                    logger.warning(last_error)
+                    break
                 
-                response_time = time.time() - start_time
+                logger.info(f"尝试使用模型: {config.name} (级别: {tier.value}, 第{attempt + 1}次)")
+                timeout = min(config.timeout_threshold, remaining)
                 
-                if response and hasattr(response, 'content') and response.content:
-                    # 更新性能统计
-                    self._update_performance_stats(tier, response_time, True)
-                    
-                    # 保存上下文
-                    if conversation_id and len(messages) > 0:
-                        user_message = next((msg["content"] for msg in messages if msg.get("role") == "user"), "")
-                        if user_message:
-                            self._preserve_context(conversation_id, user_message, response.content, config.name)
-                    
-                    logger.info(f"模型 {config.name} 响应成功，耗时: {response_time:.2f}s")
-                    
-                    return ModelResponse(
-                        content=response.content,
-                        model_used=config.name,
-                        response_time=response_time,
-                        success=True
-                    )
-                else:
-                    raise Exception("模型返回空响应")
+                try:
+                    if hedge and tier == ModelTier.HIGH_PRECISION and ModelTier.FAST_RESPONSE in models_to_try:
+                        tier_used, response = await self._hedged_call(timeout, deadline, *call_args, **kwargs)
+                    else:
+                        tier_used = tier
+                        response = await self._attempt(tier, timeout, *call_args, **kwargs)
+                        
+                except asyncio.TimeoutError:
+                    last_error = f"模型 {config.name} 响应超时 (>{timeout:.0f}s)"
+                    logger.warning(last_error)
+                    break  # 超时不重试，直接降级
                     
-            except asyncio.TimeoutError:
-                timeout_occurred = True
-                response_time = time.time() - start_time
-                error_msg = f"模型 {config.name} 响应超时 (>{config.timeout_threshold}s)"
-                logger.warning(error_msg)
-                last_error = error_msg
+                except Exception as e:
+                    last_error = f"模型 {config.name} 调用失败: {str(e)}"
+                    logger.error(last_error)
+                    # 指数退避后重试，退避时间同样计入预算
+                    if attempt < config.max_retries and self.tier_health[tier].is_available():
+                        backoff = self.retry_backoff * 2 ** attempt
+                        await asyncio.sleep(min(backoff, max(0.0, deadline - time.monotonic())))
+                    continue
                 
-                # 更新性能统计
-                self._update_performance_stats(tier, response_time, False, timeout=True)
+                model_used = self.model_configs[tier_used].name
+                response_time = time.monotonic() - started
                 
-            except Exception as e:
-                response_time = time.time() - start_time
-                error_msg = f"模型 {config.name} 调用失败: {str(e)}"
-                logger.error(error_msg)
-                last_error = error_msg
+                # 保存上下文
+                if conversation_id and len(messages) > 0:
+                    user_message = next((msg["content"] for msg in messages if msg.get("role") == "user"), "")
+                    if user_message:
+                        self._preserve_context(conversation_id, user_message, response.content, model_used)
                 
-                # 更新性能统计
-                self._update_performance_stats(tier, response_time, False)
+                logger.info(f"模型 {model_used} 响应成功，耗时: {response_time:.2f}s")
+                
+                return ModelResponse(
+                    content=response.content,
+                    model_used=model_used,
+                    response_time=response_time,
+                    success=True
+                )
         
         # 所有模型都失败了
         logger.error("所有模型都无法响应")
@@ -317,6 +462,92 @@ class ModelFallbackService:
             error_message=last_error
         )
     
+    async def _attempt(self, tier: ModelTier, timeout: float, *call_args, **kwargs):
+        """
+        调用一次模型并记录健康统计
+        
+        调用方需先通过 TierHealth.allow_request 申请。
+        
+        Raises:
+            asyncio.TimeoutError: 超过 timeout 秒，进行中的请求已被取消
+            Exception: 模型调用失败或返回空响应
+        """
+        health = self.tier_health[tier]
+        start_time = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                self._call_model(self.model_configs[tier], *call_args, **kwargs),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            health.record(time.monotonic() - start_time, False, timeout=True)
+            raise
+        except asyncio.CancelledError:
+            health.release()
+            raise
+        except Exception:
+            health.record(time.monotonic() - start_time, False)
+            raise
+        
+        response_time = time.monotonic() - start_time
+        if not (response and hasattr(response, 'content') and response.content):
+            health.record(response_time, False)
+            raise Exception("模型返回空响应")
+        
+        health.record(response_time, True)
+        return response
+    
+    async def _hedged_call(self, timeout: float, deadline: float, *call_args, **kwargs):
+        """
+        对冲请求：高精度模型超过其 p95 耗时仍未返回时，并发请求快速模型，
+        取先成功的结果并取消另一个
+        
+        Returns:
+            Tuple[ModelTier, Any]: 实际使用的模型级别与响应
+        """
+        primary = asyncio.create_task(
+            self._attempt(ModelTier.HIGH_PRECISION, timeout, *call_args, **kwargs)
+        )
+        hedge_task = None
+        try:
+            hedge_delay = self.tier_health[ModelTier.HIGH_PRECISION].percentile(95)
+            if hedge_delay is None or hedge_delay >= timeout:
+                return ModelTier.HIGH_PRECISION, await primary
+            
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done or not self.tier_health[ModelTier.FAST_RESPONSE].allow_request():
+                return ModelTier.HIGH_PRECISION, await primary
+            
+            logger.info(f"高精度模型超过 p95 ({hedge_delay:.2f}s)，发起快速模型对冲请求")
+            self.hedge_stats["fired"] += 1
+            fast_timeout = min(
+                self.model_configs[ModelTier.FAST_RESPONSE].timeout_threshold,
+                max(0.0, deadline - time.monotonic()),
+            )
+            hedge_task = asyncio.create_task(
+                self._attempt(ModelTier.FAST_RESPONSE, fast_timeout, *call_args, **kwargs)
+            )
+            
+            pending = {primary, hedge_task}
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            self.hedge_stats["won"] += 1
+                            return ModelTier.FAST_RESPONSE, task.result()
+                        return ModelTier.HIGH_PRECISION, task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            # 取消落败或被外部取消时仍在进行的请求
+            losers = [t for t in (primary, hedge_task) if t is not None and not t.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+    
     async def _call_model(self, config: ModelConfig, messages: List[Dict[str, str]], temperature: float, max_tokens: int, **kwargs):
         """
         调用具体的模型
@@ -331,7 +562,7 @@ class ModelFallbackService:
         Returns:
             模型响应
         """
-        return self.deepseek_client.get_deepseek_response(
+        return await self.deepseek_client.get_deepseek_response_async(
             messages=messages,
             model_name=config.name,
             temperature=temperature,
@@ -340,7 +571,7 @@ class ModelFallbackService:
         )
     
     def get_performance_report(self) -> Dict[str, Any]:
-        """获取性能报告"""
+        """获取性能报告（含各级别滑动窗口 p50/p95/p99 与熔断状态）"""
         return {
             "model_configs": {tier.value: {
                 "name": config.name,
@@ -348,6 +579,8 @@ class ModelFallbackService:
                 "max_retries": config.max_retries
             } for tier, config in self.model_configs.items()},
             "performance_stats": {tier.value: stats for tier, stats in self.performance_stats.items()},
+            "hedging": {"enabled": self.enable_hedging, **self.hedge_stats},
+            "request_budget": self.request_budget,
             "active_conversations": len(self.conversation_context)
         }
 
@@ -3,13 +3,17 @@ RAG Service - 特种突击队
 用于与阿里云函数计算RAG模块进行快速、精准的情报获取作战
 """
 
+import asyncio
 import json
 import logging
-from typing import List, Dict, Any, Optional
-from fastapi import HTTPException
+import math
+import time
+import unicodedata
+from typing import List, Dict, Any, Optional, Tuple
 
 # 导入统一配置系统
 from ..config.settings import get_settings
+from ..utils.cache import LocalCache
 
 # 阿里云FC SDK
 try:
@@ -24,6 +28,9 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# 本地检索器初始化失败后，间隔该秒数才会重新尝试
+RETRIEVER_RETRY_INTERVAL = 60
+
 
 class RAGService:
     """RAG特种突击队 - 专注于快速、精准的文档检索任务"""
@@ -34,6 +41,17 @@ class RAGService:
         self.config = None
         self.settings = get_settings()
         self._initialize_equipment()
+
+        # 常驻的本地检索器，首次检索时初始化
+        self._retriever = None
+        self._retriever_lock = asyncio.Lock()
+        self._retriever_failed_at = float("-inf")
+
+        # 检索结果缓存，按规范化查询与 k 区分
+        cache_size = self.config.get("result_cache_size", 512) if self.config else 512
+        self._result_cache = LocalCache(max_entries=cache_size, max_bytes=cache_size * 16 * 1024)
+        self._result_cache_hits = 0
+        self._result_cache_misses = 0
     
     def _initialize_equipment(self):
         """装备检查和初始化"""
@@ -75,57 +93,158 @@ class RAGService:
             logger.error(f"RAG突击队装备初始化失败: {e}")
             self.fc_client = None
     
-    async def retrieve_from_rag(self, user_query: str, k: int = 3) -> List[str]:
+    async def retrieve_from_rag(
+        self, user_query: str, k: int = 3, deadline: Optional[float] = None
+    ) -> List[str]:
         """
         核心突击任务：从RAG模块检索相关文档
 
         Args:
             user_query: 用户查询（渗透目标）
             k: 返回文档数量（情报份数）
+            deadline: 本次检索的时限（秒），缺省使用 RAG_RETRIEVAL_DEADLINE；
+                到时仍未完成的检索路被放弃，返回已获得的部分结果
 
         Returns:
             List[str]: 检索到的文档列表（战果）
-
-        Raises:
-            HTTPException: 任务失败时的标准求救信号
         """
+        cache_key = self._result_cache_key(user_query, k)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            self._result_cache_hits += 1
+            logger.info(f"RAG情报缓存命中，目标: {user_query[:50]}...")
+            return list(cached)
+        self._result_cache_misses += 1
+
+        loop = asyncio.get_running_loop()
+        timeout = deadline if deadline is not None else self._retrieval_deadline()
+        deadline_at = loop.time() + timeout
+
         try:
             logger.info(f"RAG突击开始，目标: {user_query[:50]}...")
 
             # 尝试使用本地RAG实现
-            try:
-                from ..rag.RAGExtension import UserRetrieve
-
-                # 创建本地RAG实例
-                rag_instance = UserRetrieve()
-
-                # 执行检索
-                results = rag_instance.retrieve_topK(user_query, k)
+            results, complete = await self._retrieve_local(user_query, k, deadline_at)
+            if results:
+                logger.info(
+                    f"本地RAG突击{'成功' if complete else '超时，返回部分结果'}，获得情报 {len(results)} 份"
+                )
+                if complete:
+                    self._cache_results(cache_key, results)
+                return results
 
+            remaining = deadline_at - loop.time()
+            if self.fc_client and remaining > 0:
+                logger.warning("本地RAG检索无结果，尝试云端服务")
+                try:
+                    results = await asyncio.wait_for(
+                        self._retrieve_from_cloud(user_query, k), timeout=remaining
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("云端RAG突击超时，返回模拟结果")
+                    return self._get_fallback_results(user_query)
                 if results:
-                    logger.info(f"本地RAG突击成功，获得情报 {len(results)} 份")
+                    self._cache_results(cache_key, results)
                     return results
-                else:
-                    logger.warning("本地RAG检索无结果，尝试云端服务")
-
-            except Exception as local_error:
-                logger.warning(f"本地RAG服务失败: {local_error}，尝试云端服务")
-
-            # 如果本地RAG失败，尝试云端服务
-            if self.fc_client:
-                return await self._retrieve_from_cloud(user_query, k)
-            else:
-                # 如果都不可用，返回模拟结果
-                logger.warning("RAG服务不可用，返回模拟结果")
                 return self._get_fallback_results(user_query)
 
+            # 如果都不可用，返回模拟结果
+            logger.warning("RAG服务不可用或已超时，返回模拟结果")
+            return self._get_fallback_results(user_query)
+
         except Exception as e:
             logger.error(f"RAG突击遭遇意外情况: {e}")
             # 返回模拟结果而不是抛出异常
             return self._get_fallback_results(user_query)
 
+    async def _retrieve_local(
+        self, user_query: str, k: int, deadline_at: float
+    ) -> Tuple[List[str], bool]:
+        """
+        本地RAG检索：向量化在线程池中执行，原文与译文两路检索并发发出
+
+        Returns:
+            Tuple[List[str], bool]: 检索结果，以及两路检索是否都在时限内完成
+        """
+        loop = asyncio.get_running_loop()
+        retriever = await self._get_retriever()
+        if retriever is None:
+            return [], False
+
+        try:
+            vectorised = await asyncio.wait_for(
+                asyncio.to_thread(retriever.vectorise_query, user_query),
+                timeout=max(deadline_at - loop.time(), 0),
+            )
+        except asyncio.TimeoutError:
+            logger.warning("本地RAG查询向量化超时")
+            return [], False
+        except Exception as e:
+            logger.warning(f"本地RAG查询向量化失败: {e}")
+            return [], False
+
+        k_per_query = math.ceil(k / 2)
+        searches = [
+            asyncio.ensure_future(
+                asyncio.to_thread(retriever.vector_store.query, vectorised[route]["vector"], k_per_query)
+            )
+            for route in ("original", "translated")
+        ]
+        done, pending = await asyncio.wait(searches, timeout=max(deadline_at - loop.time(), 0))
+        for task in pending:
+            task.cancel()
+
+        hit_lists = []
+        complete = not pending
+        for task in searches:
+            if task not in done:
+                continue
+            if task.exception() is not None:
+                logger.warning(f"本地RAG检索失败: {task.exception()}")
+                complete = False
+                continue
+            hit_lists.append(task.result())
+
+        if pending:
+            logger.warning(f"本地RAG检索超时，{len(pending)} 路检索未完成")
+        return retriever.merge_hits(hit_lists), complete
+
+    async def _get_retriever(self):
+        """获取常驻的本地检索器，初始化失败后在冷却期内不再重试"""
+        if self._retriever is not None:
+            return self._retriever
+        if time.monotonic() - self._retriever_failed_at < RETRIEVER_RETRY_INTERVAL:
+            return None
+
+        async with self._retriever_lock:
+            if self._retriever is None:
+                try:
+                    from ..rag.RAGExtension import UserRetrieve
+
+                    # 初始化会读取.env并加载向量存储，放到线程池执行
+                    self._retriever = await asyncio.to_thread(UserRetrieve)
+                except Exception as e:
+                    self._retriever_failed_at = time.monotonic()
+                    logger.warning(f"本地RAG服务初始化失败: {e}，尝试云端服务")
+                    return None
+        return self._retriever
+
+    def _retrieval_deadline(self) -> float:
+        return float(self.config.get("retrieval_deadline", 8)) if self.config else 8.0
+
+    @staticmethod
+    def _result_cache_key(user_query: str, k: int) -> str:
+        """规范化查询文本（全半角、大小写、空白）后与 k 组成缓存键"""
+        normalized = " ".join(unicodedata.normalize("NFKC", user_query).lower().split())
+        return f"{k}:{normalized}"
+
+    def _cache_results(self, cache_key: str, results: List[str]):
+        ttl = self.config.get("result_cache_ttl", 300) if self.config else 300
+        size = sum(len(text.encode("utf-8")) for text in results)
+        self._result_cache.set(cache_key, tuple(results), size, ttl)
+
     async def _retrieve_from_cloud(self, user_query: str, k: int = 3) -> List[str]:
-        """从云端函数检索"""
+        """从云端函数检索，阻塞的SDK调用在线程池中执行，失败时返回空列表"""
         try:
             # 构造渗透载荷
             payload = {
@@ -141,12 +260,14 @@ class RAGService:
                 body=json.dumps(payload).encode('utf-8')
             )
 
-            response = self.fc_client.invoke_function(self.config['function_name'], invoke_request)
+            response = await asyncio.to_thread(
+                self.fc_client.invoke_function, self.config['function_name'], invoke_request
+            )
 
             # 解析战果
             if response.status_code != 200:
                 logger.error(f"云端RAG突击失败，状态码: {response.status_code}")
-                return self._get_fallback_results(user_query)
+                return []
 
             # 解析响应体
             response_body = response.body.decode('utf-8')
@@ -160,11 +281,11 @@ class RAGService:
             else:
                 error_msg = response_data.get('body', '未知错误')
                 logger.error(f"云端RAG函数执行失败: {error_msg}")
-                return self._get_fallback_results(user_query)
+                return []
 
         except Exception as e:
             logger.error(f"云端RAG服务失败: {e}")
-            return self._get_fallback_results(user_query)
+            return []
 
     def _get_fallback_results(self, user_query: str) -> List[str]:
         """获取备用结果"""
@@ -215,7 +336,13 @@ class RAGService:
             "sdk_available": FC20230330Client is not None,
             "config_loaded": self.config is not None,
             "timeout": self.config.get('timeout') if self.config else None,
-            "max_retries": self.config.get('max_retries') if self.config else None
+            "max_retries": self.config.get('max_retries') if self.config else None,
+            "local_retriever_ready": self._retriever is not None,
+            "result_cache": {
+                "size": len(self._result_cache),
+                "hits": self._result_cache_hits,
+                "misses": self._result_cache_misses,
+            },
         }
 
 
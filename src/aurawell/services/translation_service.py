@@ -1,16 +1,26 @@
 """
 AuraWell 翻译服务模块
 实现中英文互译功能，支持RAG模块的双语查询
+
+模型按翻译方向在首次使用时加载。默认的 batched 模式下，并发的翻译请求由
+TranslationEngine 在专用工作线程中合并为一次 generate 调用；短查询使用贪心解码，
+模型可做 int8 动态量化，翻译结果按规范化文本缓存在 LRU 中。
 """
 
+import asyncio
 import logging
-import os
-from typing import Dict, Optional, Tuple
-import torch
-from transformers import MarianMTModel, MarianTokenizer
+import queue
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
 from langdetect import detect, DetectorFactory
 import warnings
 
+from ..config.settings import AuraWellSettings
+
 # 设置langdetect的随机种子以确保结果一致性
 DetectorFactory.seed = 0
 
@@ -19,6 +29,94 @@ warnings.filterwarnings("ignore", category=UserWarning, module="transformers")
 
 logger = logging.getLogger(__name__)
 
+MODEL_NAMES = {
+    "zh-en": "Helsinki-NLP/opus-mt-zh-en",
+    "en-zh": "Helsinki-NLP/opus-mt-en-zh",
+}
+
+
+class TranslationEngine:
+    """
+    翻译微批处理引擎
+
+    请求进入队列后由单个工作线程取出，在 max_wait_ms 内尽量凑满 max_batch_size 条，
+    按翻译方向分组后各调用一次 translate_batch。推理全部在工作线程中执行，
+    调用方通过 Future 等待结果。
+    """
+
+    def __init__(
+        self,
+        translate_batch: Callable[[str, List[str]], List[str]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5,
+    ):
+        self.translate_batch = translate_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.batches = 0
+        self.batched_requests = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, str, Future]]]" = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(
+            target=self._run, name="translation-engine", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, model_key: str, text: str) -> Future:
+        """提交一条翻译请求"""
+        if self._closed:
+            raise RuntimeError("翻译引擎已关闭")
+        future: Future = Future()
+        self._queue.put((model_key, text, future))
+        return future
+
+    def close(self):
+        """停止工作线程，已提交的请求会先处理完"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch: List[Tuple[str, str, Future]]):
+        groups: Dict[str, List[Tuple[str, Future]]] = {}
+        for model_key, text, future in batch:
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(model_key, []).append((text, future))
+
+        for model_key, items in groups.items():
+            # 同一批内相同的文本只翻译一次
+            unique_texts = list(dict.fromkeys(text for text, _ in items))
+            try:
+                outputs = self.translate_batch(model_key, unique_texts)
+                translated = dict(zip(unique_texts, outputs))
+                for text, future in items:
+                    future.set_result(translated[text])
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+            self.batches += 1
+            self.batched_requests += len(items)
+
 
 class TranslationService:
     """
@@ -26,41 +124,173 @@ class TranslationService:
     使用MarianMT轻量级翻译模型，支持CPU推理
     """
     
-    def __init__(self):
-        """初始化翻译服务"""
+    def __init__(
+        self,
+        engine_mode: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        cache_size: Optional[int] = None,
+    ):
+        """
+        初始化翻译服务，模型在对应方向首次翻译时才加载
+
+        Args:
+            engine_mode: "batched" 使用微批处理引擎，"direct" 在调用线程中直接推理
+                （默认 TRANSLATION_ENGINE_MODE）
+            quantize: 是否对模型做 int8 动态量化（默认 TRANSLATION_QUANTIZE）
+            cache_size: 翻译结果 LRU 缓存条数，0 表示不缓存（默认 TRANSLATION_CACHE_SIZE）
+        """
         self.device = "cpu"  # 使用CPU进行推理
         self.models = {}
         self.tokenizers = {}
-        self._initialize_models()
-        
-    def _initialize_models(self):
-        """初始化翻译模型"""
-        try:
-            logger.info("正在初始化翻译模型...")
-            
-            # 中译英模型
-            zh_en_model_name = "Helsinki-NLP/opus-mt-zh-en"
-            logger.info(f"加载中译英模型: {zh_en_model_name}")
-            self.models['zh-en'] = MarianMTModel.from_pretrained(zh_en_model_name)
-            self.tokenizers['zh-en'] = MarianTokenizer.from_pretrained(zh_en_model_name)
-            
-            # 英译中模型
-            en_zh_model_name = "Helsinki-NLP/opus-mt-en-zh"
-            logger.info(f"加载英译中模型: {en_zh_model_name}")
-            self.models['en-zh'] = MarianMTModel.from_pretrained(en_zh_model_name)
-            self.tokenizers['en-zh'] = MarianTokenizer.from_pretrained(en_zh_model_name)
-            
-            # 将模型移动到CPU
-            for key in self.models:
-                self.models[key].to(self.device)
-                self.models[key].eval()  # 设置为评估模式
-                
-            logger.info("✅ 翻译模型初始化成功")
-            
-        except Exception as e:
-            logger.error(f"❌ 翻译模型初始化失败: {e}")
-            raise RuntimeError(f"翻译模型初始化失败: {e}")
-    
+        self.engine_mode = engine_mode or AuraWellSettings.TRANSLATION_ENGINE_MODE
+        self.quantize = AuraWellSettings.TRANSLATION_QUANTIZE if quantize is None else quantize
+        self.greedy_max_tokens = AuraWellSettings.TRANSLATION_GREEDY_MAX_TOKENS
+        self.cache_size = AuraWellSettings.TRANSLATION_CACHE_SIZE if cache_size is None else cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        # direct 模式下模型不是线程安全的，推理串行执行
+        self._inference_lock = threading.Lock()
+
+        self.engine: Optional[TranslationEngine] = None
+        if self.engine_mode == "batched":
+            self.engine = TranslationEngine(
+                self._translate_batch,
+                max_batch_size=AuraWellSettings.TRANSLATION_MAX_BATCH_SIZE,
+                max_wait_ms=AuraWellSettings.TRANSLATION_MAX_WAIT_MS,
+            )
+        elif self.engine_mode != "direct":
+            raise ValueError(f"不支持的翻译引擎模式: {self.engine_mode}")
+
+    def _load_model(self, model_key: str):
+        """加载指定方向的翻译模型，按需量化"""
+        with self._model_lock:
+            if model_key in self.models:
+                return self.models[model_key], self.tokenizers[model_key]
+
+            try:
+                import torch
+                from transformers import MarianMTModel, MarianTokenizer
+
+                if AuraWellSettings.TRANSLATION_NUM_THREADS > 0:
+                    torch.set_num_threads(AuraWellSettings.TRANSLATION_NUM_THREADS)
+
+                model_name = MODEL_NAMES[model_key]
+                logger.info(f"加载翻译模型: {model_name}")
+                started = time.perf_counter()
+                tokenizer = MarianTokenizer.from_pretrained(model_name)
+                model = MarianMTModel.from_pretrained(model_name)
+                model.to(self.device)
+                model.eval()  # 设置为评估模式
+
+                if self.quantize:
+                    model = torch.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+
+                self.models[model_key] = model
+                self.tokenizers[model_key] = tokenizer
+                logger.info(
+                    f"✅ 翻译模型 {model_key} 加载完成，耗时 {time.perf_counter() - started:.1f}s"
+                    f"{'（int8量化）' if self.quantize else ''}"
+                )
+                return model, tokenizer
+
+            except Exception as e:
+                logger.error(f"❌ 翻译模型初始化失败: {e}")
+                raise RuntimeError(f"翻译模型初始化失败: {e}")
+
+    def _translate_batch(self, model_key: str, texts: List[str]) -> List[str]:
+        """
+        一次 generate 调用翻译一批文本；不超过 greedy_max_tokens 的短文本用贪心解码，
+        其余文本用 beam search
+
+        Args:
+            model_key: 翻译方向，'zh-en' 或 'en-zh'
+            texts: 待翻译文本
+
+        Returns:
+            List[str]: 与输入顺序一致的译文
+        """
+        import torch
+
+        model, tokenizer = self._load_model(model_key)
+
+        lengths = [len(ids) for ids in tokenizer(texts, truncation=True, max_length=512)["input_ids"]]
+        short = [i for i, length in enumerate(lengths) if length <= self.greedy_max_tokens]
+        long = [i for i, length in enumerate(lengths) if length > self.greedy_max_tokens]
+
+        results: List[Optional[str]] = [None] * len(texts)
+        for indices, num_beams in ((short, 1), (long, 4)):
+            if not indices:
+                continue
+            inputs = tokenizer(
+                [texts[i] for i in indices],
+                return_tensors="pt", padding=True, truncation=True, max_length=512
+            )
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            with torch.no_grad():
+                outputs = model.generate(
+                    **inputs, max_length=512, num_beams=num_beams, early_stopping=num_beams > 1
+                )
+            for i, decoded in zip(indices, tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                results[i] = decoded
+        return results
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """缓存键使用的规范化文本：NFKC 并压缩空白"""
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[str]:
+        if self.cache_size <= 0:
+            return None
+        with self._cache_lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.cache_misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return value
+
+    def _cache_set(self, key: Tuple[str, str], value: str):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _model_key(source_lang: str, target_lang: str) -> Optional[str]:
+        if source_lang == 'zh' and target_lang == 'en':
+            return 'zh-en'
+        if source_lang == 'en' and target_lang == 'zh':
+            return 'en-zh'
+        return None
+
+    def get_stats(self) -> Dict[str, object]:
+        """翻译服务运行统计"""
+        return {
+            "engine_mode": self.engine_mode,
+            "loaded_models": sorted(self.models),
+            "quantized": self.quantize,
+            "cache_size": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "batches": self.engine.batches if self.engine else None,
+            "batched_requests": self.engine.batched_requests if self.engine else None,
+        }
+
+    def close(self):
+        """停止翻译引擎的工作线程"""
+        if self.engine is not None:
+            self.engine.close()
+
     def detect_language(self, text: str) -> str:
         """
         检测文本语言
@@ -108,42 +338,17 @@ class TranslationService:
             str: 翻译后的文本
         """
         try:
-            if not text or not text.strip():
-                logger.warning("输入文本为空")
-                return text
-                
-            if source_lang == target_lang:
-                logger.info("源语言和目标语言相同，直接返回原文")
-                return text
-                
-            # 确定模型键
-            if source_lang == 'zh' and target_lang == 'en':
-                model_key = 'zh-en'
-            elif source_lang == 'en' and target_lang == 'zh':
-                model_key = 'en-zh'
-            else:
-                logger.error(f"不支持的翻译方向: {source_lang} -> {target_lang}")
-                return text
-                
-            if model_key not in self.models:
-                logger.error(f"翻译模型 {model_key} 未加载")
-                return text
-                
+            model_key, cache_key, translated = self._prepare(text, source_lang, target_lang)
+            if translated is not None:
+                return translated
+
             # 执行翻译
-            model = self.models[model_key]
-            tokenizer = self.tokenizers[model_key]
-            
-            # 编码输入文本
-            inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=512)
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            # 生成翻译
-            with torch.no_grad():
-                outputs = model.generate(**inputs, max_length=512, num_beams=4, early_stopping=True)
-            
-            # 解码输出
-            translated = tokenizer.decode(outputs[0], skip_special_tokens=True)
-            
+            if self.engine is not None:
+                translated = self.engine.submit(model_key, text).result()
+            else:
+                translated = self._translate_direct(model_key, text)
+
+            self._cache_set(cache_key, translated)
             logger.info(f"翻译成功: {text[:50]}... -> {translated[:50]}...")
             return translated
             
@@ -151,6 +356,57 @@ class TranslationService:
             logger.error(f"翻译失败: {e}")
             # 记录错误到日志但不抛出异常，返回原文
             return text
+
+    async def translate_text_async(self, text: str, source_lang: str, target_lang: str) -> str:
+        """
+        translate_text 的异步版本，推理在工作线程中执行，不阻塞事件循环
+        """
+        try:
+            model_key, cache_key, translated = self._prepare(text, source_lang, target_lang)
+            if translated is not None:
+                return translated
+
+            if self.engine is not None:
+                translated = await asyncio.wrap_future(self.engine.submit(model_key, text))
+            else:
+                translated = await asyncio.to_thread(self._translate_direct, model_key, text)
+
+            self._cache_set(cache_key, translated)
+            return translated
+
+        except Exception as e:
+            logger.error(f"翻译失败: {e}")
+            return text
+
+    def _translate_direct(self, model_key: str, text: str) -> str:
+        with self._inference_lock:
+            return self._translate_batch(model_key, [text])[0]
+
+    def _prepare(
+        self, text: str, source_lang: str, target_lang: str
+    ) -> Tuple[Optional[str], Optional[Tuple[str, str]], Optional[str]]:
+        """
+        校验翻译请求并查缓存
+
+        Returns:
+            (模型键, 缓存键, 可直接返回的结果)；第三项不为 None 时无需推理
+        """
+        if not text or not text.strip():
+            logger.warning("输入文本为空")
+            return None, None, text
+
+        if source_lang == target_lang:
+            logger.info("源语言和目标语言相同，直接返回原文")
+            return None, None, text
+
+        # 确定模型键
+        model_key = self._model_key(source_lang, target_lang)
+        if model_key is None:
+            logger.error(f"不支持的翻译方向: {source_lang} -> {target_lang}")
+            return None, None, text
+
+        cache_key = (model_key, self._normalize(text))
+        return model_key, cache_key, self._cache_get(cache_key)
     
     def query_translation(self, user_query: str) -> Dict[str, Dict[str, str]]:
         """
@@ -214,13 +470,16 @@ class TranslationService:
 
 # 全局翻译服务实例
 _translation_service = None
+_translation_service_lock = threading.Lock()
 
 
 def get_translation_service() -> TranslationService:
     """获取翻译服务实例（单例模式）"""
     global _translation_service
     if _translation_service is None:
-        _translation_service = TranslationService()
+        with _translation_service_lock:
+            if _translation_service is None:
+                _translation_service = TranslationService()
     return _translation_service
 
 
@@ -235,3 +494,5 @@ if __name__ == "__main__":
     # 测试英文查询
     result2 = service.query_translation("nutrition advice")
     print("英文查询测试:", result2)
+    print("运行统计:", service.get_stats())
+    service.close()
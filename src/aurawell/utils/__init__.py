@@ -20,9 +20,13 @@ try:
         cache_achievements,
         invalidate_user_cache,
         invalidate_health_cache,
+        invalidate_family_cache,
+        user_tag,
+        family_tag,
         PerformanceMonitor,
         get_performance_monitor,
     )
+    from .cache_codecs import CacheSerializer
     from .async_tasks import (
         TaskManager,
         AsyncTask,
@@ -2,19 +2,51 @@
 Caching utilities for AuraWell API
 
 Provides Redis-based caching for improved performance and response times.
+The backend uses ``redis.asyncio`` with a shared connection pool, so cache
+operations run on the event loop instead of hopping through a thread pool.
+
+Entries can be registered under tags (e.g. ``user:<id>``, ``family:<id>``);
+each tag is a Redis set of the keys stored under it, so invalidating a user
+reads one set and deletes its members instead of scanning the keyspace.
+
+An optional in-process L1 tier (LRU, bounded by entry count and bytes per key
+prefix) can sit in front of Redis for hot keys. It is off by default: an entry
+invalidated on another worker stays visible in this worker's L1 for up to
+``local_ttl`` seconds. Concurrent misses for the same key are coalesced so the
+underlying computation runs only once.
+
+Values are encoded by a pluggable ``CacheSerializer`` (orjson, msgpack or
+json, see ``cache_codecs``) that round-trips datetimes, Decimals and Pydantic
+models and compresses large payloads.
 """
 
 import json
+import time
+import fnmatch
+import inspect
 import logging
 import asyncio
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Optional, Dict, Union
+from typing import (
+    Any,
+    Optional,
+    Dict,
+    Union,
+    List,
+    Iterable,
+    Callable,
+    Tuple,
+    Awaitable,
+)
 from functools import wraps
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
+
+from ..config.settings import get_settings
+from .cache_codecs import CacheSerializer
 
 try:
-    import redis
+    import redis.asyncio as aioredis
 
     REDIS_AVAILABLE = True
 except ImportError:
@@ -22,30 +54,170 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Callable receiving the decorated function's arguments and returning the tags
+# the cached result should be indexed under.
+TagExtractor = Callable[..., Iterable[str]]
+
+
+def user_tag(user_id: Any) -> str:
+    """Tag covering every cache entry that belongs to a user"""
+    return f"user:{user_id}"
+
+
+def family_tag(family_id: Any) -> str:
+    """Tag covering every cache entry that belongs to a family"""
+    return f"family:{family_id}"
+
+
+# Per-prefix L1 limits as (max_entries, max_bytes)
+DEFAULT_LOCAL_CACHE_SIZES: Dict[str, Tuple[int, int]] = {
+    "user_data": (2000, 8 * 1024 * 1024),
+    "health_data": (2000, 16 * 1024 * 1024),
+    "ai_response": (500, 16 * 1024 * 1024),
+    "llm_response": (1000, 16 * 1024 * 1024),
+    "achievements": (1000, 4 * 1024 * 1024),
+}
+DEFAULT_LOCAL_CACHE_SIZE: Tuple[int, int] = (1000, 4 * 1024 * 1024)
+
+
+class LocalCache:
+    """In-process LRU cache bounded by entry count and total payload bytes
+
+    Values are stored decoded, so callers must treat results as read-only.
+    Sizes are the uncompressed length of the serialized payload.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live value and mark it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self.discard(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: float) -> int:
+        """Store a value, returning how many entries were evicted to fit it"""
+        if size > self.max_bytes or ttl <= 0:
+            self.discard(key)
+            return 0
+
+        self.discard(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self.current_bytes += size
+
+        evicted = 0
+        while (
+            len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes
+        ):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            evicted += 1
+        return evicted
+
+    def discard(self, key: str) -> bool:
+        """Remove a key if present"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.current_bytes -= entry[1]
+        return True
+
+    def discard_matching(self, pattern: str) -> int:
+        """Remove keys matching a Redis-style glob pattern"""
+        matches = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in matches:
+            self.discard(key)
+        return len(matches)
+
 
 class CacheManager:
     """Redis-based cache manager for AuraWell API"""
 
     def __init__(
-        self, redis_url: str = "redis://localhost:6379/0", enabled: bool = True
+        self,
+        redis_url: str = "redis://localhost:6379/0",
+        enabled: bool = True,
+        max_connections: int = 50,
+        scan_batch_size: int = 500,
+        tag_ttl: int = 86400,
+        local_cache: bool = False,
+        local_ttl: int = 30,
+        local_cache_sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+        codec: str = "orjson",
+        compression: str = "zstd",
+        compress_threshold: int = 1024,
     ):
         self.enabled = enabled and REDIS_AVAILABLE
+        self.serializer = CacheSerializer(codec, compression, compress_threshold)
+        # The L1 tier works without Redis; its TTL is capped so an entry
+        # invalidated by another worker is served stale for at most local_ttl.
+        # It holds encoded payloads and decodes on every hit, so callers never
+        # share a cached object.
+        self.local_enabled = enabled and local_cache
+        self.local_ttl = local_ttl
+        self.local_cache_sizes = {
+            **DEFAULT_LOCAL_CACHE_SIZES,
+            **(local_cache_sizes or {}),
+        }
+        self._local: Dict[str, LocalCache] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.redis_url = redis_url
+        self.scan_batch_size = scan_batch_size
+        # Tag sets outlive the entries they index; a dangling member only
+        # costs a no-op UNLINK, while an expired tag set would leak entries.
+        self.tag_ttl = tag_ttl
         self.redis_client = None
-        self.executor = ThreadPoolExecutor(
-            max_workers=4, thread_name_prefix="redis_cache"
-        )
+        self._pool = None
+        self._connected = False
 
         if self.enabled:
+            # The pool is created eagerly but connections are opened lazily,
+            # so constructing the manager never blocks the caller.
+            self._pool = aioredis.ConnectionPool.from_url(
+                redis_url,
+                max_connections=max_connections,
+                # Values are binary codec payloads; keys are decoded by hand
+                decode_responses=False,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+                health_check_interval=30,
+            )
+            self.redis_client = aioredis.Redis(connection_pool=self._pool)
+            logger.info("Redis cache configured (asyncio backend)")
+        else:
+            logger.info("Cache disabled or Redis not available")
+
+    async def _get_client(self):
+        """Return the Redis client, verifying the connection on first use"""
+        if not self.enabled:
+            return None
+
+        if not self._connected:
             try:
-                self.redis_client = redis.from_url(redis_url, decode_responses=True)
-                # Test connection
-                self.redis_client.ping()
+                await self.redis_client.ping()
+                self._connected = True
                 logger.info("Redis cache initialized successfully")
             except Exception as e:
                 logger.warning(f"Redis connection failed, disabling cache: {e}")
                 self.enabled = False
-        else:
-            logger.info("Cache disabled or Redis not available")
+                return None
+
+        return self.redis_client
 
     def _generate_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate cache key from prefix and parameters"""
@@ -55,108 +227,390 @@ class CacheManager:
         key_hash = hashlib.md5(key_str.encode()).hexdigest()[:8]
         return f"aurawell:{prefix}:{key_hash}"
 
+    def _local_cache_for(self, key: str) -> Optional[LocalCache]:
+        """Return the L1 cache for the key's prefix, creating it on demand"""
+        if not self.local_enabled:
+            return None
+
+        parts = key.split(":", 2)
+        prefix = parts[1] if len(parts) == 3 and parts[0] == "aurawell" else ""
+        local = self._local.get(prefix)
+        if local is None:
+            max_entries, max_bytes = self.local_cache_sizes.get(
+                prefix, DEFAULT_LOCAL_CACHE_SIZE
+            )
+            local = self._local[prefix] = LocalCache(max_entries, max_bytes)
+        return local
+
+    def _local_get(self, key: str) -> Optional[Any]:
+        """Decode a fresh copy of a live L1 entry"""
+        local = self._local_cache_for(key)
+        payload = local.get(key) if local is not None else None
+        if payload is None:
+            return None
+        return self.serializer.loads(payload)
+
+    def _local_set(self, key: str, payload: bytes, size: int, ttl: int):
+        """Store an encoded payload in L1 and record any evictions"""
+        local = self._local_cache_for(key)
+        if local is None:
+            return
+        evicted = local.set(key, payload, size, min(ttl, self.local_ttl))
+        if evicted:
+            get_performance_monitor().record_cache_eviction(evicted)
+
+    def _local_discard(self, keys: Iterable[str]):
+        """Drop keys from L1"""
+        if not self.local_enabled:
+            return
+        for key in keys:
+            local = self._local_cache_for(key)
+            local.discard(key)
+
+    def _tag_key(self, tag: str) -> str:
+        """Redis key of the set indexing entries registered under ``tag``"""
+        return f"aurawell:tag:{tag}"
+
+    def _index_tags(self, pipe, key: str, tags: Iterable[str], ttl: int):
+        """Queue tag-set registrations for ``key`` on a pipeline"""
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            pipe.sadd(tag_key, key)
+            pipe.expire(tag_key, max(ttl, self.tag_ttl))
+
     async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        if not self.enabled:
+        """Get value from cache, checking the in-process tier first"""
+        monitor = get_performance_monitor()
+        value = self._local_get(key)
+        if value is not None:
+            monitor.record_cache_hit(local=True)
+            return value
+
+        client = await self._get_client()
+        if client is None:
+            if self.local_enabled:
+                monitor.record_cache_miss()
             return None
 
         try:
-            loop = asyncio.get_event_loop()
-            value = await loop.run_in_executor(
-                self.executor, self.redis_client.get, key
-            )
+            value = await client.get(key)
             if value:
-                return json.loads(value)
+                decoded, size = self.serializer.decode(value)
+                self._local_set(key, value, size, self.local_ttl)
+                monitor.record_cache_hit()
+                return decoded
+            monitor.record_cache_miss()
         except Exception as e:
+            monitor.record_cache_error()
             logger.warning(f"Cache get error for key {key}: {e}")
 
         return None
 
-    async def set(self, key: str, value: Any, ttl: int = 300) -> bool:
-        """Set value in cache with TTL (seconds)"""
-        if not self.enabled:
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values with a single MGET, returning only the hits"""
+        if not keys:
+            return {}
+
+        monitor = get_performance_monitor()
+        found: Dict[str, Any] = {}
+        remaining: List[str] = []
+        for key in keys:
+            value = self._local_get(key)
+            if value is not None:
+                found[key] = value
+                monitor.record_cache_hit(local=True)
+            else:
+                remaining.append(key)
+
+        client = await self._get_client()
+        if client is None or not remaining:
+            return found
+
+        try:
+            values = await client.mget(remaining)
+            for key, value in zip(remaining, values):
+                if value:
+                    found[key], size = self.serializer.decode(value)
+                    self._local_set(key, value, size, self.local_ttl)
+                    monitor.record_cache_hit()
+                else:
+                    monitor.record_cache_miss()
+        except Exception as e:
+            monitor.record_cache_error()
+            logger.warning(f"Cache get_many error for {len(keys)} keys: {e}")
+        return found
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 300,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """Set value in cache with TTL (seconds), optionally indexed by tags"""
+        if not self.enabled and not self.local_enabled:
             return False
 
         try:
-            serialized_value = json.dumps(value, default=str)
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self.executor, self.redis_client.setex, key, ttl, serialized_value
-            )
-            return bool(result)
+            serialized_value, size = self.serializer.encode(value)
+            self._local_set(key, serialized_value, size, ttl)
+
+            client = await self._get_client()
+            if client is None:
+                return self.local_enabled
+
+            tags = list(tags or ())
+            if not tags:
+                result = await client.setex(key, ttl, serialized_value)
+                return bool(result)
+
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, serialized_value)
+                self._index_tags(pipe, key, tags, ttl)
+                results = await pipe.execute()
+            return bool(results[0])
         except Exception as e:
+            get_performance_monitor().record_cache_error()
             logger.warning(f"Cache set error for key {key}: {e}")
             return False
 
+    async def set_many(
+        self,
+        mapping: Dict[str, Any],
+        ttl: int = 300,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """Set several values in one pipelined round trip"""
+        if not mapping or (not self.enabled and not self.local_enabled):
+            return False
+
+        try:
+            serialized = {}
+            for key, value in mapping.items():
+                payload, size = self.serializer.encode(value)
+                serialized[key] = payload
+                self._local_set(key, payload, size, ttl)
+
+            client = await self._get_client()
+            if client is None:
+                return self.local_enabled
+
+            tags = list(tags or ())
+            async with client.pipeline(transaction=False) as pipe:
+                for key, payload in serialized.items():
+                    pipe.setex(key, ttl, payload)
+                    self._index_tags(pipe, key, tags, ttl)
+                results = await pipe.execute()
+            # Only the SETEX replies matter; tag bookkeeping replies follow each
+            stride = 1 + 2 * len(tags)
+            return all(results[::stride])
+        except Exception as e:
+            get_performance_monitor().record_cache_error()
+            logger.warning(f"Cache set_many error for {len(mapping)} keys: {e}")
+            return False
+
     async def delete(self, key: str) -> bool:
         """Delete key from cache"""
-        if not self.enabled:
+        self._local_discard([key])
+        client = await self._get_client()
+        if client is None:
             return False
 
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self.executor, self.redis_client.delete, key
-            )
+            result = await client.delete(key)
             return bool(result)
         except Exception as e:
             logger.warning(f"Cache delete error for key {key}: {e}")
             return False
 
-    async def clear_pattern(self, pattern: str) -> int:
-        """Clear all keys matching pattern"""
-        if not self.enabled:
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete keys in batches of ``scan_batch_size`` using UNLINK"""
+        keys = list(keys)
+        self._local_discard(keys)
+        client = await self._get_client()
+        if client is None:
             return 0
 
+        deleted = 0
+        batch: List[str] = []
         try:
-            loop = asyncio.get_event_loop()
-            keys = await loop.run_in_executor(
-                self.executor, self.redis_client.keys, pattern
-            )
-            if keys:
-                result = await loop.run_in_executor(
-                    self.executor, self.redis_client.delete, *keys
-                )
-                return result
+            for key in keys:
+                batch.append(key)
+                if len(batch) >= self.scan_batch_size:
+                    deleted += await client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await client.unlink(*batch)
+        except Exception as e:
+            logger.warning(f"Cache delete_many error: {e}")
+        return deleted
+
+    async def clear_pattern(self, pattern: str) -> int:
+        """Clear all keys matching pattern
+
+        Uses incremental ``SCAN`` instead of ``KEYS`` so Redis is never blocked
+        walking the whole keyspace, and deletes matches in batches.
+        """
+        for local in self._local.values():
+            local.discard_matching(pattern)
+
+        client = await self._get_client()
+        if client is None:
             return 0
+
+        deleted = 0
+        batch: List[str] = []
+        try:
+            async for key in client.scan_iter(
+                match=pattern, count=self.scan_batch_size
+            ):
+                batch.append(key)
+                if len(batch) >= self.scan_batch_size:
+                    deleted += await client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await client.unlink(*batch)
+            return deleted
         except Exception as e:
             logger.warning(f"Cache clear pattern error for {pattern}: {e}")
+            return deleted
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Delete every entry registered under any of ``tags``
+
+        Costs one SMEMBERS per tag plus pipelined UNLINKs of the members,
+        independent of the total keyspace size.
+        """
+        client = await self._get_client()
+        if client is None or not tags:
+            return 0
+
+        try:
+            tag_keys = [self._tag_key(tag) for tag in tags]
+            async with client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                member_sets = await pipe.execute()
+
+            keys = {
+                key.decode() if isinstance(key, bytes) else key
+                for members in member_sets
+                for key in members
+            }
+            deleted = await self.delete_many(keys)
+            await client.unlink(*tag_keys)
+            return deleted
+        except Exception as e:
+            logger.warning(f"Cache tag invalidation error for {tags}: {e}")
             return 0
 
-    def cleanup(self):
+    async def get_or_set(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int = 300,
+        tags: Optional[Iterable[str]] = None,
+    ) -> Any:
+        """Return the cached value or compute, cache and return it
+
+        Concurrent misses for the same key share one in-flight computation
+        (single-flight), so a cold key costs one call no matter how many
+        requests arrive together. The computation runs as its own task, so a
+        cancelled caller does not cancel it for the others.
+        """
+        cached_result = await self.get(key)
+        if cached_result is not None:
+            return cached_result
+
+        task = self._inflight.get(key)
+        if task is not None:
+            get_performance_monitor().record_cache_coalesced()
+            return await asyncio.shield(task)
+
+        async def compute_and_store():
+            result = await compute()
+            await self.set(key, result, ttl, tags=tags)
+            return result
+
+        task = asyncio.ensure_future(compute_and_store())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def cleanup(self):
         """Cleanup resources"""
-        if self.executor:
-            self.executor.shutdown(wait=True)
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+        if self._pool is not None:
+            await self._pool.disconnect()
+        self._connected = False
+
+    def cache_key(
+        self,
+        prefix: str,
+        ttl: int = 300,
+        tag_extractor: Optional[TagExtractor] = None,
+    ):
+        """Decorator for caching function results
 
-    def cache_key(self, prefix: str, ttl: int = 300):
-        """Decorator for caching function results"""
+        Args:
+            prefix: Key namespace, e.g. ``health_data``
+            ttl: Time to live in seconds
+            tag_extractor: Called with the function's arguments, returns the
+                tags to index the result under. Defaults to
+                ``default_tag_extractor(func)``, which tags by ``user_id`` /
+                ``family_id`` parameters when the function has them.
+        """
 
         def decorator(func):
+            extract_tags = tag_extractor or default_tag_extractor(func)
+
             @wraps(func)
             async def wrapper(*args, **kwargs):
                 # Generate cache key
                 cache_key = self._generate_key(prefix, *args, **kwargs)
 
-                # Try to get from cache
-                cached_result = await self.get(cache_key)
-                if cached_result is not None:
-                    logger.debug(f"Cache hit for {func.__name__}")
-                    return cached_result
-
-                # Execute function
-                result = await func(*args, **kwargs)
-
-                # Cache the result
-                await self.set(cache_key, result, ttl)
-                logger.debug(f"Cache miss for {func.__name__}, result cached")
+                # Each tag is also registered scoped to the prefix so e.g.
+                # only a user's health entries can be dropped
+                tags = []
+                for tag in extract_tags(*args, **kwargs):
+                    tags.extend((tag, f"{prefix}:{tag}"))
 
-                return result
+                return await self.get_or_set(
+                    cache_key, lambda: func(*args, **kwargs), ttl, tags=tags
+                )
 
             return wrapper
 
         return decorator
 
 
+def default_tag_extractor(func: Callable) -> TagExtractor:
+    """Build a tag extractor that tags by ``user_id`` / ``family_id`` arguments"""
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return lambda *args, **kwargs: ()
+
+    tag_builders = {"user_id": user_tag, "family_id": family_tag}
+    tagged_params = [name for name in tag_builders if name in signature.parameters]
+    if not tagged_params:
+        return lambda *args, **kwargs: ()
+
+    def extract(*args, **kwargs) -> List[str]:
+        try:
+            bound = signature.bind_partial(*args, **kwargs)
+        except TypeError:
+            return []
+        return [
+            tag_builders[name](bound.arguments[name])
+            for name in tagged_params
+            if bound.arguments.get(name) is not None
+        ]
+
+    return extract
+
+
 # Global cache instance
 _cache_manager: Optional[CacheManager] = None
 
@@ -165,55 +619,75 @@ def get_cache_manager() -> CacheManager:
     """Get global cache manager instance"""
     global _cache_manager
     if _cache_manager is None:
-        _cache_manager = CacheManager()
+        settings = get_settings()
+        _cache_manager = CacheManager(
+            redis_url=settings.REDIS_URL,
+            codec=settings.CACHE_CODEC,
+            compression=settings.CACHE_COMPRESSION,
+            compress_threshold=settings.CACHE_COMPRESS_THRESHOLD,
+            local_cache=settings.CACHE_LOCAL_ENABLED,
+            local_ttl=settings.CACHE_LOCAL_TTL,
+        )
     return _cache_manager
 
 
 # Cache decorators for common use cases
-def cache_user_data(ttl: int = 600):
+def cache_user_data(ttl: int = 600, tag_extractor: Optional[TagExtractor] = None):
     """Cache user-related data for 10 minutes"""
-    return get_cache_manager().cache_key("user_data", ttl)
+    return get_cache_manager().cache_key("user_data", ttl, tag_extractor)
 
 
-def cache_health_data(ttl: int = 300):
+def cache_health_data(ttl: int = 300, tag_extractor: Optional[TagExtractor] = None):
     """Cache health data for 5 minutes"""
-    return get_cache_manager().cache_key("health_data", ttl)
+    return get_cache_manager().cache_key("health_data", ttl, tag_extractor)
 
 
-def cache_ai_response(ttl: int = 1800):
+def cache_ai_response(ttl: int = 1800, tag_extractor: Optional[TagExtractor] = None):
     """Cache AI responses for 30 minutes"""
-    return get_cache_manager().cache_key("ai_response", ttl)
+    return get_cache_manager().cache_key("ai_response", ttl, tag_extractor)
 
 
-def cache_achievements(ttl: int = 900):
+def cache_achievements(ttl: int = 900, tag_extractor: Optional[TagExtractor] = None):
     """Cache achievement data for 15 minutes"""
-    return get_cache_manager().cache_key("achievements", ttl)
+    return get_cache_manager().cache_key("achievements", ttl, tag_extractor)
 
 
 # Cache invalidation helpers
 async def invalidate_user_cache(user_id: str):
     """Invalidate all cache entries for a user"""
     cache = get_cache_manager()
-    pattern = f"aurawell:user_data:*{user_id}*"
-    cleared = await cache.clear_pattern(pattern)
+    cleared = await cache.invalidate_tags(user_tag(user_id))
     logger.info(f"Invalidated {cleared} cache entries for user {user_id}")
 
 
 async def invalidate_health_cache(user_id: str):
     """Invalidate health data cache for a user"""
     cache = get_cache_manager()
-    pattern = f"aurawell:health_data:*{user_id}*"
-    cleared = await cache.clear_pattern(pattern)
+    cleared = await cache.invalidate_tags(f"health_data:{user_tag(user_id)}")
     logger.info(f"Invalidated {cleared} health cache entries for user {user_id}")
 
 
+async def invalidate_family_cache(family_id: str):
+    """Invalidate all cache entries for a family"""
+    cache = get_cache_manager()
+    cleared = await cache.invalidate_tags(family_tag(family_id))
+    logger.info(f"Invalidated {cleared} cache entries for family {family_id}")
+
+
 # Performance monitoring
 class PerformanceMonitor:
     """Monitor API performance metrics"""
 
     def __init__(self):
         self.request_times: Dict[str, list] = {}
-        self.cache_stats = {"hits": 0, "misses": 0, "errors": 0}
+        self.cache_stats = {
+            "hits": 0,
+            "misses": 0,
+            "errors": 0,
+            "local_hits": 0,
+            "evictions": 0,
+            "coalesced": 0,
+        }
 
     def record_request_time(self, endpoint: str, duration: float):
         """Record request processing time"""
@@ -240,9 +714,11 @@ class PerformanceMonitor:
                 slow_endpoints[endpoint] = avg_time
         return slow_endpoints
 
-    def record_cache_hit(self):
-        """Record cache hit"""
+    def record_cache_hit(self, local: bool = False):
+        """Record cache hit, optionally served by the in-process tier"""
         self.cache_stats["hits"] += 1
+        if local:
+            self.cache_stats["local_hits"] += 1
 
     def record_cache_miss(self):
         """Record cache miss"""
@@ -252,6 +728,14 @@ class PerformanceMonitor:
         """Record cache error"""
         self.cache_stats["errors"] += 1
 
+    def record_cache_eviction(self, count: int = 1):
+        """Record entries evicted from the in-process tier"""
+        self.cache_stats["evictions"] += count
+
+    def record_cache_coalesced(self):
+        """Record a miss that joined an in-flight computation"""
+        self.cache_stats["coalesced"] += 1
+
     def get_cache_hit_rate(self) -> float:
         """Get cache hit rate percentage"""
         total = self.cache_stats["hits"] + self.cache_stats["misses"]
@@ -0,0 +1,313 @@
+"""
+Cache value codecs for AuraWell API
+
+Serializers used by ``CacheManager`` to turn cached values into bytes. All
+codecs round-trip datetime, date, time, Decimal, set values and Pydantic
+models, so a cache hit has the same shape as a freshly computed result.
+Payloads above a size threshold are compressed with zstd (or zlib when
+``zstandard`` is not installed).
+
+Every payload starts with a one-byte header identifying its codec and
+compression, so entries written under one configuration stay readable after
+the configuration changes. Payloads without a header are legacy plain JSON.
+"""
+
+import importlib
+import json
+import logging
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TYPE_KEY = "__aw_type__"
+
+# Only models from these packages are rebuilt from cache; anything else comes
+# back as its field dict, so a tampered cache entry cannot import arbitrary code.
+TRUSTED_MODEL_MODULES = ("aurawell.", "src.aurawell.")
+
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2}
+
+
+def _model_path(model: BaseModel) -> str:
+    """Import path of a model's class, e.g. ``aurawell.models.x:Model``"""
+    cls = type(model)
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _load_model(path: str, data: Any) -> Any:
+    """Rebuild a Pydantic model from its import path and field data"""
+    module_name, _, qualname = path.partition(":")
+    if not module_name.startswith(TRUSTED_MODEL_MODULES):
+        logger.warning(f"Refusing to rebuild untrusted cached model {path}")
+        return data
+
+    try:
+        target: Any = importlib.import_module(module_name)
+        for attr in qualname.split("."):
+            target = getattr(target, attr)
+        if isinstance(target, type) and issubclass(target, BaseModel):
+            return target.model_validate(data)
+    except Exception as e:
+        logger.warning(f"Failed to rebuild cached model {path}: {e}")
+    return data
+
+
+def _tag(value: Any) -> Any:
+    """``default`` hook tagging values JSON cannot represent natively"""
+    if isinstance(value, datetime):
+        return {TYPE_KEY: "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {TYPE_KEY: "date", "v": value.isoformat()}
+    if isinstance(value, time):
+        return {TYPE_KEY: "time", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {TYPE_KEY: "decimal", "v": str(value)}
+    if isinstance(value, (set, frozenset)):
+        return {TYPE_KEY: "set", "v": list(value)}
+    if isinstance(value, BaseModel):
+        return {
+            TYPE_KEY: "model",
+            "m": _model_path(value),
+            "v": value.model_dump(mode="python"),
+        }
+    # UUIDs and unknown objects keep the historical ``default=str`` behaviour
+    return str(value)
+
+
+def _untag(obj: Dict[str, Any]) -> Any:
+    """Inverse of ``_tag`` for a single (already revived) dict"""
+    kind = obj.get(TYPE_KEY)
+    if kind is None:
+        return obj
+    value = obj.get("v")
+    if kind == "datetime":
+        return datetime.fromisoformat(value)
+    if kind == "date":
+        return date.fromisoformat(value)
+    if kind == "time":
+        return time.fromisoformat(value)
+    if kind == "decimal":
+        return Decimal(value)
+    if kind == "set":
+        return set(value)
+    if kind == "model":
+        return _load_model(obj.get("m", ""), value)
+    return obj
+
+
+def _revive(obj: Any) -> Any:
+    """Bottom-up walk replacing tagged dicts, for decoders without a hook"""
+    if isinstance(obj, dict):
+        return _untag({key: _revive(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return [_revive(item) for item in obj]
+    return obj
+
+
+class JSONCodec:
+    """Standard library JSON, always available"""
+
+    name = "json"
+    codec_id = 1
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_tag, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data, object_hook=_untag)
+
+
+class OrjsonCodec:
+    """orjson; wire-compatible with ``JSONCodec`` but several times faster"""
+
+    name = "orjson"
+    codec_id = 2
+
+    def __init__(self):
+        self._options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        self._marker = f'"{TYPE_KEY}"'.encode()
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_tag, option=self._options)
+
+    def loads(self, data: bytes) -> Any:
+        decoded = orjson.loads(data)
+        # Skip the Python-level walk for payloads without tagged values
+        if self._marker in data:
+            return _revive(decoded)
+        return decoded
+
+
+class MsgpackCodec:
+    """msgpack with extension types for the non-native values"""
+
+    name = "msgpack"
+    codec_id = 3
+
+    EXT_DATETIME = 1
+    EXT_DATE = 2
+    EXT_TIME = 3
+    EXT_DECIMAL = 4
+    EXT_SET = 5
+    EXT_MODEL = 6
+
+    def _default(self, value: Any) -> Any:
+        if isinstance(value, datetime):
+            return msgpack.ExtType(self.EXT_DATETIME, value.isoformat().encode())
+        if isinstance(value, date):
+            return msgpack.ExtType(self.EXT_DATE, value.isoformat().encode())
+        if isinstance(value, time):
+            return msgpack.ExtType(self.EXT_TIME, value.isoformat().encode())
+        if isinstance(value, Decimal):
+            return msgpack.ExtType(self.EXT_DECIMAL, str(value).encode())
+        if isinstance(value, (set, frozenset)):
+            return msgpack.ExtType(self.EXT_SET, self.dumps(list(value)))
+        if isinstance(value, BaseModel):
+            packed = self.dumps([_model_path(value), value.model_dump(mode="python")])
+            return msgpack.ExtType(self.EXT_MODEL, packed)
+        return str(value)
+
+    def _ext_hook(self, code: int, data: bytes) -> Any:
+        if code == self.EXT_DATETIME:
+            return datetime.fromisoformat(data.decode())
+        if code == self.EXT_DATE:
+            return date.fromisoformat(data.decode())
+        if code == self.EXT_TIME:
+            return time.fromisoformat(data.decode())
+        if code == self.EXT_DECIMAL:
+            return Decimal(data.decode())
+        if code == self.EXT_SET:
+            return set(self.loads(data))
+        if code == self.EXT_MODEL:
+            path, fields = self.loads(data)
+            return _load_model(path, fields)
+        return msgpack.ExtType(code, data)
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(
+            data, ext_hook=self._ext_hook, raw=False, strict_map_key=False
+        )
+
+
+def available_codecs() -> Dict[str, Any]:
+    """Codec classes usable in this environment, keyed by name"""
+    codecs: Dict[str, Any] = {JSONCodec.name: JSONCodec}
+    if ORJSON_AVAILABLE:
+        codecs[OrjsonCodec.name] = OrjsonCodec
+    if MSGPACK_AVAILABLE:
+        codecs[MsgpackCodec.name] = MsgpackCodec
+    return codecs
+
+
+class CacheSerializer:
+    """Encode cache values with a pluggable codec and optional compression
+
+    Args:
+        codec: ``orjson``, ``msgpack`` or ``json``; falls back to ``json``
+            when the requested library is not installed
+        compression: ``zstd``, ``zlib`` or ``none``; ``zstd`` falls back to
+            ``zlib`` when ``zstandard`` is not installed
+        compress_threshold: Payloads at least this many bytes are compressed
+        compression_level: Codec-specific level, defaults to zstd 3 / zlib 6
+    """
+
+    def __init__(
+        self,
+        codec: str = "orjson",
+        compression: str = "zstd",
+        compress_threshold: int = 1024,
+        compression_level: Optional[int] = None,
+    ):
+        codecs = available_codecs()
+        if codec not in codecs:
+            logger.warning(f"Cache codec {codec} unavailable, falling back to json")
+            codec = JSONCodec.name
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, using zlib for cache values")
+            compression = "zlib"
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+
+        self.codec = codecs[codec]()
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+
+        # Decoders for every installed codec so old entries stay readable
+        self._decoders = {cls.codec_id: cls() for cls in codecs.values()}
+        self._decoders[self.codec.codec_id] = self.codec
+
+        if compression == "zstd":
+            level = 3 if compression_level is None else compression_level
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level)
+        self._zlib_level = 6 if compression_level is None else compression_level
+
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """Return the framed payload and the uncompressed body size"""
+        body = self.codec.dumps(value)
+        compression = self.compression
+        if compression == "none" or len(body) < self.compress_threshold:
+            compression = "none"
+            framed = body
+        elif compression == "zstd":
+            framed = self._zstd_compressor.compress(body)
+        else:
+            framed = zlib.compress(body, self._zlib_level)
+
+        header = self.codec.codec_id * 4 + COMPRESSION_IDS[compression]
+        return bytes((header,)) + framed, len(body)
+
+    def decode(self, payload: bytes) -> Tuple[Any, int]:
+        """Return the decoded value and the uncompressed body size"""
+        header = payload[0]
+        # Headers stay below 0x20; JSON text never starts with such a byte
+        if header >= 0x20:
+            return json.loads(payload), len(payload)
+
+        codec_id, compression_id = divmod(header, 4)
+        body = payload[1:]
+        if compression_id == COMPRESSION_IDS["zstd"]:
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif compression_id == COMPRESSION_IDS["zlib"]:
+            body = zlib.decompress(body)
+
+        decoder = self._decoders.get(codec_id)
+        if decoder is None:
+            raise ValueError(f"Cache payload uses unavailable codec id {codec_id}")
+        return decoder.loads(body), len(body)
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value to a framed payload"""
+        return self.encode(value)[0]
+
+    def loads(self, payload: bytes) -> Any:
+        """Decode a framed payload"""
+        return self.decode(payload)[0]
@@ -14,6 +14,8 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import logging
 
+from .password_hashing import get_password_hashing_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -194,6 +196,30 @@ def verify_password(password: str, hashed_password: str, salt: str) -> bool:
         return False
 
 
+async def hash_password_async(
+    password: str, salt: Optional[bytes] = None
+) -> Tuple[str, str]:
+    """
+    Hash password on the shared password hashing pool (see ``hash_password``)
+
+    Raises:
+        PasswordHashingBusyError: If the hashing backlog is full
+    """
+    return await get_password_hashing_pool().run(hash_password, password, salt)
+
+
+async def verify_password_async(password: str, hashed_password: str, salt: str) -> bool:
+    """
+    Verify password on the shared password hashing pool (see ``verify_password``)
+
+    Raises:
+        PasswordHashingBusyError: If the hashing backlog is full
+    """
+    return await get_password_hashing_pool().run(
+        verify_password, password, hashed_password, salt
+    )
+
+
 def hash_sensitive_data(data: str) -> str:
     """
     Hash sensitive data using SHA-256 (one-way hash)
@@ -0,0 +1,117 @@
+"""
+Password hashing pool for AuraWell API
+
+bcrypt and PBKDF2 are deliberately slow (hundreds of milliseconds per call),
+so running them on the event loop stalls every other request on the worker.
+``PasswordHashingPool`` runs them on a small dedicated thread pool instead.
+Both bcrypt and OpenSSL's PBKDF2 release the GIL while hashing, so threads
+give real parallelism without copying hashing state into worker processes.
+
+Admission control bounds the backlog: when ``max_pending`` calls are already
+queued or running, new calls fail fast with ``PasswordHashingBusyError`` (the
+API maps it to HTTP 429) instead of queueing for tens of seconds.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from ..config.settings import AuraWellSettings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusyError(Exception):
+    """Raised when the hashing backlog is full"""
+
+    def __init__(self, pending: int, retry_after: int = 1):
+        super().__init__(f"Password hashing queue is full ({pending} pending)")
+        self.pending = pending
+        self.retry_after = retry_after
+
+
+class PasswordHashingPool:
+    """Bounded thread pool for CPU-heavy password hashing"""
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 64):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="password-hash"
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        # Moving average of one hash, used to estimate Retry-After
+        self._avg_seconds = 0.25
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                backlog_seconds = self._pending * self._avg_seconds / self.max_workers
+                raise PasswordHashingBusyError(
+                    self._pending, retry_after=max(1, math.ceil(backlog_seconds))
+                )
+            self._pending += 1
+
+    def _timed(self, func: Callable[..., T], *args: Any) -> T:
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run ``func(*args)`` on the pool, or raise ``PasswordHashingBusyError``"""
+        self._admit()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_hash_ms": round(self._avg_seconds * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_hashing_pool: Optional[PasswordHashingPool] = None
+_hashing_pool_lock = threading.Lock()
+
+
+def get_password_hashing_pool() -> PasswordHashingPool:
+    """Get the process-wide password hashing pool"""
+    global _hashing_pool
+    if _hashing_pool is None:
+        with _hashing_pool_lock:
+            if _hashing_pool is None:
+                _hashing_pool = PasswordHashingPool(
+                    max_workers=AuraWellSettings.PASSWORD_HASH_WORKERS,
+                    max_pending=AuraWellSettings.PASSWORD_HASH_MAX_PENDING,
+                )
+    return _hashing_pool
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agent 池测试
+验证 AgentRouter 的 LRU 与空闲超时淘汰、命中统计、重量级组件在 Agent 间共享，
+以及 1 万个不同用户访问时池内存保持有界的基准
+"""
+
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.core.agent_router import AgentRouter
+
+DISTINCT_USERS = int(os.getenv("AURAWELL_AGENT_BENCH_USERS", "10000"))
+
+
+async def test_lru_eviction_and_stats():
+    """超出容量时淘汰最久未使用的 Agent，再次访问命中"""
+    router = AgentRouter(max_agents=2, idle_ttl=60)
+
+    alice = await router.get_agent("alice")
+    await router.get_agent("bob")
+    assert await router.get_agent("alice") is alice  # alice 变为最近使用
+    await router.get_agent("carol")  # 淘汰 bob
+
+    assert await router.get_agent("alice") is alice
+    stats = router.get_pool_stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 2 and stats["misses"] == 3
+    assert stats["evicted_lru"] == 1
+
+    await router.get_agent("bob")
+    assert router.get_pool_stats()["misses"] == 4
+
+
+async def test_idle_agents_expire():
+    """空闲超过 idle_ttl 的 Agent 在下次访问池时被回收"""
+    router = AgentRouter(max_agents=10, idle_ttl=0.05)
+    first = await router.get_agent("alice")
+    await router.get_agent("bob")
+
+    await asyncio.sleep(0.08)
+    assert router.get_pool_stats()["size"] == 0
+    assert router.get_pool_stats()["evicted_idle"] == 2
+    assert await router.get_agent("alice") is not first
+
+
+async def test_agents_share_heavy_components():
+    """LLM 客户端、MCP 管理器与服务在所有 Agent 之间共享"""
+    router = AgentRouter(max_agents=10, idle_ttl=60)
+    alice = await router.get_agent("alice")
+    bob = await router.get_agent("bob")
+
+    assert alice is not bob
+    assert alice.deepseek_client is bob.deepseek_client
+    assert alice.health_advice_service is bob.health_advice_service
+    assert alice.memory_manager is bob.memory_manager
+    assert alice.mcp_manager is bob.mcp_manager
+    assert alice._conversation_history is not bob._conversation_history
+
+    router.clear_user_cache("alice")
+    assert router.get_pool_stats()["size"] == 1
+
+
+@pytest.mark.slow
+async def test_distinct_users_memory_is_bounded():
+    """1 万个不同用户依次对话：池大小与内存受 max_agents 限制"""
+    max_agents = DISTINCT_USERS // 10
+    router = AgentRouter(max_agents=max_agents, idle_ttl=3600)
+    await router.get_agent("warmup")  # 首次创建共享组件
+
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        for i in range(DISTINCT_USERS):
+            await router.get_agent(f"user_{i}")
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = router.get_pool_stats()
+    print(
+        f"\n📊 {DISTINCT_USERS:,} distinct users, pool of {max_agents:,}: "
+        f"{elapsed / DISTINCT_USERS * 1e6:.0f}µs per new agent, "
+        f"{current / 1024 / 1024:.1f}MiB held, {peak / 1024 / 1024:.1f}MiB peak, "
+        f"{current / max_agents:.0f}B per pooled agent"
+    )
+    assert stats["size"] == max_agents
+    assert stats["evicted_lru"] == DISTINCT_USERS + 1 - max_agents
+    assert current < max_agents * 8 * 1024
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+健康数据批量写入基准测试
+对比逐行 upsert 与原生 INSERT ... ON CONFLICT 批量 upsert 的写入速率（行/秒），
+场景为 365 天活动摘要同步与 100k 心率样本同步。
+样本数量可通过 AURAWELL_BULK_BENCH_HR_SAMPLES 调整（默认 100,000）。
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.database.base import Base
+from aurawell.models.enums import DataQuality, HealthPlatform, HeartRateType
+from aurawell.models.health_data_model import (
+    UnifiedActivitySummary,
+    UnifiedHeartRateSample,
+)
+from aurawell.repositories.health_data_repository import HealthDataRepository
+
+HR_SAMPLES = int(os.getenv("AURAWELL_BULK_BENCH_HR_SAMPLES", "100000"))
+USER_ID = "bench_user"
+
+pytestmark = [pytest.mark.database, pytest.mark.slow]
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _activity_year(steps_offset: int = 0) -> list:
+    today = date.today()
+    return [
+        UnifiedActivitySummary(
+            date=(today - timedelta(days=i)).isoformat(),
+            steps=8000 + i + steps_offset,
+            distance_meters=6400.0,
+            active_calories=300.0,
+            active_minutes=45,
+            source_platform=HealthPlatform.XIAOMI_HEALTH,
+            data_quality=DataQuality.HIGH,
+        )
+        for i in range(365)
+    ]
+
+
+def _heart_rate_samples(count: int) -> list:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        UnifiedHeartRateSample(
+            timestamp_utc=start + timedelta(seconds=30 * i),
+            bpm=60 + i % 40,
+            measurement_type=HeartRateType.ACTIVE,
+            source_platform=HealthPlatform.XIAOMI_HEALTH,
+            data_quality=DataQuality.HIGH,
+        )
+        for i in range(count)
+    ]
+
+
+async def test_activity_year_sync(session_factory):
+    """365 天活动同步：批量 upsert 应快于逐行 upsert，且重复同步为更新而非插入"""
+    activities = _activity_year()
+
+    async with session_factory() as session:
+        repo = HealthDataRepository(session)
+        start = time.perf_counter()
+        for activity in activities:
+            await repo.save_activity_summary(USER_ID + "_rowwise", activity)
+        await session.commit()
+        rowwise_elapsed = time.perf_counter() - start
+
+    async with session_factory() as session:
+        repo = HealthDataRepository(session)
+        start = time.perf_counter()
+        await repo.save_activity_summaries(USER_ID, activities)
+        await session.commit()
+        bulk_elapsed = time.perf_counter() - start
+
+        # 再次同步同一年的数据应覆盖原有行
+        await repo.save_activity_summaries(USER_ID, _activity_year(steps_offset=1))
+        await session.commit()
+        stored = await repo.get_activity_summaries(USER_ID)
+
+    print(
+        f"\n📊 365-day activity sync: row-by-row {365 / rowwise_elapsed:,.0f} rows/s, "
+        f"bulk upsert {365 / bulk_elapsed:,.0f} rows/s"
+    )
+    assert len(stored) == 365
+    assert stored[0].steps == 8001
+    assert bulk_elapsed < rowwise_elapsed
+
+
+async def test_heart_rate_bulk_sync(session_factory):
+    """100k 心率样本同步吞吐量（逐行存储），重复同步不产生重复行"""
+    samples = _heart_rate_samples(HR_SAMPLES)
+
+    async with session_factory() as session:
+        repo = HealthDataRepository(session, heart_rate_storage="rows")
+        start = time.perf_counter()
+        await repo.save_heart_rate_samples(USER_ID, samples)
+        await session.commit()
+        elapsed = time.perf_counter() - start
+
+        await repo.save_heart_rate_samples(USER_ID, samples[:1000])
+        await session.commit()
+        stored = await repo.heart_rate_repo.count({"user_id": USER_ID})
+
+    print(
+        f"\n📊 {HR_SAMPLES:,} heart rate samples: bulk upsert "
+        f"{HR_SAMPLES / elapsed:,.0f} rows/s ({elapsed:.2f}s)"
+    )
+    assert stored == HR_SAMPLES
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存编解码器测试
+验证各编解码器对 datetime/Decimal/Pydantic 模型的类型保真往返、
+大值压缩，以及典型负载（活动摘要、仪表盘）的编解码吞吐量
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.models.dashboard_models import DashboardData, DashboardMetric
+from aurawell.utils.cache_codecs import CacheSerializer, available_codecs
+
+CODECS = sorted(available_codecs())
+
+
+def _activity_summary_payload(days: int = 365) -> list:
+    """与 get_user_activity_summary 返回结构一致的负载"""
+    today = date.today()
+    return [
+        {
+            "date": str(today - timedelta(days=i)),
+            "steps": 8000 + i,
+            "distance_km": 6.4 + i / 100,
+            "calories_burned": 300 + i,
+            "active_minutes": 45,
+            "exercise_sessions": 1,
+        }
+        for i in range(days)
+    ]
+
+
+def _dashboard_payload() -> DashboardData:
+    """仪表盘负载，包含嵌套模型与 datetime 字段"""
+    return DashboardData(
+        user_id="user_123",
+        metrics=[
+            DashboardMetric(
+                name=f"metric_{i}",
+                value=float(i),
+                unit="steps",
+                trend="up",
+                change_percentage=1.5,
+            )
+            for i in range(50)
+        ],
+        last_updated=datetime(2025, 1, 1, 8, 30),
+    )
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_typed_round_trip(codec):
+    """datetime/date/Decimal/set/Pydantic 模型应按原类型返回"""
+    serializer = CacheSerializer(codec=codec)
+    value = {
+        "generated_at": datetime(2025, 1, 1, 8, 30, 15),
+        "day": date(2025, 1, 1),
+        "weight": Decimal("72.35"),
+        "tags": {"sleep", "steps"},
+        "dashboard": _dashboard_payload(),
+        "nested": [{"at": datetime(2024, 12, 31)}],
+    }
+
+    decoded = serializer.loads(serializer.dumps(value))
+
+    assert decoded == value
+    assert isinstance(decoded["dashboard"], DashboardData)
+    assert isinstance(decoded["dashboard"].metrics[0], DashboardMetric)
+
+
+@pytest.mark.parametrize("compression", ["zstd", "zlib", "none"])
+def test_compression_threshold(compression):
+    """超过阈值的负载才会被压缩，且可以正确解压"""
+    serializer = CacheSerializer(compression=compression, compress_threshold=1024)
+    large = _activity_summary_payload()
+    small = {"steps": 1}
+
+    large_payload = serializer.dumps(large)
+    small_payload = serializer.dumps(small)
+
+    assert serializer.loads(large_payload) == large
+    assert serializer.loads(small_payload) == small
+    assert small_payload[0] % 4 == 0
+    if compression != "none":
+        assert len(large_payload) < len(serializer.codec.dumps(large))
+
+
+def test_reads_payloads_from_other_codecs_and_legacy_json():
+    """切换编解码器后仍能读取旧条目，包括旧版纯 JSON 值"""
+    reader = CacheSerializer(codec="json")
+    for codec in CODECS:
+        writer = CacheSerializer(codec=codec)
+        assert reader.loads(writer.dumps({"d": date(2025, 1, 1)})) == {
+            "d": date(2025, 1, 1)
+        }
+    assert reader.loads(b'{"steps": 1}') == {"steps": 1}
+
+
+@pytest.mark.parametrize("codec", CODECS)
+def test_codec_throughput(codec):
+    """典型缓存负载的编解码吞吐量基准"""
+    serializer = CacheSerializer(codec=codec)
+    payloads = {
+        "activity_summary": _activity_summary_payload(),
+        "dashboard": _dashboard_payload(),
+    }
+    iterations = 200
+
+    for name, value in payloads.items():
+        encoded = serializer.dumps(value)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            serializer.dumps(value)
+        encode_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            serializer.loads(encoded)
+        decode_elapsed = time.perf_counter() - start
+
+        print(
+            f"\n📊 {codec:8s} {name:16s} {len(encoded):7d}B "
+            f"encode {iterations / encode_elapsed:9.0f}/s "
+            f"decode {iterations / decode_elapsed:9.0f}/s"
+        )
+        assert serializer.loads(encoded) == value
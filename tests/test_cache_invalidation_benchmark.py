@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存失效基准测试
+对比基于标签索引的失效与旧的 SCAN 模式匹配失效在大键空间下的延迟
+
+需要可访问的 Redis（AURAWELL_CACHE_BENCH_REDIS_URL，默认 redis://localhost:6379/15），否则跳过。
+为避免误删数据，目标库非空时同样跳过；测试结束后只删除本次写入的键。
+键数量可通过 AURAWELL_CACHE_BENCH_KEYS 调整（默认 1,000,000）。
+"""
+
+import os
+import sys
+import time
+import uuid
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.utils.cache import CacheManager, user_tag
+
+REDIS_URL = os.getenv("AURAWELL_CACHE_BENCH_REDIS_URL", "redis://localhost:6379/15")
+TOTAL_KEYS = int(os.getenv("AURAWELL_CACHE_BENCH_KEYS", "1000000"))
+USER_ENTRIES = 50
+BATCH_SIZE = 10000
+
+pytestmark = [pytest.mark.redis, pytest.mark.slow]
+
+
+async def _connected_cache() -> CacheManager:
+    cache = CacheManager(redis_url=REDIS_URL)
+    if await cache._get_client() is None:
+        pytest.skip("Redis 不可用，跳过缓存失效基准测试")
+    if await cache.redis_client.dbsize():
+        await cache.cleanup()
+        pytest.skip(f"{REDIS_URL} 中已有数据，请使用空的 Redis 库运行缓存失效基准测试")
+    return cache
+
+
+def _noise_keys(run_id: str, start: int, stop: int) -> list:
+    return [f"aurawell:health_data:bench{run_id}{i:08x}" for i in range(start, stop)]
+
+
+async def _populate(cache: CacheManager, run_id: str, user_id: str) -> list:
+    """写入 TOTAL_KEYS 个噪声键，以及目标用户的带标签条目，返回用户条目的键"""
+    client = cache.redis_client
+    for start in range(0, TOTAL_KEYS, BATCH_SIZE):
+        async with client.pipeline(transaction=False) as pipe:
+            for key in _noise_keys(run_id, start, min(start + BATCH_SIZE, TOTAL_KEYS)):
+                pipe.setex(key, 600, "{}")
+            await pipe.execute()
+
+    user_keys = []
+    for i in range(USER_ENTRIES):
+        key = cache._generate_key("health_data", user_id, i)
+        await cache.set(key, {"i": i}, 600, tags=[user_tag(user_id)])
+        user_keys.append(key)
+    return user_keys
+
+
+async def _remove_written_keys(cache: CacheManager, run_id: str, user_id: str, user_keys: list):
+    """只删除本次基准测试写入的键"""
+    client = cache.redis_client
+    for start in range(0, TOTAL_KEYS, BATCH_SIZE):
+        await client.unlink(*_noise_keys(run_id, start, min(start + BATCH_SIZE, TOTAL_KEYS)))
+    await client.unlink(*user_keys, cache._tag_key(user_tag(user_id)))
+
+
+async def test_tag_invalidation_vs_pattern_scan():
+    """标签失效应只与该用户条目数相关，而模式扫描与键空间大小相关"""
+    cache = await _connected_cache()
+    run_id = uuid.uuid4().hex[:8]
+    user_id = f"bench_{run_id}"
+    user_keys = []
+    try:
+        user_keys = await _populate(cache, run_id, user_id)
+
+        # 旧方案：SCAN 整个键空间匹配模式（哈希后的键永远匹配不到用户ID）
+        start = time.perf_counter()
+        pattern_cleared = await cache.clear_pattern(f"aurawell:health_data:*{user_id}*")
+        pattern_elapsed = time.perf_counter() - start
+
+        # 新方案：读取标签集合并批量删除
+        start = time.perf_counter()
+        tag_cleared = await cache.invalidate_tags(user_tag(user_id))
+        tag_elapsed = time.perf_counter() - start
+
+        print(
+            f"\n📊 {TOTAL_KEYS:,} keys: pattern scan cleared {pattern_cleared} "
+            f"in {pattern_elapsed * 1000:.1f}ms, tag index cleared {tag_cleared} "
+            f"in {tag_elapsed * 1000:.1f}ms"
+        )
+
+        assert pattern_cleared == 0
+        assert tag_cleared == USER_ENTRIES
+        assert tag_elapsed < pattern_elapsed
+    finally:
+        await _remove_written_keys(cache, run_id, user_id, user_keys)
+        await cache.cleanup()
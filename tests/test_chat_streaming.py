@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对话流式输出测试
+验证 AgentRouter.stream_message 在模型生成过程中逐 token 产出（首 token 耗时远小于
+完整生成耗时）、MCP 工具阶段以 progress 事件上报、生成中途失败时以 error 事件结束，
+以及 /api/v1/chat/stream 的 SSE 格式
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.core.agent_router import AgentRouter
+from aurawell.langchain_agent.mcp_tools_manager import WorkflowResult
+
+TOKENS = ["每天", "建议", "走", "8000", "步。"]
+TOKEN_DELAY = 0.05
+
+
+class StreamingClient:
+    """逐 token 延迟输出的模拟流式客户端"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def get_streaming_response(self, messages, **kwargs):
+        self.requests.append(messages)
+        for token in TOKENS:
+            await asyncio.sleep(TOKEN_DELAY)
+            yield token
+
+
+class FailingStreamingClient:
+    """输出两个 token 后连接中断的模拟流式客户端"""
+
+    async def get_streaming_response(self, messages, **kwargs):
+        for token in TOKENS[:2]:
+            yield token
+        raise ConnectionError("stream reset")
+
+
+class StubMCPManager:
+    def __init__(self, tool_calls):
+        self.tool_calls = tool_calls
+
+    async def analyze_and_execute(self, message, context):
+        return WorkflowResult(
+            success=True,
+            results={"intent_analysis": {"primary_intent": "activity"}},
+            tool_calls=self.tool_calls,
+            execution_time=0.01,
+            errors=[],
+        )
+
+    def get_stats(self):
+        return {}
+
+
+async def _router_with_stub(user_id, tool_calls=()):
+    router = AgentRouter(max_agents=10, idle_ttl=60)
+    agent = await router.get_agent(user_id, "chat")
+    agent.deepseek_client = StreamingClient()
+    agent.mcp_manager = StubMCPManager(list(tool_calls))
+    return router, agent
+
+
+async def test_tokens_stream_before_generation_finishes():
+    """首 token 应在第一个片段生成后立即到达，而不是等待完整回复"""
+    router, agent = await _router_with_stub("stream_user")
+
+    events, arrivals = [], []
+    start = time.perf_counter()
+    async for event in router.stream_message("stream_user", "每天应该走多少步"):
+        events.append(event)
+        arrivals.append(time.perf_counter() - start)
+    total = arrivals[-1]
+
+    kinds = [event["event"] for event in events]
+    assert kinds[-1] == "done"
+    assert kinds.count("token") == len(TOKENS)
+    first_token = arrivals[kinds.index("token")]
+    assert first_token < total / 2
+
+    done = events[-1]["data"]
+    assert done["success"] and done["message"] == "".join(TOKENS)
+    assert done["first_token_ms"] == pytest.approx(first_token * 1000, abs=20)
+    assert router.get_streaming_stats()["count"] == 1
+    assert agent.deepseek_client.requests[0][-1]["content"] == "每天应该走多少步"
+
+
+async def test_mcp_phase_reported_as_progress():
+    """MCP 工具执行阶段以 progress 事件上报，随后流式输出增强回复"""
+    router, _ = await _router_with_stub("mcp_user", tool_calls=["calculate_bmi"])
+
+    events = [event async for event in router.stream_message("mcp_user", "算下BMI")]
+
+    progress = [e["data"] for e in events if e["event"] == "progress"]
+    assert progress[-1]["stage"] == "tools_completed"
+    assert progress[-1]["tools_used"] == ["calculate_bmi"]
+    assert events[-1]["data"]["agent_type"] == "mcp_enhanced"
+    assert events[-1]["data"]["message"] == "".join(TOKENS)
+
+
+async def test_stream_aborted_midway_ends_with_error():
+    """已输出部分 token 后模型流中断：以 error 事件结束，不发送 success 的 done"""
+    router, agent = await _router_with_stub("abort_user", tool_calls=["calculate_bmi"])
+    agent.deepseek_client = FailingStreamingClient()
+
+    events = [event async for event in router.stream_message("abort_user", "算下BMI")]
+
+    kinds = [event["event"] for event in events]
+    assert kinds.count("token") == 2
+    assert "done" not in kinds
+    assert kinds[-1] == "error"
+    assert events[-1]["data"]["success"] is False
+    # 截断的回复不写入对话历史
+    assert agent._conversation_history == []
+
+
+async def test_sse_endpoint_frames():
+    """/api/v1/chat/stream 返回 text/event-stream，done 事件附带会话ID"""
+    from aurawell.auth import get_current_user_id
+    from aurawell.interfaces import api_interface
+
+    router, _ = await _router_with_stub("sse_user")
+    app = api_interface.app
+    app.dependency_overrides[get_current_user_id] = lambda: "sse_user"
+    original_router = api_interface.agent_router
+    api_interface.agent_router = router
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://localhost"
+        ) as client:
+            response = await client.post(
+                "/api/v1/chat/stream",
+                json={"message": "每天应该走多少步", "conversation_id": "conv_1"},
+            )
+    finally:
+        api_interface.agent_router = original_router
+        app.dependency_overrides.pop(get_current_user_id, None)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = [
+        dict(line.split(": ", 1) for line in frame.splitlines())
+        for frame in response.text.strip().split("\n\n")
+    ]
+    tokens = [json.loads(f["data"])["content"] for f in frames if f["event"] == "token"]
+    done = json.loads(frames[-1]["data"])
+    assert tokens == TOKENS
+    assert frames[-1]["event"] == "done"
+    assert done["conversation_id"] == "conv_1"
+    assert done["message"] == "".join(TOKENS)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DeepSeek 异步客户端并发测试
+使用模拟的 OpenAI 兼容接口（每次调用固定延迟），验证 N 个并发对话请求
+不再被同步客户端串行化，流式响应期间事件循环保持可调度，
+以及同一 API 主机共享连接池
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.core.deepseek_client import (
+    DeepSeekClient,
+    close_http_clients,
+    get_async_http_client,
+)
+
+BASE_URL = "https://llm.test/v1"
+LATENCY = 0.2
+CONCURRENT_REQUESTS = 10
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "deepseek-chat",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 2, "total_tokens": 7},
+    }
+
+
+def _stream_chunk(content: str) -> bytes:
+    chunk = {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "deepseek-chat",
+        "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n".encode()
+
+
+async def _handler(request: httpx.Request) -> httpx.Response:
+    """模拟 LLM 接口：非流式请求等待 LATENCY 秒，流式请求逐 token 返回"""
+    body = json.loads(request.content)
+    if body.get("stream"):
+
+        async def events():
+            for token in ("你", "好", "！"):
+                await asyncio.sleep(LATENCY / 3)
+                yield _stream_chunk(token)
+            yield b"data: [DONE]\n\n"
+
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, content=events()
+        )
+
+    await asyncio.sleep(LATENCY)
+    return httpx.Response(200, json=_completion(body["messages"][-1]["content"]))
+
+
+def _client() -> DeepSeekClient:
+    transport = httpx.MockTransport(_handler)
+    return DeepSeekClient(
+        api_key="sk-test",
+        base_url=BASE_URL,
+        http_client=httpx.AsyncClient(transport=transport),
+    )
+
+
+async def test_concurrent_requests_do_not_serialize():
+    """N 个并发请求的总耗时应接近单次延迟，而不是 N 倍"""
+    client = _client()
+    messages = [
+        [{"role": "user", "content": f"q{i}"}] for i in range(CONCURRENT_REQUESTS)
+    ]
+
+    await client.get_deepseek_response_async(messages[0])  # warm up
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.get_deepseek_response_async(m) for m in messages)
+    )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"\n📊 {CONCURRENT_REQUESTS} concurrent chat requests ({LATENCY * 1000:.0f}ms each): "
+        f"{elapsed * 1000:.0f}ms total, serialized would be "
+        f"{CONCURRENT_REQUESTS * LATENCY * 1000:.0f}ms"
+    )
+    assert [r.content for r in responses] == [
+        f"q{i}" for i in range(CONCURRENT_REQUESTS)
+    ]
+    assert responses[0].usage.total_tokens == 7
+    assert elapsed < CONCURRENT_REQUESTS * LATENCY / 3
+
+
+async def test_streaming_keeps_event_loop_responsive():
+    """流式响应期间其他协程应持续运行"""
+    client = _client()
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        tokens = [
+            token
+            async for token in client.get_streaming_response(
+                [{"role": "user", "content": "hi"}]
+            )
+        ]
+    finally:
+        ticker_task.cancel()
+
+    assert "".join(tokens) == "你好！"
+    assert ticks >= 5
+
+
+async def test_shared_pool_per_host():
+    """同一主机共享一个连接池，不同主机各自独立"""
+    try:
+        pool = get_async_http_client(BASE_URL)
+        assert get_async_http_client("https://llm.test/v2") is pool
+        assert get_async_http_client("https://other.test/v1") is not pool
+
+        client = DeepSeekClient(api_key="sk-test", base_url=BASE_URL)
+        assert client.async_client._client is pool
+    finally:
+        await close_http_clients()
+    assert pool.is_closed
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+embedding 缓存测试
+验证缓存命中时不调用远程接口、批内去重、float16 持久化精度且命中与未命中返回相同向量，
+以及重新入库只改动一个段落的文件时只向量化新段落
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.rag.embedding_cache import CachedEmbedder, EmbeddingCache
+from aurawell.rag.ingestion_pipeline import IngestionJob, IngestionPipeline, PipelineConfig
+from aurawell.rag.vector_store import LocalVectorStore
+
+DIM = 64
+
+
+class StubEmbeddingService:
+    """本地桩 embedding 接口，记录每次请求的文本"""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, texts):
+        assert len(texts) <= 10
+        self.requests.append(list(texts))
+        return [self.vector(text) for text in texts]
+
+    @staticmethod
+    def vector(text):
+        rng = np.random.default_rng(sum(text.encode("utf-8")) * 7919 + len(text))
+        return rng.standard_normal(DIM)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_hits_skip_remote_calls(cache):
+    service = StubEmbeddingService()
+    embedder = CachedEmbedder(service, model="text-embedding-v4", dimensions=DIM, cache=cache)
+
+    texts = [f"段落 {i}" for i in range(15)]
+    first = embedder(texts)
+    assert len(service.requests) == 2
+
+    second = embedder(texts[5:] + ["新段落"])
+    assert service.requests[-1] == ["新段落"]
+    assert len(service.requests) == 3
+    # 未命中时返回的向量与之后命中缓存读到的完全相同
+    np.testing.assert_array_equal(second[0], first[5])
+    assert first[5].dtype == second[0].dtype == np.float32
+
+    stats = embedder.stats.to_dict()
+    assert stats == {
+        "requested": 26,
+        "hits": 10,
+        "hit_ratio": pytest.approx(10 / 26, abs=1e-4),
+        "api_calls": 3,
+        "api_calls_saved": 1,
+    }
+
+
+def test_duplicates_in_batch_requested_once(cache):
+    service = StubEmbeddingService()
+    embedder = CachedEmbedder(service, model="m", dimensions=DIM, cache=cache)
+
+    vectors = embedder(["重复", "重复", "唯一"])
+    assert service.requests == [["重复", "唯一"]]
+    np.testing.assert_array_equal(vectors[0], vectors[1])
+
+
+def test_key_includes_model_and_dimensions_and_persists(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    service = StubEmbeddingService()
+
+    cache = EmbeddingCache(path)
+    CachedEmbedder(service, model="v4", dimensions=DIM, cache=cache)(["查询"])
+    CachedEmbedder(service, model="v3", dimensions=DIM, cache=cache)(["查询"])
+    assert len(service.requests) == 2
+    cache.close()
+
+    reopened = EmbeddingCache(path)
+    assert reopened.count() == 2
+    embedder = CachedEmbedder(service, model="v4", dimensions=DIM, cache=reopened)
+    vector = embedder(["查询"])[0]
+    assert len(service.requests) == 2
+    assert vector.dtype == np.float32
+    np.testing.assert_allclose(vector, service.vector("查询"), rtol=1e-3, atol=1e-3)
+    reopened.close()
+
+
+def test_reingestion_only_embeds_changed_segments(cache, tmp_path):
+    """文件只改动一个段落时，重新入库只向量化该段落"""
+    service = StubEmbeddingService()
+    store = LocalVectorStore(path=str(tmp_path / "index"), dim=DIM)
+    segments = [f"指南 第{i}段" for i in range(20)]
+
+    def run(doc_segments):
+        embedder = CachedEmbedder(service, model="v4", dimensions=DIM, cache=cache)
+        job = IngestionJob(filename="guide.pdf", source="nutrition/guide.pdf", segments=list(doc_segments))
+        pipeline = IngestionPipeline(
+            download=lambda job: None,
+            parse=lambda job: None,
+            filter_segments=lambda job: None,
+            embed=embedder,
+            store=store,
+            config=PipelineConfig(embed_flush_interval=0.01),
+        )
+        return pipeline.run([job]), embedder
+
+    stats, _ = run(segments)
+    assert stats.segments == 20 and len(service.requests) == 2
+
+    changed = segments[:7] + ["指南 第7段（修订）"] + segments[8:]
+    stats, embedder = run(changed)
+    assert stats.segments_skipped == 19
+    assert stats.segments == 1
+    assert service.requests[-1] == ["指南 第7段（修订）"]
+    assert len(service.requests) == 3
+    assert store.count() == 21
+    assert embedder.stats.api_calls == 1
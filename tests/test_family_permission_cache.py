@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+家庭权限解析缓存测试
+在 SQLite 内存库上验证：一次查询加载用户在所有家庭中的角色、装饰器与处理函数
+在同一请求内共享查询、跨请求 TTL 缓存与角色变更/移除成员后的失效、
+多个服务实例共享失效、并发未命中合并为一次查询、审计日志批量写入且队列满时不丢弃，并统计家庭接口每个请求的 SQL 查询数
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.config.logging_config import start_audit_logging, stop_audit_logging
+from aurawell.core.permission_resolver import FamilyPermissionResolver
+from aurawell.core.permissions import (
+    log_permission_action,
+    require_family_membership,
+    require_family_permission,
+)
+from aurawell.database.base import Base
+from aurawell.database.family_models import FamilyDB, FamilyMemberDB
+from aurawell.models.family_models import FamilyRole
+from aurawell.repositories.family_repository import FamilyRepository
+from aurawell.services import family_service
+from aurawell.services.data_sanitization_service import DataSanitizationService
+from aurawell.services.family_service import FamilyService
+
+pytestmark = pytest.mark.database
+
+MEMBERS = [
+    # (family_id, user_id, role)
+    ("family_a", "alice", "owner"),
+    ("family_a", "bob", "viewer"),
+    ("family_a", "carol", "admin"),
+    ("family_b", "alice", "viewer"),
+    ("family_b", "bob", "owner"),
+    ("family_closed", "alice", "owner"),
+]
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.count += 1
+
+
+@pytest.fixture
+async def database(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with factory() as session:
+        for family_id in ("family_a", "family_b", "family_closed"):
+            session.add(
+                FamilyDB(
+                    family_id=family_id,
+                    name=family_id,
+                    owner_id="alice",
+                    is_active=family_id != "family_closed",
+                )
+            )
+        for family_id, user_id, role in MEMBERS:
+            session.add(
+                FamilyMemberDB(
+                    member_id=f"{family_id}:{user_id}",
+                    family_id=family_id,
+                    user_id=user_id,
+                    role=role,
+                )
+            )
+        await session.commit()
+
+    async def _load_memberships(user_id):
+        async with factory() as session:
+            return await FamilyRepository(session).get_user_memberships(user_id)
+
+    # 每个测试使用新的进程级解析器，从内存库加载
+    monkeypatch.setattr(
+        family_service, "_permission_resolver", FamilyPermissionResolver(_load_memberships)
+    )
+    yield factory, QueryCounter(engine)
+    await engine.dispose()
+
+
+def _service(factory, ttl=30.0):
+    service = FamilyService()
+    service.permission_resolver.ttl = ttl
+
+    async def _get_session():
+        return factory()
+
+    service._get_session = _get_session
+    return service
+
+
+@require_family_permission([FamilyRole.OWNER, FamilyRole.MANAGER])
+async def view_member_data(
+    family_id,
+    target_user_id,
+    current_user_id,
+    family_service,
+    sanitization_service,
+    user_permissions=None,
+):
+    """模拟家庭成员健康数据接口：处理函数内再次查权限并做数据访问检查"""
+    permissions = await family_service.get_user_family_permissions(
+        family_id, current_user_id
+    )
+    allowed = await sanitization_service.check_data_access_permission(
+        current_user_id, target_user_id, ["basic_health_info"], family_id
+    )
+    return permissions.role, allowed
+
+
+@require_family_membership()
+async def list_members(family_id, current_user_id, family_service, user_permissions=None):
+    """模拟家庭成员列表接口"""
+    return await family_service.get_family_members(family_id, current_user_id)
+
+
+async def test_memberships_load_in_one_query(database):
+    factory, queries = database
+    service = _service(factory)
+
+    memberships = await service.permission_resolver.get_memberships("alice")
+    assert memberships == {"family_a": FamilyRole.OWNER, "family_b": FamilyRole.VIEWER}
+    assert queries.count == 1
+
+    # 旧数据中的 admin/member 角色映射为 manager/viewer
+    assert await service.get_user_family_role("family_a", "carol") == FamilyRole.MANAGER
+    assert not await service.is_family_member("family_closed", "alice")
+    assert queries.count == 2
+
+
+async def test_decorator_and_handler_share_request_lookup(database):
+    factory, queries = database
+    service = _service(factory)
+    sanitization = DataSanitizationService(service)
+
+    role, allowed = await view_member_data(
+        family_id="family_a",
+        target_user_id="bob",
+        current_user_id="alice",
+        family_service=service,
+        sanitization_service=sanitization,
+    )
+    assert role == FamilyRole.OWNER and allowed
+    # alice 与 bob 各一次
+    assert queries.count == 2
+
+    with pytest.raises(HTTPException) as exc_info:
+        await view_member_data(
+            family_id="family_a",
+            target_user_id="alice",
+            current_user_id="bob",
+            family_service=service,
+            sanitization_service=sanitization,
+        )
+    assert exc_info.value.status_code == 403
+    assert queries.count == 2
+
+    with pytest.raises(HTTPException) as exc_info:
+        await list_members(family_id="family_a", current_user_id="dave", family_service=service)
+    assert exc_info.value.status_code == 403
+
+
+async def test_role_change_and_removal_invalidate_cache(database):
+    factory, queries = database
+    service = _service(factory)
+    assert await service.get_user_family_role("family_a", "bob") == FamilyRole.VIEWER
+
+    async with factory() as session:
+        await session.execute(
+            update(FamilyMemberDB)
+            .where(FamilyMemberDB.member_id == "family_a:bob")
+            .values(role="manager")
+        )
+        await session.commit()
+
+    # TTL 内仍返回缓存的角色，失效后读取新角色
+    assert await service.get_user_family_role("family_a", "bob") == FamilyRole.VIEWER
+    service.invalidate_member_permissions(user_id="bob")
+    assert await service.get_user_family_role("family_a", "bob") == FamilyRole.MANAGER
+
+    async with factory() as session:
+        await session.execute(
+            update(FamilyMemberDB)
+            .where(FamilyMemberDB.family_id == "family_a")
+            .values(is_active=False)
+        )
+        await session.commit()
+
+    service.invalidate_member_permissions(family_id="family_a")
+    with pytest.raises(HTTPException) as exc_info:
+        await list_members(family_id="family_a", current_user_id="alice", family_service=service)
+    assert exc_info.value.status_code == 403
+    assert not await service.is_family_member("family_a", "bob")
+
+
+async def test_invalidation_reaches_every_service_instance(database):
+    factory, queries = database
+    # 如 WebSocket 连接与家庭工具各自创建的 FamilyService
+    websocket_service, tool_service = _service(factory), _service(factory)
+    assert not await websocket_service.is_family_member("family_b", "carol")
+
+    async with factory() as session:
+        session.add(
+            FamilyMemberDB(
+                member_id="family_b:carol", family_id="family_b", user_id="carol", role="viewer"
+            )
+        )
+        await session.commit()
+    tool_service.invalidate_member_permissions(user_id="carol")
+
+    assert await websocket_service.is_family_member("family_b", "carol")
+
+
+async def test_concurrent_misses_share_one_query(database):
+    factory, queries = database
+    service = _service(factory)
+
+    roles = await asyncio.gather(
+        *(service.get_user_family_role("family_b", "bob") for _ in range(20))
+    )
+    assert roles == [FamilyRole.OWNER] * 20
+    assert queries.count == 1
+    assert service.permission_resolver.get_stats()["coalesced_loads"] == 19
+
+
+async def test_audit_records_written_in_batches(tmp_path):
+    log_file = tmp_path / "audit.log"
+    writer = start_audit_logging(log_file=str(log_file), batch_size=64)
+    try:
+        for i in range(500):
+            await log_permission_action(
+                f"user_{i}", "family_a", "view_member_data", "health_data"
+            )
+    finally:
+        stop_audit_logging()
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 500
+    assert '"action": "view_member_data"' in lines[0]
+    assert writer.records == 500
+    assert writer.batches < 500
+
+
+async def test_audit_records_not_dropped_when_queue_full(tmp_path):
+    log_file = tmp_path / "audit.log"
+    start_audit_logging(log_file=str(log_file), queue_size=2, batch_size=64)
+    try:
+        for i in range(500):
+            await log_permission_action(
+                f"user_{i}", "family_a", "view_member_data", "health_data"
+            )
+    finally:
+        stop_audit_logging()
+
+    # 队列满时同步写入而不是丢弃
+    assert len(log_file.read_text(encoding="utf-8").splitlines()) == 500
+
+
+async def _endpoint_queries(factory, queries, ttl, requests=10):
+    """每个模拟接口连续请求 requests 次的平均查询数"""
+    service = _service(factory, ttl=ttl)
+    sanitization = DataSanitizationService(service)
+    endpoints = {
+        "成员健康数据": lambda: view_member_data(
+            family_id="family_a",
+            target_user_id="bob",
+            current_user_id="alice",
+            family_service=service,
+            sanitization_service=sanitization,
+        ),
+        "成员列表": lambda: list_members(
+            family_id="family_a", current_user_id="alice", family_service=service
+        ),
+    }
+    results = {}
+    for name, call in endpoints.items():
+        service.invalidate_member_permissions(family_id="family_a")
+        start = queries.count
+        await call()
+        cold = queries.count - start
+        for _ in range(requests - 1):
+            await call()
+        results[name] = (cold, (queries.count - start) / requests)
+    return results
+
+
+@pytest.mark.slow
+async def test_queries_per_request_report(database):
+    """家庭接口每个请求的 SQL 查询数：缓存关闭 vs 请求内 + 跨请求缓存"""
+    factory, queries = database
+    uncached = await _endpoint_queries(factory, queries, ttl=0)
+    cached = await _endpoint_queries(factory, queries, ttl=30.0)
+
+    lines = ["\n家庭接口每请求 SQL 查询数（首个请求 / 10 个请求平均）"]
+    for name in uncached:
+        lines.append(
+            f"  {name}: 缓存关闭 {uncached[name][0]} / {uncached[name][1]:.1f}, "
+            f"启用缓存 {cached[name][0]} / {cached[name][1]:.1f}"
+        )
+    print("\n".join(lines))
+
+    for name in uncached:
+        assert cached[name][0] < uncached[name][0]
+        assert cached[name][1] < uncached[name][1]
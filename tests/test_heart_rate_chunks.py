@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+心率分块存储测试
+验证按天压缩分块（增量时间戳 + uint8 BPM）的往返正确性、预计算汇总、
+分辨率选择、与逐行存储一致的仓库接口、按游标定位的分页、同一天并发写入不丢失读数，
+以及逐行数据到分块的迁移
+"""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.database.base import Base
+from aurawell.database.connection import DatabaseManager
+from aurawell.database.migrations import DatabaseMigrator
+from aurawell.database.models import UserProfileDB
+from aurawell.database.timeseries import (
+    decode_samples,
+    encode_samples,
+    select_resolution,
+)
+from aurawell.models.enums import DataQuality, HealthPlatform, HeartRateType
+from aurawell.models.health_data_model import UnifiedHeartRateSample
+from aurawell.repositories import heart_rate_repository
+from aurawell.repositories.health_data_repository import HealthDataRepository
+
+USER_ID = "hr_user"
+DAY_START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+pytestmark = pytest.mark.database
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _per_second_samples(seconds: int, start: datetime = DAY_START) -> list:
+    """每秒一个读数的可穿戴设备数据"""
+    return [
+        UnifiedHeartRateSample(
+            timestamp_utc=start + timedelta(seconds=i),
+            bpm=60 + (i // 7) % 80,
+            measurement_type=HeartRateType.ACTIVE,
+            source_platform=HealthPlatform.XIAOMI_HEALTH,
+            data_quality=DataQuality.HIGH,
+        )
+        for i in range(seconds)
+    ]
+
+
+def test_sample_encoding_round_trip():
+    """增量编码的时间戳与 BPM 应原样还原"""
+    timestamps = np.array([0, 1000, 1500, 86_399_000], dtype=np.int64) + 1_700_000_000_000
+    bpm = np.array([55, 180, 72, 220], dtype=np.uint8)
+
+    decoded_timestamps, decoded_bpm = decode_samples(encode_samples(timestamps, bpm))
+
+    assert decoded_timestamps.tolist() == timestamps.tolist()
+    assert decoded_bpm.tolist() == bpm.tolist()
+
+
+def test_select_resolution():
+    """选择仍能满足请求点数的最粗分辨率"""
+    day = timedelta(days=1)
+    assert select_resolution(DAY_START, DAY_START + day * 7, 100)[0] == "1h"
+    assert select_resolution(DAY_START, DAY_START + day, 200)[0] == "5m"
+    assert select_resolution(DAY_START, DAY_START + day, 1000)[0] == "1m"
+    assert select_resolution(DAY_START, DAY_START + timedelta(hours=1), 100)[0] == "raw"
+    assert select_resolution(DAY_START, DAY_START + day, None)[0] == "raw"
+
+
+async def test_chunked_matches_row_storage(session_factory):
+    """分块存储的查询结果应与逐行存储一致，重复同步覆盖旧读数"""
+    samples = _per_second_samples(3 * 3600)
+    start = DAY_START + timedelta(minutes=30)
+    end = DAY_START + timedelta(hours=2)
+
+    results = {}
+    for storage in ("rows", "chunked"):
+        async with session_factory() as session:
+            repo = HealthDataRepository(session, heart_rate_storage=storage)
+            await repo.save_heart_rate_samples(USER_ID + storage, samples)
+            await repo.save_heart_rate_samples(
+                USER_ID + storage, [samples[0].model_copy(update={"bpm": 99})]
+            )
+            await session.commit()
+
+            stored = await repo.get_heart_rate_samples(
+                USER_ID + storage, start_time=start, end_time=end, limit=500
+            )
+            series = await repo.get_heart_rate_series(
+                USER_ID + storage, DAY_START, DAY_START + timedelta(hours=3), points=100
+            )
+            first = await repo.get_heart_rate_samples(
+                USER_ID + storage, end_time=DAY_START
+            )
+            results[storage] = (stored, series, first)
+
+    rows, chunked = results["rows"], results["chunked"]
+    assert len(chunked[0]) == 500
+    assert [(s.bpm, s.timestamp_utc.replace(tzinfo=None)) for s in chunked[0]] == [
+        (s.bpm, s.timestamp_utc.replace(tzinfo=None)) for s in rows[0]
+    ]
+    assert chunked[1][0] == rows[1][0] == "1m"
+    assert [p[1:] for p in chunked[1][1]] == [p[1:] for p in rows[1][1]]
+    assert chunked[2][0].bpm == rows[2][0].bpm == 99
+
+
+async def test_rollups_aggregate_samples(session_factory):
+    """1 小时汇总的 min/max/mean/count 应与原始数据一致"""
+    samples = _per_second_samples(2 * 3600)
+    async with session_factory() as session:
+        repo = HealthDataRepository(session, heart_rate_storage="chunked")
+        await repo.save_heart_rate_samples(USER_ID, samples)
+        resolution, points = await repo.get_heart_rate_series(
+            USER_ID, DAY_START, DAY_START + timedelta(days=7), points=100
+        )
+
+    first_hour = [s.bpm for s in samples[:3600]]
+    assert resolution == "1h"
+    assert len(points) == 2
+    assert points[0].timestamp_utc == DAY_START
+    assert points[0].count == 3600
+    assert points[0].min_bpm == min(first_hour)
+    assert points[0].max_bpm == max(first_hour)
+    assert points[0].mean_bpm == pytest.approx(sum(first_hour) / 3600, abs=0.01)
+
+
+async def test_migrate_rows_to_chunks(tmp_path):
+    """迁移后逐行数据被移入分块，读取结果不变"""
+    db_manager = DatabaseManager(f"sqlite+aiosqlite:///{tmp_path / 'hr.db'}")
+    samples = _per_second_samples(600)
+    try:
+        async with db_manager.get_session() as session:
+            session.add(UserProfileDB(user_id=USER_ID))
+            await session.flush()
+            repo = HealthDataRepository(session, heart_rate_storage="rows")
+            await repo.save_heart_rate_samples(USER_ID, samples)
+
+        migrated = await DatabaseMigrator(db_manager).migrate_heart_rate_to_chunks(
+            batch_size=250
+        )
+
+        async with db_manager.get_session() as session:
+            repo = HealthDataRepository(session, heart_rate_storage="chunked")
+            stored = await repo.get_heart_rate_samples(USER_ID)
+            remaining = await repo.heart_rate_repo.count()
+    finally:
+        await db_manager.close()
+
+    assert migrated == 600
+    assert remaining == 0
+    assert [s.bpm for s in reversed(stored)] == [s.bpm for s in samples]
+
+
+async def test_limit_only_read_decodes_newest_days(session_factory, monkeypatch):
+    """只给 limit 时从最新的一天往前解码，凑够数量即停止，不解码全部历史"""
+    samples = []
+    for day in range(5):
+        samples += _per_second_samples(100, DAY_START + timedelta(days=day))
+    async with session_factory() as session:
+        repo = HealthDataRepository(session, heart_rate_storage="chunked")
+        await repo.save_heart_rate_samples(USER_ID, samples)
+        await session.commit()
+        everything = await repo.get_heart_rate_samples(USER_ID)
+
+        decoded = []
+        original = heart_rate_repository.decode_samples
+
+        def _counting_decode(blob):
+            decoded.append(blob)
+            return original(blob)
+
+        monkeypatch.setattr(heart_rate_repository, "decode_samples", _counting_decode)
+        newest = await repo.get_heart_rate_samples(USER_ID, limit=150)
+
+    assert newest == everything[:150]
+    assert len(decoded) == 2
+
+
+async def test_cursor_pages_decode_from_cursor_day(session_factory, monkeypatch):
+    """分块存储的游标分页从游标所在的那天开始解码，深页不重新解码更新的天"""
+    samples = []
+    for day in range(5):
+        samples += _per_second_samples(100, DAY_START + timedelta(days=day))
+    async with session_factory() as session:
+        repo = HealthDataRepository(session, heart_rate_storage="chunked")
+        await repo.save_heart_rate_samples(USER_ID, samples)
+        await session.commit()
+        everything = await repo.get_heart_rate_samples(USER_ID)
+
+        decoded = []
+        original = heart_rate_repository.decode_samples
+
+        def _counting_decode(blob):
+            decoded.append(blob)
+            return original(blob)
+
+        monkeypatch.setattr(heart_rate_repository, "decode_samples", _counting_decode)
+        chunk_repo = repo.heart_rate_chunk_repo
+        paged, cursor, decodes_per_page = [], None, []
+        while True:
+            decoded.clear()
+            page, cursor = await chunk_repo.get_samples_page(USER_ID, limit=60, cursor=cursor)
+            paged.extend(page)
+            decodes_per_page.append(len(decoded))
+            if cursor is None:
+                break
+
+    assert paged == everything
+    # 每页最多解码游标所在的一天与其前一天
+    assert max(decodes_per_page) <= 2
+    assert sum(decodes_per_page) < len(decodes_per_page) * 5
+
+
+async def _append_and_hold(session_scope, samples):
+    """写入后等待一段时间再提交，让另一个同步在提交前读取同一天的分块"""
+    async with session_scope() as session:
+        repo = HealthDataRepository(session, heart_rate_storage="chunked")
+        await repo.save_heart_rate_samples(USER_ID, samples)
+        await asyncio.sleep(0.05)
+        await session.commit()
+
+
+@pytest.mark.parametrize("shared_connection", [True, False])
+async def test_concurrent_appends_keep_all_samples(tmp_path, shared_connection):
+    """同一用户同一天的两个并发同步都保留各自的读数"""
+    path = tmp_path / "hr.db"
+    if shared_connection:
+        # 应用配置：所有会话共享一个 SQLite 连接
+        db_manager = DatabaseManager(f"sqlite+aiosqlite:///{path}")
+        async with db_manager.get_session() as session:
+            session.add(UserProfileDB(user_id=USER_ID))
+        session_scope, close = db_manager.session_factory, db_manager.close
+    else:
+        # 每个会话独立连接，相当于多个 worker 写同一个库
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_scope, close = async_sessionmaker(bind=engine), engine.dispose
+
+    samples = _per_second_samples(200)
+    try:
+        await asyncio.gather(
+            _append_and_hold(session_scope, samples[0::2]),
+            _append_and_hold(session_scope, samples[1::2]),
+        )
+        async with session_scope() as session:
+            repo = HealthDataRepository(session, heart_rate_storage="chunked")
+            stored = await repo.get_heart_rate_samples(USER_ID)
+    finally:
+        await close()
+
+    assert [s.bpm for s in reversed(stored)] == [s.bpm for s in samples]
+
+
+@pytest.mark.slow
+async def test_chunked_storage_size_and_query_speed(session_factory):
+    """一天逐秒数据（86,400 个读数）的存储体积与查询耗时基准"""
+    samples = _per_second_samples(86_400)
+    async with session_factory() as session:
+        repo = HealthDataRepository(session, heart_rate_storage="chunked")
+        start = time.perf_counter()
+        await repo.save_heart_rate_samples(USER_ID, samples)
+        await session.commit()
+        write_elapsed = time.perf_counter() - start
+
+        chunk = await repo.heart_rate_chunk_repo.get_first_by_filters(
+            {"user_id": USER_ID}
+        )
+        blob_bytes = sum(
+            len(getattr(chunk, column))
+            for column in ("samples", "rollup_1m", "rollup_5m", "rollup_1h")
+        )
+
+        start = time.perf_counter()
+        raw = await repo.get_heart_rate_samples(USER_ID)
+        raw_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resolution, series = await repo.get_heart_rate_series(
+            USER_ID, DAY_START, DAY_START + timedelta(days=1), points=200
+        )
+        series_elapsed = time.perf_counter() - start
+
+    print(
+        f"\n📊 86,400 samples: write {write_elapsed * 1000:.0f}ms, "
+        f"{blob_bytes / 1024:.1f}KiB stored ({blob_bytes / 86_400:.2f}B/sample), "
+        f"raw read {raw_elapsed * 1000:.0f}ms, "
+        f"{resolution} series ({len(series)} points) {series_elapsed * 1000:.1f}ms"
+    )
+    assert len(raw) == 86_400
+    assert resolution == "5m" and len(series) == 288
+    assert blob_bytes < 86_400 * 2
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RAG入库流水线测试
+用本地桩服务模拟 OSS 下载、DocMind 解析、大模型过滤和 embedding 接口的延迟，
+验证跨文件拼批、失败隔离、检查点续传，并对比逐文件串行处理的吞吐量
+"""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.rag.ingestion_pipeline import IngestionJob, IngestionPipeline, PipelineConfig
+from aurawell.rag.vector_store import LocalVectorStore
+
+DIM = 32
+FILES = int(os.getenv("AURAWELL_INGEST_BENCH_FILES", "24"))
+SEGMENTS_PER_FILE = 13
+
+DOWNLOAD_LATENCY = 0.02
+PARSE_LATENCY = 0.05
+FILTER_LATENCY = 0.05
+EMBED_LATENCY = 0.03
+INSERT_LATENCY = 0.002
+
+
+class StubServices:
+    """模拟各远程服务，记录调用次数"""
+
+    def __init__(self, fail_files=()):
+        self.fail_files = set(fail_files)
+        self.embed_calls = 0
+        self.batch_sizes = []
+        self.filtered = []
+        self._lock = threading.Lock()
+
+    def download(self, job):
+        time.sleep(DOWNLOAD_LATENCY)
+        job.local_path = f"/tmp/{job.filename}"
+
+    def parse(self, job):
+        time.sleep(PARSE_LATENCY)
+        job.full_text = job.filename
+
+    def filter(self, job):
+        time.sleep(FILTER_LATENCY)
+        if job.filename in self.fail_files:
+            raise RuntimeError("模型调用失败")
+        job.segments = [f"{job.filename} 段落 {i}" for i in range(SEGMENTS_PER_FILE)]
+        with self._lock:
+            self.filtered.append(job.filename)
+
+    def embed(self, texts):
+        assert len(texts) <= 10
+        time.sleep(EMBED_LATENCY)
+        with self._lock:
+            self.embed_calls += 1
+            self.batch_sizes.append(len(texts))
+        return [self._vector(text) for text in texts]
+
+    @staticmethod
+    def _vector(text):
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(DIM)
+
+
+def _jobs(count=FILES):
+    return [IngestionJob(filename=f"doc_{i}.pdf", source=f"nutrition/doc_{i}.pdf") for i in range(count)]
+
+
+def _pipeline(services, store, checkpoints=None, **config):
+    def checkpoint(job, stage):
+        if checkpoints is not None:
+            checkpoints.append((job.filename, stage))
+
+    return IngestionPipeline(
+        download=services.download,
+        parse=services.parse,
+        filter_segments=services.filter,
+        embed=services.embed,
+        store=store,
+        checkpoint=checkpoint,
+        config=PipelineConfig(embed_flush_interval=0.05, **config),
+    )
+
+
+def test_batches_span_files_and_checkpoints(tmp_path):
+    """段落跨文件拼成满批次，每个文件写入后记录一次检查点"""
+    services = StubServices()
+    store = LocalVectorStore(path=str(tmp_path), dim=DIM)
+    checkpoints = []
+
+    stats = _pipeline(services, store, checkpoints).run(_jobs(6))
+
+    total_segments = 6 * SEGMENTS_PER_FILE
+    assert stats.processed == 6 and stats.failed == 0
+    assert stats.segments == total_segments == store.count()
+    # 13 段/文件，逐文件拼批需要 12 次调用，跨文件拼批只需 8 次
+    assert services.embed_calls == -(-total_segments // 10)
+    assert sorted(checkpoints) == sorted((f"doc_{i}.pdf", "stored") for i in range(6))
+
+    hit = store.query(services._vector("doc_3.pdf 段落 7"), topk=1)[0]
+    assert hit.fields == {"raw_text": "doc_3.pdf 段落 7", "sub_title": "filtered_content"}
+
+
+def test_failed_file_does_not_block_others(tmp_path):
+    services = StubServices(fail_files={"doc_2.pdf"})
+    store = LocalVectorStore(path=str(tmp_path), dim=DIM)
+    checkpoints = []
+
+    stats = _pipeline(services, store, checkpoints).run(_jobs(5))
+
+    assert stats.processed == 4 and stats.failed == 1
+    assert "doc_2.pdf" in stats.errors
+    assert ("doc_2.pdf", "failed") in checkpoints
+    assert store.count() == 4 * SEGMENTS_PER_FILE
+
+
+def test_resume_skips_finished_stages_and_is_idempotent(tmp_path):
+    """带着已保存段落的文件跳过下载/解析/过滤；重跑已写入的文件不会产生重复向量"""
+    services = StubServices()
+    store = LocalVectorStore(path=str(tmp_path), dim=DIM)
+    _pipeline(services, store).run(_jobs(3))
+    assert store.count() == 3 * SEGMENTS_PER_FILE
+
+    resumed = IngestionJob(
+        filename="doc_1.pdf",
+        source="nutrition/doc_1.pdf",
+        segments=[f"doc_1.pdf 段落 {i}" for i in range(SEGMENTS_PER_FILE)],
+        resumed=True,
+    )
+    services.filtered.clear()
+    stats = _pipeline(services, store).run([resumed, _jobs(4)[3]])
+
+    assert stats.processed == 2 and stats.resumed == 1
+    assert services.filtered == ["doc_3.pdf"]
+    assert store.count() == 4 * SEGMENTS_PER_FILE
+
+
+def _run_sequential(services, store, jobs):
+    """原实现的处理方式：逐文件串行，每文件单独分批向量化，每个段落单独写入"""
+    for job in jobs:
+        services.download(job)
+        services.parse(job)
+        services.filter(job)
+        for start in range(0, len(job.segments), 10):
+            batch = job.segments[start:start + 10]
+            for text, vector in zip(batch, services.embed(batch)):
+                time.sleep(INSERT_LATENCY)
+                store.add([vector], [{"raw_text": text, "sub_title": job.sub_title}])
+
+
+@pytest.mark.slow
+def test_throughput_benchmark(tmp_path):
+    """对比串行处理与流水线处理同一批文件的吞吐量"""
+    sequential_services = StubServices()
+    sequential_store = LocalVectorStore(path=str(tmp_path / "sequential"), dim=DIM)
+    start = time.perf_counter()
+    _run_sequential(sequential_services, sequential_store, _jobs())
+    sequential_seconds = time.perf_counter() - start
+
+    pipeline_services = StubServices()
+    pipeline_store = LocalVectorStore(path=str(tmp_path / "pipeline"), dim=DIM)
+    stats = _pipeline(pipeline_services, pipeline_store).run(_jobs())
+
+    print(
+        f"\n入库吞吐基准: {FILES} 个文件 x {SEGMENTS_PER_FILE} 段\n"
+        f"  串行:   {FILES / sequential_seconds:.1f} 文件/秒, "
+        f"{sequential_services.embed_calls} 次向量化调用\n"
+        f"  流水线: {FILES / stats.elapsed_seconds:.1f} 文件/秒, "
+        f"{stats.embedding_calls} 次向量化调用, {stats.upsert_calls} 次批量写入"
+    )
+
+    assert pipeline_store.count() == sequential_store.count() == FILES * SEGMENTS_PER_FILE
+    assert stats.embedding_calls < sequential_services.embed_calls
+    assert stats.elapsed_seconds * 3 < sequential_seconds
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+健康数据游标分页与流式读取测试
+验证 keyset（seek）分页逐页拼接后与完整查询一致、游标格式校验、
+流式批量读取、健康数据接口只在 paginate 或 cursor 时才改用数据库分页（limit 不切换数据源），
+以及深分页时 OFFSET 与 keyset 的耗时对比
+"""
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.database.base import Base
+from aurawell.database.connection import DatabaseManager
+from aurawell.database.models import HeartRateSampleDB, UserProfileDB
+from aurawell.models.enums import DataQuality, HealthPlatform, HeartRateType
+from aurawell.models.health_data_model import (
+    UnifiedActivitySummary,
+    UnifiedHeartRateSample,
+)
+from aurawell.repositories import InvalidCursorError
+from aurawell.repositories.health_data_repository import HealthDataRepository
+
+USER_ID = "page_user"
+START = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+pytestmark = pytest.mark.database
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+def _activities(days: int) -> list:
+    return [
+        UnifiedActivitySummary(
+            date=(date(2025, 1, 1) + timedelta(days=i)).isoformat(),
+            steps=1000 + i,
+            source_platform=platform,
+            data_quality=DataQuality.HIGH,
+        )
+        for i in range(days)
+        # 同一天两个平台，验证 date 相同时按 id 决胜
+        for platform in (HealthPlatform.XIAOMI_HEALTH, HealthPlatform.APPLE_HEALTH)
+    ]
+
+
+def _heart_rate_samples(count: int) -> list:
+    return [
+        UnifiedHeartRateSample(
+            timestamp_utc=START + timedelta(seconds=10 * i),
+            bpm=60 + i % 50,
+            measurement_type=HeartRateType.ACTIVE,
+            source_platform=platform,
+            data_quality=DataQuality.HIGH,
+        )
+        for i in range(count)
+        # 两个来源共享时间戳，分页不能跳过或重复
+        for platform in (HealthPlatform.XIAOMI_HEALTH, HealthPlatform.APPLE_HEALTH)
+    ]
+
+
+async def _all_pages(fetch, limit: int) -> list:
+    items, cursor, pages = [], None, 0
+    while True:
+        page, cursor = await fetch(limit=limit, cursor=cursor)
+        items.extend(page)
+        pages += 1
+        assert len(page) <= limit
+        if cursor is None:
+            return items
+        assert pages < 10_000
+
+
+async def test_activity_pages_match_full_query(session_factory):
+    """逐页拼接的结果应与一次性查询完全一致"""
+    async with session_factory() as session:
+        repo = HealthDataRepository(session)
+        await repo.save_activity_summaries(USER_ID, _activities(45))
+        await session.commit()
+
+        full = await repo.get_activity_summaries(USER_ID)
+        paged = await _all_pages(
+            lambda **kw: repo.get_activity_summaries_page(USER_ID, **kw), limit=7
+        )
+        streamed = [
+            row
+            async for batch in repo.stream_activity_summaries(USER_ID, batch_size=8)
+            for row in batch
+        ]
+
+    assert len(paged) == len(full) == 90
+    assert len({row.id for row in paged}) == 90
+    assert [row.date for row in paged] == [row.date for row in full]
+    assert [row.id for row in streamed] == [
+        row.id for row in sorted(paged, key=lambda row: (row.date, row.id))
+    ]
+
+
+@pytest.mark.parametrize("storage", ["rows", "chunked"])
+async def test_heart_rate_pages_and_stream(session_factory, storage):
+    """两种心率存储的分页与流式读取都应不重不漏"""
+    samples = _heart_rate_samples(1_500)
+    async with session_factory() as session:
+        repo = HealthDataRepository(session, heart_rate_storage=storage)
+        await repo.save_heart_rate_samples(USER_ID, samples)
+        await session.commit()
+
+        # 奇数页大小使页边界落在同一时间戳的两条样本之间
+        paged = await _all_pages(
+            lambda **kw: repo.get_heart_rate_samples_page(USER_ID, **kw), limit=99
+        )
+        batches = [
+            batch
+            async for batch in repo.stream_heart_rate_samples(USER_ID, batch_size=250)
+        ]
+
+    key = lambda s: (s.timestamp_utc.replace(tzinfo=None), s.source_platform)
+    assert len(paged) == len(samples)
+    assert len(set(map(key, paged))) == len(samples)
+    assert [s.timestamp_utc for s in paged] == sorted(
+        (s.timestamp_utc for s in paged), reverse=True
+    )
+    assert all(len(batch) <= 250 for batch in batches)
+    assert sorted(map(key, (s for b in batches for s in b))) == sorted(map(key, paged))
+
+
+async def test_invalid_cursor(session_factory):
+    """格式错误或与排序键不匹配的游标应抛出 InvalidCursorError"""
+    async with session_factory() as session:
+        repo = HealthDataRepository(session)
+        for cursor in ("not-a-cursor", "WzEsMiwzXQ", "WyJ4Il0"):
+            with pytest.raises(InvalidCursorError):
+                await repo.get_activity_summaries_page(USER_ID, cursor=cursor)
+
+
+class FakeToolsRegistry:
+    """健康工具数据源（如小米健康）"""
+
+    def get_tool(self, name):
+        async def activity_summary(user_id, days):
+            return [{"steps": 4321, "exercise_sessions": 2}]
+
+        return activity_summary
+
+
+async def test_limit_alone_keeps_health_tools_source(tmp_path, monkeypatch):
+    """只传 limit 仍由健康工具返回数据；paginate=true 或带 cursor 才返回数据库分页"""
+    from aurawell.auth import get_current_user_id
+    from aurawell.interfaces import api_interface
+
+    db_manager = DatabaseManager(f"sqlite+aiosqlite:///{tmp_path / 'page.db'}")
+    async with db_manager.get_session() as session:
+        session.add(UserProfileDB(user_id=USER_ID))
+        await session.flush()
+        await HealthDataRepository(session).save_activity_summaries(USER_ID, _activities(3))
+
+    app = api_interface.app
+    monkeypatch.setattr(api_interface, "_db_manager", db_manager)
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    app.dependency_overrides[api_interface.get_tools_registry] = FakeToolsRegistry
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://localhost"
+        ) as client:
+
+            async def fetch(**params):
+                response = await client.get("/api/v1/health/activity", params=params)
+                assert response.status_code == 200
+                return response.json()
+
+            limited = await fetch(limit=4)
+            first_page = await fetch(paginate="true", limit=4)
+            second_page = await fetch(cursor=first_page["next_cursor"], limit=4)
+    finally:
+        app.dependency_overrides.pop(get_current_user_id, None)
+        app.dependency_overrides.pop(api_interface.get_tools_registry, None)
+        await db_manager.close()
+
+    assert [(row["steps"], row["exercise_sessions"]) for row in limited["data"]] == [(4321, 2)]
+    assert limited["next_cursor"] is None
+    assert [row["steps"] for row in first_page["data"]] == [1002, 1002, 1001, 1001]
+    assert [row["steps"] for row in second_page["data"]] == [1000, 1000]
+    assert second_page["next_cursor"] is None
+
+
+@pytest.mark.slow
+async def test_deep_page_offset_vs_keyset(session_factory):
+    """深分页：OFFSET 需扫描跳过的行，keyset 直接从索引定位"""
+    total, limit = 100_000, 100
+    async with session_factory() as session:
+        repo = HealthDataRepository(session, heart_rate_storage="rows")
+        await repo.save_heart_rate_samples(USER_ID, _heart_rate_samples(total // 2))
+        await session.commit()
+
+        # 取倒数第二页的游标
+        boundary = (
+            await repo.heart_rate_repo.paginate(
+                repo._heart_rate_select(USER_ID, None, None, None),
+                ("timestamp_utc",),
+                total - 2 * limit,
+            )
+        )[1]
+
+        stmt = (
+            select(HeartRateSampleDB)
+            .where(HeartRateSampleDB.user_id == USER_ID)
+            .order_by(
+                HeartRateSampleDB.timestamp_utc.desc(), HeartRateSampleDB.id.desc()
+            )
+            .offset(total - 2 * limit)
+            .limit(limit)
+        )
+        start = time.perf_counter()
+        offset_rows = list((await session.execute(stmt)).scalars().all())
+        offset_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        keyset_rows, _ = await repo.get_heart_rate_samples_page(
+            USER_ID, limit=limit, cursor=boundary
+        )
+        keyset_elapsed = time.perf_counter() - start
+
+    print(
+        f"\n📊 page {total // limit - 1} of {total:,} rows: "
+        f"OFFSET {offset_elapsed * 1000:.1f}ms, keyset {keyset_elapsed * 1000:.1f}ms"
+    )
+    assert [row.id for row in keyset_rows] == [row.id for row in offset_rows]
+    assert keyset_elapsed < offset_elapsed
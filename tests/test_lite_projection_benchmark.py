@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+健康数据只读列投影基准测试
+对比 365 天活动/睡眠查询时加载完整 ORM 实体与只选所需列的轻量命名元组
+在延迟与内存分配（tracemalloc 峰值）上的差异
+"""
+
+import os
+import sys
+import time as timer
+import tracemalloc
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.database.base import Base
+from aurawell.models.enums import DataQuality, HealthPlatform
+from aurawell.models.health_data_model import (
+    UnifiedActivitySummary,
+    UnifiedSleepSession,
+)
+from aurawell.repositories.health_data_repository import HealthDataRepository
+
+USER_ID = "lite_user"
+DAYS = 365
+ROUNDS = int(os.getenv("AURAWELL_LITE_BENCH_ROUNDS", "20"))
+START_DATE = date.today() - timedelta(days=DAYS - 1)
+
+pytestmark = pytest.mark.database
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with factory() as session:
+        repo = HealthDataRepository(session)
+        await repo.save_activity_summaries(
+            USER_ID,
+            [
+                UnifiedActivitySummary(
+                    date=(START_DATE + timedelta(days=i)).isoformat(),
+                    steps=6000 + i,
+                    distance_meters=4800.0,
+                    active_calories=250.0,
+                    total_calories=2100.0,
+                    active_minutes=20 + i % 30,
+                    source_platform=HealthPlatform.XIAOMI_HEALTH,
+                    data_quality=DataQuality.HIGH,
+                )
+                for i in range(DAYS)
+            ],
+        )
+        await repo.save_sleep_sessions(
+            USER_ID,
+            [
+                UnifiedSleepSession(
+                    start_time_utc=datetime.combine(
+                        START_DATE + timedelta(days=i), time(0, 30), timezone.utc
+                    ),
+                    end_time_utc=datetime.combine(
+                        START_DATE + timedelta(days=i), time(7, 30), timezone.utc
+                    ),
+                    total_duration_seconds=(420 + i % 60) * 60,
+                    deep_sleep_seconds=90 * 60,
+                    light_sleep_seconds=250 * 60,
+                    rem_sleep_seconds=80 * 60,
+                    sleep_efficiency=88.0,
+                    source_platform=HealthPlatform.XIAOMI_HEALTH,
+                    data_quality=DataQuality.HIGH,
+                )
+                for i in range(DAYS)
+            ],
+        )
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+def _activity_dicts(summaries) -> list:
+    """与 core.health_tools.get_user_activity_summary 相同的转换"""
+    return [
+        {
+            "date": str(summary.date),
+            "steps": summary.steps or 0,
+            "distance_km": (summary.distance_meters or 0) / 1000,
+            "calories_burned": summary.active_calories or 0,
+            "active_minutes": summary.active_minutes or 0,
+        }
+        for summary in summaries
+    ]
+
+
+async def _measure(session_factory, method: str):
+    """返回 (每次查询平均秒数, 单次查询内存分配峰值字节, 结果)"""
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        async with session_factory() as session:
+            fetch = getattr(HealthDataRepository(session), method)
+            start = timer.perf_counter()
+            result = _activity_dicts(await fetch(USER_ID, start_date=START_DATE))
+            elapsed += timer.perf_counter() - start
+
+    async with session_factory() as session:
+        fetch = getattr(HealthDataRepository(session), method)
+        tracemalloc.start()
+        try:
+            await fetch(USER_ID, start_date=START_DATE)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return elapsed / ROUNDS, peak, result
+
+
+async def test_lite_rows_match_orm(session_factory):
+    """投影结果应与 ORM 实体的对应字段一致，且不进入会话的 identity map"""
+    async with session_factory() as session:
+        repo = HealthDataRepository(session)
+        lite = await repo.get_sleep_sessions_lite(USER_ID, limit=30)
+        assert len(session.identity_map) == 0
+
+        full = await repo.get_sleep_sessions(USER_ID, limit=30)
+
+    assert [tuple(row) for row in lite] == [
+        tuple(getattr(row, field) for field in lite[0]._fields) for row in full
+    ]
+
+
+@pytest.mark.slow
+async def test_activity_year_lite_vs_orm(session_factory):
+    """365 天活动查询：列投影应比完整 ORM 实体更快、分配更少"""
+    orm_seconds, orm_peak, orm_result = await _measure(
+        session_factory, "get_activity_summaries"
+    )
+    lite_seconds, lite_peak, lite_result = await _measure(
+        session_factory, "get_activity_summaries_lite"
+    )
+
+    print(
+        f"\n📊 {DAYS}-day activity query: ORM {orm_seconds * 1000:.2f}ms / "
+        f"{orm_peak / 1024:.0f}KiB peak, lite {lite_seconds * 1000:.2f}ms / "
+        f"{lite_peak / 1024:.0f}KiB peak"
+    )
+    assert lite_result == orm_result
+    assert len(lite_result) == DAYS
+    assert lite_peak < orm_peak
+    assert lite_seconds < orm_seconds
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 响应缓存测试
+验证规范化后的精确匹配命中、按用户隔离的个性化缓存、
+多轮对话不会被跨用户共享，以及基于 embedding 相似度的语义命中
+"""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.core.deepseek_client import DeepSeekResponse
+from aurawell.core.llm_cache import (
+    SHARED_SCOPE,
+    CachedAIClient,
+    LLMResponseCache,
+    user_scope,
+)
+from aurawell.utils.cache import CacheManager
+
+SYSTEM = {"role": "system", "content": "你是AuraWell健康助手"}
+LATENCY = 0.05
+
+
+class FakeClient:
+    """记录调用次数、固定延迟的模拟客户端"""
+
+    is_mock = True
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_deepseek_response_async(
+        self, messages, model_name=None, tools=None, temperature=0.7, max_tokens=1024
+    ):
+        self.calls += 1
+        await asyncio.sleep(LATENCY)
+        return DeepSeekResponse(
+            content=f"answer {self.calls}",
+            model=model_name or "deepseek-chat",
+            finish_reason="stop",
+        )
+
+
+async def char_embedder(texts):
+    """按字符计数的简易 embedding，字面相近的问题相似度高"""
+    vectors = []
+    for text in texts:
+        vector = np.zeros(4096)
+        for char in text:
+            vector[ord(char) % 4096] += 1
+        vectors.append(vector)
+    return vectors
+
+
+def _ask(question):
+    return [SYSTEM, {"role": "user", "content": question}]
+
+
+@pytest.fixture
+def client():
+    # 不可达的 Redis：只使用进程内 L1 缓存
+    cache_manager = CacheManager(redis_url="redis://127.0.0.1:1/0", local_cache=True, local_ttl=300)
+    cache = LLMResponseCache(cache_manager, enabled=True)
+    return CachedAIClient(FakeClient(), cache)
+
+
+async def test_exact_hit_after_normalization(client):
+    """全角标点、空白与大小写差异不影响精确匹配"""
+    first = await client.get_deepseek_response_async(
+        _ask("每天应该走多少步？"), cache_scope=SHARED_SCOPE
+    )
+    second = await client.get_deepseek_response_async(
+        _ask("  每天应该走多少步? "), cache_scope=SHARED_SCOPE
+    )
+    other_temperature = await client.get_deepseek_response_async(
+        _ask("每天应该走多少步"), temperature=0.2, cache_scope=SHARED_SCOPE
+    )
+
+    assert second.content == first.content
+    assert other_temperature.content != first.content
+    assert client.client.calls == 2
+
+    stats = client.cache.get_stats()
+    assert stats["exact_hits"] == 1 and stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+    assert stats["latency_saved"] >= LATENCY * 0.8
+    assert client.is_mock  # 其他属性透传给底层客户端
+
+
+async def test_personalized_prompts_are_scoped_per_user(client):
+    """个性化提示词只对同一用户命中；多轮对话不能标记为共享；未指定范围则绕过"""
+    prompt = _ask("我的BMI是27.5，应该怎么减重")
+    alice = await client.get_deepseek_response_async(
+        prompt, cache_scope=user_scope("alice")
+    )
+    bob = await client.get_deepseek_response_async(
+        prompt, cache_scope=user_scope("bob")
+    )
+    alice_again = await client.get_deepseek_response_async(
+        prompt, cache_scope=user_scope("alice")
+    )
+    assert alice_again.content == alice.content != bob.content
+
+    history = [
+        SYSTEM,
+        {"role": "user", "content": "我今天睡了5小时"},
+        {"role": "assistant", "content": "睡眠偏少"},
+        {"role": "user", "content": "怎么办"},
+    ]
+    for _ in range(2):
+        await client.get_deepseek_response_async(history, cache_scope=SHARED_SCOPE)
+        await client.get_deepseek_response_async(_ask("怎么办"))
+
+    assert client.client.calls == 6
+    assert client.cache.get_stats()["bypassed"] == 4
+
+
+async def test_semantic_hit_within_threshold():
+    """语义相近的问题复用答案，差异较大的问题仍然调用模型"""
+    cache_manager = CacheManager(redis_url="redis://127.0.0.1:1/0", local_cache=True, local_ttl=300)
+    cache = LLMResponseCache(
+        cache_manager, embedder=char_embedder, semantic_threshold=0.9, enabled=True
+    )
+    client = CachedAIClient(FakeClient(), cache)
+
+    first = await client.get_deepseek_response_async(
+        _ask("成年人每天应该走多少步"), cache_scope=SHARED_SCOPE
+    )
+    similar = await client.get_deepseek_response_async(
+        _ask("成年人每天大概应该走多少步"), cache_scope=SHARED_SCOPE
+    )
+    different = await client.get_deepseek_response_async(
+        _ask("晚上失眠怎么改善"), cache_scope=SHARED_SCOPE
+    )
+    # 不同用户范围下的语义索引互不可见
+    scoped = await client.get_deepseek_response_async(
+        _ask("成年人每天应该走多少步"), cache_scope=user_scope("alice")
+    )
+
+    assert similar.content == first.content
+    assert different.content != first.content
+    assert scoped.content != first.content
+    stats = cache.get_stats()
+    assert stats["semantic_hits"] == 1 and stats["misses"] == 3
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内缓存测试
+验证 LocalCache 的 LRU 淘汰（条目数与字节数上限）、TTL 过期与模式删除，
+CacheManager 的 L1 默认关闭、命中时返回独立副本，以及并发未命中合并为一次计算
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.utils import cache as cache_module
+from aurawell.utils.cache import CacheManager, LocalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_lru_evicts_least_recently_used(clock):
+    local = LocalCache(max_entries=3, max_bytes=1000)
+    for key in ("a", "b", "c"):
+        local.set(key, key.upper(), size=10, ttl=60)
+
+    # 访问 a 后，最久未使用的是 b
+    assert local.get("a") == "A"
+    assert local.set("d", "D", size=10, ttl=60) == 1
+    assert local.get("b") is None
+    assert [local.get(key) for key in ("a", "c", "d")] == ["A", "C", "D"]
+    assert len(local) == 3
+
+
+def test_byte_limit_evicts_and_rejects_oversized(clock):
+    local = LocalCache(max_entries=100, max_bytes=100)
+    local.set("a", 1, size=40, ttl=60)
+    local.set("b", 2, size=40, ttl=60)
+    assert local.set("c", 3, size=40, ttl=60) == 1
+    assert local.get("a") is None
+    assert local.current_bytes == 80
+
+    # 超过总字节上限的值不缓存，并移除同名旧值
+    assert local.set("b", 4, size=101, ttl=60) == 0
+    assert local.get("b") is None
+    assert local.current_bytes == 40
+
+
+def test_entries_expire_after_ttl(clock):
+    local = LocalCache(max_entries=10, max_bytes=1000)
+    local.set("short", 1, size=1, ttl=5)
+    local.set("long", 2, size=1, ttl=60)
+
+    clock.now += 5
+    assert local.get("short") is None
+    assert local.get("long") == 2
+    assert len(local) == 1
+    assert local.current_bytes == 1
+
+
+def test_discard_matching(clock):
+    local = LocalCache(max_entries=10, max_bytes=1000)
+    for key in ("aurawell:user_data:1", "aurawell:user_data:2", "aurawell:health_data:1"):
+        local.set(key, key, size=1, ttl=60)
+
+    assert local.discard_matching("aurawell:user_data:*") == 2
+    assert len(local) == 1
+    assert local.current_bytes == 1
+
+
+def _offline_cache(monkeypatch, **kwargs) -> CacheManager:
+    """不连接 Redis 的缓存管理器，只使用进程内 L1"""
+    cache = CacheManager(**kwargs)
+
+    async def _no_client():
+        return None
+
+    monkeypatch.setattr(cache, "_get_client", _no_client)
+    return cache
+
+
+async def test_local_tier_disabled_by_default(monkeypatch):
+    cache = _offline_cache(monkeypatch)
+    assert not cache.local_enabled
+    assert not await cache.set("aurawell:user_data:1", {"name": "alice"})
+    assert await cache.get("aurawell:user_data:1") is None
+
+
+async def test_local_hits_return_independent_copies(monkeypatch):
+    cache = _offline_cache(monkeypatch, local_cache=True)
+    await cache.set("aurawell:user_data:1", {"tags": ["a"]})
+
+    first = await cache.get("aurawell:user_data:1")
+    first["tags"].append("mutated")
+    assert await cache.get("aurawell:user_data:1") == {"tags": ["a"]}
+    assert await cache.get_many(["aurawell:user_data:1"]) == {
+        "aurawell:user_data:1": {"tags": ["a"]}
+    }
+
+
+async def test_concurrent_misses_share_one_computation(monkeypatch):
+    cache = _offline_cache(monkeypatch)
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"value": 42}
+
+    callers = [
+        asyncio.ensure_future(cache.get_or_set("aurawell:health_data:1", compute))
+        for _ in range(20)
+    ]
+    await asyncio.sleep(0)
+    # 取消其中一个调用方不会取消其他调用方等待的计算
+    callers[0].cancel()
+    release.set()
+    results = await asyncio.gather(*callers[1:])
+
+    assert calls == 1
+    assert results == [{"value": 42}] * 19
+    assert cache._inflight == {}
+
+    # 计算完成后再次未命中会重新计算
+    await cache.get_or_set("aurawell:health_data:1", compute)
+    assert calls == 2
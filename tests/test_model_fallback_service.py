@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多模型梯度服务测试
+验证超时真正取消请求、非超时错误重试、熔断器打开与半开恢复、
+超过 p95 时的对冲请求（落败请求被取消），以及 p50/p95/p99 性能报告
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.core.deepseek_client import DeepSeekResponse
+from aurawell.services.model_fallback_service import (
+    CircuitState,
+    ModelFallbackService,
+    ModelTier,
+)
+
+MESSAGES = [{"role": "user", "content": "你好"}]
+
+
+class FakeClient:
+    """按模型名配置延迟与失败的模拟客户端"""
+
+    def __init__(self):
+        self.latency = {}
+        self.failures = {}
+        self.calls = []
+        self.cancelled = []
+
+    async def get_deepseek_response_async(self, messages, model_name=None, **kwargs):
+        self.calls.append(model_name)
+        try:
+            await asyncio.sleep(self.latency.get(model_name, 0.0))
+        except asyncio.CancelledError:
+            self.cancelled.append(model_name)
+            raise
+        if self.failures.get(model_name, 0) > 0:
+            self.failures[model_name] -= 1
+            raise RuntimeError("upstream 502")
+        return DeepSeekResponse(
+            content=f"reply from {model_name}", model=model_name, finish_reason="stop"
+        )
+
+
+@pytest.fixture
+def service():
+    client = FakeClient()
+    service = ModelFallbackService(client, enable_hedging=False, request_budget=5.0)
+    service.retry_backoff = 0.01
+    service.model_configs[ModelTier.HIGH_PRECISION].timeout_threshold = 0.3
+    service.model_configs[ModelTier.FAST_RESPONSE].timeout_threshold = 0.3
+    return service
+
+
+def _names(service):
+    return (
+        service.model_configs[ModelTier.HIGH_PRECISION].name,
+        service.model_configs[ModelTier.FAST_RESPONSE].name,
+    )
+
+
+async def test_timeout_cancels_and_falls_back(service):
+    """高精度模型超时后请求被取消，并降级到快速模型"""
+    high, fast = _names(service)
+    service.deepseek_client.latency[high] = 10.0
+
+    start = time.perf_counter()
+    response = await service.get_model_response(MESSAGES)
+
+    assert response.success and response.model_used == fast
+    assert time.perf_counter() - start < 1.0
+    assert service.deepseek_client.cancelled == [high]
+    assert service.tier_health[ModelTier.HIGH_PRECISION].timeout_count == 1
+
+
+async def test_transient_error_is_retried(service):
+    """非超时错误按 max_retries 重试，不降级"""
+    high, _ = _names(service)
+    service.deepseek_client.failures[high] = 1
+
+    response = await service.get_model_response(MESSAGES)
+
+    assert response.model_used == high
+    assert service.deepseek_client.calls == [high, high]
+
+
+async def test_circuit_breaker_opens_and_recovers(service):
+    """连续失败后熔断并跳过高精度模型，冷却后半开探测成功即恢复"""
+    high, fast = _names(service)
+    health = service.tier_health[ModelTier.HIGH_PRECISION]
+    health.recovery_timeout = 0.2
+    service.deepseek_client.failures[high] = health.failure_threshold
+
+    response = await service.get_model_response(MESSAGES)
+    assert response.model_used == fast
+    assert health.state == CircuitState.OPEN
+
+    service.deepseek_client.calls.clear()
+    assert (await service.get_model_response(MESSAGES)).model_used == fast
+    assert high not in service.deepseek_client.calls
+
+    await asyncio.sleep(0.25)
+    assert (await service.get_model_response(MESSAGES)).model_used == high
+    assert health.state == CircuitState.CLOSED
+
+
+async def test_hedged_request_takes_faster_model(service):
+    """高精度模型超过 p95 后对冲快速模型，取先返回者并取消另一个"""
+    high, fast = _names(service)
+    client = service.deepseek_client
+    client.latency[high] = 0.02
+    for _ in range(10):
+        await service.get_model_response(MESSAGES)
+    p95 = service.tier_health[ModelTier.HIGH_PRECISION].percentile(95)
+    assert p95 is not None and p95 < 0.1
+
+    client.latency[high] = 0.25
+    client.latency[fast] = 0.02
+    start = time.perf_counter()
+    response = await service.get_model_response(MESSAGES, hedge=True)
+    elapsed = time.perf_counter() - start
+
+    assert response.model_used == fast
+    assert elapsed < 0.2
+    assert client.cancelled == [high]
+    assert service.hedge_stats == {"fired": 1, "won": 1}
+
+
+async def test_performance_report_percentiles(service):
+    """性能报告包含每个级别的 p50/p95/p99 与熔断状态"""
+    for _ in range(6):
+        await service.get_model_response(MESSAGES)
+
+    stats = service.get_performance_report()["performance_stats"]
+    high_stats = stats[ModelTier.HIGH_PRECISION.value]
+    assert high_stats["successful_calls"] == 6
+    assert 0 <= high_stats["p50"] <= high_stats["p95"] <= high_stats["p99"]
+    assert high_stats["circuit_state"] == "closed"
+    assert stats[ModelTier.FAST_RESPONSE.value]["p95"] is None
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+密码哈希线程池测试
+验证哈希在线程池中执行、排队超限时返回 429、演示账号使用预计算哈希、
+未知用户与已知用户同样只做一次哈希校验（登录耗时不泄露用户名是否存在），
+并测量 200 个并发登录期间无关接口的 p99 延迟（事件循环上直接哈希 vs 线程池）
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from passlib.context import CryptContext
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.auth import jwt_auth
+from aurawell.utils import encryption_utils
+from aurawell.utils.password_hashing import PasswordHashingBusyError, PasswordHashingPool
+
+LOGINS = int(os.getenv("AURAWELL_LOGIN_STORM_LOGINS", "200"))
+# 低成本因子让基准在测试时长内完成，单次哈希仍为数毫秒级
+BENCH_ROUNDS = int(os.getenv("AURAWELL_LOGIN_STORM_BCRYPT_ROUNDS", "6"))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = PasswordHashingPool(max_workers=2, max_pending=4)
+    monkeypatch.setattr(
+        "aurawell.utils.password_hashing._hashing_pool", pool
+    )
+    yield pool
+    pool.shutdown()
+
+
+async def test_hashing_runs_off_the_event_loop(pool):
+    loop_thread = threading.get_ident()
+    seen = []
+
+    def work(value):
+        seen.append(threading.get_ident())
+        return value * 2
+
+    assert await pool.run(work, 21) == 42
+    assert seen and seen[0] != loop_thread
+    assert pool.pending == 0 and pool.completed == 1
+
+
+async def test_admission_control_rejects_when_backlog_full(pool):
+    release = threading.Event()
+
+    results = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(4)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(PasswordHashingBusyError) as exc_info:
+        await pool.run(release.wait)
+    assert exc_info.value.retry_after >= 1
+
+    release.set()
+    assert await asyncio.gather(*results) == [True] * 4
+    assert pool.get_stats()["rejected"] == 1
+    # 积压清空后恢复接收
+    assert await pool.run(lambda: "ok") == "ok"
+
+
+async def test_authenticator_maps_busy_pool_to_429(pool):
+    release = threading.Event()
+    blockers = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(4)]
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await jwt_auth.authenticator.verify_password_async("pw", "hash")
+    assert exc_info.value.status_code == 429
+    assert "Retry-After" in exc_info.value.headers
+
+    release.set()
+    await asyncio.gather(*blockers)
+
+
+async def test_demo_users_use_precomputed_hashes(pool, monkeypatch):
+    def fail_hash(*args, **kwargs):
+        raise AssertionError("demo login must not hash passwords")
+
+    monkeypatch.setattr(jwt_auth.pwd_context, "hash", fail_hash)
+
+    assert await jwt_auth._authenticate_demo_user("demo_user", "demo_password") == "user_001"
+    assert await jwt_auth._authenticate_demo_user("test_user", "test_password") == "user_002"
+    assert await jwt_auth._authenticate_demo_user("demo_user", "wrong") is None
+    assert pool.completed == 3
+
+
+class FakeUser:
+    def __init__(self, user_id, password_hash):
+        self.user_id = user_id
+        self.password_hash = password_hash
+
+
+class FakeUserRepository:
+    users = {
+        "alice": FakeUser("user_alice", jwt_auth.DEMO_USERS["demo_user"]["password_hash"]),
+        "legacy": FakeUser("user_legacy", None),
+    }
+
+    def __init__(self, session):
+        pass
+
+    async def get_user_by_username(self, username):
+        return self.users.get(username)
+
+
+class FakeDatabaseManager:
+    class _Session:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    def get_session(self):
+        return self._Session()
+
+
+async def test_every_login_path_costs_one_verify(pool, monkeypatch):
+    """已知用户、无哈希的旧用户与不存在的用户都恰好做一次 bcrypt 校验"""
+    from aurawell.database import connection
+    from aurawell.repositories import user_repository
+
+    monkeypatch.setattr(user_repository, "UserRepository", FakeUserRepository)
+    monkeypatch.setattr(connection, "get_database_manager", lambda: FakeDatabaseManager())
+    verified = []
+    real_verify = jwt_auth.pwd_context.verify
+
+    def counting_verify(password, password_hash):
+        verified.append(password_hash)
+        return real_verify(password, password_hash)
+
+    monkeypatch.setattr(jwt_auth.pwd_context, "verify", counting_verify)
+
+    assert await jwt_auth.authenticate_user("alice", "demo_password") == "user_alice"
+    assert await jwt_auth.authenticate_user("alice", "wrong") is None
+    assert await jwt_auth.authenticate_user("legacy", "pw") is None
+    assert await jwt_auth.authenticate_user("nobody", "pw") is None
+    assert await jwt_auth.authenticate_user("demo_user", "demo_password") == "user_001"
+    assert len(verified) == 5
+    assert verified[2:4] == [jwt_auth.DUMMY_PASSWORD_HASH] * 2
+
+
+async def test_encryption_utils_async_round_trip(pool):
+    hashed, salt = await encryption_utils.hash_password_async("s3cret")
+    assert await encryption_utils.verify_password_async("s3cret", hashed, salt)
+    assert not await encryption_utils.verify_password_async("wrong", hashed, salt)
+    assert encryption_utils.verify_password("s3cret", hashed, salt)
+
+
+def _login_app(context: CryptContext, password_hash: str, pooled: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if pooled:
+            ok = await jwt_auth.authenticator.verify_password_async("pw", password_hash)
+        else:
+            ok = context.verify("pw", password_hash)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+async def _login_storm(app: FastAPI):
+    """并发发起 LOGINS 个登录请求，同时每 5ms 请求一次无关接口"""
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        storm_done = asyncio.Event()
+
+        async def probe():
+            # 延迟从计划发送时刻算起，事件循环被阻塞的时间也计入
+            scheduled = time.perf_counter()
+            while not storm_done.is_set():
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/ping")
+                latencies.append(time.perf_counter() - scheduled)
+                scheduled = max(scheduled + 0.005, time.perf_counter())
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.sleep(0.02)
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/login") for _ in range(LOGINS)))
+        elapsed = time.perf_counter() - start
+        storm_done.set()
+        await probe_task
+
+    statuses = [response.status_code for response in responses]
+    p99 = statistics.quantiles(latencies, n=100, method="inclusive")[-1] if len(latencies) > 1 else max(latencies)
+    return p99, elapsed, statuses
+
+
+@pytest.mark.slow
+async def test_login_storm_benchmark(monkeypatch):
+    """200 个并发登录期间 /ping 的 p99 延迟"""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BENCH_ROUNDS)
+    password_hash = context.hash("pw")
+    monkeypatch.setattr(jwt_auth, "pwd_context", context)
+
+    legacy_p99, legacy_elapsed, legacy_statuses = await _login_storm(
+        _login_app(context, password_hash, pooled=False)
+    )
+
+    pool = PasswordHashingPool(max_workers=2, max_pending=LOGINS)
+    monkeypatch.setattr("aurawell.utils.password_hashing._hashing_pool", pool)
+    pooled_p99, pooled_elapsed, pooled_statuses = await _login_storm(
+        _login_app(context, password_hash, pooled=True)
+    )
+    pool.shutdown()
+
+    print(
+        f"\n登录风暴基准: {LOGINS} 个并发登录, bcrypt rounds={BENCH_ROUNDS}\n"
+        f"  事件循环上哈希: /ping p99 {legacy_p99 * 1000:8.1f} ms, 登录总耗时 {legacy_elapsed:.2f}s\n"
+        f"  哈希线程池:     /ping p99 {pooled_p99 * 1000:8.1f} ms, 登录总耗时 {pooled_elapsed:.2f}s"
+    )
+
+    assert legacy_statuses == pooled_statuses == [200] * LOGINS
+    assert pooled_p99 * 3 < legacy_p99
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RAGService 异步检索测试
+用模拟检索器验证：两路向量检索并发执行且不阻塞事件循环、
+超过时限时返回部分结果、规范化查询的结果缓存
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.services.rag_service import RAGService
+
+SEARCH_LATENCY = 0.2
+
+
+class FakeVectorStore:
+    def __init__(self, latencies):
+        self.latencies = latencies
+
+    def query(self, vector, topk):
+        time.sleep(self.latencies[vector])
+        return [SimpleNamespace(fields={"raw_text": f"{vector}-{i}"}) for i in range(topk)]
+
+
+class FakeRetriever:
+    """与 UserRetrieve 相同接口的阻塞式检索器"""
+
+    def __init__(self, original_latency=SEARCH_LATENCY, translated_latency=SEARCH_LATENCY):
+        self.vectorise_calls = 0
+        self._lock = threading.Lock()
+        self.vector_store = FakeVectorStore(
+            {"zh": original_latency, "en": translated_latency}
+        )
+
+    def vectorise_query(self, user_query):
+        with self._lock:
+            self.vectorise_calls += 1
+        time.sleep(0.05)
+        return {
+            "original": {"text": user_query, "vector": "zh", "language": "chinese"},
+            "translated": {"text": user_query, "vector": "en", "language": "english"},
+        }
+
+    @staticmethod
+    def merge_hits(hit_lists):
+        return [hit.fields["raw_text"] for hits in hit_lists for hit in hits]
+
+
+def _service(retriever):
+    service = RAGService()
+    service.fc_client = None
+    service._retriever = retriever
+    return service
+
+
+async def test_searches_run_concurrently_without_blocking_loop():
+    service = _service(FakeRetriever())
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    results = await service.retrieve_from_rag("每日营养建议", k=4)
+    elapsed = time.perf_counter() - start
+    ticker_task.cancel()
+
+    assert results == ["zh-0", "zh-1", "en-0", "en-1"]
+    # 向量化 0.05s + 两路并发检索 0.2s，串行执行需要 0.45s
+    assert elapsed < 0.4
+    assert ticks >= 10
+
+
+async def test_deadline_returns_partial_results_uncached():
+    retriever = FakeRetriever(translated_latency=1.0)
+    service = _service(retriever)
+
+    start = time.perf_counter()
+    results = await service.retrieve_from_rag("高血压饮食", k=4, deadline=0.4)
+    assert time.perf_counter() - start < 0.6
+    assert results == ["zh-0", "zh-1"]
+
+    # 部分结果不进入缓存
+    await service.retrieve_from_rag("高血压饮食", k=4, deadline=0.4)
+    assert retriever.vectorise_calls == 2
+
+
+async def test_result_cache_normalizes_query():
+    retriever = FakeRetriever(original_latency=0.01, translated_latency=0.01)
+    service = _service(retriever)
+
+    first = await service.retrieve_from_rag("Sleep  Tips", k=2)
+    second = await service.retrieve_from_rag(" sleep tips ", k=2)
+    assert first == second
+    assert retriever.vectorise_calls == 1
+
+    await service.retrieve_from_rag("sleep tips", k=4)
+    assert retriever.vectorise_calls == 2
+    assert service.get_status()["result_cache"]["hits"] == 1
+
+
+async def test_deadline_expired_before_search_falls_back():
+    retriever = FakeRetriever()
+    service = _service(retriever)
+
+    results = await service.retrieve_from_rag("减肥 建议", k=2, deadline=0.01)
+    assert results == service._get_fallback_results("减肥 建议")
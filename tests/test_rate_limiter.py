@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求限流测试
+验证：GCRA 令牌桶的计数与重试时间、规则字符串解析、Redis 不可用时退回进程内限流且每次故障只告警一次、
+限流默认关闭、按已验证 JWT 用户或客户端 IP 计数（调用方提供的 X-User-ID 等字段不能选择计数桶）、
+WebSocket 连接经过中间件时正常建立、被限流时拒绝握手，并按实际结果记录请求日志
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from jose import jwt
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.config.settings import get_settings
+from aurawell.core import token_blacklist
+from aurawell.core.token_blacklist import TokenBlacklistManager
+from aurawell.middleware import rate_limiter as rate_limiter_module
+from aurawell.middleware.rate_limiter import (
+    REDIS_AVAILABLE,
+    InMemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitingMiddleware,
+    RateLimitRule,
+    RedisRateLimitBackend,
+    parse_rate_limit_rules,
+)
+
+
+@pytest.fixture(autouse=True)
+def _local_blacklist(monkeypatch):
+    """不连接 Redis：所有Token都视为未撤销"""
+    manager = TokenBlacklistManager()
+
+    async def _not_blacklisted(token_hash):
+        return False
+
+    manager.is_token_hash_blacklisted = _not_blacklisted
+    monkeypatch.setattr(token_blacklist, "_blacklist_manager", manager)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_gcra_allows_burst_then_refills_evenly(clock):
+    backend = InMemoryRateLimitBackend()
+    rule = RateLimitRule(max_requests=5, window_seconds=10)  # 每 2 秒恢复一次
+
+    results = [backend.hit_sync("k", rule) for _ in range(6)]
+    assert [r.allowed for r in results] == [True] * 5 + [False]
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    assert results[4].reset_after == pytest.approx(10.0)
+    assert results[5].retry_after == 2
+    assert results[5].remaining == 0
+
+    # 恢复一个请求的额度后只放行一个
+    clock.now += 2.0
+    assert backend.hit_sync("k", rule).allowed
+    assert not backend.hit_sync("k", rule).allowed
+
+    # 空闲一个完整窗口后额度回满，且不同键互不影响
+    clock.now += 10.0
+    assert backend.hit_sync("k", rule).remaining == 4
+    assert backend.hit_sync("other", rule).remaining == 4
+
+
+def test_gcra_sweeps_refilled_keys(clock):
+    backend = InMemoryRateLimitBackend(sweep_interval=60)
+    rule = RateLimitRule(max_requests=10, window_seconds=60)
+    for i in range(100):
+        backend.hit_sync(f"user:{i}", rule)
+    assert len(backend) == 100
+
+    clock.now += 61
+    backend.hit_sync("user:new", rule)
+    assert len(backend) == 1
+
+
+def test_parse_rate_limit_rules():
+    rules = parse_rate_limit_rules(" /api/v1/chat=10/60, /ws=5 ,,/api/v1/reports=100/3600")
+    assert rules == {
+        "/api/v1/chat": RateLimitRule(max_requests=10, window_seconds=60),
+        "/ws": RateLimitRule(max_requests=5, window_seconds=60),
+        "/api/v1/reports": RateLimitRule(max_requests=100, window_seconds=3600),
+    }
+    assert parse_rate_limit_rules("") == {}
+    with pytest.raises(ValueError):
+        parse_rate_limit_rules("/ws=many/60")
+
+
+@pytest.mark.skipif(not REDIS_AVAILABLE, reason="需要 redis 包")
+async def test_redis_outage_falls_back_and_warns_once(monkeypatch):
+    backend = RedisRateLimitBackend("redis://127.0.0.1:1/0")
+    rule = RateLimitRule(max_requests=2, window_seconds=60)
+    warnings = []
+    monkeypatch.setattr(
+        rate_limiter_module.logger, "warning", lambda message: warnings.append(message)
+    )
+
+    async def _unreachable(keys, args):
+        raise ConnectionError("Redis不可用")
+
+    backend._script = _unreachable
+    # 故障期间按进程内 GCRA 限流
+    results = [await backend.hit("user:alice", rule) for _ in range(3)]
+    assert [r.allowed for r in results] == [True, True, False]
+    assert len(warnings) == 1
+
+    async def _lua_result(keys, args):
+        assert keys == ["aurawell:ratelimit:user:alice"]
+        assert args == [rule.emission_interval, rule.window_seconds]
+        return [0, "60.0", "30.0"]
+
+    backend._script = _lua_result
+    result = await backend.hit("user:alice", rule)
+    assert not backend.degraded
+    assert (result.allowed, result.remaining, result.retry_after) == (False, 0, 30)
+
+    # 恢复后再次故障会重新告警一次
+    backend._script = _unreachable
+    await backend.hit("user:alice", rule)
+    await backend.hit("user:alice", rule)
+    assert len(warnings) == 2
+    await backend.close()
+
+
+def _token(user_id):
+    settings = get_settings()
+    expire = datetime.now(timezone.utc) + timedelta(minutes=30)
+    return jwt.encode(
+        {"sub": user_id, "exp": expire}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
+    )
+
+
+def _app(rate_limiter=None):
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.websocket("/ws/echo")
+    async def echo(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_text(await websocket.receive_text())
+        await websocket.close()
+
+    @app.websocket("/ws/closed")
+    async def closed(websocket: WebSocket):
+        await websocket.close(code=1008)
+
+    app.add_middleware(RateLimitingMiddleware, rate_limiter=rate_limiter)
+    return app
+
+
+async def _statuses(app, requests):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return [
+            (await client.get("/api/v1/ping", **kwargs)).status_code for kwargs in requests
+        ]
+
+
+def _limiter(max_requests=2):
+    rule = RateLimitRule(max_requests=max_requests, window_seconds=60)
+    return RateLimiter(path_rules={"/api/v1/ping": rule, "/ws/echo": rule})
+
+
+async def test_rate_limiting_disabled_by_default():
+    app = _app()
+    statuses = await _statuses(app, [{}] * 20)
+    assert statuses == [200] * 20
+
+
+async def test_caller_supplied_ids_do_not_pick_bucket():
+    app = _app(_limiter())
+    # 伪造不同的 X-User-ID / user_id 仍落在同一个客户端 IP 计数桶
+    statuses = await _statuses(
+        app,
+        [
+            {"headers": {"X-User-ID": "a"}},
+            {"headers": {"X-User-ID": "b"}},
+            {"params": {"user_id": "c"}},
+        ],
+    )
+    assert statuses == [200, 200, 429]
+
+
+async def test_verified_users_have_separate_buckets():
+    app = _app(_limiter())
+    alice = {"headers": {"Authorization": f"Bearer {_token('alice')}"}}
+    bob = {"headers": {"Authorization": f"Bearer {_token('bob')}"}}
+    forged = {"headers": {"Authorization": "Bearer not-a-token", "X-User-ID": "alice"}}
+
+    statuses = await _statuses(app, [alice, alice, alice, bob, bob, forged, forged, forged])
+    # 无效Token按 IP 计数，不会占用 alice 的计数桶
+    assert statuses == [200, 200, 429, 200, 200, 200, 200, 429]
+
+
+def test_websocket_passes_through_middleware(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        rate_limiter_module.request_logger,
+        "info",
+        lambda *args, extra: logged.append(extra["context"]),
+    )
+    client = TestClient(_app(_limiter(max_requests=1)))
+
+    with client.websocket_connect("/ws/echo") as websocket:
+        websocket.send_text("你好")
+        assert websocket.receive_text() == "你好"
+
+    # 同一 IP 的第二次握手被限流
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with client.websocket_connect("/ws/echo"):
+            pass
+    assert exc_info.value.code == 1008
+
+    # 应用在 accept 前关闭的握手记为 403
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/ws/closed"):
+            pass
+
+    assert [(entry["method"], entry["path"], entry["status_code"]) for entry in logged] == [
+        ("WS", "/ws/echo", 101),
+        ("WS", "/ws/echo", 429),
+        ("WS", "/ws/closed", 403),
+    ]
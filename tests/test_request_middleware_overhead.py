@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求中间件开销负载测试
+对比旧方案（两个 BaseHTTPMiddleware + 事件循环上同步写 JSON 日志）
+与合并后的纯 ASGI RateLimitingMiddleware（队列异步日志）的单请求开销
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.config.logging_config import start_request_logging, stop_request_logging
+from aurawell.middleware.rate_limiter import RateLimiter, RateLimitingMiddleware
+
+REQUESTS = int(os.getenv("AURAWELL_MIDDLEWARE_BENCH_REQUESTS", "1000"))
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def _legacy_app(log_file: str) -> FastAPI:
+    """复现旧方案：计时中间件 + 同步 JSON 请求日志中间件"""
+    app = _make_app()
+    legacy_logger = logging.getLogger("aurawell.requests.legacy_bench")
+    legacy_logger.propagate = False
+    legacy_logger.setLevel(logging.INFO)
+    legacy_logger.addHandler(logging.FileHandler(log_file, encoding="utf-8"))
+
+    class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            legacy_logger.info(
+                json.dumps(
+                    {
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                        "method": request.method,
+                        "path": str(request.url.path),
+                        "query_params": dict(request.query_params),
+                        "status_code": response.status_code,
+                        "latency_ms": round((time.time() - start_time) * 1000, 2),
+                        "user_agent": request.headers.get("User-Agent"),
+                    },
+                    ensure_ascii=False,
+                )
+            )
+            return response
+
+    app.add_middleware(LegacyLoggingMiddleware)
+
+    @app.middleware("http")
+    async def add_process_time_header(request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = str(time.time() - start_time)
+        return response
+
+    return app
+
+
+def _current_app() -> FastAPI:
+    app = _make_app()
+    app.add_middleware(
+        RateLimitingMiddleware, rate_limiter=RateLimiter(), success_sample_rate=1.0
+    )
+    return app
+
+
+async def _mean_request_seconds(app: FastAPI) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(50):  # warm up
+            await client.get("/api/v1/ping")
+
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            response = await client.get("/api/v1/ping", headers={"X-User-ID": "u1"})
+            assert response.status_code in (200, 429)
+        return (time.perf_counter() - start) / REQUESTS
+
+
+@pytest.mark.slow
+async def test_middleware_overhead_before_and_after(tmp_path):
+    """合并后的纯 ASGI 中间件每请求开销应低于旧方案"""
+    baseline = await _mean_request_seconds(_make_app())
+    before = await _mean_request_seconds(_legacy_app(str(tmp_path / "legacy.log")))
+
+    start_request_logging(log_file=str(tmp_path / "requests.log"))
+    try:
+        after = await _mean_request_seconds(_current_app())
+    finally:
+        stop_request_logging()
+
+    before_overhead_us = (before - baseline) * 1e6
+    after_overhead_us = (after - baseline) * 1e6
+    print(
+        f"\n📊 {REQUESTS} requests: baseline {baseline * 1e6:.1f}us/req, "
+        f"middleware overhead before {before_overhead_us:.1f}us, "
+        f"after {after_overhead_us:.1f}us"
+    )
+
+    assert after < before
+    assert (tmp_path / "requests.log").read_text(encoding="utf-8").count("\n") > 0
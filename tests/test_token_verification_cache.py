@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Token验证缓存与本地黑名单镜像测试
+用内存版 Redis（含 pub/sub）模拟两个 worker，验证：未撤销Token的验证不产生网络请求、
+撤销通过 pub/sub 在另一个 worker 上及时生效、镜像过期时回退到 Redis 查询、
+缓存有效期不超过Token的 exp，并对比每次验证的开销
+"""
+
+import asyncio
+import fnmatch
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.config.settings import get_settings
+from aurawell.core import token_blacklist
+from aurawell.core.auth_middleware import JWTAuthMiddleware
+from aurawell.core.token_blacklist import TokenBlacklistManager
+
+VERIFICATIONS = int(os.getenv("AURAWELL_AUTH_BENCH_VERIFICATIONS", "2000"))
+# 模拟一次 Redis 往返的网络延迟
+REDIS_LATENCY = float(os.getenv("AURAWELL_AUTH_BENCH_REDIS_LATENCY", "0.0002"))
+
+
+class FakeRedisServer:
+    """多个客户端共享的内存 Redis，记录命令往返次数"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.data = {}
+        self.expires = {}
+        self.subscribers = []
+        self.commands = 0
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.server.subscribers.append((channel, self.queue))
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def unsubscribe(self):
+        self.server.subscribers = [
+            (channel, queue) for channel, queue in self.server.subscribers if queue is not self.queue
+        ]
+
+    async def close(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.keys = []
+
+    def ttl(self, key):
+        self.keys.append(key)
+
+    async def execute(self):
+        await self.client._roundtrip()
+        return [self.client._ttl(key) for key in self.keys]
+
+
+class FakeRedis:
+    def __init__(self, server):
+        self.server = server
+
+    async def _roundtrip(self):
+        self.server.commands += 1
+        if self.server.latency:
+            await asyncio.sleep(self.server.latency)
+
+    def _live(self, key):
+        expires_at = self.server.expires.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            self.server.data.pop(key, None)
+            self.server.expires.pop(key, None)
+        return key in self.server.data
+
+    def _ttl(self, key):
+        return int(self.server.expires[key] - time.time()) if self._live(key) else -2
+
+    async def ping(self):
+        await self._roundtrip()
+        return True
+
+    async def setex(self, key, ttl, value):
+        await self._roundtrip()
+        self.server.data[key] = value
+        self.server.expires[key] = time.time() + ttl
+
+    async def get(self, key):
+        await self._roundtrip()
+        return self.server.data[key] if self._live(key) else None
+
+    async def exists(self, key):
+        await self._roundtrip()
+        return int(self._live(key))
+
+    async def sadd(self, key, member):
+        await self._roundtrip()
+        self.server.data.setdefault(key, set()).add(member)
+
+    async def smembers(self, key):
+        await self._roundtrip()
+        return set(self.server.data.get(key, set()))
+
+    async def expire(self, key, ttl):
+        await self._roundtrip()
+        self.server.expires[key] = time.time() + ttl
+
+    async def delete(self, key):
+        await self._roundtrip()
+        self.server.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        await self._roundtrip()
+        for subscribed, queue in self.server.subscribers:
+            if subscribed == channel:
+                queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    async def scan_iter(self, match, count=None):
+        await self._roundtrip()
+        for key in list(self.server.data):
+            if fnmatch.fnmatchcase(key, match) and self._live(key):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub(self.server)
+
+    async def close(self):
+        pass
+
+
+def _token(user_id="user_001", minutes=30):
+    settings = get_settings()
+    expire = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    return jwt.encode(
+        {"sub": user_id, "exp": expire}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
+    )
+
+
+def _worker(server, mirror=True, cache_ttl=60.0, max_staleness=5.0):
+    manager = TokenBlacklistManager()
+    manager._redis_client = FakeRedis(server)
+    manager.mirror_enabled = mirror
+    manager.max_staleness = max_staleness
+    middleware = JWTAuthMiddleware()
+    middleware.token_cache_ttl = cache_ttl
+    return manager, middleware
+
+
+async def _use(manager, monkeypatch):
+    monkeypatch.setattr(token_blacklist, "_blacklist_manager", manager)
+
+
+async def _wait_for_mirror(manager):
+    await manager.is_token_hash_blacklisted("warmup")
+    for _ in range(100):
+        if manager.is_mirror_fresh():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("黑名单镜像未完成同步")
+
+
+async def test_unrevoked_path_has_no_network_io(monkeypatch):
+    server = FakeRedisServer()
+    manager, middleware = _worker(server)
+    await _use(manager, monkeypatch)
+    await _wait_for_mirror(manager)
+
+    token = _token()
+    commands = server.commands
+    for _ in range(100):
+        is_valid, payload, error = await middleware.verify_token(token)
+        assert is_valid and payload["sub"] == "user_001" and error is None
+
+    assert server.commands == commands
+    assert middleware.get_token_cache_stats()["hits"] == 99
+    await manager.close()
+
+
+async def test_revocation_propagates_to_other_worker(monkeypatch):
+    server = FakeRedisServer()
+    worker_a, middleware_a = _worker(server)
+    worker_b, middleware_b = _worker(server)
+    await _wait_for_mirror(worker_a)
+    await _wait_for_mirror(worker_b)
+
+    token = _token()
+    await _use(worker_b, monkeypatch)
+    assert (await middleware_b.verify_token(token))[0]
+
+    # worker A 处理登出
+    assert await worker_a.add_token_to_blacklist(token, "user_001")
+    await _use(worker_a, monkeypatch)
+    assert await middleware_a.verify_token(token) == (False, None, "Token已被撤销")
+
+    await _use(worker_b, monkeypatch)
+    deadline = time.monotonic() + 1.0
+    while (await middleware_b.verify_token(token))[0]:
+        assert time.monotonic() < deadline, "撤销未在 1 秒内传播到另一个 worker"
+        await asyncio.sleep(0.01)
+
+    await worker_a.close()
+    await worker_b.close()
+
+
+async def test_startup_loads_existing_blacklist():
+    server = FakeRedisServer()
+    writer, _ = _worker(server, mirror=False)
+    token = _token()
+    await writer.add_token_to_blacklist(token, "user_001")
+
+    reader, _ = _worker(server)
+    await _wait_for_mirror(reader)
+    commands = server.commands
+    assert await reader.is_token_blacklisted(token)
+    assert not await reader.is_token_blacklisted(_token("user_002"))
+    assert server.commands == commands
+    await reader.close()
+
+
+async def test_stale_mirror_falls_back_to_redis(monkeypatch):
+    server = FakeRedisServer()
+    manager, middleware = _worker(server, max_staleness=0.05)
+    await _use(manager, monkeypatch)
+    await _wait_for_mirror(manager)
+
+    # 模拟订阅连接断开：停止同步任务后镜像在 max_staleness 后失效
+    manager._mirror_task.cancel()
+    manager._ensure_mirror_task = lambda: None
+    await asyncio.sleep(0.1)
+    assert not manager.is_mirror_fresh()
+
+    commands = server.commands
+    redis_checks = manager.redis_checks
+    token = _token()
+    assert (await middleware.verify_token(token))[0]
+    assert server.commands == commands + 1
+    assert manager.get_mirror_stats()["redis_checks"] == redis_checks + 1
+
+
+async def test_cached_payload_never_outlives_token(monkeypatch):
+    server = FakeRedisServer()
+    manager, middleware = _worker(server, cache_ttl=60.0)
+    await _use(manager, monkeypatch)
+    await _wait_for_mirror(manager)
+
+    settings = get_settings()
+    exp = int(time.time()) + 1
+    token = jwt.encode(
+        {"sub": "user_001", "exp": exp}, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM
+    )
+    assert (await middleware.verify_token(token))[0]
+    # python-jose 按整秒比较 exp，越过下一整秒后才判定过期
+    await asyncio.sleep(exp + 1.05 - time.time())
+    assert await middleware.verify_token(token) == (False, None, "Token已过期")
+    await manager.close()
+
+
+async def _bench(middleware, token):
+    start = time.perf_counter()
+    for _ in range(VERIFICATIONS):
+        is_valid, _, _ = await middleware.verify_token(token)
+        assert is_valid
+    return (time.perf_counter() - start) / VERIFICATIONS
+
+
+@pytest.mark.slow
+async def test_auth_overhead_benchmark(monkeypatch):
+    """每次 verify_token 的平均开销：旧路径（Redis 查询 + jwt.decode）vs 本地镜像 + 缓存"""
+    token = _token()
+
+    legacy_server = FakeRedisServer(latency=REDIS_LATENCY)
+    legacy_manager, legacy_middleware = _worker(legacy_server, mirror=False, cache_ttl=0)
+    await _use(legacy_manager, monkeypatch)
+    legacy = await _bench(legacy_middleware, token)
+    legacy_commands = legacy_server.commands
+
+    server = FakeRedisServer(latency=REDIS_LATENCY)
+    manager, middleware = _worker(server)
+    await _use(manager, monkeypatch)
+    await _wait_for_mirror(manager)
+    commands = server.commands
+    cached = await _bench(middleware, token)
+    await manager.close()
+
+    print(
+        f"\nToken验证开销基准: {VERIFICATIONS} 次, 模拟 Redis 往返 {REDIS_LATENCY * 1e6:.0f}µs\n"
+        f"  Redis 黑名单 + jwt.decode: {legacy * 1e6:8.1f} µs/次, {legacy_commands} 次 Redis 命令\n"
+        f"  本地镜像 + 已验证缓存:     {cached * 1e6:8.1f} µs/次, {server.commands - commands} 次 Redis 命令"
+    )
+
+    assert server.commands == commands
+    assert cached * 5 < legacy
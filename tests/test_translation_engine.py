@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+翻译引擎测试
+用模拟推理延迟的桩模型验证：并发请求合并为一次 generate、按方向懒加载模型、
+规范化文本的 LRU 缓存，并对比 direct / batched 两种模式在 1/8/32 并发下的
+吞吐量与 p95 延迟。设置 AURAWELL_TRANSLATION_REAL_MODEL=1 时使用真实 MarianMT 模型
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.services.translation_service import TranslationEngine, TranslationService
+
+REAL_MODEL = os.getenv("AURAWELL_TRANSLATION_REAL_MODEL") == "1"
+# 桩模型：每次 generate 的固定开销与每条文本的增量开销
+GENERATE_OVERHEAD = 0.02
+PER_ITEM_COST = 0.002
+
+
+class StubTranslationService(TranslationService):
+    """以固定延迟模拟 CPU 推理，记录每次 generate 的批大小"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batch_sizes = []
+        self.loaded = []
+        self._cpu = threading.Lock()
+
+    def _load_model(self, model_key):
+        if model_key not in self.models:
+            self.loaded.append(model_key)
+            self.models[model_key] = object()
+        return self.models[model_key], None
+
+    def _translate_batch(self, model_key, texts):
+        self._load_model(model_key)
+        with self._cpu:
+            time.sleep(GENERATE_OVERHEAD + PER_ITEM_COST * len(texts))
+            self.batch_sizes.append(len(texts))
+        return [f"[{model_key}] {text}" for text in texts]
+
+
+def _service(mode="batched", **kwargs):
+    if REAL_MODEL:
+        return TranslationService(engine_mode=mode, **kwargs)
+    return StubTranslationService(engine_mode=mode, **kwargs)
+
+
+def test_models_load_lazily_per_direction():
+    service = StubTranslationService(engine_mode="direct")
+    assert service.models == {}
+
+    service.translate_text("营养建议", "zh", "en")
+    assert service.loaded == ["zh-en"]
+
+    service.translate_text("sleep tips", "en", "zh")
+    service.translate_text("运动计划", "zh", "en")
+    assert service.loaded == ["zh-en", "en-zh"]
+
+
+def test_concurrent_requests_share_one_generate_call():
+    service = StubTranslationService(engine_mode="batched", cache_size=0)
+    queries = [f"健康问题 {i}" for i in range(12)]
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = list(pool.map(lambda q: service.translate_text(q, "zh", "en"), queries))
+    service.close()
+
+    assert results == [f"[zh-en] {q}" for q in queries]
+    assert len(service.batch_sizes) < len(queries)
+    assert max(service.batch_sizes) > 1
+    assert service.get_stats()["batched_requests"] == len(queries)
+
+
+def test_engine_groups_by_direction_and_propagates_errors():
+    calls = []
+
+    def translate_batch(model_key, texts):
+        calls.append((model_key, sorted(texts)))
+        if model_key == "en-zh":
+            raise RuntimeError("推理失败")
+        return [text.upper() for text in texts]
+
+    engine = TranslationEngine(translate_batch, max_batch_size=8, max_wait_ms=50)
+    futures = [
+        engine.submit("zh-en", "a"),
+        engine.submit("en-zh", "b"),
+        engine.submit("zh-en", "a"),
+        engine.submit("zh-en", "c"),
+    ]
+    assert futures[0].result() == futures[2].result() == "A"
+    assert futures[3].result() == "C"
+    with pytest.raises(RuntimeError):
+        futures[1].result()
+    engine.close()
+
+    # 同一批内重复文本只翻译一次
+    assert sorted(calls) == [("en-zh", ["b"]), ("zh-en", ["a", "c"])]
+
+
+def test_cache_normalizes_text_and_evicts_lru():
+    service = StubTranslationService(engine_mode="direct", cache_size=2)
+
+    first = service.translate_text("睡眠  建议", "zh", "en")
+    assert service.translate_text(" 睡眠 建议 ", "zh", "en") == first
+    assert len(service.batch_sizes) == 1
+
+    service.translate_text("饮食", "zh", "en")
+    service.translate_text("运动", "zh", "en")
+    service.translate_text("睡眠 建议", "zh", "en")
+    assert len(service.batch_sizes) == 4
+    stats = service.get_stats()
+    assert stats["cache_hits"] == 1 and stats["cache_size"] == 2
+
+
+def test_async_translation_does_not_block_loop():
+    service = StubTranslationService(engine_mode="batched")
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticker_task = asyncio.create_task(ticker())
+        results = await asyncio.gather(
+            *(service.translate_text_async(f"查询 {i}", "zh", "en") for i in range(8))
+        )
+        ticker_task.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+    service.close()
+    assert results == [f"[zh-en] 查询 {i}" for i in range(8)]
+    assert ticks >= 3
+
+
+def _benchmark(service, concurrency, per_worker=8):
+    """concurrency 个线程各发出 per_worker 条不重复的查询"""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(index):
+        for i in range(per_worker):
+            query = f"每日营养建议 {index}-{i}"
+            start = time.perf_counter()
+            service.translate_text(query, "zh", "en")
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return len(latencies) / elapsed, p95
+
+
+@pytest.mark.slow
+def test_throughput_benchmark():
+    """direct 与 batched 模式在 1/8/32 并发下的吞吐量与 p95 延迟"""
+    lines = ["\n翻译吞吐基准" + ("（真实模型）" if REAL_MODEL else "（桩模型）")]
+    results = {}
+    for concurrency in (1, 8, 32):
+        for mode in ("direct", "batched"):
+            service = _service(mode, cache_size=0)
+            service.translate_text("预热", "zh", "en")
+            qps, p95 = _benchmark(service, concurrency)
+            service.close()
+            results[(mode, concurrency)] = qps
+            lines.append(
+                f"  并发 {concurrency:>2} {mode:<8}: {qps:7.1f} 查询/秒, p95 {p95 * 1000:7.1f} ms"
+            )
+    print("\n".join(lines))
+
+    assert results[("batched", 32)] > results[("direct", 32)] * 2
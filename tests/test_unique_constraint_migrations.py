@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+upsert 唯一约束迁移测试
+验证：启动时只检查并告警、不删除重复行；显式的 dedupe-unique 步骤先报告将删除的行数，
+确认后才删除重复行并补建唯一索引
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.database.connection import DatabaseManager
+from aurawell.database.migrations import DatabaseMigrator
+
+pytestmark = pytest.mark.database
+
+
+def _legacy_database(path):
+    """升级前的旧库：activity_summaries 没有唯一约束且已有重复行"""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE activity_summaries ("
+        "id INTEGER PRIMARY KEY, user_id TEXT, date TEXT, source_platform TEXT, steps INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO activity_summaries (user_id, date, source_platform, steps) VALUES (?, ?, ?, ?)",
+        [
+            ("u1", "2025-03-01", "xiaomi_health", 100),
+            ("u1", "2025-03-01", "xiaomi_health", 200),
+            ("u1", "2025-03-01", "xiaomi_health", 300),
+            ("u1", "2025-03-02", "xiaomi_health", 400),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT date, steps FROM activity_summaries ORDER BY id").fetchall()
+        indexes = {
+            row[1] for row in conn.execute("PRAGMA index_list('activity_summaries')")
+        }
+    finally:
+        conn.close()
+    return rows, indexes
+
+
+async def test_startup_keeps_duplicates_and_dedupe_reports_first(tmp_path):
+    path = tmp_path / "legacy.db"
+    _legacy_database(path)
+    db_manager = DatabaseManager(f"sqlite+aiosqlite:///{path}")
+    try:
+        # 启动：不删除任何行，也不建唯一索引
+        await db_manager.initialize()
+        rows, indexes = _rows(path)
+        assert len(rows) == 4
+        assert "uq_user_date_platform" not in indexes
+
+        # 预览：只报告
+        migrator = DatabaseMigrator(db_manager)
+        assert await migrator.dedupe_unique_constraints() == {"activity_summaries": 2}
+        assert len(_rows(path)[0]) == 4
+
+        # 确认执行：保留每组最新插入的行
+        assert await migrator.dedupe_unique_constraints(apply=True) == {
+            "activity_summaries": 2
+        }
+        rows, indexes = _rows(path)
+        assert rows == [("2025-03-01", 300), ("2025-03-02", 400)]
+        assert "uq_user_date_platform" in indexes
+
+        assert await migrator.dedupe_unique_constraints() == {}
+    finally:
+        await db_manager.close()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 心跳与连接管理测试
+验证：pong 通过 asyncio.Event 通知、未回复 pong 的连接被关闭、同一用户多设备并发连接、
+时间轮跨圈的截止时间、空闲时调度任务退出，并提供空闲连接负载测试
+（每 1 万个空闲连接的 CPU 占用）
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.interfaces.websocket_interface import HeartbeatWheel, WebSocketManager
+
+BENCH_CONNECTIONS = int(os.getenv("AURAWELL_WS_BENCH_CONNECTIONS", "10000"))
+# 负载测试的心跳间隔/超时/客户端往返时延/测量窗口（秒），默认压缩为生产配置的 1/3
+BENCH_INTERVAL = float(os.getenv("AURAWELL_WS_BENCH_INTERVAL", "10"))
+BENCH_TIMEOUT = float(os.getenv("AURAWELL_WS_BENCH_TIMEOUT", "5"))
+BENCH_RTT = float(os.getenv("AURAWELL_WS_BENCH_RTT", "0.2"))
+BENCH_WINDOW = float(os.getenv("AURAWELL_WS_BENCH_WINDOW", "10"))
+
+
+class FakeWebSocket:
+    """模拟客户端：记录收到的消息，按需在 rtt 秒后回复 pong"""
+
+    def __init__(self, manager, user_id, rtt=0.0, answer_pings=True, keep_messages=True):
+        self.manager = manager
+        self.user_id = user_id
+        self.rtt = rtt
+        self.answer_pings = answer_pings
+        self.keep_messages = keep_messages
+        self.connection_id = None
+        self.messages = []
+        self.pings = 0
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.keep_messages:
+            self.messages.append(text)
+        if '"type": "ping"' in text:
+            self.pings += 1
+            if self.answer_pings:
+                asyncio.get_running_loop().call_later(self.rtt, self._pong)
+
+    def _pong(self):
+        asyncio.ensure_future(self.manager.handle_pong(self.user_id, self.connection_id))
+
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+
+
+async def _connect(manager, user_id, **kwargs):
+    websocket = FakeWebSocket(manager, user_id, **kwargs)
+    connection = await manager.connect(websocket, user_id)
+    websocket.connection_id = connection.connection_id
+    return websocket, connection
+
+
+def _manager(**kwargs):
+    options = dict(heartbeat_interval=0.2, heartbeat_timeout=0.1, heartbeat_tick=0.02)
+    options.update(kwargs)
+    return WebSocketManager(**options)
+
+
+async def test_answered_pings_keep_connection_alive():
+    manager = _manager()
+    websocket, connection = await _connect(manager, "user_001", rtt=0.02)
+
+    await asyncio.sleep(0.75)
+    assert websocket.pings >= 3
+    assert websocket.close_code is None
+    assert manager.get_connected_users() == ["user_001"]
+    assert connection.heartbeat_count == websocket.pings
+    manager.heartbeat_wheel.stop()
+
+
+async def test_missing_pong_closes_connection():
+    manager = _manager()
+    websocket, connection = await _connect(manager, "user_001", answer_pings=False)
+
+    # 第一次 ping 在 0.2s 发出，0.1s 内未收到 pong 即断开
+    await asyncio.sleep(0.4)
+    assert websocket.close_code == 1001
+    assert manager.get_connected_users() == []
+    assert manager.get_heartbeat_stats()["heartbeat_timeouts"] == 1
+
+
+async def test_wait_for_pong_uses_event():
+    manager = _manager(heartbeat_interval=60)
+    websocket, connection = await _connect(manager, "user_001")
+    connection.pong_received.clear()
+
+    assert not await manager.wait_for_pong(connection, timeout=0.05)
+
+    asyncio.get_running_loop().call_later(0.02, websocket._pong)
+    start = time.monotonic()
+    assert await manager.wait_for_pong(connection, timeout=1.0)
+    assert time.monotonic() - start < 0.5
+    assert connection.last_pong >= start
+    manager.heartbeat_wheel.stop()
+
+
+async def test_multiple_devices_per_user():
+    manager = _manager(heartbeat_interval=60, max_connections_per_user=2)
+    phone, phone_conn = await _connect(manager, "user_001")
+    laptop, laptop_conn = await _connect(manager, "user_001")
+    assert manager.get_connection_count() == 2
+    assert manager.get_connected_users() == ["user_001"]
+
+    await manager.send_status_update("user_001", "done", "回复完成")
+    # 消息进入各连接的发送队列，由写任务在下一轮事件循环发出
+    await asyncio.sleep(0)
+    assert json.loads(phone.messages[-1])["message"] == "回复完成"
+    assert phone.messages[-1] == laptop.messages[-1]
+
+    # 第三台设备挤掉最早的连接
+    tablet, _ = await _connect(manager, "user_001")
+    assert phone.close_code == 1008
+    assert manager.get_connection_count() == 2
+
+    manager.disconnect("user_001", laptop_conn.connection_id)
+    assert manager.get_connected_users() == ["user_001"]
+    assert manager.describe_session("user_001")["connections"] == 1
+
+    manager.disconnect("user_001")
+    assert manager.get_connected_users() == []
+    assert manager.get_user_session("user_001") == {}
+    manager.heartbeat_wheel.stop()
+
+
+async def test_timer_wheel_handles_deadlines_beyond_one_revolution():
+    fired = []
+    wheel = HeartbeatWheel(lambda due: fired.extend(due), tick=0.01, slots=4)
+
+    start = time.monotonic()
+    wheel.schedule(start + 0.1, "late", None)
+    wheel.schedule(start + 0.02, "early", None)
+    await asyncio.sleep(0.05)
+    assert [kind for _, kind, _ in fired] == ["early"]
+
+    await asyncio.sleep(0.1)
+    assert [kind for _, kind, _ in fired] == ["early", "late"]
+
+    # 没有待处理的截止时间时调度任务退出，不再空转
+    await asyncio.sleep(0.03)
+    assert wheel._task is None
+    wakeups = wheel.wakeups
+    await asyncio.sleep(0.05)
+    assert wheel.wakeups == wakeups
+
+
+@pytest.mark.slow
+async def test_idle_connections_cpu_load():
+    """BENCH_CONNECTIONS 个空闲连接在心跳稳态下每 1 万连接的 CPU 占用"""
+    manager = WebSocketManager(
+        heartbeat_interval=BENCH_INTERVAL, heartbeat_timeout=BENCH_TIMEOUT
+    )
+    sockets = []
+    for i in range(BENCH_CONNECTIONS):
+        websocket, _ = await _connect(
+            manager, f"user_{i}", rtt=BENCH_RTT, keep_messages=False
+        )
+        sockets.append(websocket)
+        if i % 500 == 0:
+            # 连接分批建立，心跳分散到不同时间轮槽位
+            await asyncio.sleep(0.01)
+
+    await asyncio.sleep(BENCH_INTERVAL + 0.5)
+    pings = sum(websocket.pings for websocket in sockets)
+    wakeups = manager.heartbeat_wheel.wakeups
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.sleep(BENCH_WINDOW)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    manager.heartbeat_wheel.stop()
+
+    cpu_per_10k = cpu / wall * 10000 / BENCH_CONNECTIONS
+    print(
+        f"\nWebSocket 空闲连接负载: {BENCH_CONNECTIONS} 个连接, 心跳间隔 {BENCH_INTERVAL:.0f}s, "
+        f"客户端 RTT {BENCH_RTT * 1000:.0f}ms, 测量 {wall:.1f}s\n"
+        f"  CPU 占用: {cpu / wall * 100:.2f}% (每 1 万连接 {cpu_per_10k * 100:.2f}%)\n"
+        f"  ping: {sum(w.pings for w in sockets) - pings} 次, "
+        f"时间轮唤醒 {manager.heartbeat_wheel.wakeups - wakeups} 次"
+    )
+
+    assert manager.get_connection_count() == BENCH_CONNECTIONS
+    assert all(websocket.close_code is None for websocket in sockets)
+    # 调度器每个 tick 只唤醒一次，与连接数无关
+    assert manager.heartbeat_wheel.wakeups - wakeups <= wall / manager.heartbeat_wheel.tick + 2
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WebSocket 消息总线测试
+用内存版 Redis（含 pub/sub）模拟多个 worker，验证：按用户/家庭寻址的消息到达其他 worker 上的连接、
+同一消息只编码一次并共享给所有本地连接、慢消费者被关闭而不影响其他连接、Redis 不可用时退回本地投递、
+未安装 redis 包时记录错误、成员关系变化后在线用户的家庭索引随之刷新、
+健康告警创建后实时推送给在线家庭成员，并对比家庭广播与逐个成员发送的开销
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from aurawell.core import message_bus as message_bus_module
+from aurawell.core.message_bus import InMemoryMessageBus, RedisMessageBus, create_message_bus
+from aurawell.core.permission_resolver import FamilyPermissionResolver
+from aurawell.interfaces.websocket_interface import WebSocketManager
+from aurawell.models.family_models import FamilyRole
+from aurawell.services import family_service as family_service_module
+from aurawell.services.family_interaction_service import FamilyInteractionService
+from aurawell.services.family_service import FamilyService
+
+BENCH_MEMBERS = int(os.getenv("AURAWELL_WS_BENCH_MEMBERS", "200"))
+BENCH_MESSAGES = int(os.getenv("AURAWELL_WS_BENCH_MESSAGES", "200"))
+
+
+class FakeRedisServer:
+    """多个 worker 共享的内存 Redis pub/sub"""
+
+    def __init__(self):
+        self.subscribers = []
+        self.published = 0
+        self.available = True
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server = server
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.server.subscribers.append((channel, self.queue))
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def unsubscribe(self):
+        self.server.subscribers = [
+            (channel, queue) for channel, queue in self.server.subscribers if queue is not self.queue
+        ]
+
+    async def close(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.commands = []
+
+    def publish(self, channel, message):
+        self.commands.append((channel, message))
+
+    async def execute(self):
+        if not self.server.available:
+            raise ConnectionError("Redis不可用")
+        for channel, message in self.commands:
+            self.server.published += 1
+            for subscribed, queue in self.server.subscribers:
+                if subscribed == channel:
+                    queue.put_nowait({"type": "message", "channel": channel, "data": message})
+        return [1] * len(self.commands)
+
+
+class FakeRedis:
+    def __init__(self, server):
+        self.server = server
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.server)
+
+    def pubsub(self):
+        return FakePubSub(self.server)
+
+    async def aclose(self):
+        pass
+
+
+class FakeWebSocket:
+    """模拟客户端：记录收到的消息；blocked 时 send_text 一直挂起（慢消费者）"""
+
+    def __init__(self, blocked=False):
+        self.messages = []
+        self.close_code = None
+        self.unblocked = asyncio.Event()
+        if not blocked:
+            self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await self.unblocked.wait()
+        self.messages.append(text)
+
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+
+    def of_type(self, message_type):
+        return [json.loads(m) for m in self.messages if json.loads(m)["type"] == message_type]
+
+
+def _redis_bus(server):
+    bus = RedisMessageBus("redis://fake", channel="test:ws")
+    bus._redis_client = FakeRedis(server)
+    return bus
+
+
+def _worker(bus, **kwargs):
+    return WebSocketManager(heartbeat_interval=60, message_bus=bus, **kwargs)
+
+
+async def _connect(manager, user_id, families=(), **kwargs):
+    websocket = FakeWebSocket(**kwargs)
+    await manager.connect(websocket, user_id)
+    if families:
+        manager.set_user_families(user_id, families)
+    return websocket
+
+
+async def _settle(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "消息未在限定时间内送达"
+        await asyncio.sleep(0.005)
+
+
+async def _shutdown(*managers):
+    for manager in managers:
+        manager.heartbeat_wheel.stop()
+        await manager.message_bus.close()
+
+
+async def test_user_message_reaches_socket_on_other_worker():
+    server = FakeRedisServer()
+    worker_a, worker_b = _worker(_redis_bus(server)), _worker(_redis_bus(server))
+    phone = await _connect(worker_a, "user_001")
+    laptop = await _connect(worker_b, "user_001")
+    await _settle(lambda: len(server.subscribers) == 2)
+
+    # 流式回复由 worker A 发出，两台设备都应收到
+    await worker_a.send_streaming_message("user_001", "你好")
+    await _settle(lambda: phone.of_type("chat_stream") and laptop.of_type("chat_stream"))
+    assert phone.of_type("chat_stream")[0]["delta"] == "你好"
+    assert phone.messages[-1] == laptop.messages[-1]
+
+    # 发布者自己的连接不会从 Redis 再收到一次
+    await asyncio.sleep(0.05)
+    assert len(phone.of_type("chat_stream")) == 1
+    assert worker_a.message_bus.get_stats()["received"] == 0
+    assert worker_b.message_bus.get_stats()["received"] == 1
+    await _shutdown(worker_a, worker_b)
+
+
+async def test_family_broadcast_serializes_once():
+    bus = InMemoryMessageBus()
+    worker_a, worker_b = _worker(bus), _worker(bus)
+    alice = await _connect(worker_a, "alice", families=["family_a"])
+    alice_tablet = await _connect(worker_a, "alice")
+    bob = await _connect(worker_b, "bob", families=["family_a", "family_b"])
+    carol = await _connect(worker_b, "carol", families=["family_b"])
+
+    await worker_a.broadcast_to_family("family_a", {"type": "family_update", "n": 1})
+    await worker_b.broadcast_to_family(
+        "family_b", {"type": "family_update", "n": 2}, exclude_user="carol"
+    )
+    await asyncio.sleep(0)
+
+    assert [m["n"] for m in alice.of_type("family_update")] == [1]
+    # 同一用户的另一台设备共享家庭成员身份
+    assert [m["n"] for m in alice_tablet.of_type("family_update")] == [1]
+    assert [m["n"] for m in bob.of_type("family_update")] == [1, 2]
+    assert carol.of_type("family_update") == []
+    # 所有本地连接拿到的是同一个字符串对象，没有按接收者重新编码
+    assert alice.messages[-1] is alice_tablet.messages[-1]
+
+    # 最后一个连接断开后用户退出家庭索引
+    worker_b.disconnect("bob")
+    assert worker_b.family_members == {"family_b": {"carol"}}
+    await _shutdown(worker_a, worker_b)
+
+
+async def test_slow_consumer_is_closed_without_blocking_others():
+    manager = _worker(InMemoryMessageBus(), send_queue_size=4)
+    stuck = await _connect(manager, "user_001", blocked=True)
+    fast = await _connect(manager, "user_001")
+
+    # 模拟流式回复：每个分片之间让出事件循环
+    for i in range(10):
+        await manager.send_status_update("user_001", "streaming", f"chunk {i}")
+        await asyncio.sleep(0)
+
+    assert stuck.close_code == 1013
+    assert [m["message"] for m in fast.of_type("status_update")] == [
+        f"chunk {i}" for i in range(10)
+    ]
+    assert manager.get_connection_count() == 1
+    assert manager.get_delivery_stats()["slow_consumers"] == 1
+    await _shutdown(manager)
+
+
+async def test_redis_outage_falls_back_to_local_delivery():
+    server = FakeRedisServer()
+    server.available = False
+    manager = _worker(_redis_bus(server))
+    websocket = await _connect(manager, "user_001")
+
+    await manager.send_status_update("user_001", "done", "本地送达")
+    await _settle(lambda: manager.message_bus.get_stats()["dropped"] == 1)
+    assert websocket.of_type("status_update")[0]["message"] == "本地送达"
+    await _shutdown(manager)
+
+
+def test_redis_backend_without_package_logs_error(monkeypatch):
+    errors = []
+    settings = message_bus_module.get_settings()
+    monkeypatch.setattr(settings, "WEBSOCKET_BUS_BACKEND", "redis")
+    monkeypatch.setattr(message_bus_module, "REDIS_AVAILABLE", False)
+    monkeypatch.setattr(message_bus_module.logger, "error", lambda message: errors.append(message))
+
+    assert isinstance(create_message_bus(), InMemoryMessageBus)
+    assert len(errors) == 1
+
+
+async def test_membership_change_refreshes_family_index(monkeypatch):
+    memberships = {
+        "bob": {"family_a": FamilyRole.VIEWER},
+        "carol": {"family_a": FamilyRole.MANAGER},
+    }
+
+    async def _load(user_id):
+        return dict(memberships.get(user_id, {}))
+
+    monkeypatch.setattr(
+        family_service_module, "_permission_resolver", FamilyPermissionResolver(_load)
+    )
+    server = FakeRedisServer()
+    api_bus, ws_worker = _redis_bus(server), _worker(_redis_bus(server))
+    bob = await _connect(ws_worker, "bob", families=["family_a"])
+    carol = await _connect(ws_worker, "carol", families=["family_a"])
+    api_bus.start()
+    await _settle(lambda: len(server.subscribers) == 2)
+    service = FamilyService(message_bus=api_bus)
+
+    # bob 在另一个 worker 上加入 family_b、退出 family_a
+    memberships["bob"] = {"family_b": FamilyRole.MANAGER}
+    service.invalidate_member_permissions(user_id="bob")
+    await _settle(lambda: ws_worker.user_families["bob"] == {"family_b"})
+
+    await ws_worker.broadcast_to_family("family_a", {"type": "family_update", "n": 1})
+    await ws_worker.broadcast_to_family("family_b", {"type": "family_update", "n": 2})
+    await asyncio.sleep(0)
+    assert [m["n"] for m in bob.of_type("family_update")] == [2]
+    assert [m["n"] for m in carol.of_type("family_update")] == [1]
+
+    # 家庭解散：在线成员全部退出该家庭
+    memberships["carol"] = {}
+    service.invalidate_member_permissions(family_id="family_a")
+    await _settle(lambda: "family_a" not in ws_worker.family_members)
+    assert ws_worker.user_families["carol"] == set()
+    await api_bus.close()
+    await _shutdown(ws_worker)
+
+
+class FakeInteractionRepository:
+    async def create_health_alert(self, **kwargs):
+        return "alert_001"
+
+
+class FakeFamilyRepository:
+    async def log_family_activity(self, **kwargs):
+        pass
+
+
+class FakeUserRepository:
+    async def get_user_by_id(self, user_id):
+        return None
+
+
+async def test_health_alert_pushed_to_online_members():
+    server = FakeRedisServer()
+    api_worker, ws_worker = _redis_bus(server), _worker(_redis_bus(server))
+    parent = await _connect(ws_worker, "parent", families=["family_a"])
+    outsider = await _connect(ws_worker, "outsider", families=["family_b"])
+    api_worker.start()
+    await _settle(lambda: len(server.subscribers) == 2)
+
+    service = FamilyInteractionService(
+        FakeInteractionRepository(),
+        FakeFamilyRepository(),
+        FakeUserRepository(),
+        message_bus=api_worker,
+    )
+    alert_id = await service.create_health_alert(
+        family_id="family_a",
+        member_id="grandma",
+        alert_type="irregular_heart_rate",
+        severity="high",
+        title="心率异常",
+        message="静息心率持续偏高",
+        trigger_value=112,
+        threshold_value=100,
+        metric_unit="bpm",
+    )
+
+    await _settle(lambda: parent.of_type("health_alert"))
+    pushed = parent.of_type("health_alert")[0]
+    assert pushed["family_id"] == "family_a"
+    assert pushed["alert"]["alert_id"] == alert_id
+    assert pushed["alert"]["title"] == "心率异常"
+    assert outsider.of_type("health_alert") == []
+    await api_worker.close()
+    await _shutdown(ws_worker)
+
+
+@pytest.mark.slow
+async def test_family_fanout_benchmark():
+    """向 BENCH_MEMBERS 个在线成员推送 BENCH_MESSAGES 条消息：逐个成员发送 vs 家庭广播"""
+    manager = _worker(InMemoryMessageBus(), send_queue_size=BENCH_MESSAGES + 16)
+    members = [f"user_{i}" for i in range(BENCH_MEMBERS)]
+    sockets = [await _connect(manager, user_id, families=["family_a"]) for user_id in members]
+    message = {"type": "family_update", "data": {"steps": list(range(50)), "note": "今日步数"}}
+
+    async def _drain():
+        await _settle(lambda: all(not c.outbox for c in manager.connections.values()), 60)
+
+    start = time.perf_counter()
+    for _ in range(BENCH_MESSAGES):
+        for user_id in members:
+            await manager.send_personal_message(user_id, message)
+    await _drain()
+    per_member = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(BENCH_MESSAGES):
+        await manager.broadcast_to_family("family_a", message)
+    await _drain()
+    broadcast = time.perf_counter() - start
+    await _shutdown(manager)
+
+    deliveries = BENCH_MEMBERS * BENCH_MESSAGES
+    print(
+        f"\n家庭消息扇出: {BENCH_MEMBERS} 个在线成员 x {BENCH_MESSAGES} 条消息\n"
+        f"  逐个成员编码发送: {per_member * 1e6 / deliveries:6.2f} µs/次投递\n"
+        f"  家庭广播编码一次: {broadcast * 1e6 / deliveries:6.2f} µs/次投递"
+    )
+
+    assert all(len(s.of_type("family_update")) == 2 * BENCH_MESSAGES for s in sockets)
+    assert broadcast < per_member